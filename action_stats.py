@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Script de vérification des statistiques d'actions (table action_item_stats).
+
+Les compteurs par statut sont tenus à jour par des triggers. Ce script les
+recalcule depuis action_items et signale les écarts (écriture avec les
+triggers désactivés, restauration partielle...).
+
+Usage:
+    python action_stats.py [db_path]            # vérifier
+    python action_stats.py --repair [db_path]   # vérifier et réparer
+
+Code de sortie: 0 si aucun écart (ou écarts réparés), 1 sinon.
+"""
+
+import sys
+from pathlib import Path
+
+from src.database.db_manager import ACTION_STATS_COLUMNS, DatabaseManager
+
+
+def _format_stats(stats) -> str:
+    """Formater des compteurs sur une ligne."""
+    return " ".join(f"{column}={stats[column]}" for column in ACTION_STATS_COLUMNS)
+
+
+def check_stats(db: DatabaseManager, repair: bool) -> int:
+    """
+    Vérifier (et réparer si demandé) les compteurs et afficher les écarts.
+
+    Args:
+        db: Instance de DatabaseManager.
+        repair: Réparer les compteurs en écart.
+
+    Returns:
+        Code de sortie du script.
+    """
+    drifts = db.check_action_stats(repair=repair)
+    if not drifts:
+        print("✅ Statistiques d'actions cohérentes.")
+        return 0
+
+    print(f"⚠️  {len(drifts)} utilisateur(s) avec des statistiques en écart:")
+    for drift in drifts:
+        print(f"   - utilisateur {drift['user_id']}")
+        print(f"       enregistré: {_format_stats(drift['stored'])}")
+        print(f"       recalculé:  {_format_stats(drift['actual'])}")
+
+    if repair:
+        print("✅ Statistiques réparées.")
+        return 0
+    print("   Relancez avec --repair pour les corriger.")
+    return 1
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    repair_mode = "--repair" in args
+    args = [arg for arg in args if arg != "--repair"]
+
+    db_path = args[0] if args else "serene.db"
+    if not Path(db_path).exists():
+        print(f"❌ Erreur: La base de données '{db_path}' n'existe pas.")
+        sys.exit(1)
+
+    database = DatabaseManager(db_path)
+    try:
+        exit_code = check_stats(database, repair_mode)
+    finally:
+        database.close()
+    sys.exit(exit_code)
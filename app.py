@@ -10,7 +10,10 @@ from src.ui.conversation import show_conversation
 from src.ui.dashboard import show_dashboard
 from src.ui.profile import show_profile
 from src.ui.action_items import show_action_items
-from src.ui.styles.serene_styles import get_main_css
+from src.ui.profiling_panel import show_profiling_panel
+from src.ui.styles.serene_styles import get_main_css_bundle, compact_html
+from src.utils.profiling import profiled, span
+from src.utils.timing import timed
 
 # Configuration de la page
 st.set_page_config(
@@ -19,20 +22,25 @@ st.set_page_config(
     page_icon="◼"  # Carré noir minimaliste
 )
 
-# Charger FontAwesome pour icônes
-st.markdown("""
-<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-""", unsafe_allow_html=True)
 
-# Charger le CSS unifié
-st.markdown(get_main_css(), unsafe_allow_html=True)
+@profiled("app.styles")
+def inject_styles():
+    """Injecter les feuilles de style globales (à chaque réexécution)."""
+    # Charger FontAwesome pour icônes
+    st.markdown("""
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
+    """, unsafe_allow_html=True)
+
+    # Charger le CSS unifié (compilé et minifié une seule fois par processus)
+    st.html(get_main_css_bundle().html)
 
 
+@timed("home.page")
 def show_home():
     """Afficher la page d'accueil - Gallery minimalist style."""
 
     # Hero section minimaliste
-    st.markdown("""
+    st.markdown(compact_html("""
     <div style='text-align: center; padding: 4rem 2rem; background-color: var(--white);
                 border: 1px solid var(--line-light); margin-bottom: 3rem;
                 animation: fadeInDown 0.6s ease-out;'>
@@ -46,30 +54,30 @@ def show_home():
             Votre compagnon de bien-être mental
         </p>
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
     # Introduction
-    st.markdown("""
+    st.markdown(compact_html("""
     <p style='font-family: "Inter", sans-serif; font-size: 0.9375rem; color: var(--gray-dark);
               text-align: center; margin-bottom: 4rem; line-height: 1.8; font-weight: 300; max-width: 600px;
               margin-left: auto; margin-right: auto;'>
     Serene vous accompagne avec empathie dans votre parcours de bien-être mental.<br/>
     Un espace d'écoute, de suivi et de découverte de soi.
     </p>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
     # Fonctionnalités - Cards minimalistes
-    st.markdown("""
+    st.markdown(compact_html("""
     <h2 style='font-family: "Cormorant Garamond", serif; font-size: 2rem; font-weight: 300;
                color: var(--black); margin-bottom: 2rem; letter-spacing: 0.02em;'>
         Fonctionnalités
     </h2>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
     col1, col2 = st.columns(2)
 
     with col1:
-        st.markdown("""
+        st.markdown(compact_html("""
         <div style='background-color: var(--white); padding: 2rem; border: 1px solid var(--line-light);
                     height: 100%; box-shadow: var(--shadow-subtle);
                     transition: all 0.3s ease-out; animation: fadeInUp 0.7s ease-out;'
@@ -87,9 +95,9 @@ def show_home():
                 avec un compagnon IA qui vous écoute vraiment.
             </p>
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
 
-        st.markdown("""
+        st.markdown(compact_html("""
         <div style='background-color: var(--white); padding: 2rem; border: 1px solid var(--line-light);
                     margin-top: 1rem; box-shadow: var(--shadow-subtle);
                     transition: all 0.3s ease-out; animation: fadeInUp 0.75s ease-out;'
@@ -107,11 +115,11 @@ def show_home():
                 Suivez vos actions, marquez vos progrès et célébrez vos réussites.
             </p>
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
 
 
     with col2:
-        st.markdown("""
+        st.markdown(compact_html("""
         <div style='background-color: var(--white); padding: 2rem; border: 1px solid var(--line-light);
                     height: 100%; box-shadow: var(--shadow-subtle);
                     transition: all 0.3s ease-out; animation: fadeInUp 0.8s ease-out;'
@@ -129,9 +137,9 @@ def show_home():
                 vos insights personnalisés et vous aide à mieux vous comprendre.
             </p>
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
 
-        st.markdown("""
+        st.markdown(compact_html("""
         <div style='background-color: var(--white); padding: 2rem; border: 1px solid var(--line-light);
                     margin-top: 1rem; box-shadow: var(--shadow-subtle);
                     transition: all 0.3s ease-out; animation: fadeInUp 0.9s ease-out;'
@@ -149,9 +157,9 @@ def show_home():
                 Comprenez vos patterns émotionnels en un coup d'œil.
             </p>
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
 
-        st.markdown("""
+        st.markdown(compact_html("""
         <div style='background-color: var(--white); padding: 2rem; border: 1px solid var(--line-light);
                     margin-top: 1rem; box-shadow: var(--shadow-subtle);
                     transition: all 0.3s ease-out; animation: fadeInUp 1s ease-out;'
@@ -169,12 +177,12 @@ def show_home():
                 vous donnent espoir et pouvoir d'agir sur votre bien-être.
             </p>
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
 
     # Call to action minimaliste
     st.markdown("<div style='margin: 4rem 0 2rem 0;'></div>", unsafe_allow_html=True)
 
-    st.markdown("""
+    st.markdown(compact_html("""
     <div style='background-color: var(--white); padding: 3rem 2rem; border: 1px solid var(--line-light);
                 text-align: center; animation: fadeInUp 0.6s ease-out; box-shadow: var(--shadow-subtle);
                 transition: all 0.3s ease-out;'
@@ -190,21 +198,43 @@ def show_home():
             Utilisez le menu de navigation à gauche pour commencer votre parcours de bien-être mental.
         </p>
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
+
+
+def navigate_to(page: str) -> None:
+    """Callback de navigation: sélectionne la page à afficher."""
+    st.session_state.current_page = page
 
 
 def main():
     """Point d'entrée principal de l'application."""
+    # Une mesure racine par réexécution (SERENE_PROFILE=1), nommée d'après la page affichée
+    with span("rerun") as rerun:
+        page = render_app()
+        if rerun is not None:
+            rerun.name = f"rerun.{page}"
+
+    show_profiling_panel(f"rerun.{page}")
+
+
+def render_app() -> str:
+    """
+    Afficher l'écran correspondant à l'état de la session.
+
+    Returns:
+        Nom de l'écran affiché ('disclaimer', 'auth' ou clé de page)
+    """
+    inject_styles()
 
     # Étape 1: Vérifier si l'utilisateur a reconnu le disclaimer
     if not st.session_state.get('disclaimer_acknowledged', False):
         show_disclaimer()
-        return
+        return "disclaimer"
 
     # Étape 2: Vérifier si l'utilisateur est authentifié
     if not is_authenticated():
         show_auth()
-        return
+        return "auth"
 
     # Étape 2.5: Vérifier le timeout de session (auto-logout après inactivité)
     handle_session_timeout()
@@ -229,71 +259,6 @@ def main():
         if 'current_page' not in st.session_state:
             st.session_state.current_page = "Home"
 
-        # Style CSS pour les boutons de navigation - Textes simples avec barre
-        st.markdown("""
-        <style>
-        /* Navigation - Textes simples avec barre fine, pas de flèches */
-        section[data-testid="stSidebar"] button[kind="secondary"] {
-            background-color: transparent !important;
-            border: none !important;
-            border-left: 1px solid transparent !important;
-            border-radius: 0 !important;
-            color: var(--gray-medium) !important;
-            font-family: 'Inter', sans-serif !important;
-            font-size: 0.875rem !important;
-            font-weight: 300 !important;
-            letter-spacing: 0.03em !important;
-            text-transform: uppercase !important;
-            padding: 0.75rem 0 0.75rem 1rem !important;
-            text-align: left !important;
-            box-shadow: none !important;
-        }
-
-        section[data-testid="stSidebar"] button[kind="secondary"]:hover {
-            background-color: transparent !important;
-            border-left-color: var(--gray-lighter) !important;
-            color: var(--charcoal) !important;
-        }
-
-        /* État sélectionné - Texte noir, pas blanc */
-        section[data-testid="stSidebar"] button[kind="primary"],
-        section[data-testid="stSidebar"] button[kind="primary"]:active,
-        section[data-testid="stSidebar"] button[kind="primary"]:focus {
-            background-color: transparent !important;
-            border: none !important;
-            border-left: 2px solid var(--black) !important;
-            border-radius: 0 !important;
-            color: var(--black) !important;
-            font-family: 'Inter', sans-serif !important;
-            font-size: 0.875rem !important;
-            font-weight: 400 !important;
-            letter-spacing: 0.03em !important;
-            text-transform: uppercase !important;
-            padding: 0.75rem 0 0.75rem 1rem !important;
-            text-align: left !important;
-            box-shadow: none !important;
-        }
-
-        /* Forcer la couleur du texte intérieur à noir pour l'état sélectionné */
-        section[data-testid="stSidebar"] button[kind="primary"] p,
-        section[data-testid="stSidebar"] button[kind="primary"] div,
-        section[data-testid="stSidebar"] button[kind="primary"] span {
-            color: var(--black) !important;
-        }
-
-        section[data-testid="stSidebar"] button[kind="primary"]:hover {
-            background-color: transparent !important;
-        }
-
-        /* Pas de flèches pour la navigation */
-        section[data-testid="stSidebar"] button::after,
-        section[data-testid="stSidebar"] button::before {
-            content: none !important;
-            display: none !important;
-        }
-        </style>
-        """, unsafe_allow_html=True)
-
         # Navigation avec boutons épurés
         pages = {
             "Home": "Home",
@@ -304,15 +269,16 @@ def main():
             "Profil": "Profil"
         }
 
+        # Le callback change la page avant l'exécution du script: un seul rendu par clic
         for key, label in pages.items():
-            if st.button(
+            st.button(
                 label,
                 key=f"nav_{key}",
                 type="primary" if st.session_state.current_page == key else "secondary",
-                use_container_width=True
-            ):
-                st.session_state.current_page = key
-                st.rerun()
+                use_container_width=True,
+                on_click=navigate_to,
+                args=(key,),
+            )
 
         page = st.session_state.current_page
 
@@ -330,6 +296,8 @@ def main():
     elif page == "Profil":
         show_profile()
 
+    return page
+
 
 if __name__ == "__main__":
     main()
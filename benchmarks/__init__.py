@@ -0,0 +1,10 @@
+"""
+Suite de benchmarks de performance de Serene.
+
+Les bases synthétiques sont générées par seed.py, les appels LLM passent par
+un serveur local imitant l'API Messages (stub_server.py) et les résultats sont
+écrits en JSON pour comparer deux exécutions (harness.py, run.py).
+
+Usage:
+    python -m benchmarks.run --sizes 1000,100000 --output bench.json --compare baseline.json
+"""
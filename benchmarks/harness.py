@@ -0,0 +1,157 @@
+"""
+Mesure des temps d'exécution et comparaison de deux exécutions.
+
+Chaque benchmark produit un résultat {median_ms, p95_ms, min_ms, mean_ms,
+runs}; les résultats d'une exécution sont écrits en JSON avec l'environnement
+(versions de Python et SQLite, commit git) pour pouvoir être comparés plus tard.
+"""
+
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Écart relatif de la médiane au-delà duquel un benchmark est signalé
+REGRESSION_THRESHOLD = 0.10
+
+
+def measure(func: Callable[[], Any], runs: int = 10, warmup: int = 1) -> Dict[str, float]:
+    """
+    Mesurer le temps d'exécution d'une fonction sans argument.
+
+    Args:
+        func: Fonction à mesurer.
+        runs: Nombre d'exécutions mesurées.
+        warmup: Nombre d'exécutions préalables non mesurées (caches, imports).
+
+    Returns:
+        Médiane, 95e centile, minimum et moyenne en millisecondes.
+
+    Raises:
+        ValueError: Si runs n'est pas strictement positif.
+    """
+    if runs <= 0:
+        raise ValueError("runs doit être strictement positif")
+
+    for _ in range(warmup):
+        func()
+
+    samples: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))
+    return {
+        "median_ms": round(statistics.median(ordered), 4),
+        "p95_ms": round(ordered[p95_index], 4),
+        "min_ms": round(ordered[0], 4),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "runs": runs,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def environment() -> Dict[str, str]:
+    """Décrire l'environnement d'exécution (joint aux résultats)."""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "commit": _git_commit(),
+    }
+
+
+def save_results(
+    path: str,
+    results: Dict[str, Dict[str, Any]],
+    summary: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Écrire les résultats d'une exécution en JSON.
+
+    Args:
+        path: Fichier de sortie.
+        results: Résultats par nom de benchmark (voir measure).
+        summary: Informations globales de l'exécution (optionnel, non comparées).
+    """
+    data = {"meta": environment(), "results": results}
+    if summary is not None:
+        data["summary"] = summary
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """Lire les résultats écrits par save_results."""
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)["results"]
+
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Comparer les médianes de deux exécutions.
+
+    Args:
+        current: Résultats de l'exécution courante.
+        baseline: Résultats de référence.
+        threshold: Écart relatif signalé comme régression ou amélioration.
+
+    Returns:
+        Une ligne par benchmark commun: nom, médianes, écart relatif et verdict
+        ("regression", "improvement" ou "unchanged").
+    """
+    rows = []
+    for name in sorted(set(current) & set(baseline)):
+        before = baseline[name]["median_ms"]
+        after = current[name]["median_ms"]
+        change = (after - before) / before if before else 0.0
+        if change > threshold:
+            verdict = "regression"
+        elif change < -threshold:
+            verdict = "improvement"
+        else:
+            verdict = "unchanged"
+        rows.append({
+            "name": name,
+            "baseline_ms": before,
+            "current_ms": after,
+            "change": round(change, 4),
+            "verdict": verdict,
+        })
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Mettre en forme le résultat de compare() pour le terminal."""
+    if not rows:
+        return "Aucun benchmark commun avec la référence."
+    width = max(len(row["name"]) for row in rows)
+    lines = [f"{'benchmark':<{width}}  {'avant (ms)':>11}  {'après (ms)':>11}  {'écart':>8}"]
+    for row in rows:
+        marker = {"regression": "  ▲", "improvement": "  ▼"}.get(row["verdict"], "")
+        lines.append(
+            f"{row['name']:<{width}}  {row['baseline_ms']:>11.3f}  {row['current_ms']:>11.3f}  "
+            f"{row['change']:>+8.1%}{marker}"
+        )
+    return "\n".join(lines)
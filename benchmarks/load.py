@@ -0,0 +1,483 @@
+"""
+Générateur de charge: utilisateurs simultanés simulés sans navigateur.
+
+Chaque utilisateur virtuel (un thread, comme une session Streamlit) enchaîne
+des sessions réalistes: connexion (authenticate_user), check-in, plusieurs
+tours de conversation en streaming contre le serveur LLM local, consultation
+du tableau de bord puis acceptation ou refus des actions proposées. Un temps
+de réflexion aléatoire (loi exponentielle) sépare les étapes.
+
+Par défaut, tous les utilisateurs partagent un DatabaseManager et un
+ConversationManager, comme les singletons st.cache_resource de l'application;
+--connections session donne une connexion SQLite par utilisateur; --shards N
+répartit d'abord la base sur N fichiers (ShardedDatabaseManager). L'attente
+des verrous SQLite est mesurée en remplaçant le busy handler de SQLite par une
+boucle de réessai chronométrée (LockTimingConnection).
+
+Usage:
+    python -m benchmarks.load [--vus 20] [--duration 60] [--think-time 1.0]
+                              [--turns 3] [--rows 10000] [--connections shared|session] [--shards 0]
+                              [--ttft 0.3] [--token-delay 0.02] [--output load.json]
+"""
+
+import argparse
+import functools
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from benchmarks.harness import save_results
+from benchmarks.seed import DEFAULT_SEED, SEED_PASSWORD, seed_database, seed_path
+from benchmarks.stub_server import StubLLMServer
+from src.database.db_manager import FTS_TABLES, DatabaseManager
+from src.database.sharding import ShardedDatabaseManager
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+
+# Durée maximale d'attente d'un verrou (équivalent du timeout par défaut de sqlite3.connect)
+LOCK_TIMEOUT_SECONDS = 5.0
+
+# Pause maximale entre deux tentatives d'acquisition d'un verrou
+LOCK_RETRY_MAX_SLEEP = 0.05
+
+# Erreurs SQLite dues à un verrou tenu par une autre connexion (sans busy handler,
+# le constructeur des tables FTS5 échoue aussi quand il ne peut pas lire sa configuration)
+LOCK_ERRORS = ("database is locked", "database table is locked", "vtable constructor failed")
+
+# Propositions examinées par session
+ACTION_REVIEW_LIMIT = 3
+
+# Réponse du serveur local à l'extraction d'actions: une proposition par tour
+EXTRACTION_RESPONSE = json.dumps({
+    "actions": [{
+        "title": "Marcher 10 minutes après le déjeuner",
+        "description": "Une courte marche pour relâcher la tension de la matinée",
+    }],
+}, ensure_ascii=False)
+
+TURN_MESSAGES = (
+    "Je me sens stressé par le travail en ce moment",
+    "J'ai du mal à dormir depuis quelques jours",
+    "Je voudrais reprendre le sport mais je manque de motivation",
+    "Aujourd'hui ça va plutôt bien, j'ai vu des amis",
+)
+
+
+@dataclass
+class LockStats:
+    """Cumul des attentes de verrous SQLite (partagé entre connexions)."""
+
+    wait_seconds: float = 0.0
+    waits: int = 0
+    max_wait_seconds: float = 0.0
+    timeouts: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds += waited
+            self.waits += 1
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            self.timeouts += int(timed_out)
+
+
+class LockTimingConnection:
+    """
+    Connexion SQLite dont les attentes de verrou sont chronométrées.
+
+    Le busy handler de SQLite est désactivé (busy_timeout = 0): une instruction
+    bloquée lève « database is locked » et est réessayée ici, avec un délai
+    croissant, jusqu'à LOCK_TIMEOUT_SECONDS. C'est le comportement du busy
+    handler, mais le temps passé est visible.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, stats: LockStats, timeout: float = LOCK_TIMEOUT_SECONDS):
+        self._conn = conn
+        self._stats = stats
+        self._timeout = timeout
+        conn.execute("PRAGMA busy_timeout = 0")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def _retry(self, func: Callable, *args) -> Any:
+        start = None
+        delay = 0.001
+        while True:
+            try:
+                result = func(*args)
+            except sqlite3.OperationalError as e:
+                if not any(error in str(e) for error in LOCK_ERRORS):
+                    raise
+                now = time.perf_counter()
+                if start is None:
+                    start = now
+                elif now - start >= self._timeout:
+                    self._stats.record(now - start, timed_out=True)
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, LOCK_RETRY_MAX_SLEEP)
+                continue
+            if start is not None:
+                self._stats.record(time.perf_counter() - start)
+            return result
+
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        return self._retry(self._conn.execute, sql, parameters)
+
+    def executemany(self, sql: str, parameters) -> sqlite3.Cursor:
+        return self._retry(self._conn.executemany, sql, parameters)
+
+    def commit(self) -> None:
+        return self._retry(self._conn.commit)
+
+
+def _time_locks(db: DatabaseManager, stats: LockStats) -> None:
+    """Mesurer les attentes de verrou de la connexion d'un DatabaseManager."""
+    # Connecter les tables FTS5 avant la mesure (une fois par connexion)
+    for fts_table, _, _ in FTS_TABLES.values():
+        db.conn.execute(f"SELECT rowid FROM {fts_table} LIMIT 0").fetchall()
+    db.conn = LockTimingConnection(db.conn, stats)
+
+
+def open_database(path: str, stats: LockStats, read_connections: int = 0) -> DatabaseManager:
+    """Ouvrir un DatabaseManager dont les attentes de verrou (connexion d'écriture) sont mesurées."""
+    db = DatabaseManager(path, read_connections=read_connections)
+    _time_locks(db, stats)
+    return db
+
+
+def open_sharded(shard_dir: str, shard_count: int, stats: LockStats) -> ShardedDatabaseManager:
+    """Ouvrir un ShardedDatabaseManager dont les attentes de verrou sont mesurées (annuaire et shards)."""
+    db = ShardedDatabaseManager(shard_dir, shard_count=shard_count)
+    _time_locks(db.directory, stats)
+    for number in db.shard_numbers():
+        _time_locks(db.shard(number), stats)
+    return db
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Médiane, p95, p99 et maximum d'une liste de durées (secondes) en ms."""
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "median_ms": at(0.5),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+@dataclass
+class LoadConfig:
+    """Paramètres d'une exécution de charge."""
+
+    vus: int = 20
+    duration: float = 60.0
+    iterations: int = 0
+    think_time: float = 1.0
+    turns: int = 3
+    connections: str = "shared"
+    shards: int = 0
+    read_connections: int = 0
+    seed: int = DEFAULT_SEED
+
+
+class LoadRecorder:
+    """Durées par opération et erreurs, alimentées par tous les threads."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.sessions = 0
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(operation, []).append(seconds)
+
+    def error(self, operation: str, exc: Exception) -> None:
+        with self._lock:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+        print(f"Erreur {operation}: {exc}")
+
+    def session_done(self) -> None:
+        with self._lock:
+            self.sessions += 1
+
+
+class VirtualUser:
+    """Un utilisateur simulé qui enchaîne des sessions jusqu'à l'échéance."""
+
+    def __init__(
+        self,
+        index: int,
+        email: str,
+        db: DatabaseManager,
+        manager,
+        recorder: LoadRecorder,
+        config: LoadConfig,
+    ):
+        self.index = index
+        self.email = email
+        self.db = db
+        self.manager = manager
+        self.recorder = recorder
+        self.config = config
+        self.rng = random.Random(config.seed + index)
+
+    def _think(self) -> None:
+        if self.config.think_time > 0:
+            time.sleep(self.rng.expovariate(1 / self.config.think_time))
+
+    def _step(self, operation: str, func: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            self.recorder.error(operation, e)
+            return None
+        self.recorder.record(operation, time.perf_counter() - start)
+        return result
+
+    def _turn(self, user_id: int) -> None:
+        """Un tour de conversation: temps jusqu'au premier fragment et durée totale."""
+        start = time.perf_counter()
+        first = None
+        for _ in self.manager.send_message(user_id, self.rng.choice(TURN_MESSAGES)):
+            if first is None:
+                first = time.perf_counter()
+                self.recorder.record("conversation.ttft", first - start)
+
+    def _dashboard(self, user_id: int) -> None:
+        self.db.get_mood_stats(user_id, days=30)
+        self.db.get_mood_history(user_id, days=30)
+        self.db.get_conversation_history(user_id, limit=100)
+
+    def _review_actions(self, user_id: int) -> None:
+        self.db.get_action_items_stats(user_id)
+        for proposal in self.db.get_proposed_actions(user_id, status="pending")[:ACTION_REVIEW_LIMIT]:
+            if self.rng.random() < 0.5:
+                self.db.accept_proposed_action(proposal["id"])
+            else:
+                self.db.reject_proposed_action(proposal["id"])
+        self.db.get_action_items(user_id)
+
+    def session(self) -> None:
+        """Une session complète, de la connexion aux actions."""
+        user = self._step("login", lambda: self.db.authenticate_user(self.email, SEED_PASSWORD))
+        if not user:
+            return
+        user_id = user["id"]
+
+        self._think()
+        self._step("checkin", lambda: self.db.save_checkin(user_id, self.rng.randint(0, 10), "Séance de charge"))
+        for _ in range(self.config.turns):
+            self._think()
+            self._step("conversation.turn", lambda: self._turn(user_id))
+        self._think()
+        self._step("dashboard", lambda: self._dashboard(user_id))
+        self._think()
+        self._step("actions.review", lambda: self._review_actions(user_id))
+        self.recorder.session_done()
+
+    def run(self, deadline: float) -> None:
+        done = 0
+        while time.perf_counter() < deadline:
+            self.session()
+            done += 1
+            if self.config.iterations and done >= self.config.iterations:
+                break
+
+
+def run_load(db_path: str, users: int, stub: StubLLMServer, config: LoadConfig) -> Dict[str, Any]:
+    """
+    Exécuter la charge sur une base (modifiée en place) et produire le rapport.
+
+    Args:
+        db_path: Base synthétique (voir seed_database), comptes user<i>@bench.local.
+            Avec config.shards, elle est importée dans un dossier de shards voisin.
+        users: Nombre de comptes de la base; l'utilisateur virtuel i se connecte
+            avec le compte (i % users) + 1.
+        stub: Serveur LLM local démarré.
+        config: Paramètres de la charge.
+
+    Returns:
+        Dict avec summary (débit, erreurs, attente des verrous) et operations
+        (percentiles par opération).
+
+    Raises:
+        ValueError: Si le mode de connexion est inconnu.
+    """
+    if config.connections not in ("shared", "session"):
+        raise ValueError(f"Mode de connexion inconnu: {config.connections}")
+
+    from src.llm.conversation_manager import ConversationManager
+
+    saved_env = {key: os.environ.get(key) for key in ("ANTHROPIC_API_KEY", "ANTHROPIC_BASE_URL")}
+    os.environ["ANTHROPIC_API_KEY"] = "load-key"
+    os.environ["ANTHROPIC_BASE_URL"] = stub.base_url
+
+    stats = LockStats()
+    recorder = LoadRecorder()
+    databases: List[DatabaseManager] = []
+
+    if config.shards > 0:
+        shard_dir = os.path.join(os.path.dirname(db_path), "shards")
+        importer = ShardedDatabaseManager(shard_dir, shard_count=config.shards)
+        importer.import_database(db_path)
+        importer.close()
+        open_db = functools.partial(open_sharded, shard_dir, config.shards, stats)
+    else:
+        open_db = functools.partial(open_database, db_path, stats, config.read_connections)
+
+    try:
+        vus = []
+        shared_db = shared_manager = None
+        if config.connections == "shared":
+            shared_db = open_db()
+            shared_manager = ConversationManager(shared_db)
+            databases.append(shared_db)
+
+        for i in range(config.vus):
+            db, manager = shared_db, shared_manager
+            if db is None:
+                db = open_db()
+                manager = ConversationManager(db)
+                databases.append(db)
+            vus.append(VirtualUser(i, f"user{i % users + 1}@bench.local", db, manager, recorder, config))
+
+        start = time.perf_counter()
+        deadline = start + config.duration if config.duration > 0 else float("inf")
+        threads = [threading.Thread(target=vu.run, args=(deadline,), daemon=True) for vu in vus]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        for db in databases:
+            db.close()
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    operations = {name: percentiles(samples) for name, samples in sorted(recorder.samples.items())}
+    completed = sum(len(samples) for name, samples in recorder.samples.items() if name != "conversation.ttft")
+    summary = {
+        "vus": config.vus,
+        "connections": config.connections,
+        "shards": config.shards,
+        "read_connections": config.read_connections,
+        "elapsed_s": round(elapsed, 3),
+        "sessions": recorder.sessions,
+        "sessions_per_s": round(recorder.sessions / elapsed, 3) if elapsed else 0.0,
+        "operations_per_s": round(completed / elapsed, 3) if elapsed else 0.0,
+        "turns_per_s": round(operations.get("conversation.turn", {}).get("count", 0) / elapsed, 3) if elapsed else 0.0,
+        "errors": dict(recorder.errors),
+        "llm_requests": stub.requests,
+        "lock_wait_s": round(stats.wait_seconds, 4),
+        "lock_waits": stats.waits,
+        "lock_wait_max_ms": round(stats.max_wait_seconds * 1000, 3),
+        "lock_timeouts": stats.timeouts,
+    }
+    return {"summary": summary, "operations": operations}
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Mettre en forme le rapport de run_load() pour le terminal."""
+    summary = report["summary"]
+    lines = [
+        f"{summary['vus']} utilisateurs ({summary['connections']}"
+        f"{', ' + str(summary['shards']) + ' shards' if summary.get('shards') else ''}), {summary['elapsed_s']:.1f} s: "
+        f"{summary['sessions']} sessions ({summary['sessions_per_s']:.2f}/s), "
+        f"{summary['operations_per_s']:.2f} opérations/s, {summary['turns_per_s']:.2f} tours/s",
+        f"Attente des verrous SQLite: {summary['lock_wait_s']:.3f} s sur {summary['lock_waits']} instructions "
+        f"(max {summary['lock_wait_max_ms']:.1f} ms, {summary['lock_timeouts']} timeouts)",
+    ]
+    if summary["errors"]:
+        lines.append(f"Erreurs: {summary['errors']}")
+    width = max((len(name) for name in report["operations"]), default=0)
+    lines.append(f"{'opération':<{width}}  {'n':>6}  {'p50 (ms)':>10}  {'p95 (ms)':>10}  {'p99 (ms)':>10}  {'max (ms)':>10}")
+    for name, row in report["operations"].items():
+        lines.append(
+            f"{name:<{width}}  {row['count']:>6}  {row['median_ms']:>10.1f}  {row['p95_ms']:>10.1f}  "
+            f"{row['p99_ms']:>10.1f}  {row['max_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Générateur de charge de Serene")
+    parser.add_argument("--vus", type=int, default=20, help="Utilisateurs simultanés")
+    parser.add_argument("--duration", type=float, default=60.0, help="Durée en secondes (0: --iterations seulement)")
+    parser.add_argument("--iterations", type=int, default=0, help="Sessions par utilisateur (0: illimité)")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Temps de réflexion moyen (s)")
+    parser.add_argument("--turns", type=int, default=3, help="Tours de conversation par session")
+    parser.add_argument("--connections", choices=("shared", "session"), default="shared")
+    parser.add_argument("--shards", type=int, default=0, help="Répartir la base sur N fichiers (0: base unique)")
+    parser.add_argument(
+        "--read-connections", type=int, default=0, help="Connexions de lecture séparées (0: une seule connexion)"
+    )
+    parser.add_argument("--rows", type=int, default=10_000, help="Taille de la base synthétique")
+    parser.add_argument("--users", type=int, default=1_000, help="Comptes de la base synthétique")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Délai du premier token du serveur LLM (s)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Délai entre tokens (s)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    if args.duration <= 0 and args.iterations <= 0:
+        print("--duration ou --iterations doit être positif")
+        return 2
+
+    path = seed_path(args.data_dir, args.users, args.rows, args.seed)
+    info = seed_database(path, rows=args.rows, users=args.users, seed=args.seed)
+    config = LoadConfig(
+        vus=args.vus,
+        duration=args.duration,
+        iterations=args.iterations,
+        think_time=args.think_time,
+        turns=args.turns,
+        connections=args.connections,
+        shards=args.shards,
+        read_connections=args.read_connections,
+        seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir, StubLLMServer(
+        ttft_seconds=args.ttft, token_delay_seconds=args.token_delay, json_response=EXTRACTION_RESPONSE
+    ) as stub:
+        # La charge écrit dans une copie: la base synthétique reste réutilisable
+        db_path = os.path.join(tmp_dir, "load.db")
+        shutil.copyfile(info.path, db_path)
+        report = run_load(db_path, info.users, stub, config)
+
+    print(format_report(report))
+    if args.output:
+        results = {f"load.{name}": row for name, row in report["operations"].items()}
+        save_results(args.output, results, summary=report["summary"])
+        print(f"Résultats écrits dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,119 @@
+"""
+Évaluer le filtre local de l'extraction d'actions sur un échantillon annoté.
+
+Chaque ligne de l'échantillon (JSONL) contient un message et son étiquette:
+{"message": "...", "actionable": true}. Pour chaque seuil, le rapport donne
+le rappel (messages actionnables encore envoyés au modèle, à garder à 100 %),
+la précision et la part d'appels d'extraction évités.
+
+Usage:
+    python -m benchmarks.prefilter_eval [--sample benchmarks/prefilter_sample.jsonl]
+                                        [--thresholds 0.1,0.2,0.3,0.4,0.5,0.6]
+                                        [--show-errors 0.3]
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Sequence, Tuple
+
+from src.llm.action_prefilter import DEFAULT_PREFILTER_THRESHOLD, actionability_score
+
+DEFAULT_SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prefilter_sample.jsonl")
+DEFAULT_THRESHOLDS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6)
+
+
+def load_sample(path: str) -> List[Tuple[str, bool]]:
+    """
+    Charger un échantillon annoté.
+
+    Args:
+        path: Fichier JSONL (message, actionable).
+
+    Returns:
+        Liste de (message, étiquette).
+    """
+    with open(path, encoding="utf-8") as f:
+        return [
+            (row["message"], bool(row["actionable"]))
+            for row in (json.loads(line) for line in f if line.strip())
+        ]
+
+
+def evaluate(sample: Sequence[Tuple[str, bool]], threshold: float) -> Dict[str, float]:
+    """
+    Mesurer le filtre à un seuil.
+
+    Args:
+        sample: Messages annotés.
+        threshold: Score minimal pour envoyer le message au modèle.
+
+    Returns:
+        Dict contenant: threshold, messages, recall, precision, skipped_ratio,
+        false_negatives (messages actionnables filtrés).
+    """
+    sent = [(message, label) for message, label in sample if actionability_score(message) >= threshold]
+    actionable = sum(label for _, label in sample)
+    true_positives = sum(label for _, label in sent)
+    return {
+        "threshold": threshold,
+        "messages": len(sample),
+        "recall": true_positives / actionable if actionable else 1.0,
+        "precision": true_positives / len(sent) if sent else 1.0,
+        "skipped_ratio": 1 - len(sent) / len(sample) if sample else 0.0,
+        "false_negatives": actionable - true_positives,
+    }
+
+
+def misclassified(sample: Sequence[Tuple[str, bool]], threshold: float) -> List[Tuple[float, bool, str]]:
+    """Messages dont la décision diffère de l'étiquette: (score, étiquette, message)."""
+    rows = [(actionability_score(message), label, message) for message, label in sample]
+    return [row for row in rows if (row[0] >= threshold) != row[1]]
+
+
+def format_report(rows: Sequence[Dict[str, float]]) -> str:
+    """Formater les mesures par seuil."""
+    lines = [f"{'seuil':>6} {'rappel':>8} {'précision':>10} {'appels évités':>14} {'manqués':>8}"]
+    for row in rows:
+        marker = " (défaut)" if row["threshold"] == DEFAULT_PREFILTER_THRESHOLD else ""
+        lines.append(
+            f"{row['threshold']:>6.2f} {row['recall']:>8.1%} {row['precision']:>10.1%} "
+            f"{row['skipped_ratio']:>14.1%} {row['false_negatives']:>8}{marker}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Évaluation du filtre de l'extraction d'actions")
+    parser.add_argument("--sample", default=DEFAULT_SAMPLE, help="Échantillon annoté (JSONL)")
+    parser.add_argument("--thresholds", default=",".join(str(t) for t in DEFAULT_THRESHOLDS),
+                        help="Seuils à évaluer, séparés par des virgules")
+    parser.add_argument("--show-errors", type=float, metavar="SEUIL",
+                        help="Lister les messages mal classés à ce seuil")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    try:
+        thresholds = [float(value) for value in args.thresholds.split(",") if value]
+    except ValueError:
+        print(f"Seuils invalides: {args.thresholds}")
+        return 2
+
+    sample = load_sample(args.sample)
+    actionable = sum(label for _, label in sample)
+    print(f"Échantillon: {len(sample)} messages, dont {actionable} actionnables ({args.sample})\n")
+    print(format_report([evaluate(sample, threshold) for threshold in thresholds]))
+
+    if args.show_errors is not None:
+        print(f"\nMessages mal classés au seuil {args.show_errors}:")
+        for score, label, message in misclassified(sample, args.show_errors):
+            kind = "manqué" if label else "envoyé"
+            print(f"  {score:.2f} {kind:<7} {message}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
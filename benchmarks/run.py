@@ -0,0 +1,184 @@
+"""
+Exécuter la suite de benchmarks de Serene.
+
+Usage:
+    python -m benchmarks.run [--sizes 1000,10000,100000] [--users 10000]
+                             [--runs 10] [--output bench.json] [--compare baseline.json]
+                             [--only get_mood_history,send_message] [--data-dir benchmarks/.data]
+
+Les bases synthétiques sont générées une fois par taille dans --data-dir puis
+réutilisées. Avec --compare, les médianes sont comparées à un fichier de
+résultats précédent et le code de sortie vaut 1 en cas de régression.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.harness import (
+    REGRESSION_THRESHOLD,
+    compare,
+    format_comparison,
+    load_results,
+    measure,
+    save_results,
+)
+from benchmarks.seed import DEFAULT_SEED, DEFAULT_USERS, SeedInfo, seed_database, seed_path
+from benchmarks.stub_server import StubLLMServer
+from src.database.db_manager import DatabaseManager
+from src.utils.password_validator import check_common_passwords
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+
+# Mots de passe testés à chaque mesure de check_common_passwords
+PASSWORD_SAMPLES = ("password", "Azerty123", "Tr0ub4dor&3", "correct horse battery staple", "Serene-2024!") * 20
+
+# Messages envoyés à chaque mesure de send_message: sans intention d'action (un
+# appel, l'extraction est filtrée), puis avec (deux appels, ou un en mode fusionné)
+SEND_MESSAGE_TEXT = "Je me sens stressé par le travail en ce moment"
+ACTIONABLE_MESSAGE_TEXT = "Je vais essayer de méditer 10 minutes par jour"
+
+Benchmark = Callable[[], object]
+
+
+def database_benchmarks(db: DatabaseManager, user_id: int) -> List[Tuple[str, Benchmark]]:
+    """Benchmarks en lecture de DatabaseManager pour un utilisateur."""
+    return [
+        ("get_mood_history[30d]", lambda: db.get_mood_history(user_id, days=30)),
+        ("get_mood_history[365d]", lambda: db.get_mood_history(user_id, days=365)),
+        ("get_conversation_history", lambda: db.get_conversation_history(user_id, limit=50)),
+        ("export_user_data", lambda: db.export_user_data(user_id)),
+        ("get_action_items_stats", lambda: db.get_action_items_stats(user_id)),
+    ]
+
+
+def run_password_benchmark(runs: int) -> Dict[str, Dict]:
+    """Mesurer check_common_passwords (indépendant de la taille de la base)."""
+    return {
+        "check_common_passwords[x100]": measure(
+            lambda: [check_common_passwords(password) for password in PASSWORD_SAMPLES], runs=runs
+        )
+    }
+
+
+def run_send_message_benchmark(info: SeedInfo, runs: int) -> Dict[str, Dict]:
+    """
+    Mesurer ConversationManager.send_message contre le serveur LLM local.
+
+    Les écritures (conversations, actions, métriques) sont faites sur une copie
+    temporaire de la base synthétique, qui reste inchangée.
+    """
+    from src.llm.conversation_manager import ConversationManager
+
+    with tempfile.TemporaryDirectory() as tmp_dir, StubLLMServer() as stub:
+        db_copy = os.path.join(tmp_dir, "bench.db")
+        shutil.copyfile(info.path, db_copy)
+
+        saved_env = {key: os.environ.get(key) for key in ("ANTHROPIC_API_KEY", "ANTHROPIC_BASE_URL")}
+        os.environ["ANTHROPIC_API_KEY"] = "bench-key"
+        os.environ["ANTHROPIC_BASE_URL"] = stub.base_url
+        db = DatabaseManager(db_copy)
+        try:
+            variants = {
+                "send_message": (False, SEND_MESSAGE_TEXT),
+                "send_message[actionable]": (False, ACTIONABLE_MESSAGE_TEXT),
+                "send_message[actionable,fused]": (True, ACTIONABLE_MESSAGE_TEXT),
+            }
+            results = {}
+            for name, (fused, text) in variants.items():
+                manager = ConversationManager(db, fused_extraction=fused)
+
+                def send(manager=manager, text=text):
+                    for _ in manager.send_message(info.heavy_user_id, text):
+                        pass
+
+                requests_before = stub.requests
+                result = measure(send, runs=runs)
+                result["stub_ttft_ms"] = stub.ttft_seconds * 1000
+                # Appels LLM par tour (exécutions mesurées + échauffement)
+                result["llm_requests_per_call"] = (stub.requests - requests_before) / (runs + 1)
+                results[name] = result
+            return results
+        finally:
+            db.close()
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def run_size(info: SeedInfo, runs: int, only: List[str]) -> Dict[str, Dict]:
+    """Exécuter les benchmarks dépendant de la taille de la base."""
+    results: Dict[str, Dict] = {}
+    db = DatabaseManager(info.path)
+    try:
+        for name, func in database_benchmarks(db, info.heavy_user_id):
+            if not only or name.split("[")[0] in only:
+                results[f"{name}@{info.rows}"] = measure(func, runs=runs)
+    finally:
+        db.close()
+
+    if not only or "send_message" in only:
+        for name, result in run_send_message_benchmark(info, runs).items():
+            results[f"{name}@{info.rows}"] = result
+    return results
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks de performance de Serene")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Nombres de check-ins/conversations, séparés par des virgules")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="Fichier JSON de résultats")
+    parser.add_argument("--compare", help="Fichier JSON de référence")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--only", default="", help="Benchmarks à exécuter, séparés par des virgules")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    try:
+        sizes = [int(size) for size in args.sizes.split(",") if size]
+    except ValueError:
+        print(f"Tailles invalides: {args.sizes}")
+        return 2
+    only = [name for name in args.only.split(",") if name]
+
+    results: Dict[str, Dict] = {}
+    if not only or "check_common_passwords" in only:
+        results.update(run_password_benchmark(args.runs))
+
+    for size in sizes:
+        path = seed_path(args.data_dir, args.users, size, args.seed)
+        print(f"Base synthétique: {size} lignes, {args.users} utilisateurs ({path})")
+        info = seed_database(path, rows=size, users=args.users, seed=args.seed)
+        print(f"  utilisateur le plus actif: {info.heavy_user_rows}")
+        results.update(run_size(info, args.runs, only))
+
+    width = max((len(name) for name in results), default=0)
+    for name, result in sorted(results.items()):
+        print(f"{name:<{width}}  médiane {result['median_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms")
+
+    if args.output:
+        save_results(args.output, results)
+        print(f"Résultats écrits dans {args.output}")
+
+    if args.compare:
+        rows = compare(results, load_results(args.compare), args.threshold)
+        print(format_comparison(rows))
+        if any(row["verdict"] == "regression" for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,194 @@
+"""
+Génération de bases synthétiques pour les benchmarks.
+
+Les lignes sont réparties entre les utilisateurs selon une loi de Zipf: le
+premier utilisateur est le plus actif, ce qui reproduit le cas d'un compte
+ancien et volumineux. La génération est déterministe (graine fixe) et la base
+produite peut être réutilisée d'une exécution à l'autre.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from src.database.db_manager import FTS_TABLES, DatabaseManager
+
+DEFAULT_USERS = 10_000
+DEFAULT_SEED = 42
+
+# Exposant de la loi de Zipf (répartition des lignes entre utilisateurs)
+ZIPF_EXPONENT = 1.1
+
+# Lignes insérées par executemany()
+SEED_BATCH_SIZE = 50_000
+
+# Historique couvert par les données synthétiques
+SEED_HISTORY_DAYS = 730
+
+NOTES = (
+    "Bonne nuit de sommeil", "Journée chargée au travail", "Fatigue en fin de journée",
+    "Séance de sport ce matin", "Un peu d'anxiété avant la réunion", "Repas avec des amis",
+    "", "", "",
+)
+MESSAGES = (
+    ("Je me sens stressé par le travail", "Qu'est-ce qui te pèse le plus en ce moment ?"),
+    ("J'ai bien dormi cette nuit", "C'est une bonne nouvelle, qu'est-ce qui a aidé ?"),
+    ("Je vais essayer de méditer 10 minutes par jour", "Belle intention, comment veux-tu commencer ?"),
+    ("Je me sens seul ces derniers temps", "Merci de le partager. Qui pourrais-tu contacter cette semaine ?"),
+)
+ACTION_STATUSES = ("pending", "in_progress", "completed", "abandoned")
+
+# Hash commun à tous les comptes synthétiques (mot de passe: "Bench-Passw0rd!")
+SEED_PASSWORD = "Bench-Passw0rd!"
+
+
+@dataclass
+class SeedInfo:
+    """Description d'une base synthétique."""
+
+    path: str
+    users: int
+    rows: int
+    heavy_user_id: int
+    heavy_user_rows: Dict[str, int]
+
+
+def seed_path(directory: str, users: int, rows: int, seed: int = DEFAULT_SEED) -> str:
+    """Chemin de la base synthétique correspondant aux paramètres."""
+    return os.path.join(directory, f"seed_u{users}_r{rows}_s{seed}.db")
+
+
+def _user_ids(rng: np.random.Generator, users: int, count: int) -> np.ndarray:
+    """Tirer count user_id (1..users) selon une loi de Zipf tronquée."""
+    weights = 1.0 / np.arange(1, users + 1) ** ZIPF_EXPONENT
+    return rng.choice(users, size=count, p=weights / weights.sum()) + 1
+
+
+def _timestamps(rng: np.random.Generator, count: int, now: datetime) -> np.ndarray:
+    """Tirer count dates des SEED_HISTORY_DAYS derniers jours (format SQLite)."""
+    offsets = rng.integers(0, SEED_HISTORY_DAYS * 86_400, size=count).astype("timedelta64[s]")
+    stamps = np.datetime64(now.replace(microsecond=0)) - offsets
+    return np.datetime_as_string(stamps, unit="s")
+
+
+def _batches(count: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, count, SEED_BATCH_SIZE):
+        yield start, min(start + SEED_BATCH_SIZE, count)
+
+
+def seed_database(
+    path: str,
+    rows: int,
+    users: int = DEFAULT_USERS,
+    seed: int = DEFAULT_SEED,
+) -> SeedInfo:
+    """
+    Créer une base synthétique (ou la réutiliser si elle existe déjà).
+
+    Args:
+        path: Chemin du fichier SQLite.
+        rows: Nombre de check-ins et de conversations (chacun); rows // 10 actions.
+        users: Nombre d'utilisateurs.
+        seed: Graine du générateur aléatoire.
+
+    Returns:
+        SeedInfo décrivant la base et l'utilisateur le plus actif.
+
+    Raises:
+        ValueError: Si rows ou users ne sont pas strictement positifs.
+    """
+    if rows <= 0 or users <= 0:
+        raise ValueError("rows et users doivent être strictement positifs")
+
+    if not os.path.exists(path):
+        # Générer dans un fichier temporaire: une génération interrompue n'est jamais réutilisée
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        db = DatabaseManager(tmp_path)
+        try:
+            _populate(db, rows, users, seed)
+        finally:
+            db.close()
+        os.replace(tmp_path, path)
+
+    db = DatabaseManager(path)
+    try:
+        return _describe(db, path, rows, users)
+    finally:
+        db.close()
+
+
+def _populate(db: DatabaseManager, rows: int, users: int, seed: int) -> None:
+    """Insérer utilisateurs, check-ins, conversations et actions."""
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    conn = db.conn
+    password_hash = DatabaseManager._hash_password(SEED_PASSWORD)
+
+    # Index plein texte construit en une passe à la fin (les triggers sont
+    # recréés par schema.sql à la prochaine ouverture de la base)
+    for table in FTS_TABLES:
+        conn.execute(f"DROP TRIGGER IF EXISTS {table}_fts_insert")
+
+    conn.executemany(
+        "INSERT INTO users (id, email, password_hash, display_name) VALUES (?, ?, ?, ?)",
+        ((i, f"user{i}@bench.local", password_hash, f"User {i}") for i in range(1, users + 1)),
+    )
+
+    for start, end in _batches(rows):
+        count = end - start
+        user_ids = _user_ids(rng, users, count).tolist()
+        scores = rng.integers(0, 11, size=count).tolist()
+        notes = rng.choice(len(NOTES), size=count).tolist()
+        conn.executemany(
+            "INSERT INTO check_ins (user_id, timestamp, mood_score, notes) VALUES (?, ?, ?, ?)",
+            zip(user_ids, _timestamps(rng, count, now).tolist(), scores, (NOTES[i] for i in notes)),
+        )
+
+    for start, end in _batches(rows):
+        count = end - start
+        user_ids = _user_ids(rng, users, count).tolist()
+        messages = [MESSAGES[i] for i in rng.choice(len(MESSAGES), size=count).tolist()]
+        tokens = rng.integers(50, 1500, size=count).tolist()
+        conn.executemany(
+            "INSERT INTO conversations (user_id, timestamp, user_message, ai_response, tokens_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (uid, stamp, message[0], message[1], used)
+                for uid, stamp, message, used in zip(
+                    user_ids, _timestamps(rng, count, now).tolist(), messages, tokens
+                )
+            ),
+        )
+
+    actions = max(1, rows // 10)
+    for start, end in _batches(actions):
+        count = end - start
+        user_ids = _user_ids(rng, users, count).tolist()
+        statuses = rng.choice(len(ACTION_STATUSES), size=count).tolist()
+        conn.executemany(
+            "INSERT INTO action_items (user_id, title, status, source) VALUES (?, ?, ?, 'manual')",
+            ((uid, f"Action {start + i}", ACTION_STATUSES[s]) for i, (uid, s) in enumerate(zip(user_ids, statuses))),
+        )
+
+    for fts_table, _, _ in FTS_TABLES.values():
+        conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def _describe(db: DatabaseManager, path: str, rows: int, users: int) -> SeedInfo:
+    """Compter les lignes de l'utilisateur le plus actif (user_id 1 par construction)."""
+    heavy_rows = {
+        table: db.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE user_id = 1").fetchone()[0]
+        for table in ("check_ins", "conversations", "action_items")
+    }
+    return SeedInfo(path=path, users=users, rows=rows, heavy_user_id=1, heavy_user_rows=heavy_rows)
+
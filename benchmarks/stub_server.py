@@ -0,0 +1,215 @@
+"""
+Serveur local imitant l'API Messages d'Anthropic pour les benchmarks.
+
+Répond à POST /v1/messages, en streaming (événements SSE) ou non, avec un
+délai configurable avant le premier token et entre les tokens. Le client
+Anthropic y est redirigé par la variable ANTHROPIC_BASE_URL; aucune requête
+ne sort de la machine et aucun token n'est facturé.
+
+Si le system prompt demande le bloc d'actions du mode fusionné, la réponse en
+streaming se termine par ce bloc, contenant json_response.
+
+Des pannes peuvent être injectées pour les prochaines requêtes (fail_next,
+slow_next): erreurs HTTP (429, 500, 529...) avec ou sans retry-after, ou
+latence supplémentaire.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple
+
+from src.llm.action_extractor import ACTIONS_TRAILER_END, ACTIONS_TRAILER_START
+
+# Réponse en streaming (conversation), découpée en tokens approximatifs
+STREAM_RESPONSE = (
+    "Merci de partager ce que tu ressens. Prenons un moment pour en parler : "
+    "qu'est-ce qui t'aiderait le plus aujourd'hui ?"
+)
+
+# Réponse non streamée: JSON valide pour l'extraction et la suggestion d'actions
+JSON_RESPONSE = '{"message": "", "actions": []}'
+
+
+def _tokens(text: str) -> List[str]:
+    """Découper un texte en morceaux d'environ un mot."""
+    words = text.split(" ")
+    return [word + " " for word in words[:-1]] + [words[-1]]
+
+
+class StubLLMServer:
+    """Serveur HTTP de test exécuté dans un thread (context manager)."""
+
+    def __init__(
+        self,
+        ttft_seconds: float = 0.05,
+        token_delay_seconds: float = 0.005,
+        json_response: str = JSON_RESPONSE,
+    ):
+        """
+        Initialiser le serveur.
+
+        Args:
+            ttft_seconds: Délai avant le premier token (ou avant la réponse non streamée).
+            token_delay_seconds: Délai entre deux tokens en streaming.
+            json_response: Texte des réponses non streamées (extraction d'actions)
+                et du bloc d'actions en mode fusionné.
+        """
+        self.ttft_seconds = ttft_seconds
+        self.token_delay_seconds = token_delay_seconds
+        self.json_response = json_response
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+        # Pannes à appliquer aux prochaines requêtes: ("status", code, retry_after) ou ("slow", secondes)
+        self._faults: Deque[Tuple] = deque()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL à passer à ANTHROPIC_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubLLMServer":
+        """Démarrer le serveur sur un port libre de 127.0.0.1."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # noqa: A002 - signature imposée
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stub._requests_lock:
+                    stub.requests += 1
+                    fault = stub._faults.popleft() if stub._faults else None
+                input_tokens = max(1, length // 4)
+                if fault and fault[0] == "status":
+                    stub._error(self, fault[1], fault[2])
+                    return
+                if fault and fault[0] == "slow":
+                    time.sleep(fault[1])
+                if body.get("stream"):
+                    stub._stream(self, body, input_tokens)
+                else:
+                    stub._respond(self, body, input_tokens)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def fail_next(self, status: int, count: int = 1, retry_after: Optional[float] = None) -> None:
+        """
+        Faire échouer les prochaines requêtes.
+
+        Args:
+            status: Code HTTP retourné (429, 500, 529...).
+            count: Nombre de requêtes concernées.
+            retry_after: Valeur de l'en-tête retry-after en secondes (optionnel).
+        """
+        with self._requests_lock:
+            self._faults.extend([("status", status, retry_after)] * count)
+
+    def slow_next(self, seconds: float, count: int = 1) -> None:
+        """Ajouter une latence aux prochaines requêtes."""
+        with self._requests_lock:
+            self._faults.extend([("slow", seconds)] * count)
+
+    def stop(self) -> None:
+        """Arrêter le serveur."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.stop()
+        return False
+
+    @staticmethod
+    def _message(body: Dict, content: List[Dict], input_tokens: int, output_tokens: int) -> Dict:
+        return {
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": content,
+            "stop_reason": "end_turn" if content else None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        }
+
+    @staticmethod
+    def _error(handler: BaseHTTPRequestHandler, status: int, retry_after: Optional[float]) -> None:
+        """Réponse d'erreur au format de l'API."""
+        error_type = {429: "rate_limit_error", 529: "overloaded_error"}.get(status, "api_error")
+        payload = json.dumps({
+            "type": "error", "error": {"type": error_type, "message": f"Injected {status}"},
+        }).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        if retry_after is not None:
+            handler.send_header("retry-after", str(retry_after))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _respond(self, handler: BaseHTTPRequestHandler, body: Dict, input_tokens: int) -> None:
+        """Réponse JSON complète après ttft_seconds."""
+        time.sleep(self.ttft_seconds)
+        payload = json.dumps(self._message(
+            body, [{"type": "text", "text": self.json_response}], input_tokens, len(_tokens(self.json_response))
+        )).encode("utf-8")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _stream(self, handler: BaseHTTPRequestHandler, body: Dict, input_tokens: int) -> None:
+        """Réponse en événements SSE, un token toutes les token_delay_seconds."""
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Cache-Control", "no-cache")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        handler.close_connection = True
+
+        def send(event: str, data: Dict) -> None:
+            handler.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+
+        text = STREAM_RESPONSE
+        if ACTIONS_TRAILER_START in str(body.get("system", "")):
+            text += f"\n{ACTIONS_TRAILER_START}{self.json_response}{ACTIONS_TRAILER_END}"
+        tokens = _tokens(text)
+        send("message_start", {"type": "message_start", "message": self._message(body, [], input_tokens, 1)})
+        send("content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+        })
+        time.sleep(self.ttft_seconds)
+        for token in tokens:
+            send("content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": token},
+            })
+            time.sleep(self.token_delay_seconds)
+        send("content_block_stop", {"type": "content_block_stop", "index": 0})
+        send("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": len(tokens)},
+        })
+        send("message_stop", {"type": "message_stop"})
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Script d'import en masse de check-ins ou de conversations historiques
+(migration depuis un autre outil de journal).
+
+Usage:
+    python import_data.py <fichier.csv|.json|.ndjson> <check_ins|conversations> <user_id> [db_path] [--defer-indexes]
+
+--defer-indexes: supprimer les index de la table pendant l'import et les
+    recréer à la fin (plus rapide pour de gros fichiers). Hors ligne
+    uniquement, application arrêtée: pendant l'import, les lectures des
+    autres utilisateurs n'ont plus d'index.
+
+Colonnes attendues:
+    check_ins:      mood_score (requis), timestamp, notes
+    conversations:  user_message, ai_response (requis), timestamp, tokens_used
+"""
+
+import sys
+from pathlib import Path
+
+from src.database.bulk_import import BulkImporter
+from src.database.db_manager import DatabaseManager
+
+
+def import_data(
+    file_path: str,
+    table: str,
+    user_id: int,
+    db_path: str = "serene.db",
+    defer_indexes: bool = False,
+) -> None:
+    """
+    Importer un fichier dans la base de données.
+
+    Args:
+        file_path: Chemin du fichier à importer.
+        table: Table cible ('check_ins' ou 'conversations').
+        user_id: ID de l'utilisateur auquel rattacher les lignes.
+        db_path: Chemin vers le fichier de base de données.
+        defer_indexes: Différer les index (hors ligne uniquement, voir l'usage).
+    """
+    print(f"📥 Import de {file_path} dans '{table}' (utilisateur {user_id})")
+
+    if not Path(file_path).exists():
+        print(f"❌ Erreur: Le fichier '{file_path}' n'existe pas.")
+        sys.exit(1)
+
+    if not Path(db_path).exists():
+        print(f"❌ Erreur: La base de données '{db_path}' n'existe pas.")
+        print("   Créez d'abord la base de données principale.")
+        sys.exit(1)
+
+    db = DatabaseManager(db_path)
+
+    try:
+        report = BulkImporter(db).import_file(file_path, table, user_id, defer_indexes=defer_indexes)
+    except ValueError as e:
+        print(f"❌ Erreur lors de l'import: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"✅ {report.imported} ligne(s) importée(s) en {report.elapsed_seconds:.2f}s "
+          f"({report.rows_per_second:,.0f} lignes/s)")
+
+    if report.rejected:
+        print(f"⚠️  {report.rejected} ligne(s) rejetée(s):")
+        for error in report.errors:
+            print(f"   - {error}")
+
+
+if __name__ == "__main__":
+    defer = "--defer-indexes" in sys.argv
+    args = [arg for arg in sys.argv if arg != "--defer-indexes"]
+    if len(args) < 4:
+        print(__doc__)
+        sys.exit(1)
+
+    try:
+        target_user_id = int(args[3])
+    except ValueError:
+        print(f"❌ Erreur: user_id doit être un entier, reçu: {args[3]}")
+        sys.exit(1)
+
+    import_data(
+        args[1],
+        args[2],
+        target_user_id,
+        args[4] if len(args) > 4 else "serene.db",
+        defer_indexes=defer,
+    )
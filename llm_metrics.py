@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Script d'export de la télémétrie des appels LLM (table llm_metrics).
+
+Usage:
+    python llm_metrics.py [db_path]                    # format texte Prometheus
+    python llm_metrics.py --summary [db_path] [days]   # résumé par composant
+
+Le format Prometheus peut être écrit dans le dossier du collecteur
+"textfile" de node_exporter, par exemple via cron:
+    python llm_metrics.py serene.db > /var/lib/node_exporter/serene_llm.prom
+"""
+
+import sys
+from pathlib import Path
+
+from src.database.db_manager import DatabaseManager
+from src.llm.telemetry import render_prometheus
+
+
+def _format_ms(value) -> str:
+    """Formater une durée en millisecondes (ou '-' si absente)."""
+    return f"{value:,.0f}" if value is not None else "-"
+
+
+def print_summary(db: DatabaseManager, days: int) -> None:
+    """
+    Afficher le résumé de la télémétrie par composant et modèle.
+
+    Args:
+        db: Instance de DatabaseManager.
+        days: Nombre de jours à considérer.
+    """
+    summary = db.get_llm_metrics_summary(days)
+    if not summary:
+        print(f"Aucun appel LLM enregistré sur les {days} derniers jours.")
+        return
+
+    print(f"📊 Appels LLM sur les {days} derniers jours\n")
+    header = (
+        f"{'composant':<18} {'appels':>7} {'erreurs':>8} {'tokens in':>10} {'tokens out':>11} "
+        f"{'coût $':>9} {'p50 ms':>8} {'p95 ms':>8} {'p95 ttft':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in summary:
+        print(
+            f"{row['component']:<18} {row['requests']:>7} {row['errors']:>8} "
+            f"{row['input_tokens']:>10,} {row['output_tokens']:>11,} {row['cost_usd']:>9.4f} "
+            f"{_format_ms(row['p50_latency_ms']):>8} {_format_ms(row['p95_latency_ms']):>8} "
+            f"{_format_ms(row['p95_ttft_ms']):>9}"
+        )
+
+    skipped = db.get_llm_skip_totals(days)
+    if skipped:
+        print("\nAppels évités:")
+        for row in skipped:
+            print(f"  {row['component']} ({row['reason']}): {row['skipped']}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    summary_mode = "--summary" in args
+    args = [arg for arg in args if arg != "--summary"]
+
+    db_path = args[0] if args else "serene.db"
+    if not Path(db_path).exists():
+        print(f"❌ Erreur: La base de données '{db_path}' n'existe pas.")
+        sys.exit(1)
+
+    try:
+        window_days = int(args[1]) if len(args) > 1 else 7
+    except ValueError:
+        print(f"❌ Erreur: days doit être un entier, reçu: {args[1]}")
+        sys.exit(1)
+
+    database = DatabaseManager(db_path)
+    try:
+        if summary_mode:
+            print_summary(database, window_days)
+        else:
+            sys.stdout.write(render_prometheus(database))
+    finally:
+        database.close()
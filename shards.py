@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Script d'administration des shards (voir src/database/sharding.py).
+
+Les options de répartition sont lues dans l'environnement (SERENE_SHARD_DIR,
+SERENE_SHARD_COUNT, SERENE_SHARD_PER_USER), comme pour l'application.
+À lancer application arrêtée pour import, split et move.
+
+Usage:
+    python shards.py status                       # utilisateurs, lignes et taille par shard
+    python shards.py import <serene.db>           # migrer une base unique
+    python shards.py split <shard>                # déplacer la moitié d'un shard vers un nouveau
+    python shards.py move <user_id> <shard>       # déplacer un utilisateur
+    python shards.py check [--repair]             # vérifier les statistiques d'actions
+"""
+
+import sys
+from pathlib import Path
+
+from src.database.sharding import ShardedDatabaseManager
+
+
+def print_status(db: ShardedDatabaseManager) -> None:
+    """
+    Afficher la taille de chaque shard.
+
+    Args:
+        db: Instance de ShardedDatabaseManager.
+    """
+    stats = db.get_shard_stats()
+    if not stats:
+        print("Aucun shard enregistré.")
+        return
+
+    header = f"{'shard':>6} {'utilisateurs':>13} {'lignes':>10} {'taille Mo':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in stats:
+        print(f"{row['shard']:>6} {row['users']:>13,} {row['rows']:>10,} {row['size_bytes'] / 1e6:>10.1f}")
+
+
+def run(db: ShardedDatabaseManager, command: str, args) -> int:
+    """
+    Exécuter une commande.
+
+    Args:
+        db: Instance de ShardedDatabaseManager.
+        command: Commande (status, import, split, move, check).
+        args: Arguments de la commande.
+
+    Returns:
+        Code de sortie du script.
+
+    Raises:
+        ValueError: Si la commande ou ses arguments sont invalides.
+    """
+    if command == "status":
+        print_status(db)
+    elif command == "import":
+        if len(args) != 1 or not Path(args[0]).exists():
+            raise ValueError("import attend le chemin d'une base existante")
+        count = db.import_database(args[0])
+        print(f"✅ {count} utilisateur(s) importé(s) depuis {args[0]}")
+        print_status(db)
+    elif command == "split":
+        if len(args) != 1:
+            raise ValueError("split attend un numéro de shard")
+        result = db.split_shard(int(args[0]))
+        print(f"✅ {result['moved_users']} utilisateur(s) ({result['moved_rows']:,} lignes) "
+              f"déplacé(s) vers le shard {result['shard']}")
+        print_status(db)
+    elif command == "move":
+        if len(args) != 2:
+            raise ValueError("move attend un user_id et un numéro de shard")
+        moved = db.move_user(int(args[0]), int(args[1]))
+        print(f"✅ {moved} ligne(s) déplacée(s)")
+    elif command == "check":
+        drifts = db.check_action_stats(repair="--repair" in args)
+        if not drifts:
+            print("✅ Statistiques d'actions cohérentes.")
+            return 0
+        print(f"⚠️  {len(drifts)} utilisateur(s) avec des statistiques en écart"
+              + (" (réparées)." if "--repair" in args else ". Relancez avec --repair."))
+        return 0 if "--repair" in args else 1
+    else:
+        raise ValueError(f"Commande inconnue: {command}")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    database = ShardedDatabaseManager.from_env()
+    if database is None:
+        print("❌ Erreur: sharding désactivé (définir SERENE_SHARD_COUNT ou SERENE_SHARD_PER_USER).")
+        sys.exit(1)
+
+    try:
+        exit_code = run(database, sys.argv[1], sys.argv[2:])
+    except ValueError as e:
+        print(f"❌ Erreur: {e}")
+        exit_code = 1
+    finally:
+        database.close()
+    sys.exit(exit_code)
@@ -1,5 +1,14 @@
 """Module de gestion de la base de données pour Serene."""
 
 from .db_manager import DatabaseManager
+from .postgres import PostgresDatabaseManager
+from .sharding import ShardedDatabaseManager
+from .storage import StorageBackend, open_storage
 
-__all__ = ["DatabaseManager"]
+__all__ = [
+    "DatabaseManager",
+    "PostgresDatabaseManager",
+    "ShardedDatabaseManager",
+    "StorageBackend",
+    "open_storage",
+]
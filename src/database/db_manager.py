@@ -1,29 +1,345 @@
 """Gestionnaire de base de données SQLite pour Serene."""
 
+import contextlib
 import sqlite3
 import os
 import hashlib
 import json
-from typing import List, Dict, Any, Optional
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime, timedelta
 
+from src.database.query_cache import QueryCache, VersionedCache, cached_query, invalidates
+from src.database.read_replicas import ReadReplicas
+
+# Expressions SQL de début d'intervalle pour l'agrégation des check-ins
+MOOD_BUCKET_EXPRESSIONS = {
+    "hour": "strftime('%Y-%m-%d %H:00:00', timestamp)",
+    "day": "date(timestamp)",
+    # Lundi de la semaine ('weekday 0' avance au dimanche suivant ou au jour même)
+    "week": "date(timestamp, 'weekday 0', '-6 days')",
+}
+
+
+# Sections de l'export RGPD: nom de section -> (table, colonnes, tri)
+USER_EXPORT_SECTIONS = {
+    "check_ins": (
+        "check_ins",
+        "id, timestamp, mood_score, notes, created_at",
+        "timestamp DESC",
+    ),
+    "conversations": (
+        "conversations",
+        "id, timestamp, user_message, ai_response, tokens_used, created_at",
+        "timestamp DESC",
+    ),
+    "insights": (
+        "insights_log",
+        "id, created_at, insight_type, content, based_on_data, tokens_used",
+        "created_at DESC",
+    ),
+    "action_items": (
+        "action_items",
+        "id, title, description, status, source, conversation_id, "
+        "deadline, created_at, completed_at, updated_at",
+        "created_at DESC",
+    ),
+    "proposed_actions": (
+        "proposed_actions",
+        "id, title, description, status, conversation_id, proposed_at, reviewed_at",
+        "proposed_at DESC",
+    ),
+}
+
+# Index plein texte: table source -> (table FTS5, colonnes indexées, colonne de date)
+FTS_TABLES = {
+    "conversations": ("conversations_fts", ("user_message", "ai_response"), "timestamp"),
+    "check_ins": ("check_ins_fts", ("notes",), "timestamp"),
+}
+
+# Mots vides français ignorés dans les requêtes de recherche
+SEARCH_STOP_WORDS = frozenset({
+    "au", "aux", "avec", "ce", "ces", "dans", "de", "des", "du", "elle", "en", "et",
+    "il", "je", "la", "le", "les", "leur", "ma", "mais", "me", "mes", "mon", "ne",
+    "nous", "on", "ou", "par", "pas", "pour", "qu", "que", "qui", "sa", "se", "ses",
+    "son", "sur", "ta", "te", "tes", "ton", "tu", "un", "une", "vous",
+})
+
+# Marqueurs entourant les termes trouvés dans les extraits (à convertir à l'affichage)
+SEARCH_HIGHLIGHT_START = "\x02"
+SEARCH_HIGHLIGHT_END = "\x03"
+
+# Nombre de lignes lues par fetchmany() lors d'un export
+EXPORT_BATCH_SIZE = 500
+
+# Tables dont les écritures incrémentent les versions de données par utilisateur
+# (une colonne par table dans user_data_version, maintenue par des triggers)
+DATA_VERSION_TABLES = ("check_ins", "conversations", "action_items", "proposed_actions", "insights_log")
+
+DATA_VERSION_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS {table}_data_version_{event} AFTER {event} ON {table} BEGIN
+    INSERT INTO user_data_version (user_id, {table}) VALUES ({row}.user_id, 1)
+    ON CONFLICT (user_id) DO UPDATE SET {table} = {table} + 1;
+END;
+"""
+
+# Compteurs de action_item_stats (un par statut, plus le total)
+ACTION_STATS_COLUMNS = ("pending", "in_progress", "completed", "abandoned", "total")
+
+# Triggers maintenant action_item_stats: chaque écriture sur action_items ajuste
+# les compteurs de l'utilisateur (un changement de statut retire puis ajoute)
+ACTION_STATS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS action_items_stats_insert AFTER INSERT ON action_items BEGIN
+    INSERT INTO action_item_stats (user_id, pending, in_progress, completed, abandoned, total)
+    VALUES (new.user_id, new.status IS 'pending', new.status IS 'in_progress',
+            new.status IS 'completed', new.status IS 'abandoned', 1)
+    ON CONFLICT (user_id) DO UPDATE SET
+        pending = pending + excluded.pending,
+        in_progress = in_progress + excluded.in_progress,
+        completed = completed + excluded.completed,
+        abandoned = abandoned + excluded.abandoned,
+        total = total + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS action_items_stats_delete AFTER DELETE ON action_items BEGIN
+    UPDATE action_item_stats SET
+        pending = pending - (old.status IS 'pending'),
+        in_progress = in_progress - (old.status IS 'in_progress'),
+        completed = completed - (old.status IS 'completed'),
+        abandoned = abandoned - (old.status IS 'abandoned'),
+        total = total - 1
+    WHERE user_id = old.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS action_items_stats_update AFTER UPDATE OF status, user_id ON action_items
+WHEN old.status IS NOT new.status OR old.user_id IS NOT new.user_id BEGIN
+    UPDATE action_item_stats SET
+        pending = pending - (old.status IS 'pending'),
+        in_progress = in_progress - (old.status IS 'in_progress'),
+        completed = completed - (old.status IS 'completed'),
+        abandoned = abandoned - (old.status IS 'abandoned'),
+        total = total - 1
+    WHERE user_id = old.user_id;
+    INSERT INTO action_item_stats (user_id, pending, in_progress, completed, abandoned, total)
+    VALUES (new.user_id, new.status IS 'pending', new.status IS 'in_progress',
+            new.status IS 'completed', new.status IS 'abandoned', 1)
+    ON CONFLICT (user_id) DO UPDATE SET
+        pending = pending + excluded.pending,
+        in_progress = in_progress + excluded.in_progress,
+        completed = completed + excluded.completed,
+        abandoned = abandoned + excluded.abandoned,
+        total = total + 1;
+END;
+"""
+
+
+def search_words(text: str) -> List[str]:
+    """
+    Extraire les mots recherchés d'une saisie libre.
+
+    Les mots vides et les lettres isolées (ex: le "l" de "l'anxiété") sont ignorés.
+
+    Args:
+        text: Saisie de l'utilisateur.
+
+    Returns:
+        Mots en minuscules, dans l'ordre de la saisie.
+    """
+    return [
+        word for word in re.findall(r"\w+", text.lower())
+        if len(word) > 1 and word not in SEARCH_STOP_WORDS
+    ]
+
+
+def build_search_query(text: str) -> Optional[str]:
+    """
+    Convertir une saisie libre en requête FTS5 sûre.
+
+    Chaque mot (voir search_words) devient un préfixe entre guillemets:
+    "fatigu" trouve "fatigue" et "fatigué". Tous les mots doivent être présents.
+
+    Args:
+        text: Saisie de l'utilisateur.
+
+    Returns:
+        Requête MATCH, ou None si aucun mot exploitable.
+    """
+    words = search_words(text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+# Terminaisons retirées par le stemmer léger des titres d'actions (la plus longue d'abord)
+TITLE_SUFFIXES = ("ements", "ement", "ments", "ment", "ations", "ation", "euses", "euse", "eurs", "eur",
+                  "er", "ir", "re", "es", "e", "s", "x")
+
+# Similarité de Jaccard (mots racinisés) au-delà de laquelle deux titres sont des doublons
+TITLE_SIMILARITY_THRESHOLD = 0.75
+
+# Clés de titres actifs mémorisées (utilisateurs) et tables dont elles dépendent
+TITLE_KEYS_CACHE_SIZE = 1024
+TITLE_KEYS_TABLES = ("proposed_actions", "action_items")
+
+
+def _stem_title_word(word: str) -> str:
+    """Retirer la première terminaison de TITLE_SUFFIXES qui laisse au moins 3 lettres."""
+    for suffix in TITLE_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+@lru_cache(maxsize=4096)
+def normalize_title(title: str) -> str:
+    """
+    Calculer la clé de déduplication d'un titre d'action.
+
+    Minuscules, accents retirés, ponctuation et mots vides ignorés, mots
+    racinisés puis séparés par une espace: "Aller courir 2 fois" et
+    "aller  Courir, 2 fois !" ont la même clé.
+
+    Args:
+        title: Titre de l'action.
+
+    Returns:
+        Clé normalisée (le titre replié si tous les mots sont des mots vides).
+    """
+    folded = "".join(
+        char for char in unicodedata.normalize("NFKD", title.lower()) if not unicodedata.combining(char)
+    )
+    words = re.findall(r"\w+", folded)
+    stems = [_stem_title_word(word) for word in words if word not in SEARCH_STOP_WORDS]
+    return " ".join(stems or words)
+
+
+def titles_similar(key: str, other: str) -> bool:
+    """
+    Comparer deux clés de titres (voir normalize_title).
+
+    Args:
+        key: Première clé.
+        other: Seconde clé.
+
+    Returns:
+        True si les clés sont égales, si les mots de l'une (au moins deux)
+        sont tous dans l'autre, ou si leur similarité de Jaccard atteint
+        TITLE_SIMILARITY_THRESHOLD.
+    """
+    if key == other:
+        return True
+    words, other_words = set(key.split()), set(other.split())
+    if not words or not other_words:
+        return False
+    common = len(words & other_words)
+    if common == min(len(words), len(other_words)) >= 2:
+        return True
+    return common / len(words | other_words) >= TITLE_SIMILARITY_THRESHOLD
+
+
+def choose_mood_bucket(days: int) -> str:
+    """
+    Choisir la granularité d'agrégation selon la taille de la fenêtre.
+
+    Args:
+        days: Nombre de jours affichés.
+
+    Returns:
+        'hour' jusqu'à 2 jours, 'day' jusqu'à 31 jours, 'week' au-delà.
+    """
+    if days <= 2:
+        return "hour"
+    if days <= 31:
+        return "day"
+    return "week"
+
 
 class DatabaseManager:
     """Gestionnaire de base de données pour les opérations CRUD."""
 
-    def __init__(self, db_path: str = "serene.db"):
+    def __init__(
+        self,
+        db_path: str = "serene.db",
+        query_cache: Optional[QueryCache] = None,
+        read_connections: int = 0,
+        snapshot_seconds: float = 0.0,
+    ):
         """
         Initialiser la connexion et créer les tables.
 
         Args:
             db_path: Chemin vers le fichier de base de données SQLite.
                     Utiliser ":memory:" pour une base de données en mémoire (tests).
+            query_cache: Cache de lecture optionnel (désactivé si None).
+            read_connections: Nombre de connexions de lecture séparées
+                    (0: tout passe par la connexion d'écriture; ignoré en mémoire).
+            snapshot_seconds: Si > 0, les connexions de lecture lisent une
+                    copie de la base refaite en arrière-plan toutes les N secondes.
         """
         self.db_path = db_path
+        self.query_cache = query_cache
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row  # Enable dict-like access
+        self.replicas: Optional[ReadReplicas] = None
+        self._title_keys = VersionedCache(max_entries=TITLE_KEYS_CACHE_SIZE)
         self._init_db()
 
+        if read_connections > 0 and db_path != ":memory:":
+            # WAL: les lecteurs ne bloquent pas l'écrivain (et inversement)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.replicas = ReadReplicas(db_path, read_connections, snapshot_seconds=snapshot_seconds)
+
+    @classmethod
+    def from_env(cls, db_path: str = "serene.db", query_cache: Optional[QueryCache] = None) -> "DatabaseManager":
+        """
+        Créer un gestionnaire à partir des variables d'environnement.
+
+        SERENE_DB_READ_CONNECTIONS (0 pour une seule connexion) et
+        SERENE_DB_SNAPSHOT_SECONDS (0 pour lire la base elle-même).
+
+        Args:
+            db_path: Chemin vers le fichier de base de données SQLite.
+            query_cache: Cache de lecture optionnel.
+
+        Returns:
+            Instance de DatabaseManager.
+        """
+        try:
+            read_connections = int(os.getenv("SERENE_DB_READ_CONNECTIONS", "0"))
+        except ValueError:
+            read_connections = 0
+        try:
+            snapshot_seconds = float(os.getenv("SERENE_DB_SNAPSHOT_SECONDS", "0"))
+        except ValueError:
+            snapshot_seconds = 0.0
+
+        return cls(
+            db_path,
+            query_cache=query_cache,
+            read_connections=max(read_connections, 0),
+            snapshot_seconds=max(snapshot_seconds, 0.0),
+        )
+
+    def _reader(self, user_id: Optional[int] = None):
+        """
+        Choisir la connexion d'une lecture.
+
+        Les lectures passent par une connexion de lecture si elle voit déjà
+        les dernières écritures de l'utilisateur, sinon par la connexion
+        d'écriture (lecture de ses propres écritures).
+
+        Args:
+            user_id: Utilisateur dont les données sont lues (None: données globales).
+
+        Returns:
+            Gestionnaire de contexte rendant une connexion SQLite.
+        """
+        if self.replicas is None or not self.replicas.can_serve(user_id):
+            return contextlib.nullcontext(self.conn)
+        return self.replicas.connection()
+
     def _init_db(self):
         """Créer les tables si elles n'existent pas."""
         # Pour les DB in-memory (tests), utiliser le schéma directement
@@ -83,11 +399,59 @@ class DatabaseManager:
                 status TEXT DEFAULT 'pending' CHECK(status IN ('pending', 'accepted', 'rejected')),
                 conversation_id INTEGER,
                 proposed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                reviewed_at DATETIME
+                reviewed_at DATETIME,
+                title_key TEXT
             );
             CREATE INDEX IF NOT EXISTS idx_proposed_actions_user_id ON proposed_actions(user_id);
             CREATE INDEX IF NOT EXISTS idx_proposed_actions_status ON proposed_actions(status);
             CREATE INDEX IF NOT EXISTS idx_proposed_actions_proposed_at ON proposed_actions(proposed_at DESC);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_proposed_actions_pending_title
+                ON proposed_actions(user_id, title_key) WHERE status = 'pending';
+
+            CREATE TABLE IF NOT EXISTS llm_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                component TEXT NOT NULL,
+                model TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'ok' CHECK(status IN ('ok', 'error', 'cancelled')),
+                latency_ms REAL NOT NULL,
+                ttft_ms REAL,
+                input_tokens INTEGER DEFAULT 0,
+                output_tokens INTEGER DEFAULT 0,
+                cache_creation_tokens INTEGER DEFAULT 0,
+                cache_read_tokens INTEGER DEFAULT 0,
+                retries INTEGER DEFAULT 0,
+                cost_usd REAL DEFAULT 0,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_metrics_component_created ON llm_metrics(component, created_at);
+
+            CREATE TABLE IF NOT EXISTS llm_skipped_calls (
+                component TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                day DATE NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (component, reason, day)
+            );
+
+            CREATE TABLE IF NOT EXISTS user_data_version (
+                user_id INTEGER PRIMARY KEY,
+                check_ins INTEGER NOT NULL DEFAULT 0,
+                conversations INTEGER NOT NULL DEFAULT 0,
+                action_items INTEGER NOT NULL DEFAULT 0,
+                proposed_actions INTEGER NOT NULL DEFAULT 0,
+                insights_log INTEGER NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS action_item_stats (
+                user_id INTEGER PRIMARY KEY,
+                pending INTEGER NOT NULL DEFAULT 0,
+                in_progress INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0,
+                abandoned INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0
+            );
             """
         else:
             # Pour les DB sur disque, charger depuis schema.sql
@@ -97,9 +461,75 @@ class DatabaseManager:
             with open(schema_path, "r", encoding="utf-8") as f:
                 schema = f.read()
 
+        existing_tables = {
+            row["name"]
+            for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+
+        if "proposed_actions" in existing_tables:
+            self._add_proposal_title_keys()
+
         self.conn.executescript(schema)
+        self._create_data_version_triggers()
+        self.conn.executescript(ACTION_STATS_TRIGGERS)
+
+        # Compteurs créés sur une base existante: les calculer depuis action_items
+        if "action_items" in existing_tables and "action_item_stats" not in existing_tables:
+            self.check_action_stats(repair=True)
+
+        # Index plein texte créé sur une base existante: indexer les lignes déjà présentes
+        for fts_table, _, _ in FTS_TABLES.values():
+            if fts_table not in existing_tables and self._table_exists(fts_table):
+                self.conn.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
         self.conn.commit()
 
+    def _add_proposal_title_keys(self) -> None:
+        """
+        Ajouter la colonne title_key à une table proposed_actions existante.
+
+        Seules les propositions en attente reçoivent une clé (l'index unique
+        ne porte que sur elles); pour les doublons déjà présents, seule la plus
+        ancienne en reçoit une et les autres restent visibles jusqu'à leur examen.
+        """
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(proposed_actions)")}
+        if "title_key" in columns:
+            return
+
+        self.conn.execute("ALTER TABLE proposed_actions ADD COLUMN title_key TEXT")
+        seen = set()
+        keys = []
+        for row in self.conn.execute(
+            "SELECT id, user_id, title FROM proposed_actions WHERE status = 'pending' ORDER BY id"
+        ):
+            key = (row["user_id"], normalize_title(row["title"]))
+            if key not in seen:
+                seen.add(key)
+                keys.append((key[1], row["id"]))
+        self.conn.executemany("UPDATE proposed_actions SET title_key = ? WHERE id = ?", keys)
+        self.conn.commit()
+
+    def _create_data_version_triggers(self) -> None:
+        """
+        Créer les triggers incrémentant user_data_version (voir get_data_versions).
+
+        Les tables sans colonne user_id (ancien schéma en mémoire) sont ignorées.
+        """
+        for table in DATA_VERSION_TABLES:
+            columns = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if "user_id" not in columns:
+                continue
+            for event, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+                self.conn.execute(DATA_VERSION_TRIGGER.format(table=table, event=event, row=row))
+
+    def _table_exists(self, name: str) -> bool:
+        """Vérifier l'existence d'une table."""
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    @invalidates("check_ins")
     def save_checkin(self, user_id: int, mood_score: int, notes: str = "") -> int:
         """
         Enregistrer un check-in.
@@ -133,6 +563,7 @@ class DatabaseManager:
         except sqlite3.IntegrityError as e:
             raise ValueError(f"Erreur d'intégrité de la base de données: {e}")
 
+    @cached_query("check_ins")
     def get_mood_history(self, user_id: int, days: int = 30) -> List[Dict[str, Any]]:
         """
         Récupérer l'historique des check-ins (derniers N jours).
@@ -147,18 +578,94 @@ class DatabaseManager:
         """
         cutoff_date = datetime.now() - timedelta(days=days)
 
-        cursor = self.conn.execute(
-            """
-            SELECT id, timestamp, mood_score, notes, created_at
-            FROM check_ins
-            WHERE user_id = ? AND timestamp >= ?
-            ORDER BY timestamp DESC
-            """,
-            (user_id, cutoff_date),
-        )
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                """
+                SELECT id, timestamp, mood_score, notes, created_at
+                FROM check_ins
+                WHERE user_id = ? AND timestamp >= ?
+                ORDER BY timestamp DESC
+                """,
+                (user_id, cutoff_date),
+            )
+
+            return [dict(row) for row in cursor.fetchall()]
+
+    @cached_query("check_ins")
+    def get_mood_stats(self, user_id: int, days: int = 30) -> Dict[str, Any]:
+        """
+        Calculer les statistiques d'humeur (derniers N jours) directement en SQL.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            days: Nombre de jours à considérer (défaut: 30).
+
+        Returns:
+            Dict contenant: count, avg, min, max et latest (dernier score, ou None).
+        """
+        cutoff_date = datetime.now() - timedelta(days=days)
+
+        with self._reader(user_id) as conn:
+            row = conn.execute(
+                """
+                SELECT COUNT(*) as count, AVG(mood_score) as avg,
+                       MIN(mood_score) as min, MAX(mood_score) as max,
+                       (SELECT mood_score FROM check_ins
+                        WHERE user_id = ? AND timestamp >= ?
+                        ORDER BY timestamp DESC LIMIT 1) as latest
+                FROM check_ins
+                WHERE user_id = ? AND timestamp >= ?
+                """,
+                (user_id, cutoff_date, user_id, cutoff_date),
+            ).fetchone()
+
+            return dict(row)
+
+    @cached_query("check_ins")
+    def get_mood_buckets(
+        self, user_id: int, days: int = 30, bucket: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Récupérer l'historique d'humeur agrégé par intervalle de temps.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            days: Nombre de jours d'historique (défaut: 30).
+            bucket: 'hour', 'day' ou 'week' (défaut: choisi selon days).
+
+        Returns:
+            Liste de dicts contenant: bucket_start, mean, min, max, count.
+            Trié du plus ancien au plus récent.
+
+        Raises:
+            ValueError: Si bucket n'est pas une granularité connue.
+        """
+        bucket = bucket or choose_mood_bucket(days)
+        if bucket not in MOOD_BUCKET_EXPRESSIONS:
+            raise ValueError(
+                f"bucket doit être 'hour', 'day' ou 'week', reçu: {bucket}"
+            )
 
-        return [dict(row) for row in cursor.fetchall()]
+        cutoff_date = datetime.now() - timedelta(days=days)
+        bucket_expr = MOOD_BUCKET_EXPRESSIONS[bucket]
+
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT {bucket_expr} as bucket_start,
+                       AVG(mood_score) as mean, MIN(mood_score) as min,
+                       MAX(mood_score) as max, COUNT(*) as count
+                FROM check_ins
+                WHERE user_id = ? AND timestamp >= ?
+                GROUP BY bucket_start
+                ORDER BY bucket_start ASC
+                """,
+                (user_id, cutoff_date),
+            )
 
+            return [dict(row) for row in cursor.fetchall()]
+
+    @invalidates("conversations")
     def save_conversation(
         self, user_id: int, user_message: str, ai_response: str, tokens_used: int = 0
     ) -> int:
@@ -196,6 +703,7 @@ class DatabaseManager:
         except sqlite3.IntegrityError as e:
             raise ValueError(f"Erreur d'intégrité de la base de données: {e}")
 
+    @cached_query("conversations")
     def get_conversation_history(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
         """
         Récupérer l'historique des conversations.
@@ -208,19 +716,21 @@ class DatabaseManager:
             Liste de dicts contenant: id, timestamp, user_message, ai_response, tokens_used, created_at.
             Trié du plus récent au plus ancien.
         """
-        cursor = self.conn.execute(
-            """
-            SELECT id, timestamp, user_message, ai_response, tokens_used, created_at
-            FROM conversations
-            WHERE user_id = ?
-            ORDER BY timestamp ASC
-            LIMIT ?
-            """,
-            (user_id, limit),
-        )
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                """
+                SELECT id, timestamp, user_message, ai_response, tokens_used, created_at
+                FROM conversations
+                WHERE user_id = ?
+                ORDER BY timestamp ASC
+                LIMIT ?
+                """,
+                (user_id, limit),
+            )
 
-        return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in cursor.fetchall()]
 
+    @cached_query("conversations")
     def get_conversation_count(self, user_id: int, days: int = 7) -> int:
         """
         Compter le nombre de conversations (derniers N jours).
@@ -234,18 +744,106 @@ class DatabaseManager:
         """
         cutoff_date = datetime.now() - timedelta(days=days)
 
-        cursor = self.conn.execute(
-            """
-            SELECT COUNT(*) as count
-            FROM conversations
-            WHERE user_id = ? AND timestamp >= ?
-            """,
-            (user_id, cutoff_date),
-        )
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                """
+                SELECT COUNT(*) as count
+                FROM conversations
+                WHERE user_id = ? AND timestamp >= ?
+                """,
+                (user_id, cutoff_date),
+            )
 
-        result = cursor.fetchone()
-        return result["count"] if result else 0
+            result = cursor.fetchone()
+            return result["count"] if result else 0
+
+    @cached_query("conversations")
+    def get_recent_conversations(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Récupérer les N dernières conversations.
 
+        Args:
+            user_id: ID de l'utilisateur.
+            limit: Nombre de conversations à récupérer (défaut: 50).
+
+        Returns:
+            Liste de dicts contenant: id, timestamp, user_message, ai_response, tokens_used.
+            Les plus récentes, triées chronologiquement (la dernière en fin de liste).
+        """
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                """
+                SELECT id, timestamp, user_message, ai_response, tokens_used
+                FROM conversations
+                WHERE user_id = ?
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+                """,
+                (user_id, limit),
+            )
+
+            return [dict(row) for row in reversed(cursor.fetchall())]
+
+    def get_conversations_after(
+        self, user_id: int, after_id: int = 0, limit: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Récupérer les conversations d'ID supérieur à after_id (indexation incrémentale).
+
+        Non mis en cache: chaque appel porte sur des lignes jamais lues.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            after_id: Dernier ID déjà traité (0 pour partir du début).
+            limit: Nombre maximum de conversations par lot.
+
+        Returns:
+            Liste de dicts contenant: id, user_message, ai_response. Triée par ID croissant.
+        """
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                """
+                SELECT id, user_message, ai_response
+                FROM conversations
+                WHERE user_id = ? AND id > ?
+                ORDER BY id
+                LIMIT ?
+                """,
+                (user_id, after_id, limit),
+            )
+
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_conversations_by_ids(self, user_id: int, ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Récupérer des conversations par ID (limitées à l'utilisateur).
+
+        Args:
+            user_id: ID de l'utilisateur.
+            ids: IDs des conversations.
+
+        Returns:
+            Liste de dicts contenant: id, timestamp, user_message, ai_response,
+            dans l'ordre de ids. Les IDs inconnus ou d'un autre utilisateur sont ignorés.
+        """
+        if not ids:
+            return []
+
+        placeholders = ", ".join("?" for _ in ids)
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT id, timestamp, user_message, ai_response
+                FROM conversations
+                WHERE user_id = ? AND id IN ({placeholders})
+                """,
+                (user_id, *ids),
+            )
+
+            rows = {row["id"]: dict(row) for row in cursor.fetchall()}
+            return [rows[conv_id] for conv_id in ids if conv_id in rows]
+
+    @invalidates("insights_log")
     def save_insight(
         self,
         user_id: int,
@@ -289,6 +887,7 @@ class DatabaseManager:
         except sqlite3.IntegrityError as e:
             raise ValueError(f"Erreur d'intégrité de la base de données: {e}")
 
+    @cached_query("insights_log")
     def get_latest_insight(self, user_id: int, insight_type: str) -> Optional[Dict[str, Any]]:
         """
         Récupérer le dernier insight d'un type donné.
@@ -301,19 +900,100 @@ class DatabaseManager:
             Dict contenant l'insight (id, created_at, insight_type, content, based_on_data, tokens_used),
             ou None si aucun insight trouvé.
         """
-        cursor = self.conn.execute(
-            """
-            SELECT id, created_at, insight_type, content, based_on_data, tokens_used
-            FROM insights_log
-            WHERE user_id = ? AND insight_type = ?
-            ORDER BY created_at DESC
-            LIMIT 1
-            """,
-            (user_id, insight_type),
-        )
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                """
+                SELECT id, created_at, insight_type, content, based_on_data, tokens_used
+                FROM insights_log
+                WHERE user_id = ? AND insight_type = ?
+                ORDER BY created_at DESC
+                LIMIT 1
+                """,
+                (user_id, insight_type),
+            )
 
-        result = cursor.fetchone()
-        return dict(result) if result else None
+            result = cursor.fetchone()
+            return dict(result) if result else None
+
+    # ===== Full-Text Search Methods =====
+
+    @cached_query("conversations", "check_ins")
+    def search(
+        self,
+        user_id: int,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        sources: Tuple[str, ...] = ("conversations", "check_ins"),
+    ) -> List[Dict[str, Any]]:
+        """
+        Rechercher dans les conversations et les notes de check-in (FTS5).
+
+        Args:
+            user_id: ID de l'utilisateur.
+            query: Texte recherché (voir build_search_query).
+            limit: Nombre maximum de résultats (taille de page).
+            offset: Nombre de résultats à sauter (pagination).
+            sources: Tables à interroger ('conversations', 'check_ins').
+
+        Returns:
+            Liste de dicts contenant: source ('conversation' ou 'check_in'), id,
+            timestamp, snippet (termes entourés de SEARCH_HIGHLIGHT_START/END),
+            mood_score (check-ins uniquement) et rank (bm25, plus petit = plus pertinent).
+            Trié par pertinence.
+
+        Raises:
+            ValueError: Si une source est inconnue.
+        """
+        unknown = set(sources) - set(FTS_TABLES)
+        if unknown:
+            raise ValueError(f"Source(s) de recherche inconnue(s): {', '.join(sorted(unknown))}")
+
+        match = build_search_query(query)
+        if match is None:
+            return []
+
+        selects = []
+        params: List[Any] = []
+        if "conversations" in sources:
+            selects.append(
+                """
+                SELECT 'conversation' AS source, c.id, c.timestamp,
+                       snippet(conversations_fts, -1, ?, ?, '…', 16) AS snippet,
+                       NULL AS mood_score, bm25(conversations_fts) AS rank
+                FROM conversations_fts
+                JOIN conversations c ON c.id = conversations_fts.rowid
+                WHERE conversations_fts MATCH ? AND c.user_id = ?
+                """
+            )
+            params += [SEARCH_HIGHLIGHT_START, SEARCH_HIGHLIGHT_END, match, user_id]
+        if "check_ins" in sources:
+            selects.append(
+                """
+                SELECT 'check_in' AS source, ci.id, ci.timestamp,
+                       snippet(check_ins_fts, 0, ?, ?, '…', 16) AS snippet,
+                       ci.mood_score, bm25(check_ins_fts) AS rank
+                FROM check_ins_fts
+                JOIN check_ins ci ON ci.id = check_ins_fts.rowid
+                WHERE check_ins_fts MATCH ? AND ci.user_id = ?
+                """
+            )
+            params += [SEARCH_HIGHLIGHT_START, SEARCH_HIGHLIGHT_END, match, user_id]
+
+        if not selects:
+            return []
+
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT * FROM ({" UNION ALL ".join(selects)})
+                ORDER BY rank, timestamp DESC
+                LIMIT ? OFFSET ?
+                """,
+                (*params, limit, offset),
+            )
+
+            return [dict(row) for row in cursor.fetchall()]
 
     # ===== User Authentication Methods =====
 
@@ -575,17 +1255,19 @@ class DatabaseManager:
         self.conn.execute(query, params)
         self.conn.commit()
 
-    def export_user_data(self, user_id: int) -> Dict[str, Any]:
+    def get_user_export_profile(self, user_id: int) -> Dict[str, Any]:
         """
-        Export all user data for RGPD compliance.
+        Récupérer le profil exportable d'un utilisateur (sans le hash du mot de passe).
 
         Args:
-            user_id: User's ID.
+            user_id: ID de l'utilisateur.
 
         Returns:
-            Dict containing all user data including profile, check-ins, conversations, and insights.
+            Dict du profil, avec les préférences décodées si possible.
+
+        Raises:
+            ValueError: Si l'utilisateur n'existe pas.
         """
-        # Get user profile
         user = self.get_user_by_id(user_id)
         if not user:
             raise ValueError(f"Utilisateur {user_id} introuvable")
@@ -593,55 +1275,6 @@ class DatabaseManager:
         # Remove password_hash from export
         user_data = {k: v for k, v in user.items() if k != "password_hash"}
 
-        # Get all check-ins
-        cursor = self.conn.execute(
-            """
-            SELECT id, timestamp, mood_score, notes, created_at
-            FROM check_ins
-            WHERE user_id = ?
-            ORDER BY timestamp DESC
-            """,
-            (user_id,),
-        )
-        check_ins = [dict(row) for row in cursor.fetchall()]
-
-        # Get all conversations
-        cursor = self.conn.execute(
-            """
-            SELECT id, timestamp, user_message, ai_response, tokens_used, created_at
-            FROM conversations
-            WHERE user_id = ?
-            ORDER BY timestamp DESC
-            """,
-            (user_id,),
-        )
-        conversations = [dict(row) for row in cursor.fetchall()]
-
-        # Get all insights
-        cursor = self.conn.execute(
-            """
-            SELECT id, created_at, insight_type, content, based_on_data, tokens_used
-            FROM insights_log
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-            """,
-            (user_id,),
-        )
-        insights = [dict(row) for row in cursor.fetchall()]
-
-        # Get all action items
-        cursor = self.conn.execute(
-            """
-            SELECT id, title, description, status, source, conversation_id,
-                   deadline, created_at, completed_at, updated_at
-            FROM action_items
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-            """,
-            (user_id,),
-        )
-        action_items = [dict(row) for row in cursor.fetchall()]
-
         # Parse preferences if available
         if user_data.get("preferences"):
             try:
@@ -649,17 +1282,89 @@ class DatabaseManager:
             except json.JSONDecodeError:
                 pass
 
-        return {
-            "user_profile": user_data,
-            "check_ins": check_ins,
-            "conversations": conversations,
-            "insights": insights,
-            "action_items": action_items,
-            "export_timestamp": datetime.now().isoformat(),
-        }
+        return user_data
+
+    def count_user_export_rows(self, user_id: int) -> Dict[str, int]:
+        """
+        Compter les lignes de chaque section de l'export (pour la progression).
+
+        Args:
+            user_id: ID de l'utilisateur.
+
+        Returns:
+            Dict section -> nombre de lignes.
+        """
+        counts = {}
+        with self._reader(user_id) as conn:
+            for section, (table, _, _) in USER_EXPORT_SECTIONS.items():
+                row = conn.execute(
+                    f"SELECT COUNT(*) as count FROM {table} WHERE user_id = ?",
+                    (user_id,),
+                ).fetchone()
+                counts[section] = row["count"]
+            return counts
+
+    def iter_user_export_rows(
+        self, user_id: int, section: str, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourir les lignes d'une section de l'export par lots (fetchmany).
+
+        Seul un lot de batch_size lignes est en mémoire à la fois.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            section: Section de USER_EXPORT_SECTIONS.
+            batch_size: Nombre de lignes lues par lot.
+
+        Yields:
+            Une ligne (dict) à la fois.
+
+        Raises:
+            ValueError: Si la section est inconnue.
+        """
+        if section not in USER_EXPORT_SECTIONS:
+            raise ValueError(f"Section d'export inconnue: {section}")
+
+        table, columns, order_by = USER_EXPORT_SECTIONS[section]
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                f"SELECT {columns} FROM {table} WHERE user_id = ? ORDER BY {order_by}",
+                (user_id,),
+            )
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(row)
+            finally:
+                cursor.close()
+
+    def export_user_data(self, user_id: int) -> Dict[str, Any]:
+        """
+        Export all user data for RGPD compliance.
+
+        Charge tout en mémoire: pour les gros comptes, préférer les exports
+        en flux de src.database.export.
+
+        Args:
+            user_id: User's ID.
+
+        Returns:
+            Dict containing all user data including profile, check-ins, conversations,
+            insights, action items and proposed actions.
+        """
+        export = {"user_profile": self.get_user_export_profile(user_id)}
+        for section in USER_EXPORT_SECTIONS:
+            export[section] = list(self.iter_user_export_rows(user_id, section))
+        export["export_timestamp"] = datetime.now().isoformat()
+        return export
 
     # ===== Action Items Methods =====
 
+    @invalidates("action_items")
     def save_action_item(
         self,
         user_id: int,
@@ -708,6 +1413,7 @@ class DatabaseManager:
         except sqlite3.IntegrityError as e:
             raise ValueError(f"Erreur d'intégrité de la base de données: {e}")
 
+    @cached_query("action_items")
     def get_action_items(
         self, user_id: int, status: Optional[str] = None, limit: int = 100
     ) -> List[Dict[str, Any]]:
@@ -723,33 +1429,35 @@ class DatabaseManager:
             Liste de dicts contenant les informations des actions.
             Trié par date de création (plus récent en premier).
         """
-        if status:
-            cursor = self.conn.execute(
-                """
-                SELECT id, user_id, title, description, status, source,
-                       conversation_id, deadline, created_at, completed_at, updated_at
-                FROM action_items
-                WHERE user_id = ? AND status = ?
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
-                (user_id, status, limit),
-            )
-        else:
-            cursor = self.conn.execute(
-                """
-                SELECT id, user_id, title, description, status, source,
-                       conversation_id, deadline, created_at, completed_at, updated_at
-                FROM action_items
-                WHERE user_id = ?
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
-                (user_id, limit),
-            )
-
-        return [dict(row) for row in cursor.fetchall()]
-
+        with self._reader(user_id) as conn:
+            if status:
+                cursor = conn.execute(
+                    """
+                    SELECT id, user_id, title, description, status, source,
+                           conversation_id, deadline, created_at, completed_at, updated_at
+                    FROM action_items
+                    WHERE user_id = ? AND status = ?
+                    ORDER BY created_at DESC
+                    LIMIT ?
+                    """,
+                    (user_id, status, limit),
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    SELECT id, user_id, title, description, status, source,
+                           conversation_id, deadline, created_at, completed_at, updated_at
+                    FROM action_items
+                    WHERE user_id = ?
+                    ORDER BY created_at DESC
+                    LIMIT ?
+                    """,
+                    (user_id, limit),
+                )
+
+            return [dict(row) for row in cursor.fetchall()]
+
+    @invalidates("action_items", owner_table="action_items")
     def update_action_item(
         self,
         action_id: int,
@@ -810,6 +1518,7 @@ class DatabaseManager:
         self.conn.execute(query, params)
         self.conn.commit()
 
+    @invalidates("action_items", owner_table="action_items")
     def delete_action_item(self, action_id: int) -> None:
         """
         Supprimer une action.
@@ -849,52 +1558,169 @@ class DatabaseManager:
         result = cursor.fetchone()
         return dict(result) if result else None
 
+    @cached_query("action_items")
     def get_action_items_stats(self, user_id: int) -> Dict[str, int]:
         """
         Obtenir des statistiques sur les actions d'un utilisateur.
 
+        Lecture par clé primaire des compteurs de action_item_stats, tenus à
+        jour par des triggers (voir check_action_stats en cas de doute).
+
         Args:
             user_id: ID de l'utilisateur.
 
         Returns:
             Dict avec le nombre d'actions par statut.
         """
+        with self._reader(user_id) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(ACTION_STATS_COLUMNS)} FROM action_item_stats WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+            if row is None:
+                return dict.fromkeys(ACTION_STATS_COLUMNS, 0)
+            return {column: row[column] for column in ACTION_STATS_COLUMNS}
+
+    def check_action_stats(self, repair: bool = False) -> List[Dict[str, Any]]:
+        """
+        Vérifier les compteurs de action_item_stats en les recalculant.
+
+        Args:
+            repair: Si True, remplacer les compteurs erronés par les valeurs recalculées.
+
+        Returns:
+            Liste de dicts par utilisateur en écart contenant: user_id,
+            stored (compteurs enregistrés) et actual (compteurs recalculés).
+        """
+        actual: Dict[int, Dict[str, int]] = {}
         cursor = self.conn.execute(
-            """
-            SELECT status, COUNT(*) as count
-            FROM action_items
-            WHERE user_id = ?
-            GROUP BY status
-            """,
-            (user_id,),
+            "SELECT user_id, status, COUNT(*) AS count FROM action_items GROUP BY user_id, status"
         )
+        for row in cursor:
+            stats = actual.setdefault(row["user_id"], dict.fromkeys(ACTION_STATS_COLUMNS, 0))
+            if row["status"] in stats:
+                stats[row["status"]] += row["count"]
+            stats["total"] += row["count"]
 
-        stats = {
-            "pending": 0,
-            "in_progress": 0,
-            "completed": 0,
-            "abandoned": 0,
-            "total": 0,
+        stored = {
+            row["user_id"]: {column: row[column] for column in ACTION_STATS_COLUMNS}
+            for row in self.conn.execute("SELECT * FROM action_item_stats")
         }
 
-        for row in cursor.fetchall():
-            stats[row["status"]] = row["count"]
-            stats["total"] += row["count"]
+        empty = dict.fromkeys(ACTION_STATS_COLUMNS, 0)
+        drifts = []
+        for user_id in sorted(actual.keys() | stored.keys()):
+            expected = actual.get(user_id, empty)
+            current = stored.get(user_id, empty)
+            if expected != current:
+                drifts.append({"user_id": user_id, "stored": current, "actual": expected})
+
+        if repair and drifts:
+            columns = ", ".join(ACTION_STATS_COLUMNS)
+            self.conn.executemany(
+                f"""
+                INSERT INTO action_item_stats (user_id, {columns})
+                VALUES (?, {', '.join('?' for _ in ACTION_STATS_COLUMNS)})
+                ON CONFLICT (user_id) DO UPDATE SET
+                    {', '.join(f'{column} = excluded.{column}' for column in ACTION_STATS_COLUMNS)}
+                """,
+                [
+                    (drift["user_id"], *(drift["actual"][column] for column in ACTION_STATS_COLUMNS))
+                    for drift in drifts
+                ],
+            )
+            self.conn.commit()
+            for drift in drifts:
+                if self.query_cache is not None:
+                    self.query_cache.invalidate(drift["user_id"], ("action_items",))
+                if self.replicas is not None:
+                    self.replicas.note_write(drift["user_id"])
 
-        return stats
+        return drifts
 
     # ===== Proposed Actions Methods =====
 
+    def get_active_title_keys(self, user_id: int) -> List[str]:
+        """
+        Récupérer les clés de titres des propositions en attente et des actions en cours.
+
+        Les clés sont gardées en mémoire par utilisateur, avec les versions
+        de proposed_actions et action_items (voir get_data_versions): tant
+        qu'elles ne changent pas, y compris par un autre processus, une
+        seule lecture par clé primaire remplace la requête UNION.
+
+        Args:
+            user_id: ID de l'utilisateur.
+
+        Returns:
+            Clés normalisées (voir normalize_title), sans doublons.
+        """
+        version = self._title_keys_version(user_id)
+        keys = self._title_keys.get(user_id, version)
+        if keys is None:
+            keys = tuple(self._load_active_title_keys(user_id))
+            self._title_keys.put(user_id, version, keys)
+        return list(keys)
+
+    def _title_keys_version(self, user_id: int) -> Tuple[int, ...]:
+        """Versions des tables lues par get_active_title_keys."""
+        versions = self.get_data_versions(user_id)
+        return tuple(versions[table] for table in TITLE_KEYS_TABLES)
+
+    def _remember_title_key(self, user_id: int, version: Tuple[int, ...], key: str) -> None:
+        """
+        Ajouter la clé d'une proposition tout juste enregistrée aux clés mémorisées.
+
+        Seulement si notre insertion est la seule écriture depuis la lecture
+        de version (proposed_actions avancée d'exactement 1); sinon les clés
+        seront relues au prochain appel.
+        """
+        keys = self._title_keys.get(user_id, version)
+        expected = (version[0] + 1,) + version[1:]
+        if keys is not None and self._title_keys_version(user_id) == expected:
+            self._title_keys.put(user_id, expected, tuple(sorted(set(keys) | {key})))
+
+    def _load_active_title_keys(self, user_id: int) -> List[str]:
+        """Lire les clés de titres actifs (voir get_active_title_keys)."""
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                """
+                SELECT title FROM proposed_actions WHERE user_id = ? AND status = 'pending'
+                UNION
+                SELECT title FROM action_items WHERE user_id = ? AND status IN ('pending', 'in_progress')
+                """,
+                (user_id, user_id),
+            )
+            return sorted({normalize_title(row["title"]) for row in cursor.fetchall()})
+
+    def find_similar_active_title(self, user_id: int, title: str) -> Optional[str]:
+        """
+        Chercher une proposition en attente ou une action en cours similaire à un titre.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            title: Titre à comparer.
+
+        Returns:
+            Clé similaire trouvée, ou None.
+        """
+        key = normalize_title(title)
+        return next((other for other in self.get_active_title_keys(user_id) if titles_similar(key, other)), None)
+
+    @invalidates("proposed_actions")
     def save_proposed_action(
         self,
         user_id: int,
         title: str,
         description: str = "",
         conversation_id: Optional[int] = None,
-    ) -> int:
+    ) -> Optional[int]:
         """
         Enregistrer une nouvelle proposition d'action par l'IA.
 
+        La proposition est ignorée si une proposition en attente ou une action
+        en cours de l'utilisateur a un titre similaire (voir titles_similar).
+
         Args:
             user_id: ID de l'utilisateur.
             title: Titre de l'action proposée.
@@ -902,7 +1728,7 @@ class DatabaseManager:
             conversation_id: ID de la conversation d'origine.
 
         Returns:
-            ID de la proposition créée.
+            ID de la proposition créée, ou None si c'est un doublon.
 
         Raises:
             ValueError: Si les paramètres sont invalides.
@@ -913,19 +1739,28 @@ class DatabaseManager:
         if not user_id:
             raise ValueError("user_id est requis")
 
+        version = self._title_keys_version(user_id)
+        if self.find_similar_active_title(user_id, title) is not None:
+            return None
+
         try:
             cursor = self.conn.execute(
                 """
-                INSERT INTO proposed_actions (user_id, title, description, conversation_id)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO proposed_actions (user_id, title, description, conversation_id, title_key)
+                VALUES (?, ?, ?, ?, ?)
                 """,
-                (user_id, title, description, conversation_id),
+                (user_id, title, description, conversation_id, normalize_title(title)),
             )
             self.conn.commit()
+            self._remember_title_key(user_id, version, normalize_title(title))
             return cursor.lastrowid
         except sqlite3.IntegrityError as e:
+            # Doublon exact inséré entre la vérification et l'écriture (autre session)
+            if "UNIQUE" in str(e):
+                return None
             raise ValueError(f"Erreur d'intégrité de la base de données: {e}")
 
+    @cached_query("proposed_actions")
     def get_proposed_actions(
         self, user_id: int, status: Optional[str] = None, limit: int = 100
     ) -> List[Dict[str, Any]]:
@@ -941,33 +1776,35 @@ class DatabaseManager:
             Liste de dicts contenant les informations des propositions.
             Trié par date de proposition (plus récent en premier).
         """
-        if status:
-            cursor = self.conn.execute(
-                """
-                SELECT id, user_id, title, description, status,
-                       conversation_id, proposed_at, reviewed_at
-                FROM proposed_actions
-                WHERE user_id = ? AND status = ?
-                ORDER BY proposed_at DESC
-                LIMIT ?
-                """,
-                (user_id, status, limit),
-            )
-        else:
-            cursor = self.conn.execute(
-                """
-                SELECT id, user_id, title, description, status,
-                       conversation_id, proposed_at, reviewed_at
-                FROM proposed_actions
-                WHERE user_id = ?
-                ORDER BY proposed_at DESC
-                LIMIT ?
-                """,
-                (user_id, limit),
-            )
-
-        return [dict(row) for row in cursor.fetchall()]
-
+        with self._reader(user_id) as conn:
+            if status:
+                cursor = conn.execute(
+                    """
+                    SELECT id, user_id, title, description, status,
+                           conversation_id, proposed_at, reviewed_at
+                    FROM proposed_actions
+                    WHERE user_id = ? AND status = ?
+                    ORDER BY proposed_at DESC
+                    LIMIT ?
+                    """,
+                    (user_id, status, limit),
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    SELECT id, user_id, title, description, status,
+                           conversation_id, proposed_at, reviewed_at
+                    FROM proposed_actions
+                    WHERE user_id = ?
+                    ORDER BY proposed_at DESC
+                    LIMIT ?
+                    """,
+                    (user_id, limit),
+                )
+
+            return [dict(row) for row in cursor.fetchall()]
+
+    @invalidates("proposed_actions", "action_items", owner_table="proposed_actions")
     def accept_proposed_action(self, proposal_id: int, deadline: Optional[str] = None) -> int:
         """
         Accepter une proposition d'action (créer l'action et marquer la proposition comme acceptée).
@@ -1022,6 +1859,7 @@ class DatabaseManager:
 
         return action_id
 
+    @invalidates("proposed_actions", owner_table="proposed_actions")
     def reject_proposed_action(self, proposal_id: int) -> None:
         """
         Rejeter une proposition d'action.
@@ -1058,6 +1896,7 @@ class DatabaseManager:
         )
         self.conn.commit()
 
+    @cached_query("proposed_actions")
     def get_proposed_actions_count(self, user_id: int, status: str = "pending") -> int:
         """
         Obtenir le nombre de propositions d'actions pour un utilisateur.
@@ -1069,17 +1908,19 @@ class DatabaseManager:
         Returns:
             Nombre de propositions.
         """
-        cursor = self.conn.execute(
-            """
-            SELECT COUNT(*) as count
-            FROM proposed_actions
-            WHERE user_id = ? AND status = ?
-            """,
-            (user_id, status),
-        )
-        result = cursor.fetchone()
-        return result["count"] if result else 0
+        with self._reader(user_id) as conn:
+            cursor = conn.execute(
+                """
+                SELECT COUNT(*) as count
+                FROM proposed_actions
+                WHERE user_id = ? AND status = ?
+                """,
+                (user_id, status),
+            )
+            result = cursor.fetchone()
+            return result["count"] if result else 0
 
+    @invalidates("proposed_actions", owner_table="proposed_actions")
     def delete_proposed_action(self, proposal_id: int) -> None:
         """
         Supprimer une proposition d'action.
@@ -1096,7 +1937,300 @@ class DatabaseManager:
         )
         self.conn.commit()
 
+    # ===== LLM Telemetry Methods =====
+
+    def save_llm_metric(
+        self,
+        component: str,
+        model: str,
+        latency_ms: float,
+        user_id: Optional[int] = None,
+        status: str = "ok",
+        ttft_ms: Optional[float] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_creation_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        retries: int = 0,
+        cost_usd: float = 0.0,
+        error: Optional[str] = None,
+    ) -> int:
+        """
+        Enregistrer la télémétrie d'un appel à l'API Claude.
+
+        Args:
+            component: Composant appelant ('conversation', 'action_extraction', ...).
+            model: Modèle appelé.
+            latency_ms: Durée totale de l'appel en millisecondes.
+            user_id: ID de l'utilisateur concerné (optionnel).
+            status: 'ok', 'error' ou 'cancelled'.
+            ttft_ms: Temps jusqu'au premier token (streaming uniquement).
+            input_tokens: Tokens d'entrée facturés.
+            output_tokens: Tokens de sortie.
+            cache_creation_tokens: Tokens écrits dans le cache de prompt.
+            cache_read_tokens: Tokens lus depuis le cache de prompt.
+            retries: Nombre de nouvelles tentatives.
+            cost_usd: Coût estimé en dollars.
+            error: Type de l'exception en cas d'échec.
+
+        Returns:
+            ID de la mesure créée.
+
+        Raises:
+            ValueError: Si le statut est invalide.
+        """
+        if status not in ("ok", "error", "cancelled"):
+            raise ValueError(f"Statut invalide: {status}")
+
+        cursor = self.conn.execute(
+            """
+            INSERT INTO llm_metrics (
+                user_id, component, model, status, latency_ms, ttft_ms,
+                input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens,
+                retries, cost_usd, error
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                user_id, component, model, status, latency_ms, ttft_ms,
+                input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens,
+                retries, cost_usd, error,
+            ),
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def _llm_percentiles(self, column: str, days: int, percentiles: Tuple[float, ...]) -> Dict[Tuple[str, str], List[float]]:
+        """
+        Calculer des percentiles (rang le plus proche) par composant et modèle.
+
+        Args:
+            column: 'latency_ms' ou 'ttft_ms' (valeur interne).
+            days: Fenêtre en jours.
+            percentiles: Percentiles entre 0 et 1.
+
+        Returns:
+            Dict (component, model) -> valeurs dans l'ordre de percentiles.
+        """
+        selects = ", ".join(
+            f"MIN(CASE WHEN rn >= {p!r} * n THEN {column} END)" for p in percentiles
+        )
+        with self._reader() as conn:
+            cursor = conn.execute(
+                f"""
+                WITH ranked AS (
+                    SELECT component, model, {column},
+                           ROW_NUMBER() OVER (PARTITION BY component, model ORDER BY {column}) AS rn,
+                           COUNT(*) OVER (PARTITION BY component, model) AS n
+                    FROM llm_metrics
+                    WHERE created_at >= datetime('now', ?) AND {column} IS NOT NULL
+                )
+                SELECT component, model, {selects}
+                FROM ranked
+                GROUP BY component, model
+                """,
+                (f"-{days} days",),
+            )
+            return {(row[0], row[1]): list(row[2:]) for row in cursor.fetchall()}
+
+    def get_llm_metrics_summary(self, days: int = 7) -> List[Dict[str, Any]]:
+        """
+        Résumer la télémétrie des appels LLM par composant et modèle.
+
+        Args:
+            days: Nombre de jours à considérer (défaut: 7).
+
+        Returns:
+            Liste de dicts contenant: component, model, requests, errors, retries,
+            input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens,
+            cost_usd, avg_latency_ms, p50_latency_ms, p95_latency_ms, p95_ttft_ms.
+            Trié par coût décroissant.
+        """
+        with self._reader() as conn:
+            cursor = conn.execute(
+                """
+                SELECT component, model,
+                       COUNT(*) AS requests,
+                       SUM(status = 'error') AS errors,
+                       SUM(retries) AS retries,
+                       SUM(input_tokens) AS input_tokens,
+                       SUM(output_tokens) AS output_tokens,
+                       SUM(cache_creation_tokens) AS cache_creation_tokens,
+                       SUM(cache_read_tokens) AS cache_read_tokens,
+                       SUM(cost_usd) AS cost_usd,
+                       AVG(latency_ms) AS avg_latency_ms
+                FROM llm_metrics
+                WHERE created_at >= datetime('now', ?)
+                GROUP BY component, model
+                ORDER BY cost_usd DESC, component
+                """,
+                (f"-{days} days",),
+            )
+            summary = [dict(row) for row in cursor.fetchall()]
+
+        latency = self._llm_percentiles("latency_ms", days, (0.5, 0.95))
+        ttft = self._llm_percentiles("ttft_ms", days, (0.95,))
+        for row in summary:
+            key = (row["component"], row["model"])
+            row["p50_latency_ms"], row["p95_latency_ms"] = latency.get(key, [None, None])
+            row["p95_ttft_ms"] = ttft.get(key, [None])[0]
+
+        return summary
+
+    def get_llm_metric_totals(self) -> List[Dict[str, Any]]:
+        """
+        Obtenir les totaux cumulés de télémétrie LLM (compteurs Prometheus).
+
+        Returns:
+            Liste de dicts par (component, model, status) contenant: requests,
+            retries, input_tokens, output_tokens, cache_creation_tokens,
+            cache_read_tokens et cost_usd.
+        """
+        with self._reader() as conn:
+            cursor = conn.execute(
+                """
+                SELECT component, model, status,
+                       COUNT(*) AS requests,
+                       SUM(retries) AS retries,
+                       SUM(input_tokens) AS input_tokens,
+                       SUM(output_tokens) AS output_tokens,
+                       SUM(cache_creation_tokens) AS cache_creation_tokens,
+                       SUM(cache_read_tokens) AS cache_read_tokens,
+                       SUM(cost_usd) AS cost_usd
+                FROM llm_metrics
+                GROUP BY component, model, status
+                ORDER BY component, model, status
+                """
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def record_llm_skip(self, component: str, reason: str) -> None:
+        """
+        Compter un appel à l'API Claude évité.
+
+        Args:
+            component: Composant qui aurait appelé l'API ('action_extraction', ...).
+            reason: Raison de l'économie ('prefilter', ...).
+        """
+        self.conn.execute(
+            """
+            INSERT INTO llm_skipped_calls (component, reason, day, count)
+            VALUES (?, ?, date('now'), 1)
+            ON CONFLICT (component, reason, day) DO UPDATE SET count = count + 1
+            """,
+            (component, reason),
+        )
+        self.conn.commit()
+
+    def get_llm_skip_totals(self, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Obtenir le nombre d'appels à l'API Claude évités.
+
+        Args:
+            days: Nombre de jours à considérer (None = depuis le début).
+
+        Returns:
+            Liste de dicts par (component, reason) contenant: skipped.
+        """
+        window = "date('now', ?)" if days is not None else "''"
+        with self._reader() as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT component, reason, SUM(count) AS skipped
+                FROM llm_skipped_calls
+                WHERE day >= {window}
+                GROUP BY component, reason
+                ORDER BY component, reason
+                """,
+                (f"-{days} days",) if days is not None else (),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_llm_histogram(self, column: str, bounds_ms: Tuple[float, ...]) -> List[Dict[str, Any]]:
+        """
+        Obtenir un histogramme cumulé de latence par composant et modèle.
+
+        Args:
+            column: 'latency_ms' ou 'ttft_ms'.
+            bounds_ms: Bornes supérieures des intervalles, en millisecondes (croissantes).
+
+        Returns:
+            Liste de dicts contenant: component, model, buckets (nombre de mesures
+            <= chaque borne), count et sum (en millisecondes).
+
+        Raises:
+            ValueError: Si la colonne n'est pas une colonne de durée.
+        """
+        if column not in ("latency_ms", "ttft_ms"):
+            raise ValueError(f"Colonne de durée invalide: {column}")
+
+        bucket_selects = "".join(f", SUM({column} <= ?)" for _ in bounds_ms)
+        with self._reader() as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT component, model, COUNT(*), SUM({column}){bucket_selects}
+                FROM llm_metrics
+                WHERE {column} IS NOT NULL
+                GROUP BY component, model
+                ORDER BY component, model
+                """,
+                tuple(bounds_ms),
+            )
+            return [
+                {
+                    "component": row[0],
+                    "model": row[1],
+                    "count": row[2],
+                    "sum": row[3],
+                    "buckets": list(row[4:]),
+                }
+                for row in cursor.fetchall()
+            ]
+
+    def get_data_versions(self, user_id: int) -> Dict[str, int]:
+        """
+        Obtenir les versions des données d'un utilisateur.
+
+        Chaque ligne insérée, modifiée ou supprimée dans une table de
+        DATA_VERSION_TABLES incrémente la version de cette table pour son
+        utilisateur (triggers SQLite, dans la même transaction que
+        l'écriture, y compris hors de DatabaseManager): deux lectures qui
+        rendent les mêmes versions ont vu les mêmes données. Les versions ne
+        décroissent jamais; une seule ligne est lue, par clé primaire.
+
+        Args:
+            user_id: ID de l'utilisateur.
+
+        Returns:
+            Dict table -> version, pour chaque table de DATA_VERSION_TABLES
+            (0 si l'utilisateur n'a encore rien écrit).
+        """
+        with self._reader(user_id) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(DATA_VERSION_TABLES)} FROM user_data_version WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+            if row is None:
+                return dict.fromkeys(DATA_VERSION_TABLES, 0)
+            return {table: row[table] for table in DATA_VERSION_TABLES}
+
+    def _get_row_owner(self, table: str, row_id: int) -> Optional[int]:
+        """
+        Récupérer le user_id propriétaire d'une ligne (pour l'invalidation du cache).
+
+        Args:
+            table: Nom de la table (valeur interne, jamais issue de l'utilisateur).
+            row_id: ID de la ligne.
+
+        Returns:
+            user_id de la ligne, ou None si elle n'existe pas.
+        """
+        row = self.conn.execute(f"SELECT user_id FROM {table} WHERE id = ?", (row_id,)).fetchone()
+        return row["user_id"] if row else None
+
     def close(self):
         """Fermer la connexion à la base de données."""
+        if self.replicas is not None:
+            self.replicas.close()
         if self.conn:
             self.conn.close()
@@ -0,0 +1,174 @@
+"""
+Export RGPD en flux des données d'un utilisateur.
+
+Les lignes sont lues par lots (fetchmany) et écrites au fur et à mesure, en
+NDJSON (un objet JSON par ligne) ou dans une archive ZIP contenant un fichier
+par table. La mémoire utilisée ne dépend pas de la taille du compte.
+"""
+
+import json
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, Iterator, Optional
+
+from src.database.db_manager import EXPORT_BATCH_SIZE, USER_EXPORT_SECTIONS, DatabaseManager
+
+# Version du format d'export, incrémentée en cas de changement de structure
+EXPORT_FORMAT_VERSION = 1
+
+# Callback de progression: (lignes exportées, lignes à exporter)
+ProgressCallback = Callable[[int, int], None]
+
+
+def _dumps(value) -> str:
+    """Sérialiser une valeur en JSON compact (UTF-8 lisible)."""
+    return json.dumps(value, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+class _ProgressTracker:
+    """Compte les lignes exportées et notifie le callback à chaque lot."""
+
+    def __init__(self, total: int, callback: Optional[ProgressCallback]):
+        self.total = total
+        self.done = 0
+        self._callback = callback
+
+    def advance(self) -> None:
+        self.done += 1
+        if self._callback and self.done % EXPORT_BATCH_SIZE == 0:
+            self._callback(self.done, self.total)
+
+    def finish(self) -> None:
+        if self._callback:
+            self._callback(self.done, self.total)
+
+
+def _build_metadata(counts: Dict[str, int]) -> Dict:
+    """Construire l'en-tête décrivant l'export."""
+    return {
+        "format_version": EXPORT_FORMAT_VERSION,
+        "export_timestamp": datetime.now().isoformat(),
+        "counts": counts,
+    }
+
+
+def iter_ndjson_export(
+    db: DatabaseManager,
+    user_id: int,
+    progress: Optional[ProgressCallback] = None,
+) -> Iterator[bytes]:
+    """
+    Générer l'export NDJSON ligne par ligne.
+
+    La première ligne décrit l'export (section "export_metadata"), la
+    deuxième contient le profil, puis chaque ligne est un enregistrement
+    {"section": ..., "data": {...}}.
+
+    Args:
+        db: Instance de DatabaseManager.
+        user_id: ID de l'utilisateur.
+        progress: Callback de progression optionnel.
+
+    Yields:
+        Lignes NDJSON encodées en UTF-8 (terminées par un saut de ligne).
+
+    Raises:
+        ValueError: Si l'utilisateur n'existe pas.
+    """
+    return _ndjson_lines(db, user_id, progress, {})
+
+
+def _ndjson_lines(
+    db: DatabaseManager,
+    user_id: int,
+    progress: Optional[ProgressCallback],
+    written: Dict[str, int],
+) -> Iterator[bytes]:
+    """Générer les lignes NDJSON en comptant dans written les lignes de chaque section."""
+    profile = db.get_user_export_profile(user_id)
+    counts = db.count_user_export_rows(user_id)
+    tracker = _ProgressTracker(sum(counts.values()), progress)
+
+    yield (_dumps({"section": "export_metadata", "data": _build_metadata(counts)}) + "\n").encode("utf-8")
+    yield (_dumps({"section": "user_profile", "data": profile}) + "\n").encode("utf-8")
+
+    for section in USER_EXPORT_SECTIONS:
+        written[section] = 0
+        for row in db.iter_user_export_rows(user_id, section):
+            yield (_dumps({"section": section, "data": row}) + "\n").encode("utf-8")
+            written[section] += 1
+            tracker.advance()
+
+    tracker.finish()
+
+
+def write_ndjson_export(
+    db: DatabaseManager,
+    user_id: int,
+    fileobj: BinaryIO,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, int]:
+    """
+    Écrire l'export NDJSON dans un fichier binaire.
+
+    Args:
+        db: Instance de DatabaseManager.
+        user_id: ID de l'utilisateur.
+        fileobj: Fichier ouvert en écriture binaire.
+        progress: Callback de progression optionnel.
+
+    Returns:
+        Nombre de lignes écrites par section.
+
+    Raises:
+        ValueError: Si l'utilisateur n'existe pas.
+    """
+    written: Dict[str, int] = {}
+    for line in _ndjson_lines(db, user_id, progress, written):
+        fileobj.write(line)
+    return written
+
+
+def write_zip_export(
+    db: DatabaseManager,
+    user_id: int,
+    fileobj: BinaryIO,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, int]:
+    """
+    Écrire l'export sous forme d'archive ZIP (un fichier NDJSON par table).
+
+    L'archive contient manifest.json, user_profile.json et
+    <section>.ndjson pour chaque section de USER_EXPORT_SECTIONS.
+
+    Args:
+        db: Instance de DatabaseManager.
+        user_id: ID de l'utilisateur.
+        fileobj: Fichier ouvert en écriture binaire (seekable ou non).
+        progress: Callback de progression optionnel.
+
+    Returns:
+        Nombre de lignes écrites par section.
+
+    Raises:
+        ValueError: Si l'utilisateur n'existe pas.
+    """
+    profile = db.get_user_export_profile(user_id)
+    counts = db.count_user_export_rows(user_id)
+    tracker = _ProgressTracker(sum(counts.values()), progress)
+    written = dict.fromkeys(USER_EXPORT_SECTIONS, 0)
+
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("manifest.json", json.dumps(_build_metadata(counts), ensure_ascii=False, indent=2))
+        archive.writestr("user_profile.json", json.dumps(profile, ensure_ascii=False, indent=2, default=str))
+
+        for section in USER_EXPORT_SECTIONS:
+            # force_zip64: la taille finale n'est pas connue à l'ouverture
+            with archive.open(f"{section}.ndjson", "w", force_zip64=True) as member:
+                for row in db.iter_user_export_rows(user_id, section):
+                    member.write((_dumps(row) + "\n").encode("utf-8"))
+                    written[section] += 1
+                    tracker.advance()
+
+    tracker.finish()
+    return written
@@ -0,0 +1,1558 @@
+"""
+Gestionnaire de base de données PostgreSQL pour Serene.
+
+PostgresDatabaseManager expose les méthodes publiques de DatabaseManager
+(voir src.database.storage.StorageBackend) sur un serveur PostgreSQL, pour que
+plusieurs réplicas de l'application partagent les mêmes données:
+- les connexions viennent d'un pool (psycopg_pool), une par appel; chaque
+  méthode est une transaction;
+- les exports parcourent les lignes avec un curseur côté serveur: seules
+  batch_size lignes sont transférées à la fois;
+- le schéma (schema_postgres.sql) reprend celui de SQLite; la recherche
+  plein texte utilise des colonnes tsvector indexées (GIN), les versions de
+  données et les compteurs d'actions des triggers PL/pgSQL;
+- les dates sont rendues en chaînes ISO et les nombres en int/float, comme
+  avec SQLite.
+
+Dépendance optionnelle: pip install -r requirements-postgres.txt
+"""
+
+import json
+import os
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.database.db_manager import (
+    ACTION_STATS_COLUMNS,
+    DATA_VERSION_TABLES,
+    EXPORT_BATCH_SIZE,
+    FTS_TABLES,
+    SEARCH_HIGHLIGHT_END,
+    SEARCH_HIGHLIGHT_START,
+    TITLE_KEYS_CACHE_SIZE,
+    USER_EXPORT_SECTIONS,
+    DatabaseManager,
+    choose_mood_bucket,
+    normalize_title,
+    search_words,
+)
+from src.database.query_cache import QueryCache, VersionedCache, cached_query, invalidates
+
+try:
+    import psycopg
+    from psycopg.rows import dict_row
+    from psycopg.types.numeric import FloatLoader
+    from psycopg.types.string import TextLoader
+    from psycopg_pool import ConnectionPool
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+DEFAULT_POOL_SIZE = 10
+
+# Verrou consultatif pris pendant la création du schéma (réplicas démarrés en même temps)
+SCHEMA_LOCK_ID = 0x5E4E4E
+
+# Expressions SQL de début d'intervalle pour l'agrégation des check-ins (mêmes chaînes qu'avec SQLite)
+MOOD_BUCKET_EXPRESSIONS = {
+    "hour": "to_char(date_trunc('hour', timestamp), 'YYYY-MM-DD HH24:MI:SS')",
+    "day": "to_char(timestamp, 'YYYY-MM-DD')",
+    # date_trunc('week') rend le lundi
+    "week": "to_char(date_trunc('week', timestamp), 'YYYY-MM-DD')",
+}
+
+# Options de ts_headline proches de snippet(..., 16) de FTS5
+SEARCH_HEADLINE_OPTIONS = (
+    f"StartSel={SEARCH_HIGHLIGHT_START}, StopSel={SEARCH_HIGHLIGHT_END}, "
+    "MaxWords=16, MinWords=8, MaxFragments=1, FragmentDelimiter=…"
+)
+
+# Date courante UTC (les colonnes TIMESTAMP sont en UTC, comme CURRENT_TIMESTAMP de SQLite)
+UTC_NOW = "(now() AT TIME ZONE 'utc')"
+
+
+def fold_accents(word: str) -> str:
+    """Retirer les accents d'un mot (comme serene_fold côté serveur)."""
+    return "".join(
+        char for char in unicodedata.normalize("NFKD", word) if not unicodedata.combining(char)
+    )
+
+
+def build_tsquery(text: str, keep_accents: bool = False) -> Optional[str]:
+    """
+    Convertir une saisie libre en requête tsquery sûre (to_tsquery 'simple').
+
+    Mêmes mots que la recherche SQLite (voir search_words), chacun en
+    préfixe: "fatigu" trouve "fatigue" et "fatigué". Tous les mots doivent
+    être présents.
+
+    Args:
+        text: Saisie de l'utilisateur.
+        keep_accents: Accepter aussi la forme accentuée de chaque mot (pour
+            surligner le texte d'origine dans les extraits).
+
+    Returns:
+        Requête tsquery, ou None si aucun mot exploitable.
+    """
+    terms = []
+    for word in search_words(text):
+        folded = fold_accents(word)
+        if keep_accents and folded != word:
+            terms.append(f"('{folded}':* | '{word}':*)")
+        else:
+            terms.append(f"'{folded}':*")
+    return " & ".join(terms) or None
+
+
+def _configure_connection(conn) -> None:
+    """Configurer une connexion du pool: lignes en dicts, dates en chaînes, numeric en float."""
+    conn.row_factory = dict_row
+    for type_name in ("timestamp", "timestamptz", "date"):
+        conn.adapters.register_loader(type_name, TextLoader)
+    conn.adapters.register_loader("numeric", FloatLoader)
+
+
+class PostgresDatabaseManager:
+    """Gestionnaire de base de données PostgreSQL (même interface que DatabaseManager)."""
+
+    def __init__(
+        self,
+        conninfo: str,
+        query_cache: Optional[QueryCache] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        """
+        Ouvrir le pool de connexions et créer les tables.
+
+        Args:
+            conninfo: URL ou chaîne de connexion libpq (postgresql://...).
+            query_cache: Cache de lecture optionnel (désactivé si None). Local
+                au processus: les écritures d'un autre réplica n'invalident
+                pas ses entrées avant leur expiration.
+            pool_size: Nombre maximum de connexions ouvertes.
+
+        Raises:
+            ImportError: Si psycopg ou psycopg_pool n'est pas installé.
+        """
+        if not PSYCOPG_AVAILABLE:
+            raise ImportError("PostgreSQL: installer les pilotes (pip install -r requirements-postgres.txt)")
+
+        self.conninfo = conninfo
+        self.query_cache = query_cache
+        self._title_keys = VersionedCache(max_entries=TITLE_KEYS_CACHE_SIZE)
+        self.pool = ConnectionPool(
+            conninfo,
+            min_size=1,
+            max_size=pool_size,
+            configure=_configure_connection,
+            name="serene",
+            open=True,
+        )
+        self._init_db()
+
+    @classmethod
+    def from_env(cls, query_cache: Optional[QueryCache] = None) -> Optional["PostgresDatabaseManager"]:
+        """
+        Créer le gestionnaire depuis SERENE_DATABASE_URL et SERENE_DATABASE_POOL_SIZE.
+
+        Args:
+            query_cache: Cache de lecture optionnel.
+
+        Returns:
+            Gestionnaire PostgreSQL, ou None si SERENE_DATABASE_URL n'est pas défini.
+        """
+        conninfo = os.getenv("SERENE_DATABASE_URL", "").strip()
+        if not conninfo:
+            return None
+        pool_size = int(os.getenv("SERENE_DATABASE_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+        return cls(conninfo, query_cache=query_cache, pool_size=pool_size)
+
+    def _init_db(self):
+        """Créer les tables, fonctions et triggers s'ils n'existent pas."""
+        schema_path = os.path.join(os.path.dirname(__file__), "schema_postgres.sql")
+        with open(schema_path, "r", encoding="utf-8") as f:
+            schema = f.read()
+
+        with self.pool.connection() as conn:
+            conn.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_ID,))
+            conn.execute(schema)
+
+    def _fetchall(self, query: str, params: Any = ()) -> List[Dict[str, Any]]:
+        """Exécuter une requête et retourner toutes ses lignes."""
+        with self.pool.connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def _fetchone(self, query: str, params: Any = ()) -> Optional[Dict[str, Any]]:
+        """Exécuter une requête et retourner sa première ligne (ou None)."""
+        with self.pool.connection() as conn:
+            return conn.execute(query, params).fetchone()
+
+    def _execute(self, query: str, params: Any = ()) -> None:
+        """Exécuter une écriture dans sa propre transaction."""
+        with self.pool.connection() as conn:
+            conn.execute(query, params)
+
+    def _insert(self, query: str, params: Any = ()) -> int:
+        """
+        Exécuter un INSERT ... RETURNING id.
+
+        Raises:
+            ValueError: Si une contrainte d'intégrité est violée.
+        """
+        try:
+            return self._fetchone(query, params)["id"]
+        except psycopg.IntegrityError as e:
+            raise ValueError(f"Erreur d'intégrité de la base de données: {e}")
+
+    @invalidates("check_ins")
+    def save_checkin(self, user_id: int, mood_score: int, notes: str = "") -> int:
+        """
+        Enregistrer un check-in.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            mood_score: Score d'humeur (0-10).
+            notes: Notes optionnelles de l'utilisateur.
+
+        Returns:
+            ID du check-in créé.
+
+        Raises:
+            ValueError: Si mood_score est hors limites (0-10) ou user_id invalide.
+        """
+        if not isinstance(mood_score, int) or not 0 <= mood_score <= 10:
+            raise ValueError(
+                f"mood_score doit être un entier entre 0 et 10, reçu: {mood_score}"
+            )
+
+        if not user_id:
+            raise ValueError("user_id est requis")
+
+        return self._insert(
+            "INSERT INTO check_ins (user_id, mood_score, notes) VALUES (%s, %s, %s) RETURNING id",
+            (user_id, mood_score, notes),
+        )
+
+    @cached_query("check_ins")
+    def get_mood_history(self, user_id: int, days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Récupérer l'historique des check-ins (derniers N jours).
+
+        Args:
+            user_id: ID de l'utilisateur.
+            days: Nombre de jours d'historique à récupérer (défaut: 30).
+
+        Returns:
+            Liste de dicts contenant: id, timestamp, mood_score, notes, created_at.
+            Trié du plus récent au plus ancien.
+        """
+        cutoff_date = datetime.now() - timedelta(days=days)
+
+        return self._fetchall(
+            """
+            SELECT id, timestamp, mood_score, notes, created_at
+            FROM check_ins
+            WHERE user_id = %s AND timestamp >= %s
+            ORDER BY timestamp DESC
+            """,
+            (user_id, cutoff_date),
+        )
+
+    @cached_query("check_ins")
+    def get_mood_stats(self, user_id: int, days: int = 30) -> Dict[str, Any]:
+        """
+        Calculer les statistiques d'humeur (derniers N jours) directement en SQL.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            days: Nombre de jours à considérer (défaut: 30).
+
+        Returns:
+            Dict contenant: count, avg, min, max et latest (dernier score, ou None).
+        """
+        cutoff_date = datetime.now() - timedelta(days=days)
+
+        return self._fetchone(
+            """
+            SELECT COUNT(*) AS count, AVG(mood_score) AS avg,
+                   MIN(mood_score) AS min, MAX(mood_score) AS max,
+                   (SELECT mood_score FROM check_ins
+                    WHERE user_id = %(user_id)s AND timestamp >= %(cutoff)s
+                    ORDER BY timestamp DESC LIMIT 1) AS latest
+            FROM check_ins
+            WHERE user_id = %(user_id)s AND timestamp >= %(cutoff)s
+            """,
+            {"user_id": user_id, "cutoff": cutoff_date},
+        )
+
+    @cached_query("check_ins")
+    def get_mood_buckets(
+        self, user_id: int, days: int = 30, bucket: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Récupérer l'historique d'humeur agrégé par intervalle de temps.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            days: Nombre de jours d'historique (défaut: 30).
+            bucket: 'hour', 'day' ou 'week' (défaut: choisi selon days).
+
+        Returns:
+            Liste de dicts contenant: bucket_start, mean, min, max, count.
+            Trié du plus ancien au plus récent.
+
+        Raises:
+            ValueError: Si bucket n'est pas une granularité connue.
+        """
+        bucket = bucket or choose_mood_bucket(days)
+        if bucket not in MOOD_BUCKET_EXPRESSIONS:
+            raise ValueError(
+                f"bucket doit être 'hour', 'day' ou 'week', reçu: {bucket}"
+            )
+
+        cutoff_date = datetime.now() - timedelta(days=days)
+
+        return self._fetchall(
+            f"""
+            SELECT {MOOD_BUCKET_EXPRESSIONS[bucket]} AS bucket_start,
+                   AVG(mood_score) AS mean, MIN(mood_score) AS min,
+                   MAX(mood_score) AS max, COUNT(*) AS count
+            FROM check_ins
+            WHERE user_id = %s AND timestamp >= %s
+            GROUP BY bucket_start
+            ORDER BY bucket_start ASC
+            """,
+            (user_id, cutoff_date),
+        )
+
+    @invalidates("conversations")
+    def save_conversation(
+        self, user_id: int, user_message: str, ai_response: str, tokens_used: int = 0
+    ) -> int:
+        """
+        Enregistrer une conversation.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            user_message: Message de l'utilisateur.
+            ai_response: Réponse de l'IA.
+            tokens_used: Nombre de tokens utilisés (optionnel).
+
+        Returns:
+            ID de la conversation créée.
+
+        Raises:
+            ValueError: Si les messages sont vides ou user_id invalide.
+        """
+        if not user_message or not ai_response:
+            raise ValueError("Les messages ne peuvent pas être vides")
+
+        if not user_id:
+            raise ValueError("user_id est requis")
+
+        return self._insert(
+            """
+            INSERT INTO conversations (user_id, user_message, ai_response, tokens_used)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id
+            """,
+            (user_id, user_message, ai_response, tokens_used),
+        )
+
+    @cached_query("conversations")
+    def get_conversation_history(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Récupérer l'historique des conversations.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            limit: Nombre maximum de conversations à récupérer (défaut: 50).
+
+        Returns:
+            Liste de dicts contenant: id, timestamp, user_message, ai_response, tokens_used, created_at.
+        """
+        return self._fetchall(
+            """
+            SELECT id, timestamp, user_message, ai_response, tokens_used, created_at
+            FROM conversations
+            WHERE user_id = %s
+            ORDER BY timestamp ASC
+            LIMIT %s
+            """,
+            (user_id, limit),
+        )
+
+    @cached_query("conversations")
+    def get_conversation_count(self, user_id: int, days: int = 7) -> int:
+        """
+        Compter le nombre de conversations (derniers N jours).
+
+        Args:
+            user_id: ID de l'utilisateur.
+            days: Nombre de jours à considérer (défaut: 7).
+
+        Returns:
+            Nombre total de conversations dans la période.
+        """
+        cutoff_date = datetime.now() - timedelta(days=days)
+
+        row = self._fetchone(
+            "SELECT COUNT(*) AS count FROM conversations WHERE user_id = %s AND timestamp >= %s",
+            (user_id, cutoff_date),
+        )
+        return row["count"]
+
+    @cached_query("conversations")
+    def get_recent_conversations(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Récupérer les N dernières conversations.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            limit: Nombre de conversations à récupérer (défaut: 50).
+
+        Returns:
+            Liste de dicts contenant: id, timestamp, user_message, ai_response, tokens_used.
+            Les plus récentes, triées chronologiquement (la dernière en fin de liste).
+        """
+        rows = self._fetchall(
+            """
+            SELECT id, timestamp, user_message, ai_response, tokens_used
+            FROM conversations
+            WHERE user_id = %s
+            ORDER BY timestamp DESC, id DESC
+            LIMIT %s
+            """,
+            (user_id, limit),
+        )
+        return rows[::-1]
+
+    def get_conversations_after(
+        self, user_id: int, after_id: int = 0, limit: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Récupérer les conversations d'ID supérieur à after_id (indexation incrémentale).
+
+        Args:
+            user_id: ID de l'utilisateur.
+            after_id: Dernier ID déjà traité (0 pour partir du début).
+            limit: Nombre maximum de conversations par lot.
+
+        Returns:
+            Liste de dicts contenant: id, user_message, ai_response. Triée par ID croissant.
+        """
+        return self._fetchall(
+            """
+            SELECT id, user_message, ai_response
+            FROM conversations
+            WHERE user_id = %s AND id > %s
+            ORDER BY id
+            LIMIT %s
+            """,
+            (user_id, after_id, limit),
+        )
+
+    def get_conversations_by_ids(self, user_id: int, ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Récupérer des conversations par ID (limitées à l'utilisateur).
+
+        Args:
+            user_id: ID de l'utilisateur.
+            ids: IDs des conversations.
+
+        Returns:
+            Liste de dicts contenant: id, timestamp, user_message, ai_response,
+            dans l'ordre de ids. Les IDs inconnus ou d'un autre utilisateur sont ignorés.
+        """
+        if not ids:
+            return []
+
+        rows = self._fetchall(
+            """
+            SELECT id, timestamp, user_message, ai_response
+            FROM conversations
+            WHERE user_id = %s AND id = ANY(%s)
+            """,
+            (user_id, list(ids)),
+        )
+        by_id = {row["id"]: row for row in rows}
+        return [by_id[conv_id] for conv_id in ids if conv_id in by_id]
+
+    @invalidates("insights_log")
+    def save_insight(
+        self,
+        user_id: int,
+        insight_type: str,
+        content: str,
+        based_on_data: str = "",
+        tokens_used: int = 0,
+    ) -> int:
+        """
+        Enregistrer un insight IA.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            insight_type: Type d'insight (ex: "weekly", "monthly").
+            content: Contenu de l'insight généré.
+            based_on_data: Métadonnées sur les données utilisées (JSON string optionnel).
+            tokens_used: Nombre de tokens utilisés pour la génération.
+
+        Returns:
+            ID de l'insight créé.
+
+        Raises:
+            ValueError: Si les paramètres sont invalides.
+        """
+        if not insight_type or not content:
+            raise ValueError("insight_type et content ne peuvent pas être vides")
+
+        if not user_id:
+            raise ValueError("user_id est requis")
+
+        return self._insert(
+            """
+            INSERT INTO insights_log (user_id, insight_type, content, based_on_data, tokens_used)
+            VALUES (%s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (user_id, insight_type, content, based_on_data, tokens_used),
+        )
+
+    @cached_query("insights_log")
+    def get_latest_insight(self, user_id: int, insight_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupérer le dernier insight d'un type donné.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            insight_type: Type d'insight à récupérer.
+
+        Returns:
+            Dict contenant l'insight (id, created_at, insight_type, content, based_on_data, tokens_used),
+            ou None si aucun insight trouvé.
+        """
+        return self._fetchone(
+            """
+            SELECT id, created_at, insight_type, content, based_on_data, tokens_used
+            FROM insights_log
+            WHERE user_id = %s AND insight_type = %s
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (user_id, insight_type),
+        )
+
+    # ===== Full-Text Search Methods =====
+
+    @cached_query("conversations", "check_ins")
+    def search(
+        self,
+        user_id: int,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        sources: Tuple[str, ...] = ("conversations", "check_ins"),
+    ) -> List[Dict[str, Any]]:
+        """
+        Rechercher dans les conversations et les notes de check-in (tsvector).
+
+        Les accents sont ignorés pour trouver les lignes; dans les extraits,
+        un mot saisi sans accent n'est surligné que s'il est écrit sans accent.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            query: Texte recherché (voir build_tsquery).
+            limit: Nombre maximum de résultats (taille de page).
+            offset: Nombre de résultats à sauter (pagination).
+            sources: Tables à interroger ('conversations', 'check_ins').
+
+        Returns:
+            Liste de dicts contenant: source ('conversation' ou 'check_in'), id,
+            timestamp, snippet (termes entourés de SEARCH_HIGHLIGHT_START/END),
+            mood_score (check-ins uniquement) et rank (opposé de ts_rank, plus
+            petit = plus pertinent). Trié par pertinence.
+
+        Raises:
+            ValueError: Si une source est inconnue.
+        """
+        unknown = set(sources) - set(FTS_TABLES)
+        if unknown:
+            raise ValueError(f"Source(s) de recherche inconnue(s): {', '.join(sorted(unknown))}")
+
+        match = build_tsquery(query)
+        if match is None:
+            return []
+
+        selects = []
+        if "conversations" in sources:
+            selects.append(
+                """
+                SELECT 'conversation' AS source, id, timestamp,
+                       ts_headline('simple', user_message || ' ' || ai_response,
+                                   to_tsquery('simple', %(highlight)s), %(options)s) AS snippet,
+                       NULL::integer AS mood_score,
+                       -ts_rank(search_vector, to_tsquery('simple', %(match)s)) AS rank
+                FROM conversations
+                WHERE search_vector @@ to_tsquery('simple', %(match)s) AND user_id = %(user_id)s
+                """
+            )
+        if "check_ins" in sources:
+            selects.append(
+                """
+                SELECT 'check_in' AS source, id, timestamp,
+                       ts_headline('simple', coalesce(notes, ''),
+                                   to_tsquery('simple', %(highlight)s), %(options)s) AS snippet,
+                       mood_score,
+                       -ts_rank(search_vector, to_tsquery('simple', %(match)s)) AS rank
+                FROM check_ins
+                WHERE search_vector @@ to_tsquery('simple', %(match)s) AND user_id = %(user_id)s
+                """
+            )
+
+        if not selects:
+            return []
+
+        return self._fetchall(
+            f"""
+            SELECT * FROM ({" UNION ALL ".join(selects)}) AS results
+            ORDER BY rank, timestamp DESC
+            LIMIT %(limit)s OFFSET %(offset)s
+            """,
+            {
+                "match": match,
+                "highlight": build_tsquery(query, keep_accents=True),
+                "options": SEARCH_HEADLINE_OPTIONS,
+                "user_id": user_id,
+                "limit": limit,
+                "offset": offset,
+            },
+        )
+
+    # ===== User Authentication Methods =====
+
+    _hash_password = staticmethod(DatabaseManager._hash_password)
+
+    def create_user(
+        self, email: str, password: str, display_name: Optional[str] = None
+    ) -> int:
+        """
+        Create a new user account.
+
+        Args:
+            email: User's email address (must be unique).
+            password: Plain text password (will be hashed).
+            display_name: Optional display name for the user.
+
+        Returns:
+            ID of the created user.
+
+        Raises:
+            ValueError: If email already exists or inputs are invalid.
+        """
+        if not email or not password:
+            raise ValueError("Email et mot de passe sont requis")
+
+        try:
+            return self._fetchone(
+                """
+                INSERT INTO users (email, password_hash, display_name, created_at)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id
+                """,
+                (email, self._hash_password(password), display_name, datetime.now().isoformat()),
+            )["id"]
+        except psycopg.errors.UniqueViolation:
+            raise ValueError(f"Un utilisateur avec l'email '{email}' existe déjà")
+        except psycopg.IntegrityError as e:
+            raise ValueError(f"Erreur lors de la création de l'utilisateur: {e}")
+
+    authenticate_user = DatabaseManager.authenticate_user
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get user by ID.
+
+        Args:
+            user_id: User's ID.
+
+        Returns:
+            User dict or None if not found.
+        """
+        return self._fetchone(
+            """
+            SELECT id, email, password_hash, display_name, created_at, last_login, preferences
+            FROM users
+            WHERE id = %s
+            """,
+            (user_id,),
+        )
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """
+        Get user by email.
+
+        Args:
+            email: User's email address.
+
+        Returns:
+            User dict or None if not found.
+        """
+        return self._fetchone(
+            """
+            SELECT id, email, password_hash, display_name, created_at, last_login, preferences
+            FROM users
+            WHERE email = %s
+            """,
+            (email,),
+        )
+
+    def update_last_login(self, user_id: int) -> None:
+        """
+        Update user's last login timestamp.
+
+        Args:
+            user_id: User's ID.
+        """
+        self._execute(
+            "UPDATE users SET last_login = %s WHERE id = %s",
+            (datetime.now().isoformat(), user_id),
+        )
+
+    def update_user_preferences(
+        self, user_id: int, preferences: Dict[str, Any]
+    ) -> None:
+        """
+        Update user preferences.
+
+        Args:
+            user_id: User's ID.
+            preferences: Dict of user preferences (will be stored as JSON).
+        """
+        self._execute(
+            "UPDATE users SET preferences = %s WHERE id = %s",
+            (json.dumps(preferences), user_id),
+        )
+
+    get_user_preferences = DatabaseManager.get_user_preferences
+
+    def change_password(self, user_id: int, new_password: str) -> None:
+        """
+        Change user's password.
+
+        Args:
+            user_id: User's ID.
+            new_password: New plain text password (will be hashed).
+
+        Raises:
+            ValueError: If password is empty.
+        """
+        if not new_password:
+            raise ValueError("Le mot de passe ne peut pas être vide")
+
+        self._execute(
+            "UPDATE users SET password_hash = %s WHERE id = %s",
+            (self._hash_password(new_password), user_id),
+        )
+
+    def update_user_profile(
+        self,
+        user_id: int,
+        display_name: Optional[str] = None,
+        full_name: Optional[str] = None,
+        birth_year: Optional[int] = None,
+        timezone: Optional[str] = None,
+    ) -> None:
+        """
+        Update user profile information.
+
+        Args:
+            user_id: User's ID.
+            display_name: Display name (optional).
+            full_name: Full name (optional).
+            birth_year: Birth year (optional).
+            timezone: Timezone/location (optional).
+        """
+        fields = {
+            "display_name": display_name,
+            "full_name": full_name,
+            "birth_year": birth_year,
+            "timezone": timezone,
+        }
+        updates = {column: value for column, value in fields.items() if value is not None}
+        if not updates:
+            return  # Nothing to update
+
+        assignments = ", ".join(f"{column} = %s" for column in updates)
+        self._execute(
+            f"UPDATE users SET {assignments} WHERE id = %s",
+            (*updates.values(), user_id),
+        )
+
+    get_user_export_profile = DatabaseManager.get_user_export_profile
+
+    def count_user_export_rows(self, user_id: int) -> Dict[str, int]:
+        """
+        Compter les lignes de chaque section de l'export (pour la progression).
+
+        Args:
+            user_id: ID de l'utilisateur.
+
+        Returns:
+            Dict section -> nombre de lignes.
+        """
+        counts = ", ".join(
+            f"(SELECT COUNT(*) FROM {table} WHERE user_id = %(user_id)s) AS {section}"
+            for section, (table, _, _) in USER_EXPORT_SECTIONS.items()
+        )
+        return self._fetchone(f"SELECT {counts}", {"user_id": user_id})
+
+    def iter_user_export_rows(
+        self, user_id: int, section: str, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourir les lignes d'une section de l'export avec un curseur côté serveur.
+
+        Seul un lot de batch_size lignes est transféré à la fois; une
+        connexion du pool reste prise jusqu'à la fin du parcours.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            section: Section de USER_EXPORT_SECTIONS.
+            batch_size: Nombre de lignes lues par lot.
+
+        Yields:
+            Une ligne (dict) à la fois.
+
+        Raises:
+            ValueError: Si la section est inconnue.
+        """
+        if section not in USER_EXPORT_SECTIONS:
+            raise ValueError(f"Section d'export inconnue: {section}")
+
+        table, columns, order_by = USER_EXPORT_SECTIONS[section]
+        with self.pool.connection() as conn:
+            with conn.cursor(name=f"serene_export_{section}") as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(
+                    f"SELECT {columns} FROM {table} WHERE user_id = %s ORDER BY {order_by}",
+                    (user_id,),
+                )
+                yield from cursor
+
+    export_user_data = DatabaseManager.export_user_data
+
+    # ===== Action Items Methods =====
+
+    @invalidates("action_items")
+    def save_action_item(
+        self,
+        user_id: int,
+        title: str,
+        description: str = "",
+        source: str = "manual",
+        conversation_id: Optional[int] = None,
+        deadline: Optional[str] = None,
+    ) -> int:
+        """
+        Enregistrer un nouvel objectif/action.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            title: Titre de l'action.
+            description: Description détaillée (optionnelle).
+            source: Source de l'action ('manual' ou 'ai_extracted').
+            conversation_id: ID de la conversation d'origine si extrait par l'IA.
+            deadline: Date limite au format ISO (optionnelle).
+
+        Returns:
+            ID de l'action créée.
+
+        Raises:
+            ValueError: Si les paramètres sont invalides.
+        """
+        if not title:
+            raise ValueError("Le titre ne peut pas être vide")
+
+        if not user_id:
+            raise ValueError("user_id est requis")
+
+        if source not in ["manual", "ai_extracted"]:
+            raise ValueError("source doit être 'manual' ou 'ai_extracted'")
+
+        return self._insert(
+            """
+            INSERT INTO action_items (user_id, title, description, source, conversation_id, deadline)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (user_id, title, description, source, conversation_id, deadline),
+        )
+
+    @cached_query("action_items")
+    def get_action_items(
+        self, user_id: int, status: Optional[str] = None, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Récupérer les actions d'un utilisateur.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            status: Filtrer par statut (optionnel: 'pending', 'in_progress', 'completed', 'abandoned').
+            limit: Nombre maximum d'actions à récupérer (défaut: 100).
+
+        Returns:
+            Liste de dicts contenant les informations des actions.
+            Trié par date de création (plus récent en premier).
+        """
+        return self._fetchall(
+            """
+            SELECT id, user_id, title, description, status, source,
+                   conversation_id, deadline, created_at, completed_at, updated_at
+            FROM action_items
+            WHERE user_id = %(user_id)s AND (%(status)s::text IS NULL OR status = %(status)s)
+            ORDER BY created_at DESC, id DESC
+            LIMIT %(limit)s
+            """,
+            {"user_id": user_id, "status": status or None, "limit": limit},
+        )
+
+    @invalidates("action_items", owner_table="action_items")
+    def update_action_item(
+        self,
+        action_id: int,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        status: Optional[str] = None,
+        deadline: Optional[str] = None,
+    ) -> None:
+        """
+        Mettre à jour une action.
+
+        Args:
+            action_id: ID de l'action.
+            title: Nouveau titre (optionnel).
+            description: Nouvelle description (optionnelle).
+            status: Nouveau statut (optionnel).
+            deadline: Nouvelle deadline (optionnelle).
+
+        Raises:
+            ValueError: Si le statut est invalide.
+        """
+        if status and status not in ["pending", "in_progress", "completed", "abandoned"]:
+            raise ValueError(
+                "status doit être 'pending', 'in_progress', 'completed' ou 'abandoned'"
+            )
+
+        updates = {"updated_at": datetime.now().isoformat()}
+        if title is not None:
+            updates["title"] = title
+        if description is not None:
+            updates["description"] = description
+        if status is not None:
+            updates["status"] = status
+            # completed_at suit le statut (remis à NULL si l'action est rouverte)
+            updates["completed_at"] = datetime.now().isoformat() if status == "completed" else None
+        if deadline is not None:
+            updates["deadline"] = deadline
+
+        assignments = ", ".join(f"{column} = %s" for column in updates)
+        self._execute(
+            f"UPDATE action_items SET {assignments} WHERE id = %s",
+            (*updates.values(), action_id),
+        )
+
+    @invalidates("action_items", owner_table="action_items")
+    def delete_action_item(self, action_id: int) -> None:
+        """
+        Supprimer une action.
+
+        Args:
+            action_id: ID de l'action à supprimer.
+        """
+        self._execute("DELETE FROM action_items WHERE id = %s", (action_id,))
+
+    def get_action_item_by_id(self, action_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Récupérer une action par son ID.
+
+        Args:
+            action_id: ID de l'action.
+
+        Returns:
+            Dict contenant les informations de l'action, ou None si non trouvée.
+        """
+        return self._fetchone(
+            """
+            SELECT id, user_id, title, description, status, source,
+                   conversation_id, deadline, created_at, completed_at, updated_at
+            FROM action_items
+            WHERE id = %s
+            """,
+            (action_id,),
+        )
+
+    @cached_query("action_items")
+    def get_action_items_stats(self, user_id: int) -> Dict[str, int]:
+        """
+        Obtenir des statistiques sur les actions d'un utilisateur.
+
+        Lecture par clé primaire des compteurs de action_item_stats, tenus à
+        jour par des triggers (voir check_action_stats en cas de doute).
+
+        Args:
+            user_id: ID de l'utilisateur.
+
+        Returns:
+            Dict avec le nombre d'actions par statut.
+        """
+        row = self._fetchone(
+            f"SELECT {', '.join(ACTION_STATS_COLUMNS)} FROM action_item_stats WHERE user_id = %s",
+            (user_id,),
+        )
+        return row if row is not None else dict.fromkeys(ACTION_STATS_COLUMNS, 0)
+
+    def check_action_stats(self, repair: bool = False) -> List[Dict[str, Any]]:
+        """
+        Vérifier les compteurs de action_item_stats en les recalculant.
+
+        Args:
+            repair: Si True, remplacer les compteurs erronés par les valeurs recalculées.
+
+        Returns:
+            Liste de dicts par utilisateur en écart contenant: user_id,
+            stored (compteurs enregistrés) et actual (compteurs recalculés).
+        """
+        counts = ", ".join(
+            f"COUNT(*) FILTER (WHERE status = '{column}') AS {column}"
+            for column in ACTION_STATS_COLUMNS if column != "total"
+        )
+        actual = {
+            row.pop("user_id"): row
+            for row in self._fetchall(
+                f"SELECT user_id, {counts}, COUNT(*) AS total FROM action_items GROUP BY user_id"
+            )
+        }
+        stored = {
+            row.pop("user_id"): row
+            for row in self._fetchall(
+                f"SELECT user_id, {', '.join(ACTION_STATS_COLUMNS)} FROM action_item_stats"
+            )
+        }
+
+        empty = dict.fromkeys(ACTION_STATS_COLUMNS, 0)
+        drifts = []
+        for user_id in sorted(actual.keys() | stored.keys()):
+            expected = actual.get(user_id, empty)
+            current = stored.get(user_id, empty)
+            if expected != current:
+                drifts.append({"user_id": user_id, "stored": current, "actual": expected})
+
+        if repair and drifts:
+            columns = ", ".join(ACTION_STATS_COLUMNS)
+            with self.pool.connection() as conn:
+                conn.cursor().executemany(
+                    f"""
+                    INSERT INTO action_item_stats (user_id, {columns})
+                    VALUES (%s, {', '.join('%s' for _ in ACTION_STATS_COLUMNS)})
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        {', '.join(f'{column} = excluded.{column}' for column in ACTION_STATS_COLUMNS)}
+                    """,
+                    [
+                        (drift["user_id"], *(drift["actual"][column] for column in ACTION_STATS_COLUMNS))
+                        for drift in drifts
+                    ],
+                )
+            if self.query_cache is not None:
+                for drift in drifts:
+                    self.query_cache.invalidate(drift["user_id"], ("action_items",))
+
+        return drifts
+
+    # ===== Proposed Actions Methods =====
+
+    # Clés mémorisées par utilisateur, validées par get_data_versions (voir DatabaseManager)
+    get_active_title_keys = DatabaseManager.get_active_title_keys
+    _title_keys_version = DatabaseManager._title_keys_version
+    _remember_title_key = DatabaseManager._remember_title_key
+
+    def _load_active_title_keys(self, user_id: int) -> List[str]:
+        """Lire les clés de titres actifs (voir get_active_title_keys)."""
+        rows = self._fetchall(
+            """
+            SELECT title FROM proposed_actions WHERE user_id = %(user_id)s AND status = 'pending'
+            UNION
+            SELECT title FROM action_items WHERE user_id = %(user_id)s AND status IN ('pending', 'in_progress')
+            """,
+            {"user_id": user_id},
+        )
+        return sorted({normalize_title(row["title"]) for row in rows})
+
+    find_similar_active_title = DatabaseManager.find_similar_active_title
+
+    @invalidates("proposed_actions")
+    def save_proposed_action(
+        self,
+        user_id: int,
+        title: str,
+        description: str = "",
+        conversation_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """
+        Enregistrer une nouvelle proposition d'action par l'IA.
+
+        La proposition est ignorée si une proposition en attente ou une action
+        en cours de l'utilisateur a un titre similaire (voir titles_similar).
+
+        Args:
+            user_id: ID de l'utilisateur.
+            title: Titre de l'action proposée.
+            description: Description détaillée (optionnelle).
+            conversation_id: ID de la conversation d'origine.
+
+        Returns:
+            ID de la proposition créée, ou None si c'est un doublon.
+
+        Raises:
+            ValueError: Si les paramètres sont invalides.
+        """
+        if not title:
+            raise ValueError("Le titre ne peut pas être vide")
+
+        if not user_id:
+            raise ValueError("user_id est requis")
+
+        version = self._title_keys_version(user_id)
+        if self.find_similar_active_title(user_id, title) is not None:
+            return None
+
+        try:
+            proposal_id = self._fetchone(
+                """
+                INSERT INTO proposed_actions (user_id, title, description, conversation_id, title_key)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING id
+                """,
+                (user_id, title, description, conversation_id, normalize_title(title)),
+            )["id"]
+        except psycopg.errors.UniqueViolation:
+            # Doublon exact inséré entre la vérification et l'écriture (autre réplica)
+            return None
+        except psycopg.IntegrityError as e:
+            raise ValueError(f"Erreur d'intégrité de la base de données: {e}")
+        self._remember_title_key(user_id, version, normalize_title(title))
+        return proposal_id
+
+    @cached_query("proposed_actions")
+    def get_proposed_actions(
+        self, user_id: int, status: Optional[str] = None, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Récupérer les propositions d'actions d'un utilisateur.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            status: Filtrer par statut (optionnel: 'pending', 'accepted', 'rejected').
+            limit: Nombre maximum de propositions à récupérer (défaut: 100).
+
+        Returns:
+            Liste de dicts contenant les informations des propositions.
+            Trié par date de proposition (plus récent en premier).
+        """
+        return self._fetchall(
+            """
+            SELECT id, user_id, title, description, status,
+                   conversation_id, proposed_at, reviewed_at
+            FROM proposed_actions
+            WHERE user_id = %(user_id)s AND (%(status)s::text IS NULL OR status = %(status)s)
+            ORDER BY proposed_at DESC, id DESC
+            LIMIT %(limit)s
+            """,
+            {"user_id": user_id, "status": status or None, "limit": limit},
+        )
+
+    def _review_proposal(self, conn, proposal_id: int, status: str) -> Dict[str, Any]:
+        """
+        Verrouiller une proposition en attente et la marquer comme examinée.
+
+        Le verrou (FOR UPDATE) empêche deux réplicas de traiter la même proposition.
+
+        Args:
+            conn: Connexion de la transaction en cours.
+            proposal_id: ID de la proposition.
+            status: Nouveau statut ('accepted' ou 'rejected').
+
+        Returns:
+            La proposition (user_id, title, description, conversation_id).
+
+        Raises:
+            ValueError: Si la proposition n'existe pas ou est déjà traitée.
+        """
+        proposal = conn.execute(
+            """
+            SELECT user_id, title, description, status, conversation_id
+            FROM proposed_actions
+            WHERE id = %s
+            FOR UPDATE
+            """,
+            (proposal_id,),
+        ).fetchone()
+
+        if not proposal:
+            raise ValueError(f"Proposition {proposal_id} introuvable")
+
+        if proposal["status"] != "pending":
+            raise ValueError(f"Proposition déjà traitée (statut: {proposal['status']})")
+
+        conn.execute(
+            "UPDATE proposed_actions SET status = %s, reviewed_at = %s WHERE id = %s",
+            (status, datetime.now().isoformat(), proposal_id),
+        )
+        return proposal
+
+    @invalidates("proposed_actions", "action_items", owner_table="proposed_actions")
+    def accept_proposed_action(self, proposal_id: int, deadline: Optional[str] = None) -> int:
+        """
+        Accepter une proposition d'action (créer l'action et marquer la proposition comme acceptée).
+
+        Les deux écritures sont faites dans la même transaction.
+
+        Args:
+            proposal_id: ID de la proposition.
+            deadline: Date limite optionnelle pour l'action créée.
+
+        Returns:
+            ID de l'action créée.
+
+        Raises:
+            ValueError: Si la proposition n'existe pas ou est déjà traitée.
+        """
+        with self.pool.connection() as conn:
+            proposal = self._review_proposal(conn, proposal_id, "accepted")
+            return conn.execute(
+                """
+                INSERT INTO action_items (user_id, title, description, source, conversation_id, deadline)
+                VALUES (%s, %s, %s, 'ai_extracted', %s, %s)
+                RETURNING id
+                """,
+                (
+                    proposal["user_id"], proposal["title"], proposal["description"],
+                    proposal["conversation_id"], deadline,
+                ),
+            ).fetchone()["id"]
+
+    @invalidates("proposed_actions", owner_table="proposed_actions")
+    def reject_proposed_action(self, proposal_id: int) -> None:
+        """
+        Rejeter une proposition d'action.
+
+        Args:
+            proposal_id: ID de la proposition.
+
+        Raises:
+            ValueError: Si la proposition n'existe pas ou est déjà traitée.
+        """
+        with self.pool.connection() as conn:
+            self._review_proposal(conn, proposal_id, "rejected")
+
+    @cached_query("proposed_actions")
+    def get_proposed_actions_count(self, user_id: int, status: str = "pending") -> int:
+        """
+        Obtenir le nombre de propositions d'actions pour un utilisateur.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            status: Statut des propositions à compter (défaut: 'pending').
+
+        Returns:
+            Nombre de propositions.
+        """
+        row = self._fetchone(
+            "SELECT COUNT(*) AS count FROM proposed_actions WHERE user_id = %s AND status = %s",
+            (user_id, status),
+        )
+        return row["count"]
+
+    @invalidates("proposed_actions", owner_table="proposed_actions")
+    def delete_proposed_action(self, proposal_id: int) -> None:
+        """
+        Supprimer une proposition d'action.
+
+        Args:
+            proposal_id: ID de la proposition à supprimer.
+        """
+        self._execute("DELETE FROM proposed_actions WHERE id = %s", (proposal_id,))
+
+    # ===== LLM Telemetry Methods =====
+
+    def save_llm_metric(
+        self,
+        component: str,
+        model: str,
+        latency_ms: float,
+        user_id: Optional[int] = None,
+        status: str = "ok",
+        ttft_ms: Optional[float] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_creation_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        retries: int = 0,
+        cost_usd: float = 0.0,
+        error: Optional[str] = None,
+    ) -> int:
+        """
+        Enregistrer la télémétrie d'un appel à l'API Claude.
+
+        Args:
+            component: Composant appelant ('conversation', 'action_extraction', ...).
+            model: Modèle appelé.
+            latency_ms: Durée totale de l'appel en millisecondes.
+            user_id: ID de l'utilisateur concerné (optionnel).
+            status: 'ok', 'error' ou 'cancelled'.
+            ttft_ms: Temps jusqu'au premier token (streaming uniquement).
+            input_tokens: Tokens d'entrée facturés.
+            output_tokens: Tokens de sortie.
+            cache_creation_tokens: Tokens écrits dans le cache de prompt.
+            cache_read_tokens: Tokens lus depuis le cache de prompt.
+            retries: Nombre de nouvelles tentatives.
+            cost_usd: Coût estimé en dollars.
+            error: Type de l'exception en cas d'échec.
+
+        Returns:
+            ID de la mesure créée.
+
+        Raises:
+            ValueError: Si le statut est invalide.
+        """
+        if status not in ("ok", "error", "cancelled"):
+            raise ValueError(f"Statut invalide: {status}")
+
+        return self._insert(
+            """
+            INSERT INTO llm_metrics (
+                user_id, component, model, status, latency_ms, ttft_ms,
+                input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens,
+                retries, cost_usd, error
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (
+                user_id, component, model, status, latency_ms, ttft_ms,
+                input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens,
+                retries, cost_usd, error,
+            ),
+        )
+
+    def _llm_percentiles(
+        self, column: str, days: int, percentiles: Tuple[float, ...]
+    ) -> Dict[Tuple[str, str], List[float]]:
+        """
+        Calculer des percentiles (rang le plus proche, percentile_disc) par composant et modèle.
+
+        Args:
+            column: 'latency_ms' ou 'ttft_ms' (valeur interne).
+            days: Fenêtre en jours.
+            percentiles: Percentiles entre 0 et 1.
+
+        Returns:
+            Dict (component, model) -> valeurs dans l'ordre de percentiles.
+        """
+        rows = self._fetchall(
+            f"""
+            SELECT component, model,
+                   percentile_disc(%s::float8[]) WITHIN GROUP (ORDER BY {column}) AS values
+            FROM llm_metrics
+            WHERE created_at >= {UTC_NOW} - make_interval(days => %s) AND {column} IS NOT NULL
+            GROUP BY component, model
+            """,
+            (list(percentiles), days),
+        )
+        return {(row["component"], row["model"]): row["values"] for row in rows}
+
+    def get_llm_metrics_summary(self, days: int = 7) -> List[Dict[str, Any]]:
+        """
+        Résumer la télémétrie des appels LLM par composant et modèle.
+
+        Args:
+            days: Nombre de jours à considérer (défaut: 7).
+
+        Returns:
+            Liste de dicts contenant: component, model, requests, errors, retries,
+            input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens,
+            cost_usd, avg_latency_ms, p50_latency_ms, p95_latency_ms, p95_ttft_ms.
+            Trié par coût décroissant.
+        """
+        summary = self._fetchall(
+            f"""
+            SELECT component, model,
+                   COUNT(*) AS requests,
+                   COUNT(*) FILTER (WHERE status = 'error') AS errors,
+                   SUM(retries) AS retries,
+                   SUM(input_tokens) AS input_tokens,
+                   SUM(output_tokens) AS output_tokens,
+                   SUM(cache_creation_tokens) AS cache_creation_tokens,
+                   SUM(cache_read_tokens) AS cache_read_tokens,
+                   SUM(cost_usd) AS cost_usd,
+                   AVG(latency_ms) AS avg_latency_ms
+            FROM llm_metrics
+            WHERE created_at >= {UTC_NOW} - make_interval(days => %s)
+            GROUP BY component, model
+            ORDER BY cost_usd DESC, component
+            """,
+            (days,),
+        )
+
+        latency = self._llm_percentiles("latency_ms", days, (0.5, 0.95))
+        ttft = self._llm_percentiles("ttft_ms", days, (0.95,))
+        for row in summary:
+            key = (row["component"], row["model"])
+            row["p50_latency_ms"], row["p95_latency_ms"] = latency.get(key, [None, None])
+            row["p95_ttft_ms"] = ttft.get(key, [None])[0]
+
+        return summary
+
+    def get_llm_metric_totals(self) -> List[Dict[str, Any]]:
+        """
+        Obtenir les totaux cumulés de télémétrie LLM (compteurs Prometheus).
+
+        Returns:
+            Liste de dicts par (component, model, status) contenant: requests,
+            retries, input_tokens, output_tokens, cache_creation_tokens,
+            cache_read_tokens et cost_usd.
+        """
+        return self._fetchall(
+            """
+            SELECT component, model, status,
+                   COUNT(*) AS requests,
+                   SUM(retries) AS retries,
+                   SUM(input_tokens) AS input_tokens,
+                   SUM(output_tokens) AS output_tokens,
+                   SUM(cache_creation_tokens) AS cache_creation_tokens,
+                   SUM(cache_read_tokens) AS cache_read_tokens,
+                   SUM(cost_usd) AS cost_usd
+            FROM llm_metrics
+            GROUP BY component, model, status
+            ORDER BY component, model, status
+            """
+        )
+
+    def record_llm_skip(self, component: str, reason: str) -> None:
+        """
+        Compter un appel à l'API Claude évité.
+
+        Args:
+            component: Composant qui aurait appelé l'API ('action_extraction', ...).
+            reason: Raison de l'économie ('prefilter', ...).
+        """
+        self._execute(
+            f"""
+            INSERT INTO llm_skipped_calls AS skipped (component, reason, day, count)
+            VALUES (%s, %s, {UTC_NOW}::date, 1)
+            ON CONFLICT (component, reason, day) DO UPDATE SET count = skipped.count + 1
+            """,
+            (component, reason),
+        )
+
+    def get_llm_skip_totals(self, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Obtenir le nombre d'appels à l'API Claude évités.
+
+        Args:
+            days: Nombre de jours à considérer (None = depuis le début).
+
+        Returns:
+            Liste de dicts par (component, reason) contenant: skipped.
+        """
+        return self._fetchall(
+            f"""
+            SELECT component, reason, SUM(count) AS skipped
+            FROM llm_skipped_calls
+            WHERE %(days)s::integer IS NULL OR day >= {UTC_NOW}::date - %(days)s::integer
+            GROUP BY component, reason
+            ORDER BY component, reason
+            """,
+            {"days": days},
+        )
+
+    def get_llm_histogram(self, column: str, bounds_ms: Tuple[float, ...]) -> List[Dict[str, Any]]:
+        """
+        Obtenir un histogramme cumulé de latence par composant et modèle.
+
+        Args:
+            column: 'latency_ms' ou 'ttft_ms'.
+            bounds_ms: Bornes supérieures des intervalles, en millisecondes (croissantes).
+
+        Returns:
+            Liste de dicts contenant: component, model, buckets (nombre de mesures
+            <= chaque borne), count et sum (en millisecondes).
+
+        Raises:
+            ValueError: Si la colonne n'est pas une colonne de durée.
+        """
+        if column not in ("latency_ms", "ttft_ms"):
+            raise ValueError(f"Colonne de durée invalide: {column}")
+
+        bucket_selects = "".join(
+            f", COUNT(*) FILTER (WHERE {column} <= %s) AS le_{i}" for i in range(len(bounds_ms))
+        )
+        rows = self._fetchall(
+            f"""
+            SELECT component, model, COUNT(*) AS count, SUM({column}) AS sum{bucket_selects}
+            FROM llm_metrics
+            WHERE {column} IS NOT NULL
+            GROUP BY component, model
+            ORDER BY component, model
+            """,
+            tuple(bounds_ms),
+        )
+        return [
+            {
+                "component": row["component"],
+                "model": row["model"],
+                "count": row["count"],
+                "sum": row["sum"],
+                "buckets": [row[f"le_{i}"] for i in range(len(bounds_ms))],
+            }
+            for row in rows
+        ]
+
+    def get_data_versions(self, user_id: int) -> Dict[str, int]:
+        """
+        Obtenir les versions des données d'un utilisateur.
+
+        Mêmes garanties qu'avec SQLite (voir DatabaseManager.get_data_versions):
+        les triggers PL/pgSQL incrémentent les versions dans la transaction de
+        l'écriture, quel que soit le réplica qui écrit.
+
+        Args:
+            user_id: ID de l'utilisateur.
+
+        Returns:
+            Dict table -> version, pour chaque table de DATA_VERSION_TABLES
+            (0 si l'utilisateur n'a encore rien écrit).
+        """
+        row = self._fetchone(
+            f"SELECT {', '.join(DATA_VERSION_TABLES)} FROM user_data_version WHERE user_id = %s",
+            (user_id,),
+        )
+        return row if row is not None else dict.fromkeys(DATA_VERSION_TABLES, 0)
+
+    def _get_row_owner(self, table: str, row_id: int) -> Optional[int]:
+        """
+        Récupérer le user_id propriétaire d'une ligne (pour l'invalidation du cache).
+
+        Args:
+            table: Nom de la table (valeur interne, jamais issue de l'utilisateur).
+            row_id: ID de la ligne.
+
+        Returns:
+            user_id de la ligne, ou None si elle n'existe pas.
+        """
+        row = self._fetchone(f"SELECT user_id FROM {table} WHERE id = %s", (row_id,))
+        return row["user_id"] if row else None
+
+    def close(self):
+        """Fermer le pool de connexions."""
+        self.pool.close()
@@ -0,0 +1,340 @@
+"""
+Cache de lecture devant les requêtes de DatabaseManager.
+
+Les résultats des méthodes de lecture sont mis en cache par
+(user_id, méthode, arguments), avec une durée de vie (TTL) et une taille
+maximale (LRU). Chaque entrée est étiquetée par les tables qu'elle lit: une
+écriture sur une table n'invalide que les entrées de cet utilisateur qui
+dépendent de cette table.
+
+Le cache ne voit que les écritures faites par ce processus: les écritures
+d'un autre processus (import_data.py, action_stats.py --repair, shards.py,
+autre instance de l'application sur PostgreSQL) restent invisibles jusqu'à
+l'expiration des entrées. Il est donc désactivé par défaut dans l'application
+(SERENE_QUERY_CACHE_TTL non défini).
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+DEFAULT_TTL_SECONDS = 30.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class QueryCache:
+    """Cache LRU avec TTL et invalidation par (utilisateur, table)."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialiser le cache.
+
+        Args:
+            max_entries: Nombre maximum d'entrées avant éviction LRU.
+            ttl_seconds: Durée de vie d'une entrée en secondes.
+            clock: Horloge monotone (injectable pour les tests).
+
+        Raises:
+            ValueError: Si max_entries ou ttl_seconds ne sont pas positifs.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries doit être strictement positif")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds doit être strictement positif")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        # clé -> (expiration, tables lues, valeur)
+        self._entries: "OrderedDict[Tuple, Tuple[float, frozenset, Any]]" = OrderedDict()
+        # Génération par utilisateur, incrémentée à chaque invalidation
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["QueryCache"]:
+        """
+        Créer un cache à partir des variables d'environnement.
+
+        SERENE_QUERY_CACHE_TTL (secondes, 0 ou non défini pour désactiver) et
+        SERENE_QUERY_CACHE_SIZE (nombre d'entrées).
+
+        Returns:
+            Instance de QueryCache, ou None si le cache est désactivé.
+        """
+        try:
+            ttl = float(os.getenv("SERENE_QUERY_CACHE_TTL", "0"))
+            size = int(os.getenv("SERENE_QUERY_CACHE_SIZE", str(DEFAULT_MAX_ENTRIES)))
+        except ValueError:
+            return None
+
+        if ttl <= 0 or size <= 0:
+            return None
+        return cls(max_entries=size, ttl_seconds=ttl)
+
+    def get_or_load(
+        self,
+        key: Tuple,
+        tables: Iterable[str],
+        loader: Callable[[], Any],
+    ) -> Any:
+        """
+        Retourner la valeur en cache, ou l'obtenir via loader et la mémoriser.
+
+        Args:
+            key: Clé dont le premier élément est le user_id.
+            tables: Tables lues par la requête (étiquettes d'invalidation).
+            loader: Fonction exécutant la requête réelle.
+
+        Returns:
+            Résultat de la requête.
+        """
+        user_id = key[0]
+        now = self._clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            generation = self._generations.get(user_id, 0)
+
+        value = loader()
+
+        with self._lock:
+            # Une écriture a eu lieu pendant la lecture: ne pas mémoriser un résultat périmé
+            if self._generations.get(user_id, 0) != generation:
+                return value
+            self._entries[key] = (self._clock() + self.ttl_seconds, frozenset(tables), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return value
+
+    def invalidate(self, user_id: Hashable, tables: Iterable[str]) -> int:
+        """
+        Invalider les entrées d'un utilisateur qui lisent l'une des tables.
+
+        Args:
+            user_id: ID de l'utilisateur concerné par l'écriture.
+            tables: Tables modifiées.
+
+        Returns:
+            Nombre d'entrées supprimées.
+        """
+        tables = frozenset(tables)
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            stale = [
+                key for key, (_, entry_tables, _) in self._entries.items()
+                if key[0] == user_id and entry_tables & tables
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Vider entièrement le cache (les compteurs sont conservés)."""
+        with self._lock:
+            for user_id in list(self._generations):
+                self._generations[user_id] += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtenir les compteurs du cache.
+
+        Returns:
+            Dict avec hits, misses, hit_rate, invalidations, evictions et size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+
+def _copy_result(value: Any) -> Any:
+    """Copier un résultat (liste de dicts ou dict) pour protéger l'entrée en cache."""
+    if isinstance(value, list):
+        return [dict(row) if isinstance(row, dict) else row for row in value]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def cached_query(*tables: str):
+    """
+    Décorateur de méthode de lecture dont le premier argument est user_id.
+
+    Sans cache configuré sur l'instance (query_cache à None), la méthode
+    est appelée directement.
+
+    Args:
+        *tables: Tables lues par la méthode.
+
+    Returns:
+        Décorateur.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.query_cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+
+            # Normaliser les arguments pour que days=30 et 30 partagent l'entrée
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = tuple(bound.arguments.items())[1:]
+            user_id = arguments[0][1]
+            key = (user_id, method.__name__, arguments[1:])
+
+            value = cache.get_or_load(key, tables, lambda: method(self, *args, **kwargs))
+            return _copy_result(value)
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*tables: str, owner_table: Optional[str] = None):
+    """
+    Décorateur de méthode d'écriture invalidant le cache de l'utilisateur concerné.
+
+    Pose aussi le marqueur de dernière écriture des connexions de lecture
+    (attribut replicas, voir src.database.read_replicas) s'il y en a.
+
+    Args:
+        *tables: Tables modifiées par la méthode.
+        owner_table: Si fourni, le premier argument est l'ID d'une ligne de
+            cette table et le user_id est lu avant l'écriture. Sinon, le
+            premier argument est le user_id.
+
+    Returns:
+        Décorateur.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        first_param = list(signature.parameters)[1]
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.query_cache
+            replicas = getattr(self, "replicas", None)
+            if cache is None and replicas is None:
+                return method(self, *args, **kwargs)
+
+            first_arg = signature.bind(self, *args, **kwargs).arguments[first_param]
+            user_id = self._get_row_owner(owner_table, first_arg) if owner_table else first_arg
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if user_id is not None:
+                    if cache is not None:
+                        cache.invalidate(user_id, tables)
+                    if replicas is not None:
+                        replicas.note_write(user_id)
+
+        return wrapper
+
+    return decorator
+
+
+class VersionedCache:
+    """
+    Cache LRU dont chaque entrée est valable pour une version des données.
+
+    Une entrée n'est rendue que si la version demandée est celle enregistrée
+    (par exemple les versions de DatabaseManager.get_data_versions): aucune
+    invalidation explicite n'est nécessaire.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialiser le cache.
+
+        Args:
+            max_entries: Nombre maximum d'entrées avant éviction LRU.
+
+        Raises:
+            ValueError: Si max_entries n'est pas positif.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries doit être strictement positif")
+
+        self.max_entries = max_entries
+        # clé -> (version, valeur)
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """
+        Retourner la valeur mémorisée pour cette version des données.
+
+        Args:
+            key: Clé de l'entrée.
+            version: Version courante des données lues par la valeur.
+
+        Returns:
+            Valeur, ou None si absente ou calculée sur une autre version.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, version: Hashable, value: Any) -> None:
+        """
+        Mémoriser une valeur calculée sur une version des données.
+
+        Args:
+            key: Clé de l'entrée.
+            version: Version des données lues pour calculer la valeur.
+            value: Valeur à mémoriser.
+        """
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vider le cache."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,224 @@
+"""
+Connexions de lecture séparées de la connexion d'écriture de DatabaseManager.
+
+Par défaut, DatabaseManager fait tout passer par une seule connexion SQLite:
+un export ou un tableau de bord long retarde les écritures des autres
+sessions. Avec ReadReplicas, les lectures des données d'un utilisateur
+utilisent un pool de connexions en lecture seule (URI mode=ro) et la
+connexion d'origine ne sert plus qu'aux écritures:
+- sans copie (snapshot_seconds = 0): les connexions lisent la base elle-même,
+  en mode WAL (les lecteurs ne bloquent pas l'écrivain et voient toute
+  écriture validée);
+- avec copie (snapshot_seconds > 0): les connexions lisent une copie
+  (fichier <base>.snapshot) refaite toutes les snapshot_seconds par un
+  thread d'arrière-plan, jamais pendant une lecture.
+  Pour qu'une session relise ses propres écritures, chaque écriture note un
+  marqueur (numéro d'écriture) pour son utilisateur: tant que la copie est
+  antérieure à ce marqueur, les lectures de cet utilisateur repassent par la
+  connexion d'écriture. Les marqueurs couverts par une copie sont oubliés.
+
+Une session de l'application correspond à un utilisateur connecté: les
+marqueurs sont tenus par user_id. Les écritures faites hors de DatabaseManager
+(autre processus, SQL direct) ne posent pas de marqueur.
+"""
+
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Hashable, Iterator, Optional
+
+SNAPSHOT_SUFFIX = ".snapshot"
+
+
+class ReadReplicas:
+    """Pool de connexions SQLite en lecture seule, avec copie optionnelle."""
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int,
+        snapshot_seconds: float = 0.0,
+        background: bool = True,
+    ):
+        """
+        Préparer le pool (les connexions sont ouvertes à la première lecture).
+
+        Avec snapshot_seconds > 0 et background, un thread fait la première
+        copie puis la refait toutes les snapshot_seconds; d'ici là, les
+        lectures passent par la connexion d'écriture.
+
+        Args:
+            db_path: Chemin de la base SQLite (en mode WAL).
+            size: Nombre maximum de connexions de lecture.
+            snapshot_seconds: Intervalle entre deux copies (0: lire la base elle-même).
+            background: Rafraîchir la copie dans un thread (sinon: appeler refresh).
+
+        Raises:
+            ValueError: Si size n'est pas positif.
+        """
+        if size < 1:
+            raise ValueError(f"size doit être positif, reçu: {size}")
+
+        self.db_path = db_path
+        self.size = size
+        self.snapshot_seconds = snapshot_seconds
+        self.snapshot_path = db_path + SNAPSHOT_SUFFIX if snapshot_seconds > 0 else None
+
+        # Connexions libres: (génération de la copie, connexion ou None si pas encore ouverte)
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put((0, None))
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._writes = 0
+        self._last_write: Dict[Hashable, int] = {}
+        self._generation = 0  # 0: pas encore de copie
+        self._snapshot_writes = 0
+
+        self.reads = 0
+        self.writer_reads = 0
+        self.refreshes = 0
+
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+        if self.snapshot_path and background:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="serene-snapshot", daemon=True)
+            self._refresher.start()
+
+    def note_write(self, user_id: Hashable) -> None:
+        """
+        Poser le marqueur de dernière écriture d'un utilisateur.
+
+        À appeler une fois l'écriture validée.
+
+        Args:
+            user_id: Utilisateur dont les données ont changé.
+        """
+        with self._lock:
+            self._writes += 1
+            self._last_write[user_id] = self._writes
+
+    def can_serve(self, user_id: Optional[Hashable] = None) -> bool:
+        """
+        Indiquer si les connexions de lecture voient les écritures de l'utilisateur.
+
+        Ne fait que comparer des marqueurs (la copie est refaite ailleurs).
+
+        Args:
+            user_id: Utilisateur lu (None pour des données globales, pour
+                lesquelles une copie récente suffit).
+
+        Returns:
+            True si la lecture peut passer par le pool, False si elle doit
+            passer par la connexion d'écriture.
+        """
+        if self.snapshot_path is None:
+            return True
+
+        with self._lock:
+            fresh = self._generation > 0 and self._last_write.get(user_id, 0) <= self._snapshot_writes
+            if not fresh:
+                self.writer_reads += 1
+            return fresh
+
+    def refresh(self) -> bool:
+        """
+        Refaire la copie lue par le pool (API de sauvegarde SQLite).
+
+        La copie est écrite dans un fichier temporaire puis renommée: les
+        lectures en cours finissent sur l'ancienne copie, les connexions sont
+        rouvertes sur la nouvelle à leur prochaine utilisation.
+
+        Returns:
+            True si la copie a été refaite, False si un autre thread s'en charge.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                # Toute écriture notée avant la copie est validée, donc copiée
+                writes = self._writes
+            temporary = self.snapshot_path + ".tmp"
+            source = sqlite3.connect(self._uri(self.db_path), uri=True)
+            target = sqlite3.connect(temporary)
+            try:
+                source.backup(target)
+                # Copie en mode rollback: lisible en mode=ro sans fichiers -wal/-shm
+                target.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                target.close()
+                source.close()
+            os.replace(temporary, self.snapshot_path)
+
+            with self._lock:
+                self._generation += 1
+                self._snapshot_writes = writes
+                self.refreshes += 1
+                # Marqueurs couverts par la copie: l'absence de marqueur suffit
+                self._last_write = {key: mark for key, mark in self._last_write.items() if mark > writes}
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh_loop(self) -> None:
+        """Refaire la copie toutes les snapshot_seconds jusqu'à close()."""
+        while True:
+            try:
+                self.refresh()
+            except (sqlite3.Error, OSError) as e:
+                print(f"Erreur lors de la copie de {self.db_path}: {e}")
+            if self._stop.wait(self.snapshot_seconds):
+                return
+
+    @staticmethod
+    def _uri(path: str) -> str:
+        """URI SQLite en lecture seule d'un fichier."""
+        return f"{Path(path).resolve().as_uri()}?mode=ro"
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvrir une connexion de lecture (base ou copie)."""
+        conn = sqlite3.connect(
+            self._uri(self.snapshot_path or self.db_path), uri=True, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Emprunter une connexion de lecture (attend si toutes sont prises).
+
+        Yields:
+            Connexion SQLite en lecture seule.
+        """
+        generation, conn = self._idle.get()
+        try:
+            if conn is not None and generation != self._generation:
+                conn.close()
+                conn = None
+            if conn is None:
+                generation, conn = self._generation, self._connect()
+            with self._lock:
+                self.reads += 1
+            yield conn
+        finally:
+            self._idle.put((generation, conn))
+
+    def close(self) -> None:
+        """Arrêter le rafraîchissement, fermer les connexions libres et supprimer la copie."""
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+        while True:
+            try:
+                _, conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                conn.close()
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
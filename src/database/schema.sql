@@ -31,6 +31,7 @@ CREATE TABLE IF NOT EXISTS check_ins (
 -- Index pour améliorer les performances des requêtes par date et utilisateur
 CREATE INDEX IF NOT EXISTS idx_check_ins_timestamp ON check_ins(timestamp);
 CREATE INDEX IF NOT EXISTS idx_check_ins_user_id ON check_ins(user_id);
+CREATE INDEX IF NOT EXISTS idx_check_ins_user_timestamp ON check_ins(user_id, timestamp);
 
 -- Table: conversations - Enregistrement des conversations avec l'IA
 CREATE TABLE IF NOT EXISTS conversations (
@@ -96,6 +97,7 @@ CREATE TABLE IF NOT EXISTS proposed_actions (
     conversation_id INTEGER,  -- Référence à la conversation d'origine
     proposed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     reviewed_at DATETIME,  -- Date de l'acceptation/rejet
+    title_key TEXT,  -- Titre normalisé (voir normalize_title), pour la déduplication
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE SET NULL
 );
@@ -104,3 +106,111 @@ CREATE TABLE IF NOT EXISTS proposed_actions (
 CREATE INDEX IF NOT EXISTS idx_proposed_actions_user_id ON proposed_actions(user_id);
 CREATE INDEX IF NOT EXISTS idx_proposed_actions_status ON proposed_actions(status);
 CREATE INDEX IF NOT EXISTS idx_proposed_actions_proposed_at ON proposed_actions(proposed_at DESC);
+
+-- Une seule proposition en attente par titre normalisé et par utilisateur
+CREATE UNIQUE INDEX IF NOT EXISTS idx_proposed_actions_pending_title
+    ON proposed_actions(user_id, title_key) WHERE status = 'pending';
+
+-- Table: llm_metrics - Télémétrie des appels à l'API Claude (sans contenu des messages)
+CREATE TABLE IF NOT EXISTS llm_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    component TEXT NOT NULL,  -- 'conversation', 'action_extraction', 'action_suggestion', 'insights'
+    model TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'ok' CHECK(status IN ('ok', 'error', 'cancelled')),
+    latency_ms REAL NOT NULL,
+    ttft_ms REAL,  -- Temps jusqu'au premier token (appels en streaming uniquement)
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    cache_creation_tokens INTEGER DEFAULT 0,
+    cache_read_tokens INTEGER DEFAULT 0,
+    retries INTEGER DEFAULT 0,
+    cost_usd REAL DEFAULT 0,
+    error TEXT,  -- Type de l'exception en cas d'échec
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+);
+
+-- Index pour les agrégations par composant et période
+CREATE INDEX IF NOT EXISTS idx_llm_metrics_component_created ON llm_metrics(component, created_at);
+
+-- Table: llm_skipped_calls - Appels à l'API Claude évités (ex: messages filtrés avant l'extraction d'actions)
+CREATE TABLE IF NOT EXISTS llm_skipped_calls (
+    component TEXT NOT NULL,
+    reason TEXT NOT NULL,  -- 'prefilter', ...
+    day DATE NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (component, reason, day)
+);
+
+-- Table: user_data_version - Versions des données par utilisateur, pour la détection de changements des caches
+-- Une colonne par table suivie; incrémentée à chaque écriture par des triggers créés par
+-- DatabaseManager (voir DATA_VERSION_TABLES). Pas de clé étrangère: les versions ne reviennent jamais à 0.
+CREATE TABLE IF NOT EXISTS user_data_version (
+    user_id INTEGER PRIMARY KEY,
+    check_ins INTEGER NOT NULL DEFAULT 0,
+    conversations INTEGER NOT NULL DEFAULT 0,
+    action_items INTEGER NOT NULL DEFAULT 0,
+    proposed_actions INTEGER NOT NULL DEFAULT 0,
+    insights_log INTEGER NOT NULL DEFAULT 0
+);
+
+-- Table: action_item_stats - Nombre d'actions par statut et par utilisateur (lecture O(1))
+-- Tenue à jour par des triggers sur action_items créés par DatabaseManager (voir ACTION_STATS_TRIGGERS);
+-- vérification et réparation: python action_stats.py [--repair]
+CREATE TABLE IF NOT EXISTS action_item_stats (
+    user_id INTEGER PRIMARY KEY,
+    pending INTEGER NOT NULL DEFAULT 0,
+    in_progress INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    abandoned INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0
+);
+
+-- Recherche plein texte (FTS5) sur les conversations et les notes de check-in
+-- Tables "external content": le texte n'est pas dupliqué, les triggers maintiennent l'index.
+-- remove_diacritics 2: "anxiété" et "anxiete" sont équivalents.
+CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+    user_message,
+    ai_response,
+    content='conversations',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+    INSERT INTO conversations_fts(rowid, user_message, ai_response)
+    VALUES (new.id, new.user_message, new.ai_response);
+END;
+
+CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+    INSERT INTO conversations_fts(conversations_fts, rowid, user_message, ai_response)
+    VALUES ('delete', old.id, old.user_message, old.ai_response);
+END;
+
+CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF user_message, ai_response ON conversations BEGIN
+    INSERT INTO conversations_fts(conversations_fts, rowid, user_message, ai_response)
+    VALUES ('delete', old.id, old.user_message, old.ai_response);
+    INSERT INTO conversations_fts(rowid, user_message, ai_response)
+    VALUES (new.id, new.user_message, new.ai_response);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS check_ins_fts USING fts5(
+    notes,
+    content='check_ins',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS check_ins_fts_insert AFTER INSERT ON check_ins BEGIN
+    INSERT INTO check_ins_fts(rowid, notes) VALUES (new.id, new.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS check_ins_fts_delete AFTER DELETE ON check_ins BEGIN
+    INSERT INTO check_ins_fts(check_ins_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS check_ins_fts_update AFTER UPDATE OF notes ON check_ins BEGIN
+    INSERT INTO check_ins_fts(check_ins_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+    INSERT INTO check_ins_fts(rowid, notes) VALUES (new.id, new.notes);
+END;
@@ -0,0 +1,217 @@
+-- Schéma PostgreSQL pour Serene (voir src/database/postgres.py)
+-- Mêmes tables et colonnes que schema.sql. Appliqué à chaque démarrage: toutes les instructions
+-- sont idempotentes (PostgreSQL 14 ou plus récent pour CREATE OR REPLACE TRIGGER).
+
+-- Texte replié pour la recherche: minuscules et accents retirés ("Anxiété" -> "anxiete").
+-- translate() plutôt que l'extension unaccent, absente de certaines installations.
+CREATE OR REPLACE FUNCTION serene_fold(text) RETURNS text AS $$
+    SELECT translate(
+        lower($1),
+        'àâäáãåçéèêëîïíìñôöóòõùûüúÿýÀÂÄÁÃÅÇÉÈÊËÎÏÍÌÑÔÖÓÒÕÙÛÜÚŸÝ',
+        'aaaaaaceeeeiiiinooooouuuuyyaaaaaaceeeeiiiinooooouuuuyy'
+    )
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+
+-- Table: users - Gestion des utilisateurs
+CREATE TABLE IF NOT EXISTS users (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    display_name TEXT,
+    full_name TEXT,  -- Nom complet de l'utilisateur
+    birth_year INTEGER,  -- Année de naissance
+    timezone TEXT,  -- Fuseau horaire / zone géographique
+    created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    last_login TIMESTAMP,
+    preferences TEXT  -- JSON string pour stocker les préférences utilisateur
+);
+
+-- Table: check_ins - Enregistrement des check-ins quotidiens
+CREATE TABLE IF NOT EXISTS check_ins (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    timestamp TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    mood_score INTEGER NOT NULL CHECK(mood_score BETWEEN 0 AND 10),
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    search_vector tsvector GENERATED ALWAYS AS (to_tsvector('simple', serene_fold(coalesce(notes, '')))) STORED
+);
+
+CREATE INDEX IF NOT EXISTS idx_check_ins_user_timestamp ON check_ins(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_check_ins_search ON check_ins USING GIN (search_vector);
+
+-- Table: conversations - Enregistrement des conversations avec l'IA
+CREATE TABLE IF NOT EXISTS conversations (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    timestamp TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    user_message TEXT NOT NULL,
+    ai_response TEXT NOT NULL,
+    tokens_used INTEGER,
+    created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple', serene_fold(user_message || ' ' || ai_response))
+    ) STORED
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversations_user_timestamp ON conversations(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_conversations_search ON conversations USING GIN (search_vector);
+
+-- Table: insights_log - Enregistrement des insights IA générés
+CREATE TABLE IF NOT EXISTS insights_log (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    insight_type VARCHAR(50) NOT NULL,
+    content TEXT NOT NULL,
+    based_on_data TEXT,
+    tokens_used INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_insights_log_user_type_created ON insights_log(user_id, insight_type, created_at DESC);
+
+-- Table: action_items - Suivi des objectifs et actions identifiés
+CREATE TABLE IF NOT EXISTS action_items (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT DEFAULT 'pending' CHECK(status IN ('pending', 'in_progress', 'completed', 'abandoned')),
+    source TEXT DEFAULT 'manual',  -- 'manual' ou 'ai_extracted'
+    conversation_id BIGINT REFERENCES conversations(id) ON DELETE SET NULL,
+    deadline TIMESTAMP,  -- Date limite optionnelle
+    created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    completed_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+CREATE INDEX IF NOT EXISTS idx_action_items_user_created ON action_items(user_id, created_at DESC);
+
+-- Table: proposed_actions - Actions proposées par l'IA en attente d'approbation
+CREATE TABLE IF NOT EXISTS proposed_actions (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT DEFAULT 'pending' CHECK(status IN ('pending', 'accepted', 'rejected')),
+    conversation_id BIGINT REFERENCES conversations(id) ON DELETE SET NULL,
+    proposed_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    reviewed_at TIMESTAMP,  -- Date de l'acceptation/rejet
+    title_key TEXT  -- Titre normalisé (voir normalize_title), pour la déduplication
+);
+
+CREATE INDEX IF NOT EXISTS idx_proposed_actions_user_proposed ON proposed_actions(user_id, proposed_at DESC);
+
+-- Une seule proposition en attente par titre normalisé et par utilisateur
+CREATE UNIQUE INDEX IF NOT EXISTS idx_proposed_actions_pending_title
+    ON proposed_actions(user_id, title_key) WHERE status = 'pending';
+
+-- Table: llm_metrics - Télémétrie des appels à l'API Claude (sans contenu des messages)
+CREATE TABLE IF NOT EXISTS llm_metrics (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc'),
+    component TEXT NOT NULL,
+    model TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'ok' CHECK(status IN ('ok', 'error', 'cancelled')),
+    latency_ms DOUBLE PRECISION NOT NULL,
+    ttft_ms DOUBLE PRECISION,
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    cache_creation_tokens INTEGER DEFAULT 0,
+    cache_read_tokens INTEGER DEFAULT 0,
+    retries INTEGER DEFAULT 0,
+    cost_usd DOUBLE PRECISION DEFAULT 0,
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_metrics_component_created ON llm_metrics(component, created_at);
+
+-- Table: llm_skipped_calls - Appels à l'API Claude évités
+CREATE TABLE IF NOT EXISTS llm_skipped_calls (
+    component TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    day DATE NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (component, reason, day)
+);
+
+-- Table: user_data_version - Versions des données par utilisateur (voir DATA_VERSION_TABLES)
+CREATE TABLE IF NOT EXISTS user_data_version (
+    user_id BIGINT PRIMARY KEY,
+    check_ins INTEGER NOT NULL DEFAULT 0,
+    conversations INTEGER NOT NULL DEFAULT 0,
+    action_items INTEGER NOT NULL DEFAULT 0,
+    proposed_actions INTEGER NOT NULL DEFAULT 0,
+    insights_log INTEGER NOT NULL DEFAULT 0
+);
+
+-- Table: action_item_stats - Nombre d'actions par statut et par utilisateur (lecture O(1))
+CREATE TABLE IF NOT EXISTS action_item_stats (
+    user_id BIGINT PRIMARY KEY,
+    pending INTEGER NOT NULL DEFAULT 0,
+    in_progress INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    abandoned INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0
+);
+
+-- Incrémenter la version de la table modifiée pour l'utilisateur de la ligne
+CREATE OR REPLACE FUNCTION serene_bump_data_version() RETURNS trigger AS $$
+BEGIN
+    EXECUTE format(
+        'INSERT INTO user_data_version (user_id, %1$I) VALUES ($1, 1)
+         ON CONFLICT (user_id) DO UPDATE SET %1$I = user_data_version.%1$I + 1',
+        TG_TABLE_NAME
+    ) USING CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER check_ins_data_version AFTER INSERT OR UPDATE OR DELETE ON check_ins
+    FOR EACH ROW EXECUTE FUNCTION serene_bump_data_version();
+CREATE OR REPLACE TRIGGER conversations_data_version AFTER INSERT OR UPDATE OR DELETE ON conversations
+    FOR EACH ROW EXECUTE FUNCTION serene_bump_data_version();
+CREATE OR REPLACE TRIGGER action_items_data_version AFTER INSERT OR UPDATE OR DELETE ON action_items
+    FOR EACH ROW EXECUTE FUNCTION serene_bump_data_version();
+CREATE OR REPLACE TRIGGER proposed_actions_data_version AFTER INSERT OR UPDATE OR DELETE ON proposed_actions
+    FOR EACH ROW EXECUTE FUNCTION serene_bump_data_version();
+CREATE OR REPLACE TRIGGER insights_log_data_version AFTER INSERT OR UPDATE OR DELETE ON insights_log
+    FOR EACH ROW EXECUTE FUNCTION serene_bump_data_version();
+
+-- Ajuster action_item_stats: retirer l'ancienne ligne, ajouter la nouvelle
+CREATE OR REPLACE FUNCTION serene_action_item_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE action_item_stats SET
+            pending = pending - (OLD.status IS NOT DISTINCT FROM 'pending')::int,
+            in_progress = in_progress - (OLD.status IS NOT DISTINCT FROM 'in_progress')::int,
+            completed = completed - (OLD.status IS NOT DISTINCT FROM 'completed')::int,
+            abandoned = abandoned - (OLD.status IS NOT DISTINCT FROM 'abandoned')::int,
+            total = total - 1
+        WHERE user_id = OLD.user_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO action_item_stats AS stats (user_id, pending, in_progress, completed, abandoned, total)
+        VALUES (NEW.user_id,
+                (NEW.status IS NOT DISTINCT FROM 'pending')::int,
+                (NEW.status IS NOT DISTINCT FROM 'in_progress')::int,
+                (NEW.status IS NOT DISTINCT FROM 'completed')::int,
+                (NEW.status IS NOT DISTINCT FROM 'abandoned')::int,
+                1)
+        ON CONFLICT (user_id) DO UPDATE SET
+            pending = stats.pending + excluded.pending,
+            in_progress = stats.in_progress + excluded.in_progress,
+            completed = stats.completed + excluded.completed,
+            abandoned = stats.abandoned + excluded.abandoned,
+            total = stats.total + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER action_items_stats AFTER INSERT OR DELETE ON action_items
+    FOR EACH ROW EXECUTE FUNCTION serene_action_item_stats();
+CREATE OR REPLACE TRIGGER action_items_stats_update AFTER UPDATE OF status, user_id ON action_items
+    FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+    EXECUTE FUNCTION serene_action_item_stats();
@@ -0,0 +1,700 @@
+"""
+Répartition des utilisateurs sur plusieurs fichiers SQLite (sharding).
+
+SQLite n'accepte qu'un écrivain à la fois par fichier: dans serene.db, les
+check-ins et conversations de tous les utilisateurs attendent le même verrou.
+ShardedDatabaseManager expose l'interface de DatabaseManager mais répartit
+les données:
+- l'annuaire (directory.db) garde les comptes (users, authentification), la
+  télémétrie LLM et l'affectation user_id -> shard (table user_shards);
+- les données d'un utilisateur (check-ins, conversations, insights, actions,
+  propositions) vivent dans un shard shard_<n>.db, un DatabaseManager
+  complet. Affectation: shard 1 + user_id % shard_count, ou un shard par
+  utilisateur (per_user);
+- les IDs de lignes restent uniques entre shards: le shard n les alloue à
+  partir de n * SHARD_ID_SPAN. Les méthodes par ID (update_action_item...)
+  s'adressent au shard de la plage de l'ID, sauf pour les lignes déplacées
+  ou importées, enregistrées dans l'annuaire (table moved_rows);
+- seuls les max_open_shards shards utilisés le plus récemment restent
+  ouverts (LRU): en mode per_user, les connexions ne s'accumulent pas avec
+  le nombre d'utilisateurs;
+- les opérations d'administration (check_action_stats, get_shard_stats,
+  split_shard, import_database) parcourent tous les shards.
+
+Le découpage d'un shard chargé (split_shard) déplace une partie de ses
+utilisateurs vers un nouveau shard: toujours le plus récent, dont la plage
+d'IDs est au-dessus de toutes les lignes existantes.
+"""
+
+import contextlib
+import functools
+import inspect
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from src.database.db_manager import DATA_VERSION_TABLES, DatabaseManager
+from src.database.query_cache import QueryCache
+
+DIRECTORY_FILE = "directory.db"
+DEFAULT_SHARD_DIR = "shards"
+
+# Nombre de shards gardés ouverts (une connexion SQLite chacun)
+DEFAULT_MAX_OPEN_SHARDS = 64
+
+# Plage d'IDs réservée à chaque shard (les IDs d'une base unique importée sont sous la première)
+SHARD_ID_SPAN = 10**9
+
+# Tables de données par utilisateur, copiées lors d'un déplacement
+SHARDED_TABLES = ("check_ins", "conversations", "insights_log", "action_items", "proposed_actions")
+
+# Tables globales copiées dans l'annuaire par import_database
+DIRECTORY_TABLES = ("users", "llm_metrics", "llm_skipped_calls")
+
+DIRECTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    number INTEGER PRIMARY KEY,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_shards (
+    user_id INTEGER PRIMARY KEY,
+    shard INTEGER NOT NULL REFERENCES shards(number)
+);
+CREATE INDEX IF NOT EXISTS idx_user_shards_shard ON user_shards(shard);
+
+-- Lignes hors de la plage d'IDs de leur shard (déplacées ou importées)
+CREATE TABLE IF NOT EXISTS moved_rows (
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    shard INTEGER NOT NULL REFERENCES shards(number),
+    PRIMARY KEY (table_name, row_id)
+) WITHOUT ROWID;
+"""
+
+# Méthodes de DatabaseManager servies par l'annuaire
+DIRECTORY_METHODS = (
+    "authenticate_user", "get_user_by_id", "get_user_by_email", "update_last_login",
+    "update_user_preferences", "get_user_preferences", "change_password", "update_user_profile",
+    "get_user_export_profile", "save_llm_metric", "get_llm_metrics_summary", "get_llm_metric_totals",
+    "record_llm_skip", "get_llm_skip_totals", "get_llm_histogram",
+)
+
+# Méthodes dont le premier argument est le user_id: servies par le shard de l'utilisateur
+USER_METHODS = (
+    "save_checkin", "get_mood_history", "get_mood_stats", "get_mood_buckets",
+    "save_conversation", "get_conversation_history", "get_conversation_count",
+    "get_recent_conversations", "get_conversations_after", "get_conversations_by_ids",
+    "save_insight", "get_latest_insight", "search", "count_user_export_rows", "iter_user_export_rows",
+    "save_action_item", "get_action_items", "get_action_items_stats", "get_active_title_keys",
+    "find_similar_active_title", "save_proposed_action", "get_proposed_actions",
+    "get_proposed_actions_count", "get_data_versions",
+)
+
+# Méthodes dont le premier argument est l'ID d'une ligne -> table de la ligne
+ROW_METHODS = {
+    "update_action_item": "action_items",
+    "delete_action_item": "action_items",
+    "get_action_item_by_id": "action_items",
+    "accept_proposed_action": "proposed_actions",
+    "reject_proposed_action": "proposed_actions",
+    "delete_proposed_action": "proposed_actions",
+}
+
+# Tables dont les lignes sont retrouvées par ID (voir moved_rows)
+ROW_TABLES = tuple(sorted(set(ROW_METHODS.values())))
+
+
+def _copy_rows(conn, table: str, where: str = "", params: tuple = ()) -> int:
+    """Copier les lignes de source.<table> dans main.<table> (colonnes communes)."""
+    target_columns = [row["name"] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+    source_columns = {row["name"] for row in conn.execute(f"PRAGMA source.table_info({table})")}
+    columns = ", ".join(column for column in target_columns if column in source_columns)
+    cursor = conn.execute(
+        f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM source.{table} {where}", params
+    )
+    return cursor.rowcount
+
+
+class ShardedDatabaseManager:
+    """Gestionnaire de base de données réparti par utilisateur sur plusieurs fichiers SQLite."""
+
+    def __init__(
+        self,
+        shard_dir: str = DEFAULT_SHARD_DIR,
+        shard_count: int = 4,
+        per_user: bool = False,
+        query_cache: Optional[QueryCache] = None,
+        max_open_shards: int = DEFAULT_MAX_OPEN_SHARDS,
+    ):
+        """
+        Ouvrir (ou créer) l'annuaire et les shards.
+
+        Args:
+            shard_dir: Dossier contenant directory.db et les shard_<n>.db.
+            shard_count: Nombre de shards entre lesquels les nouveaux
+                utilisateurs sont répartis (ignoré si per_user).
+            per_user: Si True, chaque nouvel utilisateur reçoit son propre
+                shard (un fichier SQLite par utilisateur).
+            query_cache: Cache de lecture optionnel, partagé par les shards.
+            max_open_shards: Nombre de shards gardés ouverts (LRU).
+
+        Raises:
+            ValueError: Si shard_count (hors per_user) ou max_open_shards
+                n'est pas positif.
+        """
+        if not per_user and shard_count <= 0:
+            raise ValueError("shard_count doit être strictement positif")
+        if max_open_shards <= 0:
+            raise ValueError("max_open_shards doit être strictement positif")
+
+        self.shard_dir = shard_dir
+        self.shard_count = shard_count
+        self.per_user = per_user
+        self.query_cache = query_cache
+        self.max_open_shards = max_open_shards
+        self._shards: "OrderedDict[int, DatabaseManager]" = OrderedDict()
+        # Shards en cours d'utilisation (nombre d'appels), et shards évincés à fermer après usage
+        self._in_use: Dict[DatabaseManager, int] = {}
+        self._retired: Set[DatabaseManager] = set()
+        self._user_shards: Dict[int, int] = {}
+        self._lock = threading.RLock()
+
+        os.makedirs(shard_dir, exist_ok=True)
+        self.directory = DatabaseManager(os.path.join(shard_dir, DIRECTORY_FILE), query_cache=query_cache)
+        had_moved_rows = self.directory.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'moved_rows'"
+        ).fetchone()
+        self.directory.conn.executescript(DIRECTORY_SCHEMA)
+        if not had_moved_rows:
+            self._backfill_moved_rows()
+        if not per_user:
+            for number in range(1, shard_count + 1):
+                self._register_shard(number)
+
+    @classmethod
+    def from_env(cls, query_cache: Optional[QueryCache] = None) -> Optional["ShardedDatabaseManager"]:
+        """
+        Créer un gestionnaire réparti à partir des variables d'environnement.
+
+        SERENE_SHARD_COUNT (0 pour une base unique), SERENE_SHARD_PER_USER,
+        SERENE_SHARD_DIR et SERENE_SHARD_MAX_OPEN.
+
+        Args:
+            query_cache: Cache de lecture optionnel.
+
+        Returns:
+            Instance de ShardedDatabaseManager, ou None si le sharding est désactivé.
+        """
+        per_user = os.getenv("SERENE_SHARD_PER_USER", "").strip().lower() in ("1", "true", "yes", "on")
+        try:
+            shard_count = int(os.getenv("SERENE_SHARD_COUNT", "0"))
+        except ValueError:
+            shard_count = 0
+        try:
+            max_open_shards = int(os.getenv("SERENE_SHARD_MAX_OPEN", str(DEFAULT_MAX_OPEN_SHARDS)))
+        except ValueError:
+            max_open_shards = DEFAULT_MAX_OPEN_SHARDS
+
+        if shard_count <= 0 and not per_user:
+            return None
+        return cls(
+            os.getenv("SERENE_SHARD_DIR") or DEFAULT_SHARD_DIR,
+            shard_count=shard_count,
+            per_user=per_user,
+            query_cache=query_cache,
+            max_open_shards=max(max_open_shards, 1),
+        )
+
+    # ===== Shards =====
+
+    def shard_path(self, number: int) -> str:
+        """Chemin du fichier du shard number."""
+        return os.path.join(self.shard_dir, f"shard_{number:04d}.db")
+
+    def shard_numbers(self) -> List[int]:
+        """Numéros des shards enregistrés dans l'annuaire."""
+        return [row["number"] for row in self.directory.conn.execute("SELECT number FROM shards ORDER BY number")]
+
+    def _register_shard(self, number: int) -> DatabaseManager:
+        """Enregistrer un shard dans l'annuaire et l'ouvrir."""
+        with self._lock:
+            self.directory.conn.execute("INSERT OR IGNORE INTO shards (number) VALUES (?)", (number,))
+            self.directory.conn.commit()
+            return self.shard(number)
+
+    def shard(self, number: int) -> DatabaseManager:
+        """
+        Obtenir le DatabaseManager d'un shard (ouvert au premier usage).
+
+        Le shard peut être fermé dès qu'il sort du LRU: pour un usage qui
+        dure, passer par _using.
+
+        Args:
+            number: Numéro du shard.
+
+        Returns:
+            Instance de DatabaseManager du shard.
+        """
+        with self._lock:
+            shard = self._shards.get(number)
+            if shard is not None:
+                self._shards.move_to_end(number)
+                return shard
+
+            shard = DatabaseManager(self.shard_path(number), query_cache=self.query_cache)
+            # Plage d'IDs du shard: AUTOINCREMENT continue après la plus grande valeur
+            base = number * SHARD_ID_SPAN
+            for table in SHARDED_TABLES:
+                shard.conn.execute(
+                    """
+                    INSERT INTO sqlite_sequence (name, seq)
+                    SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)
+                    """,
+                    (table, base, table),
+                )
+                shard.conn.execute(
+                    "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (base, table)
+                )
+            shard.conn.commit()
+            self._shards[number] = shard
+
+            while len(self._shards) > self.max_open_shards:
+                _, evicted = self._shards.popitem(last=False)
+                if evicted in self._in_use:
+                    self._retired.add(evicted)
+                else:
+                    evicted.close()
+            return shard
+
+    @contextlib.contextmanager
+    def _using(self, number: int) -> Iterator[DatabaseManager]:
+        """Emprunter un shard: s'il est évincé entre-temps, il n'est fermé qu'au retour."""
+        with self._lock:
+            shard = self.shard(number)
+            self._in_use[shard] = self._in_use.get(shard, 0) + 1
+        try:
+            yield shard
+        finally:
+            with self._lock:
+                self._in_use[shard] -= 1
+                if not self._in_use[shard]:
+                    del self._in_use[shard]
+                    if shard in self._retired:
+                        self._retired.discard(shard)
+                        shard.close()
+
+    def _call(self, number: int, name: str, args: tuple, kwargs: dict) -> Any:
+        """Appeler une méthode d'un shard emprunté (jusqu'à épuisement pour un générateur)."""
+        if inspect.isgeneratorfunction(getattr(DatabaseManager, name)):
+            return self._iterate(number, name, args, kwargs)
+        with self._using(number) as shard:
+            return getattr(shard, name)(*args, **kwargs)
+
+    def _iterate(self, number: int, name: str, args: tuple, kwargs: dict) -> Iterator[Any]:
+        with self._using(number) as shard:
+            yield from getattr(shard, name)(*args, **kwargs)
+
+    def _next_shard_number(self) -> int:
+        """Numéro d'un nouveau shard (après tous les existants)."""
+        row = self.directory.conn.execute("SELECT COALESCE(MAX(number), 0) AS number FROM shards").fetchone()
+        return row["number"] + 1
+
+    def shard_number_for(self, user_id: int) -> int:
+        """
+        Obtenir le numéro du shard d'un utilisateur.
+
+        Args:
+            user_id: ID de l'utilisateur.
+
+        Returns:
+            Numéro du shard.
+
+        Raises:
+            ValueError: Si l'utilisateur n'a pas de shard (inconnu de l'annuaire).
+        """
+        number = self._user_shards.get(user_id)
+        if number is None:
+            row = self.directory.conn.execute(
+                "SELECT shard FROM user_shards WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Utilisateur {user_id} introuvable dans l'annuaire des shards")
+            number = self._user_shards[user_id] = row["shard"]
+        return number
+
+    def shard_for(self, user_id: int) -> DatabaseManager:
+        """Obtenir le DatabaseManager du shard d'un utilisateur (voir shard_number_for)."""
+        return self.shard(self.shard_number_for(user_id))
+
+    def _shard_number_for_row(self, table: str, row_id: int) -> int:
+        """Shard contenant une ligne: celui de sa plage d'IDs, sauf ligne déplacée (moved_rows)."""
+        row = self.directory.conn.execute(
+            """
+            SELECT COALESCE(
+                (SELECT shard FROM moved_rows WHERE table_name = ? AND row_id = ?),
+                (SELECT number FROM shards WHERE number = ?),
+                (SELECT MIN(number) FROM shards)
+            ) AS shard
+            """,
+            (table, row_id, row_id // SHARD_ID_SPAN),
+        ).fetchone()
+        if row["shard"] is None:
+            raise ValueError("Aucun shard enregistré")
+        # ID inconnu: la méthode du shard le traite comme une ligne absente
+        return row["shard"]
+
+    def _record_moved_rows(self, user_id: int, number: int) -> None:
+        """Enregistrer les lignes d'un utilisateur copiées hors de la plage d'IDs du shard."""
+        with self._using(number) as shard:
+            rows = [
+                (table, row["id"], number)
+                for table in ROW_TABLES
+                for row in shard.conn.execute(
+                    f"SELECT id FROM {table} WHERE user_id = ? AND (id < ? OR id >= ?)",
+                    (user_id, number * SHARD_ID_SPAN, (number + 1) * SHARD_ID_SPAN),
+                )
+            ]
+        self.directory.conn.executemany(
+            """
+            INSERT INTO moved_rows (table_name, row_id, shard) VALUES (?, ?, ?)
+            ON CONFLICT (table_name, row_id) DO UPDATE SET shard = excluded.shard
+            """,
+            rows,
+        )
+        self.directory.conn.commit()
+
+    def _backfill_moved_rows(self) -> None:
+        """Enregistrer les lignes déplacées d'un annuaire créé avant la table moved_rows."""
+        for row in self.directory.conn.execute("SELECT user_id, shard FROM user_shards").fetchall():
+            if os.path.exists(self.shard_path(row["shard"])):
+                self._record_moved_rows(row["user_id"], row["shard"])
+
+    # ===== Utilisateurs =====
+
+    def create_user(self, email: str, password: str, display_name: Optional[str] = None) -> int:
+        """
+        Créer un compte dans l'annuaire et lui affecter un shard.
+
+        Args:
+            email: Adresse email (unique).
+            password: Mot de passe en clair (haché).
+            display_name: Nom affiché optionnel.
+
+        Returns:
+            ID de l'utilisateur créé.
+
+        Raises:
+            ValueError: Si l'email existe déjà ou si les entrées sont invalides.
+        """
+        user_id = self.directory.create_user(email, password, display_name)
+        with self._lock:
+            if self.per_user:
+                number = self._next_shard_number()
+                self._register_shard(number)
+            else:
+                number = 1 + user_id % self.shard_count
+            self._assign(user_id, number)
+        return user_id
+
+    def _assign(self, user_id: int, number: int) -> None:
+        """Enregistrer le shard d'un utilisateur dans l'annuaire."""
+        self.directory.conn.execute(
+            """
+            INSERT INTO user_shards (user_id, shard) VALUES (?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET shard = excluded.shard
+            """,
+            (user_id, number),
+        )
+        self.directory.conn.commit()
+        self._user_shards[user_id] = number
+
+    # Export complet: profil depuis l'annuaire, lignes depuis le shard
+    export_user_data = DatabaseManager.export_user_data
+
+    # ===== Administration =====
+
+    def check_action_stats(self, repair: bool = False) -> List[Dict[str, Any]]:
+        """
+        Vérifier les compteurs de action_item_stats de tous les shards.
+
+        Args:
+            repair: Si True, remplacer les compteurs erronés.
+
+        Returns:
+            Écarts de tous les shards (voir DatabaseManager.check_action_stats),
+            avec le numéro du shard (shard).
+        """
+        drifts = []
+        for number in self.shard_numbers():
+            with self._using(number) as shard:
+                for drift in shard.check_action_stats(repair=repair):
+                    drifts.append({"shard": number, **drift})
+        return drifts
+
+    def _user_row_counts(self, number: int) -> Dict[int, int]:
+        """Nombre de lignes par utilisateur d'un shard (utilisateurs sans ligne compris)."""
+        counts = {
+            row["user_id"]: 0
+            for row in self.directory.conn.execute("SELECT user_id FROM user_shards WHERE shard = ?", (number,))
+        }
+        with self._using(number) as shard:
+            for table in SHARDED_TABLES:
+                for row in shard.conn.execute(f"SELECT user_id, COUNT(*) AS count FROM {table} GROUP BY user_id"):
+                    if row["user_id"] in counts:
+                        counts[row["user_id"]] += row["count"]
+        return counts
+
+    def get_shard_stats(self) -> List[Dict[str, Any]]:
+        """
+        Obtenir la taille de chaque shard (pour repérer les shards chargés).
+
+        Returns:
+            Liste de dicts par shard contenant: shard, users, rows, size_bytes.
+        """
+        stats = []
+        for number in self.shard_numbers():
+            counts = self._user_row_counts(number)
+            path = self.shard_path(number)
+            stats.append({
+                "shard": number,
+                "users": len(counts),
+                "rows": sum(counts.values()),
+                "size_bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+            })
+        return stats
+
+    def _copy_user(self, target: DatabaseManager, source_path: str, user_id: int, max_id: int) -> int:
+        """
+        Copier les lignes d'un utilisateur d'un fichier SQLite vers un shard.
+
+        Les IDs sont conservés (max_id: plafond au-delà duquel ils
+        empiéteraient sur les plages d'autres shards). Les triggers du shard
+        indexent les lignes (FTS) et comptent les actions; les versions de
+        données de l'utilisateur reprennent celles de la source.
+
+        Returns:
+            Nombre de lignes copiées.
+
+        Raises:
+            ValueError: Si un ID de la source dépasse max_id.
+        """
+        conn = target.conn
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+        try:
+            for table in SHARDED_TABLES:
+                row = conn.execute(
+                    f"SELECT MAX(id) AS max_id FROM source.{table} WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                if row["max_id"] is not None and row["max_id"] >= max_id:
+                    raise ValueError(
+                        f"{table}: l'ID {row['max_id']} de l'utilisateur {user_id} dépasse la plage "
+                        f"du shard cible (déplacer vers un shard plus récent)"
+                    )
+
+            copied = sum(_copy_rows(conn, table, "WHERE user_id = ?", (user_id,)) for table in SHARDED_TABLES)
+
+            # Versions croissantes: ajouter celles de la source aux incréments de la copie
+            if conn.execute(
+                "SELECT 1 FROM source.sqlite_master WHERE type = 'table' AND name = 'user_data_version'"
+            ).fetchone():
+                columns = ", ".join(DATA_VERSION_TABLES)
+                updates = ", ".join(f"{table} = {table} + excluded.{table}" for table in DATA_VERSION_TABLES)
+                conn.execute(
+                    f"""
+                    INSERT INTO user_data_version (user_id, {columns})
+                    SELECT user_id, {columns} FROM source.user_data_version WHERE user_id = ?
+                    ON CONFLICT (user_id) DO UPDATE SET {updates}
+                    """,
+                    (user_id,),
+                )
+            conn.commit()
+            return copied
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DETACH DATABASE source")
+
+    def move_user(self, user_id: int, number: int) -> int:
+        """
+        Déplacer les données d'un utilisateur vers un autre shard.
+
+        À lancer application arrêtée (ou utilisateur déconnecté): une
+        écriture de l'utilisateur pendant le déplacement serait perdue.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            number: Numéro du shard cible (enregistré).
+
+        Returns:
+            Nombre de lignes déplacées.
+
+        Raises:
+            ValueError: Si le shard cible est inconnu, ou plus ancien que
+                les lignes de l'utilisateur (voir _copy_user).
+        """
+        if number not in self.shard_numbers():
+            raise ValueError(f"Shard inconnu: {number}")
+        source_number = self.shard_number_for(user_id)
+        if source_number == number:
+            return 0
+
+        with self._lock:
+            with self._using(number) as target:
+                moved = self._copy_user(target, self.shard_path(source_number), user_id, (number + 1) * SHARD_ID_SPAN)
+            self._record_moved_rows(user_id, number)
+            self._assign(user_id, number)
+
+            with self._using(source_number) as source:
+                for table in SHARDED_TABLES:
+                    source.conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (user_id,))
+                source.conn.execute("DELETE FROM user_data_version WHERE user_id = ?", (user_id,))
+                source.conn.commit()
+
+        if self.query_cache is not None:
+            self.query_cache.invalidate(user_id, SHARDED_TABLES)
+        return moved
+
+    def split_shard(self, number: int) -> Dict[str, Any]:
+        """
+        Découper un shard: la moitié de ses lignes part vers un nouveau shard.
+
+        Les utilisateurs sont répartis du plus gros au plus petit (en
+        lignes) vers la moitié la moins remplie.
+
+        Args:
+            number: Numéro du shard à découper.
+
+        Returns:
+            Dict contenant: shard (nouveau numéro), moved_users, moved_rows.
+
+        Raises:
+            ValueError: Si le shard est inconnu.
+        """
+        if number not in self.shard_numbers():
+            raise ValueError(f"Shard inconnu: {number}")
+
+        counts = self._user_row_counts(number)
+        kept_rows = moved_rows = 0
+        to_move = []
+        for user_id, rows in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+            if moved_rows < kept_rows:
+                to_move.append(user_id)
+                moved_rows += rows
+            else:
+                kept_rows += rows
+
+        with self._lock:
+            new_number = self._next_shard_number()
+            self._register_shard(new_number)
+            for user_id in to_move:
+                self.move_user(user_id, new_number)
+
+        return {"shard": new_number, "moved_users": len(to_move), "moved_rows": moved_rows}
+
+    def import_database(self, path: str) -> int:
+        """
+        Importer une base unique (serene.db) dans un annuaire vide.
+
+        Les comptes et la télémétrie vont dans l'annuaire, les données de
+        chaque utilisateur dans son shard; les IDs sont conservés. La base
+        d'origine n'est pas modifiée (hors mise à jour de son schéma).
+
+        Args:
+            path: Chemin de la base à importer.
+
+        Returns:
+            Nombre d'utilisateurs importés.
+
+        Raises:
+            ValueError: Si l'annuaire contient déjà des utilisateurs, ou si
+                la base contient des IDs de la plage des shards.
+        """
+        if self.directory.conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+            raise ValueError("L'annuaire contient déjà des utilisateurs")
+
+        # Mettre le schéma de la base à jour (colonnes ajoutées depuis sa création)
+        DatabaseManager(path).close()
+
+        conn = self.directory.conn
+        conn.commit()
+        conn.execute("ATTACH DATABASE ? AS source", (path,))
+        try:
+            for table in DIRECTORY_TABLES:
+                _copy_rows(conn, table)
+            conn.commit()
+            user_ids = [row["id"] for row in conn.execute("SELECT id FROM users ORDER BY id")]
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute("DETACH DATABASE source")
+
+        for user_id in user_ids:
+            with self._lock:
+                if self.per_user:
+                    number = self._next_shard_number()
+                    self._register_shard(number)
+                else:
+                    number = 1 + user_id % self.shard_count
+                with self._using(number) as target:
+                    self._copy_user(target, path, user_id, SHARD_ID_SPAN)
+                self._record_moved_rows(user_id, number)
+                self._assign(user_id, number)
+        return len(user_ids)
+
+    def close(self):
+        """Fermer l'annuaire et les shards ouverts."""
+        with self._lock:
+            for shard in [*self._shards.values(), *self._retired]:
+                shard.close()
+            self._shards.clear()
+            self._retired.clear()
+            self.directory.close()
+
+
+def _directory_method(name: str):
+    method = getattr(DatabaseManager, name)
+
+    @functools.wraps(method)
+    def route(self, *args, **kwargs):
+        return getattr(self.directory, name)(*args, **kwargs)
+
+    return route
+
+
+def _user_method(name: str):
+    method = getattr(DatabaseManager, name)
+    signature = inspect.signature(method)
+    first_param = list(signature.parameters)[1]
+
+    @functools.wraps(method)
+    def route(self, *args, **kwargs):
+        user_id = signature.bind(self, *args, **kwargs).arguments[first_param]
+        return self._call(self.shard_number_for(user_id), name, args, kwargs)
+
+    return route
+
+
+def _row_method(name: str, table: str):
+    method = getattr(DatabaseManager, name)
+    signature = inspect.signature(method)
+    first_param = list(signature.parameters)[1]
+
+    @functools.wraps(method)
+    def route(self, *args, **kwargs):
+        row_id = signature.bind(self, *args, **kwargs).arguments[first_param]
+        return self._call(self._shard_number_for_row(table, row_id), name, args, kwargs)
+
+    return route
+
+
+for _name in DIRECTORY_METHODS:
+    setattr(ShardedDatabaseManager, _name, _directory_method(_name))
+for _name in USER_METHODS:
+    setattr(ShardedDatabaseManager, _name, _user_method(_name))
+for _name, _table in ROW_METHODS.items():
+    setattr(ShardedDatabaseManager, _name, _row_method(_name, _table))
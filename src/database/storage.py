@@ -0,0 +1,328 @@
+"""
+Interface de stockage de Serene et choix de l'implémentation.
+
+StorageBackend décrit les méthodes publiques de DatabaseManager, les seules
+utilisées par l'interface et les composants LLM. Trois implémentations:
+- DatabaseManager: un fichier SQLite (serene.db), une seule instance de
+  l'application;
+- ShardedDatabaseManager: plusieurs fichiers SQLite sur le même disque;
+- PostgresDatabaseManager: un serveur PostgreSQL partagé par plusieurs
+  réplicas de l'application (pool de connexions).
+
+Les valeurs rendues sont les mêmes quelle que soit l'implémentation: dicts de
+types simples, dates en chaînes ISO, nombres en int/float.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple, runtime_checkable
+
+from src.database.db_manager import DatabaseManager
+from src.database.postgres import PostgresDatabaseManager
+from src.database.query_cache import QueryCache
+from src.database.sharding import ShardedDatabaseManager
+
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """Méthodes publiques communes aux gestionnaires de base de données."""
+
+    query_cache: Optional[QueryCache]
+
+    # ===== Check-ins, conversations, insights =====
+
+    def save_checkin(self, user_id: int, mood_score: int, notes: str = "") -> int:
+        """Enregistrer un check-in."""
+        ...
+
+    def get_mood_history(self, user_id: int, days: int = 30) -> List[Dict[str, Any]]:
+        """Récupérer l'historique des check-ins (derniers N jours)."""
+        ...
+
+    def get_mood_stats(self, user_id: int, days: int = 30) -> Dict[str, Any]:
+        """Calculer les statistiques d'humeur (derniers N jours)."""
+        ...
+
+    def get_mood_buckets(
+        self, user_id: int, days: int = 30, bucket: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Récupérer l'historique d'humeur agrégé par intervalle de temps."""
+        ...
+
+    def save_conversation(
+        self, user_id: int, user_message: str, ai_response: str, tokens_used: int = 0
+    ) -> int:
+        """Enregistrer une conversation."""
+        ...
+
+    def get_conversation_history(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """Récupérer l'historique des conversations."""
+        ...
+
+    def get_conversation_count(self, user_id: int, days: int = 7) -> int:
+        """Compter le nombre de conversations (derniers N jours)."""
+        ...
+
+    def get_recent_conversations(self, user_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """Récupérer les N dernières conversations."""
+        ...
+
+    def get_conversations_after(
+        self, user_id: int, after_id: int = 0, limit: int = 500
+    ) -> List[Dict[str, Any]]:
+        """Récupérer les conversations d'ID supérieur à after_id."""
+        ...
+
+    def get_conversations_by_ids(self, user_id: int, ids: List[int]) -> List[Dict[str, Any]]:
+        """Récupérer des conversations par ID (limitées à l'utilisateur)."""
+        ...
+
+    def save_insight(
+        self,
+        user_id: int,
+        insight_type: str,
+        content: str,
+        based_on_data: str = "",
+        tokens_used: int = 0,
+    ) -> int:
+        """Enregistrer un insight IA."""
+        ...
+
+    def get_latest_insight(self, user_id: int, insight_type: str) -> Optional[Dict[str, Any]]:
+        """Récupérer le dernier insight d'un type donné."""
+        ...
+
+    def search(
+        self,
+        user_id: int,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        sources: Tuple[str, ...] = ("conversations", "check_ins"),
+    ) -> List[Dict[str, Any]]:
+        """Rechercher dans les conversations et les notes de check-in."""
+        ...
+
+    # ===== Utilisateurs =====
+
+    def create_user(self, email: str, password: str, display_name: Optional[str] = None) -> int:
+        """Créer un compte utilisateur."""
+        ...
+
+    def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
+        """Authentifier un utilisateur."""
+        ...
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Récupérer un utilisateur par ID."""
+        ...
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Récupérer un utilisateur par email."""
+        ...
+
+    def update_last_login(self, user_id: int) -> None:
+        """Mettre à jour la date de dernière connexion."""
+        ...
+
+    def update_user_preferences(self, user_id: int, preferences: Dict[str, Any]) -> None:
+        """Enregistrer les préférences d'un utilisateur."""
+        ...
+
+    def get_user_preferences(self, user_id: int) -> Dict[str, Any]:
+        """Récupérer les préférences d'un utilisateur."""
+        ...
+
+    def change_password(self, user_id: int, new_password: str) -> None:
+        """Changer le mot de passe d'un utilisateur."""
+        ...
+
+    def update_user_profile(
+        self,
+        user_id: int,
+        display_name: Optional[str] = None,
+        full_name: Optional[str] = None,
+        birth_year: Optional[int] = None,
+        timezone: Optional[str] = None,
+    ) -> None:
+        """Mettre à jour le profil d'un utilisateur."""
+        ...
+
+    # ===== Export RGPD =====
+
+    def get_user_export_profile(self, user_id: int) -> Dict[str, Any]:
+        """Récupérer le profil exportable d'un utilisateur."""
+        ...
+
+    def count_user_export_rows(self, user_id: int) -> Dict[str, int]:
+        """Compter les lignes de chaque section de l'export."""
+        ...
+
+    def iter_user_export_rows(
+        self, user_id: int, section: str, batch_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """Parcourir les lignes d'une section de l'export par lots."""
+        ...
+
+    def export_user_data(self, user_id: int) -> Dict[str, Any]:
+        """Exporter toutes les données d'un utilisateur (en mémoire)."""
+        ...
+
+    # ===== Actions et propositions =====
+
+    def save_action_item(
+        self,
+        user_id: int,
+        title: str,
+        description: str = "",
+        source: str = "manual",
+        conversation_id: Optional[int] = None,
+        deadline: Optional[str] = None,
+    ) -> int:
+        """Enregistrer un nouvel objectif/action."""
+        ...
+
+    def get_action_items(
+        self, user_id: int, status: Optional[str] = None, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Récupérer les actions d'un utilisateur."""
+        ...
+
+    def update_action_item(
+        self,
+        action_id: int,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        status: Optional[str] = None,
+        deadline: Optional[str] = None,
+    ) -> None:
+        """Mettre à jour une action."""
+        ...
+
+    def delete_action_item(self, action_id: int) -> None:
+        """Supprimer une action."""
+        ...
+
+    def get_action_item_by_id(self, action_id: int) -> Optional[Dict[str, Any]]:
+        """Récupérer une action par son ID."""
+        ...
+
+    def get_action_items_stats(self, user_id: int) -> Dict[str, int]:
+        """Obtenir le nombre d'actions par statut."""
+        ...
+
+    def check_action_stats(self, repair: bool = False) -> List[Dict[str, Any]]:
+        """Vérifier (et réparer) les compteurs d'actions."""
+        ...
+
+    def get_active_title_keys(self, user_id: int) -> List[str]:
+        """Récupérer les clés de titres des propositions et actions en cours."""
+        ...
+
+    def find_similar_active_title(self, user_id: int, title: str) -> Optional[str]:
+        """Chercher une proposition ou action en cours de titre similaire."""
+        ...
+
+    def save_proposed_action(
+        self,
+        user_id: int,
+        title: str,
+        description: str = "",
+        conversation_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """Enregistrer une proposition d'action (None si doublon)."""
+        ...
+
+    def get_proposed_actions(
+        self, user_id: int, status: Optional[str] = None, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Récupérer les propositions d'actions d'un utilisateur."""
+        ...
+
+    def accept_proposed_action(self, proposal_id: int, deadline: Optional[str] = None) -> int:
+        """Accepter une proposition (crée l'action)."""
+        ...
+
+    def reject_proposed_action(self, proposal_id: int) -> None:
+        """Rejeter une proposition."""
+        ...
+
+    def get_proposed_actions_count(self, user_id: int, status: str = "pending") -> int:
+        """Compter les propositions d'un statut."""
+        ...
+
+    def delete_proposed_action(self, proposal_id: int) -> None:
+        """Supprimer une proposition."""
+        ...
+
+    # ===== Télémétrie LLM =====
+
+    def save_llm_metric(
+        self,
+        component: str,
+        model: str,
+        latency_ms: float,
+        user_id: Optional[int] = None,
+        status: str = "ok",
+        ttft_ms: Optional[float] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_creation_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        retries: int = 0,
+        cost_usd: float = 0.0,
+        error: Optional[str] = None,
+    ) -> int:
+        """Enregistrer la télémétrie d'un appel à l'API Claude."""
+        ...
+
+    def get_llm_metrics_summary(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Résumer la télémétrie par composant et modèle."""
+        ...
+
+    def get_llm_metric_totals(self) -> List[Dict[str, Any]]:
+        """Obtenir les totaux cumulés de télémétrie."""
+        ...
+
+    def record_llm_skip(self, component: str, reason: str) -> None:
+        """Compter un appel à l'API Claude évité."""
+        ...
+
+    def get_llm_skip_totals(self, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Obtenir le nombre d'appels évités."""
+        ...
+
+    def get_llm_histogram(self, column: str, bounds_ms: Tuple[float, ...]) -> List[Dict[str, Any]]:
+        """Obtenir un histogramme cumulé de latence."""
+        ...
+
+    # ===== Versions et cycle de vie =====
+
+    def get_data_versions(self, user_id: int) -> Dict[str, int]:
+        """Obtenir les versions des données d'un utilisateur."""
+        ...
+
+    def close(self) -> None:
+        """Libérer les connexions."""
+        ...
+
+
+def open_storage(query_cache: Optional[QueryCache] = None, db_path: str = "serene.db") -> StorageBackend:
+    """
+    Ouvrir le stockage configuré par l'environnement.
+
+    Par ordre de priorité: SERENE_DATABASE_URL (PostgreSQL), puis
+    SERENE_SHARD_COUNT / SERENE_SHARD_PER_USER (shards SQLite), sinon le
+    fichier SQLite db_path (avec SERENE_DB_READ_CONNECTIONS connexions de
+    lecture).
+
+    Args:
+        query_cache: Cache de lecture optionnel (désactivé si None).
+        db_path: Fichier SQLite utilisé sans autre configuration.
+
+    Returns:
+        Gestionnaire de base de données.
+    """
+    return (
+        PostgresDatabaseManager.from_env(query_cache)
+        or ShardedDatabaseManager.from_env(query_cache)
+        or DatabaseManager.from_env(db_path, query_cache=query_cache)
+    )
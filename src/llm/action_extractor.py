@@ -1,26 +1,134 @@
 """Module d'extraction automatique d'actions/objectifs depuis les conversations."""
 
 import os
-import json
 from typing import List, Dict, Optional
 from anthropic import Anthropic
 
-from src.utils.prompts import ACTION_EXTRACTION_PROMPT
+from src.utils.prompts import ACTION_EXTRACTION_PROMPT, CLAUDE_MODEL
 from src.database.db_manager import DatabaseManager
+from src.llm.action_prefilter import should_extract, threshold_from_env
+from src.llm.json_output import IncrementalJSONParser, compile_schema, parse_object, salvage_items
+from src.llm.telemetry import LLMCallTracker
+from src.llm.transport import LLMTransport, client_options
+
+
+# Action proposée par le modèle (extraction, suggestion, mode fusionné)
+ACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "minLength": 1, "maxLength": 200},
+        "description": {"type": "string", "default": ""},
+    },
+    "required": ["title"],
+}
+
+# Réponse de l'extraction: {"actions": [...]}
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {"actions": {"type": "array", "items": ACTION_SCHEMA}},
+    "required": ["actions"],
+}
+
+validate_action = compile_schema(ACTION_SCHEMA)
+validate_extraction = compile_schema(EXTRACTION_SCHEMA)
+
+# Délimiteurs du bloc d'actions en fin de réponse (mode fusionné, voir FUSED_ACTIONS_PROMPT)
+ACTIONS_TRAILER_START = "<actions>"
+ACTIONS_TRAILER_END = "</actions>"
+
+
+class ActionTrailerFilter:
+    """
+    Retirer le bloc d'actions d'une réponse en streaming.
+
+    Le texte précédant ACTIONS_TRAILER_START est rendu au fur et à mesure;
+    seule une fin de morceau pouvant être le début du délimiteur est retenue
+    jusqu'au morceau suivant.
+
+    Le contenu du bloc est lu au fil de l'eau: chaque action complète est
+    ajoutée à actions dès sa réception.
+
+    Exemple:
+        trailer_filter = ActionTrailerFilter()
+        for text in stream.text_stream:
+            visible = trailer_filter.feed(text)
+        visible = trailer_filter.finish()
+        actions = trailer_filter.actions
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._trailer: Optional[str] = None
+        self._parser = IncrementalJSONParser("actions", validate_action)
+
+    def feed(self, text: str) -> str:
+        """
+        Ajouter un morceau de la réponse.
+
+        Args:
+            text: Morceau reçu.
+
+        Returns:
+            Texte affichable (éventuellement vide).
+        """
+        if self._trailer is not None:
+            self._trailer += text
+            self._parser.feed(text)
+            return ""
+
+        buffer = self._pending + text
+        start = buffer.find(ACTIONS_TRAILER_START)
+        if start >= 0:
+            self._pending = ""
+            self._trailer = buffer[start + len(ACTIONS_TRAILER_START):]
+            self._parser.feed(self._trailer)
+            return buffer[:start]
+
+        # Plus longue fin du texte qui commence le délimiteur
+        keep = next(
+            (size for size in range(min(len(buffer), len(ACTIONS_TRAILER_START) - 1), 0, -1)
+             if ACTIONS_TRAILER_START.startswith(buffer[-size:])),
+            0,
+        )
+        self._pending = buffer[len(buffer) - keep:]
+        return buffer[:len(buffer) - keep]
+
+    def finish(self) -> str:
+        """Rendre le texte retenu à la fin du flux (délimiteur incomplet)."""
+        pending, self._pending = self._pending, ""
+        return pending
+
+    @property
+    def trailer(self) -> Optional[str]:
+        """Contenu du bloc d'actions, ou None si la réponse n'en contient pas."""
+        if self._trailer is None:
+            return None
+        return self._trailer.split(ACTIONS_TRAILER_END, 1)[0]
+
+    @property
+    def actions(self) -> List[Dict]:
+        """Actions complètes et valides reçues dans le bloc."""
+        return list(self._parser.items)
 
 
 class ActionExtractor:
     """Extrait automatiquement les actions et objectifs des conversations."""
 
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, prefilter_threshold: Optional[float] = None):
         """
         Initialiser l'extracteur d'actions.
 
         Args:
             db_manager: Instance du gestionnaire de base de données.
+            prefilter_threshold: Score minimal du filtre local pour appeler
+                le modèle (défaut: SERENE_ACTION_PREFILTER_THRESHOLD, 0 désactive).
         """
         self.db_manager = db_manager
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.prefilter_threshold = (
+            threshold_from_env() if prefilter_threshold is None else prefilter_threshold
+        )
+        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), **client_options())
+        self.transport = LLMTransport.from_env(self.client)
 
     def extract_actions_from_message(
         self, user_message: str, user_id: int, conversation_id: Optional[int] = None
@@ -36,58 +144,91 @@ class ActionExtractor:
         Returns:
             Liste des actions extraites et sauvegardées.
         """
+        # Message sans intention d'action (remerciement, récit...): pas d'appel au modèle
+        if not should_extract(user_message, self.prefilter_threshold):
+            self.record_skip("prefilter")
+            return []
+
         try:
             # Appel à l'API Claude pour extraction
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=500,
-                system=ACTION_EXTRACTION_PROMPT,
-                messages=[{"role": "user", "content": user_message}],
-            )
-
-            # Parser la réponse JSON
-            response_text = response.content[0].text.strip()
-
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                # Extract JSON from markdown code block
-                lines = response_text.split("\n")
-                response_text = "\n".join(
-                    line for line in lines if not line.startswith("```")
+            with LLMCallTracker(self.db_manager, "action_extraction", CLAUDE_MODEL, user_id) as call:
+                response = self.transport.create(
+                    tracker=call,
+                    model=CLAUDE_MODEL,
+                    max_tokens=500,
+                    system=ACTION_EXTRACTION_PROMPT,
+                    messages=[{"role": "user", "content": user_message}],
                 )
-
-            result = json.loads(response_text)
-            extracted_actions = result.get("actions", [])
+                call.record_usage(response.usage)
+
+            # Parser la réponse JSON (prose, bloc markdown ou troncature tolérés)
+            response_text = response.content[0].text
+            result = parse_object(response_text, validate_extraction)
+            if result is not None:
+                extracted_actions = result["actions"]
+            else:
+                # Pas d'objet complet: garder les actions complètes d'une réponse tronquée
+                extracted_actions = salvage_items(response_text, "actions", validate_action)
+                if not extracted_actions:
+                    print(f"Aucun JSON valide dans la réponse d'extraction: {response_text[:200]}")
 
             # Sauvegarder les actions comme propositions dans la base de données
-            saved_proposals = []
-            for action in extracted_actions:
-                if action.get("title"):
-                    proposal_id = self.db_manager.save_proposed_action(
-                        user_id=user_id,
-                        title=action["title"],
-                        description=action.get("description", ""),
-                        conversation_id=conversation_id,
-                    )
-
-                    saved_proposals.append(
-                        {
-                            "id": proposal_id,
-                            "title": action["title"],
-                            "description": action.get("description", ""),
-                        }
-                    )
-
-            return saved_proposals
-
-        except json.JSONDecodeError as e:
-            print(f"Erreur de parsing JSON: {e}")
-            print(f"Réponse reçue: {response_text}")
-            return []
+            return self.save_proposals(extracted_actions, user_id, conversation_id)
+
         except Exception as e:
             print(f"Erreur lors de l'extraction d'actions: {e}")
             return []
 
+    def record_skip(self, reason: str) -> None:
+        """
+        Compter un appel d'extraction évité (voir DatabaseManager.record_llm_skip).
+
+        Args:
+            reason: 'prefilter' (message filtré) ou 'fused' (actions lues dans la réponse).
+        """
+        try:
+            self.db_manager.record_llm_skip("action_extraction", reason)
+        except Exception as e:
+            # La télémétrie ne doit jamais faire échouer l'extraction
+            print(f"Erreur d'enregistrement de la télémétrie LLM: {e}")
+
+    def save_proposals(
+        self, actions: List[Dict], user_id: int, conversation_id: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Enregistrer des actions extraites comme propositions.
+
+        Args:
+            actions: Actions validées (voir ACTION_SCHEMA).
+            user_id: ID de l'utilisateur.
+            conversation_id: ID de la conversation d'origine (optionnel).
+
+        Returns:
+            Propositions créées (les doublons et actions sans titre sont ignorés).
+        """
+        saved_proposals = []
+        for action in actions:
+            if action.get("title"):
+                proposal_id = self.db_manager.save_proposed_action(
+                    user_id=user_id,
+                    title=action["title"],
+                    description=action.get("description", ""),
+                    conversation_id=conversation_id,
+                )
+                if proposal_id is None:
+                    # Doublon d'une proposition en attente ou d'une action en cours
+                    continue
+
+                saved_proposals.append(
+                    {
+                        "id": proposal_id,
+                        "title": action["title"],
+                        "description": action.get("description", ""),
+                    }
+                )
+
+        return saved_proposals
+
     def extract_actions_batch(
         self, conversations: List[Dict], user_id: int
     ) -> List[Dict[str, str]]:
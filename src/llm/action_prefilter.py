@@ -0,0 +1,160 @@
+"""
+Filtre local avant l'extraction d'actions.
+
+``ActionExtractor`` envoie chaque message utilisateur à Claude pour y
+chercher des objectifs. La plupart des messages ("merci", "ok", récit d'une
+journée difficile) n'en contiennent aucun: ce module leur attribue un score
+d'actionnabilité à partir de mots-clés d'intention, de verbes d'action, de
+marqueurs temporels et de la longueur du message, sans appel réseau. Sous le
+seuil (SERENE_ACTION_PREFILTER_THRESHOLD), l'appel d'extraction est évité.
+
+Le filtre privilégie le rappel: un message ambigu est envoyé au modèle, qui
+reste seul juge de l'extraction. Voir benchmarks/prefilter_eval.py pour
+mesurer un seuil sur l'échantillon annoté. Cet échantillon a été rédigé en
+même temps que les motifs: le rappel qu'il donne est optimiste, et tout
+message actionnable manqué en production doit y être ajouté.
+"""
+
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+# Seuil par défaut (0 désactive le filtre: tous les messages sont analysés)
+DEFAULT_PREFILTER_THRESHOLD = 0.3
+
+# Poids des indices (le score est plafonné à 1)
+INTENT_WEIGHT = 0.6
+PLANNING_WEIGHT = 0.3
+ACTION_VERB_WEIGHT = 0.2
+TIME_MARKER_WEIGHT = 0.2
+LENGTH_WEIGHT = 0.1
+
+# À partir de ce nombre de mots, un message reçoit le bonus de longueur
+LONG_MESSAGE_WORDS = 15
+
+# Les motifs s'appliquent au texte en minuscules, sans accents, apostrophes droites.
+# Intention à la première personne: "je vais", "j'ai décidé", "je méditerai",
+# "je devrais", "je me suis inscrit", "rappelle-moi de"...
+INTENT_PATTERN = re.compile(
+    r"\b(?:"
+    r"je (?:vais|veux|voudrais|dois|compte|prevois|souhaite|m'engage|me promets|"
+    r"essaie|essaye|commence|reprends|m'y mets|me mets|tente|m'oblige)"
+    r"|je me suis (?:promis|inscrit|engage|fixe|mis|remis|lance|decide|organise)e?s?"
+    r"|j'(?:ai decide|ai prevu|ai l'intention|ai pris la decision|ai pris (?:un )?(?:rdv|rendez-vous)|ai reserve"
+    r"|aimerais|essaie|essaye|envisage|arrete|irai)"
+    r"|(?:il )?(?:faut|faudrait|faudra) que j(?:e |')"
+    r"|(?:on|nous) (?:va|allons|devons|doit|devrait|devrions|prevoit|prevoyons)"
+    r"|j(?:e |')(?:(?:me|te|se|le|la|les|lui|leur|y|en) |[mtsl]')*\w{2,}rais?"
+    r"|(?:rappelle|rappelez|aide|aidez|fais|faites|pousse|encourage|motive)-moi"
+    r"|n'oublie pas|pense a|note (?:que|de)"
+    r")\b"
+)
+
+# Consigne commençant par un infinitif ("Prendre rdv chez le dentiste", "- Aller courir")
+INFINITIVE_START_PATTERN = re.compile(
+    r"^\s*(?:[-*]\s*)?(?:me |m'|se |s')?(?:"
+    r"aller|prendre|faire|appeler|rappeler|contacter|ecrire|envoyer|acheter|reserver|inscrire"
+    r"|commencer|recommencer|reprendre|arreter|essayer|continuer|penser|planifier|preparer|organiser"
+    r"|ranger|finir|terminer|chercher|trouver|demander|parler|sortir|voir|passer"
+    r"|mediter|courir|marcher|nager|boire|manger|dormir|coucher|lever|lire|cuisiner"
+    r")\b",
+    re.MULTILINE,
+)
+
+# Vocabulaire de planification sans verbe à la première personne
+PLANNING_PATTERN = re.compile(
+    r"\b(?:"
+    r"objectifs?|resolutions?|engagements?|routines?|habitudes?|programme|planning|to-?do"
+    r"|(?:essayer|commencer|recommencer|reprendre|arreter|continuer|penser|prendre le temps) (?:de|a|d')"
+    r")\b"
+)
+
+# Actions liées au bien-être (racines)
+ACTION_VERB_PATTERN = re.compile(
+    r"\b(?:"
+    r"medit\w*|sport\w*|cour(?:ir|s|se|rai)\w*|march\w*|promen\w*|yoga|etir\w*|natation|nag\w*|velo|gym"
+    r"|respir\w*|dorm\w*|couch\w*|lever|reveil\w*|sieste"
+    r"|appel\w*|telephon\w*|ecri\w*|journal|lire|lecture|rendez-vous|rdv|consult\w*|psy\w*|therap\w*|medecin"
+    r"|mang\w*|cuisin\w*|boire|hydrat\w*|ecrans?|deconnect\w*|pauses?|vacances|conges?"
+    r"|sortir|voir|inscri\w*|ranger|range|organis\w*|planifi\w*|terminer|finir|demander|parler"
+    r")\b"
+)
+
+# Marqueurs de planification dans le temps
+TIME_MARKER_PATTERN = re.compile(
+    r"\b(?:"
+    r"demain|ce soir|ce week-?end|cette semaine|ce mois|desormais|dorenavant|a partir d[e']|des (?:demain|lundi|maintenant)"
+    r"|(?:chaque|tous les|toutes les) \w+|par (?:jour|semaine|mois)|fois par|d'ici"
+    r"|(?:semaine|mois|annee) prochaine?|prochaine?s? \w+|lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche"
+    r"|\d+ ?(?:min|minutes|h|heures?|km|pas)"
+    r")\b"
+)
+
+# Messages sans contenu à analyser
+ACKNOWLEDGMENT_WORDS = frozenset({
+    "merci", "beaucoup", "ok", "okay", "oui", "non", "ouais", "d'accord", "daccord", "super", "cool",
+    "top", "parfait", "genial", "bien", "tres", "bof", "bonjour", "salut", "bonsoir", "coucou", "hello",
+    "revoir", "au", "a", "plus", "ca", "va", "et", "toi", "vous", "hmm", "ah", "oh", "lol", "mdr", "bonne",
+    "nuit", "journee", "soiree", "pas", "mal", "je", "sais", "vrai", "exact", "exactement", "compris",
+})
+
+
+def _fold(text: str) -> str:
+    """Mettre en minuscules, retirer les accents et uniformiser les apostrophes."""
+    text = text.lower().replace("’", "'").replace("`", "'")
+    return "".join(
+        char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char)
+    )
+
+
+@lru_cache(maxsize=1024)
+def actionability_score(message: str) -> float:
+    """
+    Estimer la probabilité qu'un message contienne une action à extraire.
+
+    Args:
+        message: Message de l'utilisateur.
+
+    Returns:
+        Score entre 0 (rien à extraire) et 1.
+    """
+    text = _fold(message)
+    words = re.findall(r"[\w'-]+", text)
+    if not words or all(word in ACKNOWLEDGMENT_WORDS for word in words):
+        return 0.0
+
+    score = 0.0
+    if INTENT_PATTERN.search(text) or INFINITIVE_START_PATTERN.search(text):
+        score += INTENT_WEIGHT
+    if PLANNING_PATTERN.search(text):
+        score += PLANNING_WEIGHT
+    if ACTION_VERB_PATTERN.search(text):
+        score += ACTION_VERB_WEIGHT
+    if TIME_MARKER_PATTERN.search(text):
+        score += TIME_MARKER_WEIGHT
+    if len(words) >= LONG_MESSAGE_WORDS:
+        score += LENGTH_WEIGHT
+    return min(score, 1.0)
+
+
+def threshold_from_env() -> float:
+    """Lire le seuil (SERENE_ACTION_PREFILTER_THRESHOLD, défaut DEFAULT_PREFILTER_THRESHOLD)."""
+    try:
+        return float(os.getenv("SERENE_ACTION_PREFILTER_THRESHOLD", DEFAULT_PREFILTER_THRESHOLD))
+    except ValueError:
+        return DEFAULT_PREFILTER_THRESHOLD
+
+
+def should_extract(message: str, threshold: float) -> bool:
+    """
+    Décider si un message doit être envoyé au modèle d'extraction.
+
+    Args:
+        message: Message de l'utilisateur.
+        threshold: Score minimal (0 ou moins: toujours envoyer).
+
+    Returns:
+        True si l'appel d'extraction doit avoir lieu.
+    """
+    return threshold <= 0 or actionability_score(message) >= threshold
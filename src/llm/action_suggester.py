@@ -1,12 +1,55 @@
 """Module de suggestion d'actions personnalisées par l'IA."""
 
 import os
-import json
-from typing import List, Dict, Optional
+import threading
+import weakref
+from datetime import date, timedelta
+from typing import List, Dict, Optional, Tuple
 from anthropic import Anthropic
 
-from src.utils.prompts import ACTION_SUGGESTION_PROMPT
+from src.utils.prompts import ACTION_SUGGESTION_PROMPT, CLAUDE_MODEL
 from src.database.db_manager import DatabaseManager
+from src.database.query_cache import VersionedCache
+from src.llm.action_extractor import ACTION_SCHEMA, validate_action
+from src.llm.json_output import compile_schema, parse_object, salvage_items
+from src.llm.telemetry import LLMCallTracker
+from src.llm.transport import LLMTransport, client_options
+
+
+# Réponse de la suggestion: {"message": "...", "actions": [...]}
+SUGGESTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "message": {"type": "string", "default": ""},
+        "actions": {"type": "array", "items": ACTION_SCHEMA},
+    },
+    "required": ["actions"],
+}
+
+validate_suggestion = compile_schema(SUGGESTION_SCHEMA)
+
+# Tables lues pour le contexte, et pour les suggestions (les propositions en attente comptent)
+CONTEXT_TABLES = ("check_ins", "conversations", "action_items")
+SUGGESTION_TABLES = CONTEXT_TABLES + ("proposed_actions",)
+
+# Fenêtre des check-ins du contexte (jours)
+CONTEXT_CHECKIN_DAYS = 7
+
+# Utilisateurs mémorisés par cache
+SUGGESTION_CACHE_SIZE = 256
+
+# Caches partagés par les instances d'une même base (l'interface crée un ActionSuggester par clic)
+_caches: "weakref.WeakKeyDictionary[DatabaseManager, Dict[str, VersionedCache]]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def _shared_cache(db_manager: DatabaseManager, name: str) -> VersionedCache:
+    """Cache name de la base, créé au premier usage et libéré avec elle."""
+    with _caches_lock:
+        caches = _caches.setdefault(db_manager, {})
+        if name not in caches:
+            caches[name] = VersionedCache(max_entries=SUGGESTION_CACHE_SIZE)
+        return caches[name]
 
 
 class ActionSuggester:
@@ -20,20 +63,44 @@ class ActionSuggester:
             db_manager: Instance du gestionnaire de base de données.
         """
         self.db_manager = db_manager
-        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.context_cache = _shared_cache(db_manager, "context")
+        self.suggestion_cache = _shared_cache(db_manager, "suggestions")
+        self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), **client_options())
+        self.transport = LLMTransport.from_env(self.client)
+
+    def _data_version(self, user_id: int, tables: Tuple[str, ...]) -> Tuple:
+        """
+        Version des données de l'utilisateur pour ces tables.
+
+        Les versions de get_data_versions sont suivies du premier jour de la
+        fenêtre des check-ins: un check-in sorti de la fenêtre invalide le
+        cache le lendemain, même sans nouvelle écriture.
+        """
+        versions = self.db_manager.get_data_versions(user_id)
+        window_start = date.today() - timedelta(days=CONTEXT_CHECKIN_DAYS)
+        return tuple(versions[table] for table in tables) + (window_start.isoformat(),)
 
     def _build_context(self, user_id: int) -> str:
         """
         Construire le contexte utilisateur pour les suggestions.
 
+        Le contexte est mémorisé tant que les check-ins, conversations et
+        actions de l'utilisateur ne changent pas, et au plus jusqu'au
+        lendemain (la fenêtre des check-ins avance chaque jour).
+
         Args:
             user_id: ID de l'utilisateur.
 
         Returns:
             Contexte formaté pour le prompt.
         """
+        version = self._data_version(user_id, CONTEXT_TABLES)
+        context = self.context_cache.get(user_id, version)
+        if context is not None:
+            return context
+
         # Récupérer les check-ins récents (7 derniers jours)
-        recent_checkins = self.db_manager.get_checkins(user_id, limit=7)
+        recent_checkins = self.db_manager.get_mood_history(user_id, days=CONTEXT_CHECKIN_DAYS)
 
         # Récupérer les conversations récentes
         recent_conversations = self.db_manager.get_recent_conversations(user_id, limit=5)
@@ -79,6 +146,7 @@ class ActionSuggester:
                 context += f"- {action['title']}\n"
             context += "\n"
 
+        self.context_cache.put(user_id, version, context)
         return context
 
     def suggest_actions(
@@ -87,40 +155,53 @@ class ActionSuggester:
         """
         Suggérer des actions personnalisées pour l'utilisateur.
 
+        Tant que les données de l'utilisateur (check-ins, conversations,
+        actions, propositions) ne changent pas, les suggestions précédentes
+        sont rendues sans nouvel appel à l'API, jusqu'au lendemain au plus.
+
         Args:
             user_id: ID de l'utilisateur.
             conversation_id: ID de la conversation (optionnel).
 
         Returns:
-            Dict contenant le message et les actions suggérées, ou None en cas d'erreur.
+            Dict contenant le message, les actions suggérées et cached (True si
+            rendu depuis le cache), ou None en cas d'erreur.
         """
+        cache_key = (user_id, conversation_id)
+        cached = self.suggestion_cache.get(cache_key, self._data_version(user_id, SUGGESTION_TABLES))
+        if cached is not None:
+            return dict(cached, proposals=[dict(proposal) for proposal in cached["proposals"]], cached=True)
+
         try:
             # Construire le contexte
+            context_version = self._data_version(user_id, CONTEXT_TABLES)
             context = self._build_context(user_id)
 
             # Appel à l'API Claude pour génération de suggestions
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1000,
-                system=ACTION_SUGGESTION_PROMPT,
-                messages=[{"role": "user", "content": context}],
-            )
-
-            # Parser la réponse JSON
-            response_text = response.content[0].text.strip()
-
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = "\n".join(
-                    line for line in lines if not line.startswith("```")
+            with LLMCallTracker(self.db_manager, "action_suggestion", CLAUDE_MODEL, user_id) as call:
+                response = self.transport.create(
+                    tracker=call,
+                    model=CLAUDE_MODEL,
+                    max_tokens=1000,
+                    system=ACTION_SUGGESTION_PROMPT,
+                    messages=[{"role": "user", "content": context}],
                 )
-
-            result = json.loads(response_text)
+                call.record_usage(response.usage)
+
+            # Parser la réponse JSON (prose, bloc markdown ou troncature tolérés)
+            response_text = response.content[0].text
+            result = parse_object(response_text, validate_suggestion)
+            if result is None:
+                # Pas d'objet complet: garder les actions complètes d'une réponse tronquée
+                actions = salvage_items(response_text, "actions", validate_action)
+                if not actions:
+                    print(f"Aucun JSON valide dans la réponse de suggestion: {response_text[:200]}")
+                    return None
+                result = {"message": "", "actions": actions}
 
             # Sauvegarder les suggestions comme propositions
-            message = result.get("message", "")
-            suggested_actions = result.get("actions", [])
+            message = result["message"]
+            suggested_actions = result["actions"]
 
             saved_proposals = []
             for action in suggested_actions:
@@ -131,6 +212,9 @@ class ActionSuggester:
                         description=action.get("description", ""),
                         conversation_id=conversation_id,
                     )
+                    if proposal_id is None:
+                        # Doublon d'une proposition en attente ou d'une action en cours
+                        continue
 
                     saved_proposals.append(
                         {
@@ -140,16 +224,20 @@ class ActionSuggester:
                         }
                     )
 
-            return {
+            result = {
                 "message": message,
                 "proposals": saved_proposals,
                 "count": len(saved_proposals),
+                "cached": False,
             }
 
-        except json.JSONDecodeError as e:
-            print(f"Erreur de parsing JSON: {e}")
-            print(f"Réponse reçue: {response_text}")
-            return None
+            # Version relue après l'enregistrement des propositions (notre propre écriture);
+            # pas de mémorisation si le contexte a changé pendant l'appel
+            if self._data_version(user_id, CONTEXT_TABLES) == context_version:
+                self.suggestion_cache.put(cache_key, self._data_version(user_id, SUGGESTION_TABLES), result)
+                result = dict(result, proposals=[dict(proposal) for proposal in saved_proposals])
+            return result
+
         except Exception as e:
             print(f"Erreur lors de la suggestion d'actions: {e}")
             return None
@@ -1,11 +1,25 @@
 """Gestionnaire de conversations avec l'API Claude."""
 
+import logging
 import os
-from typing import Generator, List, Dict
+from typing import Generator, Iterable, List, Dict, Optional, Tuple
 from anthropic import Anthropic
 import anthropic
 from src.database.db_manager import DatabaseManager
-from src.utils.prompts import CONVERSATION_SYSTEM_PROMPT, CRISIS_KEYWORDS
+from src.llm.memory_index import MemoryIndex
+from src.llm.telemetry import LLMCallTracker
+from src.llm.transport import LLMTransport, client_options
+from src.llm.action_extractor import ActionTrailerFilter
+from src.llm.action_prefilter import should_extract
+from src.utils.prompts import (
+    CLAUDE_MODEL,
+    CONVERSATION_SYSTEM_PROMPT,
+    CRISIS_KEYWORDS,
+    FUSED_ACTIONS_PROMPT,
+    MEMORY_CONTEXT_PROMPT,
+)
+
+logger = logging.getLogger("serene.llm")
 
 
 class ConversationManager:
@@ -15,14 +29,26 @@ class ConversationManager:
     MAX_CONTEXT_TOKENS = 180000  # Limite de sécurité (Claude-4 supporte 200k)
     MAX_HISTORY_MESSAGES = 50  # Nombre maximum de messages à récupérer
     MIN_RECENT_MESSAGES = 10  # Toujours garder les N derniers messages
-
-    def __init__(self, db_manager: DatabaseManager, enable_action_extraction: bool = True):
+    MEMORY_EXCERPT_CHARS = 400  # Longueur maximale d'un message dans un souvenir
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        enable_action_extraction: bool = True,
+        memory_index: Optional[MemoryIndex] = None,
+        enable_memory: bool = True,
+        fused_extraction: Optional[bool] = None,
+    ):
         """
         Initialiser le gestionnaire de conversations.
 
         Args:
             db_manager: Instance de DatabaseManager pour la persistance.
             enable_action_extraction: Activer l'extraction automatique d'actions (défaut: True).
+            memory_index: Index des échanges passés (créé via MemoryIndex.from_env() si None).
+            enable_memory: Retrouver les échanges anciens pertinents à chaque message (défaut: True).
+            fused_extraction: Demander les actions détectées à la fin de la réponse au lieu
+                d'un second appel (défaut: SERENE_FUSED_ACTION_EXTRACTION).
 
         Raises:
             ValueError: Si ANTHROPIC_API_KEY n'est pas définie.
@@ -31,17 +57,36 @@ class ConversationManager:
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment")
 
-        self.client = Anthropic(api_key=api_key)
+        self.client = Anthropic(api_key=api_key, **client_options())
+        self.transport = LLMTransport.from_env(self.client)
         self.db = db_manager
         self.system_prompt = CONVERSATION_SYSTEM_PROMPT
         self.enable_action_extraction = enable_action_extraction
         self.action_extractor = None
+        self.memory_index = None
+        if fused_extraction is None:
+            fused_extraction = os.getenv("SERENE_FUSED_ACTION_EXTRACTION", "").strip().lower() in (
+                "1", "true", "yes", "on"
+            )
+        self.fused_extraction = fused_extraction
+
+        if enable_memory:
+            self.memory_index = memory_index or MemoryIndex.from_env(db_manager)
 
         # Lazy load action extractor pour éviter import circulaire
         if enable_action_extraction:
             from src.llm.action_extractor import ActionExtractor
             self.action_extractor = ActionExtractor(db_manager)
 
+    def _use_fused_extraction(self, user_message: str) -> bool:
+        """Vérifier si les actions de ce message sont demandées dans la réponse elle-même."""
+        return (
+            self.fused_extraction
+            and self.enable_action_extraction
+            and self.action_extractor is not None
+            and should_extract(user_message, self.action_extractor.prefilter_threshold)
+        )
+
     def _estimate_tokens(self, text: str) -> int:
         """
         Estimer le nombre de tokens dans un texte.
@@ -56,56 +101,127 @@ class ConversationManager:
         """
         return len(text) // 4
 
-    def _build_conversation_context(self, user_id: int, current_message: str) -> List[Dict[str, str]]:
+    def _excerpt(self, text: str) -> str:
+        """Tronquer un message de souvenir à MEMORY_EXCERPT_CHARS caractères."""
+        text = " ".join(text.split())
+        if len(text) <= self.MEMORY_EXCERPT_CHARS:
+            return text
+        return text[:self.MEMORY_EXCERPT_CHARS].rstrip() + "…"
+
+    def _retrieve_memories(
+        self, user_id: int, current_message: str, exclude_ids: Iterable[int]
+    ) -> List[Dict]:
+        """
+        Retrouver les échanges anciens pertinents pour le message actuel.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            current_message: Message actuel de l'utilisateur.
+            exclude_ids: IDs des conversations déjà présentes dans le contexte récent.
+
+        Returns:
+            Liste d'échanges (voir MemoryIndex.search), vide si la mémoire est désactivée
+            ou en cas d'erreur.
+        """
+        if self.memory_index is None:
+            return []
+
+        try:
+            return self.memory_index.search(user_id, current_message, exclude_ids=exclude_ids)
+        except Exception as e:
+            # Ne pas bloquer la conversation si la recherche échoue
+            print(f"Erreur recherche mémoire: {e}")
+            return []
+
+    def _build_system_prompt(self, memories: List[Dict]) -> str:
+        """
+        Ajouter les souvenirs retrouvés au system prompt.
+
+        Args:
+            memories: Échanges retrouvés, du plus pertinent au moins pertinent.
+
+        Returns:
+            System prompt, inchangé s'il n'y a aucun souvenir.
+        """
+        if not memories:
+            return self.system_prompt
+
+        # Présentés dans l'ordre chronologique
+        lines = []
+        for memory in sorted(memories, key=lambda m: (m["timestamp"] or "", m["id"])):
+            date = str(memory["timestamp"] or "")[:10]
+            lines.append(
+                f"- [{date}] Utilisateur: {self._excerpt(memory['user_message'])}\n"
+                f"  Serene: {self._excerpt(memory['ai_response'])}"
+            )
+
+        return self.system_prompt + MEMORY_CONTEXT_PROMPT.format(memories="\n".join(lines))
+
+    def _build_conversation_context(
+        self, user_id: int, current_message: str
+    ) -> Tuple[str, List[Dict[str, str]]]:
         """
         Construire le contexte de conversation avec gestion intelligente de la limite de tokens.
 
+        Le contexte combine la fenêtre des échanges les plus récents et, dans le
+        system prompt, les échanges plus anciens pertinents pour le message actuel.
+
         Args:
             user_id: ID de l'utilisateur.
             current_message: Message actuel de l'utilisateur.
 
         Returns:
-            Liste de messages formatés pour l'API Claude (role + content).
+            Tuple (system prompt, liste de messages formatés pour l'API Claude (role + content)).
         """
-        # Récupérer l'historique depuis la base de données
-        history = self.db.get_conversation_history(user_id, limit=self.MAX_HISTORY_MESSAGES)
+        # Récupérer les échanges les plus récents depuis la base de données
+        history = self.db.get_recent_conversations(user_id, limit=self.MAX_HISTORY_MESSAGES)
 
-        # Construire les messages alternés user/assistant
-        messages = []
-        cumulative_tokens = self._estimate_tokens(self.system_prompt)
+        memories = self._retrieve_memories(user_id, current_message, [conv["id"] for conv in history])
+        system_prompt = self._build_system_prompt(memories)
 
-        for conv in history:
-            user_msg = {"role": "user", "content": conv['user_message']}
-            assistant_msg = {"role": "assistant", "content": conv['ai_response']}
+        cumulative_tokens = self._estimate_tokens(system_prompt) + self._estimate_tokens(current_message)
 
+        # Parcourir du plus récent au plus ancien pour garder la fin de la conversation
+        kept = []
+        for conv in reversed(history):
             # Estimer les tokens pour ces messages
             msg_tokens = self._estimate_tokens(conv['user_message']) + \
                         self._estimate_tokens(conv['ai_response'])
 
             # Vérifier si on peut ajouter ces messages sans dépasser la limite
             if cumulative_tokens + msg_tokens < self.MAX_CONTEXT_TOKENS or \
-               len(messages) < self.MIN_RECENT_MESSAGES * 2:  # Toujours garder minimum messages
-                messages.append(user_msg)
-                messages.append(assistant_msg)
+               len(kept) < self.MIN_RECENT_MESSAGES:  # Toujours garder minimum messages
+                kept.append(conv)
                 cumulative_tokens += msg_tokens
             else:
                 # On a atteint la limite, arrêter d'ajouter des messages plus anciens
                 break
 
+        # Construire les messages alternés user/assistant (ordre chronologique)
+        messages = []
+        for conv in reversed(kept):
+            messages.append({"role": "user", "content": conv['user_message']})
+            messages.append({"role": "assistant", "content": conv['ai_response']})
+
         # Ajouter le message actuel
-        current_tokens = self._estimate_tokens(current_message)
         messages.append({"role": "user", "content": current_message})
-        cumulative_tokens += current_tokens
 
-        # Log pour debugging (optionnel)
-        print(f"📊 Contexte construit: {len(messages)} messages, ~{cumulative_tokens} tokens estimés")
+        # Les tokens réellement facturés sont enregistrés par la télémétrie (llm_metrics)
+        logger.debug(
+            "Contexte construit: %d messages, %d souvenir(s), ~%d tokens estimés",
+            len(messages), len(memories), cumulative_tokens,
+        )
 
-        return messages
+        return system_prompt, messages
 
     def send_message(self, user_id: int, user_message: str) -> Generator[str, None, None]:
         """
         Envoyer un message à Claude avec streaming et contexte complet.
 
+        En mode fusionné (fused_extraction), la réponse se termine par un bloc
+        d'actions détectées, retiré du flux avant affichage et enregistré
+        comme propositions: un seul appel par tour au lieu de deux.
+
         Args:
             user_id: ID de l'utilisateur.
             user_message: Message de l'utilisateur.
@@ -118,36 +234,64 @@ class ConversationManager:
         """
         try:
             # Construire le contexte complet de la conversation
-            messages = self._build_conversation_context(user_id, user_message)
+            system_prompt, messages = self._build_conversation_context(user_id, user_message)
+
+            trailer_filter = None
+            if self._use_fused_extraction(user_message):
+                trailer_filter = ActionTrailerFilter()
+                system_prompt += FUSED_ACTIONS_PROMPT
 
             # Envoyer avec l'historique complet
-            with self.client.messages.stream(
-                model="claude-sonnet-4-20250514",
-                max_tokens=2048,  # Augmenté pour des réponses plus complètes
-                system=self.system_prompt,
-                messages=messages  # ✅ Contexte complet !
-            ) as stream:
-                response_text = ""
-                for text in stream.text_stream:
-                    response_text += text
-                    yield text
-
-                # Sauvegarder après complétion
-                usage = stream.get_final_message().usage
-                tokens = usage.input_tokens + usage.output_tokens
-                conversation_id = self.db.save_conversation(
-                    user_id, user_message, response_text, tokens
-                )
-
-                # Extraire les actions automatiquement
-                if self.enable_action_extraction and self.action_extractor:
-                    try:
+            with LLMCallTracker(self.db, "conversation", CLAUDE_MODEL, user_id) as call:
+                with self.transport.stream(
+                    tracker=call,
+                    model=CLAUDE_MODEL,
+                    max_tokens=2048,  # Augmenté pour des réponses plus complètes
+                    system=system_prompt,
+                    messages=messages  # ✅ Contexte complet !
+                ) as stream:
+                    response_text = ""
+                    for text in stream.text_stream:
+                        call.first_token()
+                        if trailer_filter is not None:
+                            text = trailer_filter.feed(text)
+                        if text:
+                            response_text += text
+                            yield text
+
+                    if trailer_filter is not None:
+                        # Début de délimiteur retenu mais jamais complété
+                        text = trailer_filter.finish()
+                        if text:
+                            response_text += text
+                            yield text
+                        response_text = response_text.rstrip()
+
+                    usage = stream.get_final_message().usage
+                    call.record_usage(usage)
+
+            # Sauvegarder après complétion
+            tokens = usage.input_tokens + usage.output_tokens
+            conversation_id = self.db.save_conversation(
+                user_id, user_message, response_text, tokens
+            )
+
+            # Extraire les actions automatiquement
+            if self.enable_action_extraction and self.action_extractor:
+                try:
+                    if trailer_filter is not None and trailer_filter.trailer is not None:
+                        self.action_extractor.save_proposals(
+                            trailer_filter.actions, user_id, conversation_id
+                        )
+                        self.action_extractor.record_skip("fused")
+                    else:
+                        # Mode séparé, ou bloc d'actions absent de la réponse
                         self.action_extractor.extract_actions_from_message(
                             user_message, user_id, conversation_id
                         )
-                    except Exception as e:
-                        print(f"Erreur extraction d'actions: {e}")
-                        # Ne pas bloquer la conversation si l'extraction échoue
+                except Exception as e:
+                    print(f"Erreur extraction d'actions: {e}")
+                    # Ne pas bloquer la conversation si l'extraction échoue
 
         except Exception as e:
             error_msg = "Je suis désolé, je rencontre des difficultés techniques. Veuillez réessayer."
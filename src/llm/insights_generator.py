@@ -6,7 +6,9 @@ from typing import Optional
 from datetime import datetime, timedelta
 from anthropic import Anthropic
 from src.database.db_manager import DatabaseManager
-from src.utils.prompts import INSIGHTS_SYSTEM_PROMPT
+from src.llm.telemetry import LLMCallTracker
+from src.llm.transport import LLMTransport, client_options
+from src.utils.prompts import CLAUDE_MODEL, INSIGHTS_SYSTEM_PROMPT
 
 # =========================
 # Global constants
@@ -35,7 +37,8 @@ class InsightsGenerator:
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment")
 
-        self.client = Anthropic(api_key=api_key)
+        self.client = Anthropic(api_key=api_key, **client_options())
+        self.transport = LLMTransport.from_env(self.client)
         self.db = db_manager
         self.user_id = user_id
 
@@ -106,12 +109,15 @@ class InsightsGenerator:
             )
 
             # Appeler Claude API (pas de streaming pour insights)
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=500,
-                system=system_prompt,
-                messages=[{"role": "user", "content": data_context}]
-            )
+            with LLMCallTracker(self.db, "insights", CLAUDE_MODEL, self.user_id) as call:
+                message = self.transport.create(
+                    tracker=call,
+                    model=CLAUDE_MODEL,
+                    max_tokens=500,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": data_context}]
+                )
+                call.record_usage(message.usage)
 
             # Extraire le contenu
             insight_content = message.content[0].text
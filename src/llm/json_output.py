@@ -0,0 +1,296 @@
+"""
+Lecture tolérante des réponses JSON des modèles.
+
+Les réponses attendues en JSON arrivent parfois entourées de prose, dans un
+bloc de code markdown, ou tronquées (max_tokens atteint). Ce module:
+- retrouve le premier objet JSON valide d'un texte par appariement des
+  accolades (en ignorant celles des chaînes), sans dépendre des délimiteurs;
+- lit les éléments d'un tableau au fil de l'eau (IncrementalJSONParser):
+  chaque élément complet est rendu dès sa dernière accolade reçue, ce qui
+  permet de les enregistrer pendant le streaming et de garder ceux d'une
+  réponse tronquée;
+- valide les objets lus avec des validateurs compilés une seule fois
+  (compile_schema), qui normalisent les valeurs et ignorent les éléments
+  invalides d'un tableau au lieu de rejeter toute la réponse.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+# Validateur compilé: retourne la valeur normalisée ou lève SchemaError
+Validator = Callable[[Any], Any]
+
+
+class SchemaError(ValueError):
+    """Levée quand une valeur ne respecte pas le schéma."""
+
+
+def _compile_string(schema: Dict) -> Validator:
+    min_length = schema.get("minLength", 0)
+    max_length = schema.get("maxLength")
+
+    def validate(value: Any) -> str:
+        if not isinstance(value, str):
+            raise SchemaError(f"chaîne attendue, reçu {type(value).__name__}")
+        value = value.strip()
+        if len(value) < min_length:
+            raise SchemaError(f"chaîne de moins de {min_length} caractère(s)")
+        return value[:max_length] if max_length is not None else value
+
+    return validate
+
+
+def _compile_array(schema: Dict) -> Validator:
+    validate_item = compile_schema(schema["items"]) if "items" in schema else None
+
+    def validate(value: Any) -> List:
+        if not isinstance(value, list):
+            raise SchemaError(f"tableau attendu, reçu {type(value).__name__}")
+        if validate_item is None:
+            return value
+        items = []
+        for item in value:
+            try:
+                items.append(validate_item(item))
+            except SchemaError:
+                # Un élément invalide n'invalide pas les autres
+                continue
+        return items
+
+    return validate
+
+
+def _compile_object(schema: Dict) -> Validator:
+    properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+    defaults = {name: sub["default"] for name, sub in schema.get("properties", {}).items() if "default" in sub}
+    required = frozenset(schema.get("required", ()))
+
+    def validate(value: Any) -> Dict:
+        if not isinstance(value, dict):
+            raise SchemaError(f"objet attendu, reçu {type(value).__name__}")
+        result = {}
+        for name, validate_property in properties.items():
+            if name in value and value[name] is not None:
+                try:
+                    result[name] = validate_property(value[name])
+                    continue
+                except SchemaError as e:
+                    if name in required:
+                        raise SchemaError(f"{name}: {e}")
+            if name in required:
+                raise SchemaError(f"propriété requise manquante: {name}")
+            if name in defaults:
+                result[name] = defaults[name]
+        return result
+
+    return validate
+
+
+_COMPILERS = {"string": _compile_string, "array": _compile_array, "object": _compile_object}
+
+
+def compile_schema(schema: Dict) -> Validator:
+    """
+    Compiler un schéma (sous-ensemble de JSON Schema) en validateur.
+
+    Mots-clés pris en charge: type ('object', 'array', 'string'),
+    properties, required, default, items, minLength et maxLength. Les
+    chaînes sont nettoyées (strip) et tronquées à maxLength, les propriétés
+    inconnues ignorées, les propriétés optionnelles invalides remplacées par
+    leur valeur par défaut et les éléments invalides d'un tableau retirés.
+
+    Args:
+        schema: Schéma à compiler.
+
+    Returns:
+        Validateur: valeur -> valeur normalisée (lève SchemaError).
+
+    Raises:
+        ValueError: Si le type du schéma n'est pas pris en charge.
+    """
+    compiler = _COMPILERS.get(schema.get("type"))
+    if compiler is None:
+        raise ValueError(f"Type de schéma non pris en charge: {schema.get('type')}")
+    return compiler(schema)
+
+
+def _closing_brace(text: str, start: int) -> Optional[int]:
+    """Position de l'accolade fermant celle de start (None si le texte s'arrête avant)."""
+    depth = 0
+    in_string = escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+    return None
+
+
+def parse_object(text: str, validator: Optional[Validator] = None) -> Optional[Dict]:
+    """
+    Retrouver le premier objet JSON valide d'un texte.
+
+    Args:
+        text: Réponse du modèle (prose, bloc markdown... autour de l'objet).
+        validator: Validateur compilé (optionnel); un objet qui ne le
+            respecte pas est ignoré au profit du suivant.
+
+    Returns:
+        Objet (normalisé par validator), ou None si aucun objet valide.
+    """
+    start = text.find("{")
+    while start != -1:
+        end = _closing_brace(text, start)
+        if end is None:
+            # Accolade jamais fermée (prose ou réponse tronquée): essayer la suivante
+            start = text.find("{", start + 1)
+            continue
+        try:
+            value = json.loads(text[start:end + 1])
+            if isinstance(value, dict):
+                return validator(value) if validator else value
+        except (json.JSONDecodeError, SchemaError):
+            pass
+        start = text.find("{", start + 1)
+    return None
+
+
+class IncrementalJSONParser:
+    """
+    Lire au fil de l'eau les éléments d'un tableau d'un objet JSON.
+
+    Pour {"message": "...", "actions": [{...}, {...}]} et array_key="actions",
+    chaque objet du tableau est rendu par feed dès qu'il est complet. Le texte
+    précédant le premier objet (prose, ```json) est ignoré.
+
+    Exemple:
+        parser = IncrementalJSONParser("actions", validate_action)
+        for chunk in chunks:
+            for action in parser.feed(chunk):
+                save(action)
+    """
+
+    def __init__(self, array_key: str, item_validator: Optional[Validator] = None):
+        """
+        Initialiser le parseur.
+
+        Args:
+            array_key: Clé du tableau dans l'objet de premier niveau.
+            item_validator: Validateur compilé des éléments (les éléments
+                invalides sont ignorés).
+        """
+        self.array_key = array_key
+        self.item_validator = item_validator
+        self.items: List[Any] = []
+        self._text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Ajouter un morceau de texte.
+
+        Args:
+            chunk: Morceau reçu.
+
+        Returns:
+            Éléments complétés par ce morceau (validés).
+        """
+        if self._done:
+            return []
+        self._text += chunk
+        completed = []
+        text = self._text
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start:index + 1]
+            elif self._depth == 0 and char != "{":
+                continue
+            elif char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ":" and self._depth == 1:
+                self._key = self._decode_key(self._last_string)
+            elif char in "{[":
+                if char == "{" and self._depth == self._array_depth:
+                    self._item_start = index
+                if char == "[" and self._depth == 1 and self._key == self.array_key:
+                    self._array_depth = 2
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._depth == self._array_depth and self._item_start is not None:
+                    item = self._item(text[self._item_start:index + 1])
+                    self._item_start = None
+                    if item is not None:
+                        completed.append(item)
+                elif char == "]" and self._depth == 1:
+                    self._array_depth = None
+                elif self._depth <= 0:
+                    # Fin de l'objet de premier niveau: le reste est ignoré
+                    self._done = True
+                    self._position = index + 1
+                    break
+        else:
+            self._position = len(text)
+        self.items.extend(completed)
+        return completed
+
+    @staticmethod
+    def _decode_key(literal: Optional[str]) -> Optional[str]:
+        try:
+            return json.loads(literal) if literal else None
+        except json.JSONDecodeError:
+            return None
+
+    def _item(self, literal: str) -> Any:
+        try:
+            value = json.loads(literal)
+            return self.item_validator(value) if self.item_validator else value
+        except (json.JSONDecodeError, SchemaError):
+            return None
+
+
+def salvage_items(text: str, array_key: str, item_validator: Optional[Validator] = None) -> List[Any]:
+    """
+    Récupérer les éléments complets d'un tableau dans une réponse invalide ou tronquée.
+
+    Args:
+        text: Réponse du modèle.
+        array_key: Clé du tableau dans l'objet de premier niveau.
+        item_validator: Validateur compilé des éléments (optionnel).
+
+    Returns:
+        Éléments complets et valides, dans l'ordre.
+    """
+    parser = IncrementalJSONParser(array_key, item_validator)
+    parser.feed(text)
+    return parser.items
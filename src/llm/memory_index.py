@@ -0,0 +1,433 @@
+"""
+Mémoire à long terme des conversations par recherche de similarité.
+
+Chaque échange (message + réponse) est converti en vecteur par un
+vectoriseur à hachage (sans modèle ni dépendance réseau), puis stocké dans un
+index NumPy par utilisateur. À chaque tour, les échanges les plus proches du
+message actuel sont retrouvés par produit scalaire (vecteurs normalisés,
+donc similarité cosinus). L'index est alimenté de façon incrémentale à partir
+du dernier ID indexé et peut être persisté sur disque: les nouveaux vecteurs
+sont ajoutés en fin de fichier (jamais réécrits) et les fichiers sont ouverts
+en mémoire partagée (mmap). Seuls les index des utilisateurs récents restent
+ouverts (LRU).
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.database.db_manager import SEARCH_STOP_WORDS, DatabaseManager
+
+# Dimension des vecteurs (puissance de 2: modulo rapide, peu de collisions)
+MEMORY_DIMENSIONS = 1024
+
+# Nombre d'échanges retrouvés par défaut et score cosinus minimum
+DEFAULT_TOP_K = 4
+DEFAULT_MIN_SCORE = 0.15
+
+# Nombre de conversations lues par lot lors de l'indexation
+INDEX_BATCH_SIZE = 500
+
+# Nombre d'index d'utilisateurs gardés ouverts (LRU)
+DEFAULT_MAX_USERS = 256
+
+# Capacité initiale d'un index en mémoire (doublée quand elle est atteinte)
+INITIAL_CAPACITY = 64
+
+logger = logging.getLogger("serene.llm")
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _fold(text: str) -> str:
+    """Mettre en minuscules et retirer les accents."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+@lru_cache(maxsize=65536)
+def _hash_feature(feature: str, dimensions: int) -> Tuple[int, float]:
+    """
+    Associer une caractéristique à une composante du vecteur et à un signe.
+
+    Le signe (hachage signé) compense en moyenne les collisions.
+    """
+    digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest % dimensions, 1.0 if digest >> 63 else -1.0
+
+
+class HashingEmbedder:
+    """Vectoriseur à hachage: mots et paires de mots, sans vocabulaire à entraîner."""
+
+    def __init__(self, dimensions: int = MEMORY_DIMENSIONS, stop_words: Iterable[str] = SEARCH_STOP_WORDS):
+        """
+        Initialiser le vectoriseur.
+
+        Args:
+            dimensions: Taille des vecteurs produits.
+            stop_words: Mots ignorés (comparés sans accents).
+
+        Raises:
+            ValueError: Si dimensions n'est pas strictement positif.
+        """
+        if dimensions <= 0:
+            raise ValueError("dimensions doit être strictement positif")
+
+        self.dimensions = dimensions
+        self.stop_words = frozenset(_fold(word) for word in stop_words)
+
+    def features(self, text: str) -> List[str]:
+        """
+        Extraire les caractéristiques d'un texte.
+
+        Les mots sont normalisés (minuscules, sans accents, pluriel simple
+        retiré); les mots vides et d'une lettre sont ignorés.
+
+        Args:
+            text: Texte à analyser.
+
+        Returns:
+            Liste des mots puis des paires de mots consécutifs.
+        """
+        words = []
+        for word in _WORD_PATTERN.findall(_fold(text or "")):
+            if len(word) < 2 or word in self.stop_words:
+                continue
+            if len(word) > 3 and word[-1] in "sx":
+                word = word[:-1]
+            words.append(word)
+
+        return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Convertir un texte en vecteur normalisé (norme L2 = 1, ou nul si vide).
+
+        Args:
+            text: Texte à convertir.
+
+        Returns:
+            Vecteur float32 de taille dimensions.
+        """
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature, count in Counter(self.features(text)).items():
+            index, sign = _hash_feature(feature, self.dimensions)
+            # Fréquence sous-linéaire: une répétition ne domine pas l'échange
+            vector[index] += sign * (1.0 + np.log(count))
+
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Convertir plusieurs textes en matrice (une ligne par texte).
+
+        Args:
+            texts: Textes à convertir.
+
+        Returns:
+            Matrice float32 de forme (len(texts), dimensions).
+        """
+        vectors = [self.embed(text) for text in texts]
+        if not vectors:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.vstack(vectors)
+
+
+class _UserIndex:
+    """Vecteurs indexés d'un utilisateur (les count premières lignes de tableaux préalloués)."""
+
+    def __init__(self, ids: np.ndarray, vectors: np.ndarray, count: Optional[int] = None):
+        self._ids = ids
+        self._vectors = vectors
+        self.count = len(ids) if count is None else count
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.count]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self.count]
+
+    @property
+    def last_id(self) -> int:
+        return int(self._ids[self.count - 1]) if self.count else 0
+
+    def append(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """Ajouter des lignes, en doublant la capacité si nécessaire (coût amorti constant)."""
+        needed = self.count + len(ids)
+        if needed > len(self._ids):
+            capacity = max(needed, 2 * len(self._ids), INITIAL_CAPACITY)
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_vectors = np.empty((capacity, self._vectors.shape[1]), dtype=np.float32)
+            grown_ids[:self.count] = self.ids
+            grown_vectors[:self.count] = self.vectors
+            self._ids, self._vectors = grown_ids, grown_vectors
+        self._ids[self.count:needed] = ids
+        self._vectors[self.count:needed] = vectors
+        self.count = needed
+
+
+class MemoryIndex:
+    """Index vectoriel des échanges passés, par utilisateur."""
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        embedder: Optional[HashingEmbedder] = None,
+        storage_dir: Optional[str] = None,
+        top_k: int = DEFAULT_TOP_K,
+        min_score: float = DEFAULT_MIN_SCORE,
+        max_users: int = DEFAULT_MAX_USERS,
+    ):
+        """
+        Initialiser l'index.
+
+        Args:
+            db: Instance de DatabaseManager.
+            embedder: Vectoriseur (HashingEmbedder par défaut).
+            storage_dir: Dossier de persistance des vecteurs (None: en mémoire seulement).
+            top_k: Nombre d'échanges retrouvés par défaut.
+            min_score: Similarité cosinus minimale d'un échange retrouvé.
+            max_users: Nombre d'index d'utilisateurs gardés ouverts (LRU).
+
+        Raises:
+            ValueError: Si top_k ou max_users n'est pas strictement positif.
+        """
+        if top_k <= 0:
+            raise ValueError("top_k doit être strictement positif")
+        if max_users <= 0:
+            raise ValueError("max_users doit être strictement positif")
+
+        self.db = db
+        self.embedder = embedder or HashingEmbedder()
+        self.storage_dir = storage_dir
+        self.top_k = top_k
+        self.min_score = min_score
+        self.max_users = max_users
+        self._users: "OrderedDict[int, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if storage_dir:
+            os.makedirs(storage_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, db: DatabaseManager) -> Optional["MemoryIndex"]:
+        """
+        Créer un index à partir des variables d'environnement.
+
+        SERENE_MEMORY_TOP_K (nombre d'échanges retrouvés, 0 pour désactiver),
+        SERENE_MEMORY_DIR (dossier de persistance, optionnel) et
+        SERENE_MEMORY_MAX_USERS (index gardés ouverts).
+
+        Args:
+            db: Instance de DatabaseManager.
+
+        Returns:
+            Instance de MemoryIndex, ou None si la mémoire est désactivée.
+        """
+        try:
+            top_k = int(os.getenv("SERENE_MEMORY_TOP_K", str(DEFAULT_TOP_K)))
+        except ValueError:
+            top_k = DEFAULT_TOP_K
+        try:
+            max_users = int(os.getenv("SERENE_MEMORY_MAX_USERS", str(DEFAULT_MAX_USERS)))
+        except ValueError:
+            max_users = DEFAULT_MAX_USERS
+
+        if top_k <= 0:
+            return None
+        return cls(
+            db,
+            storage_dir=os.getenv("SERENE_MEMORY_DIR") or None,
+            top_k=top_k,
+            max_users=max(max_users, 1),
+        )
+
+    @staticmethod
+    def exchange_text(conversation: Dict) -> str:
+        """Texte indexé pour un échange: message de l'utilisateur puis réponse."""
+        return f"{conversation['user_message']}\n{conversation['ai_response']}"
+
+    def _paths(self, user_id: int) -> Tuple[str, str]:
+        """Fichiers bruts (sans en-tête) des IDs (int64) et des vecteurs (float32)."""
+        base = os.path.join(self.storage_dir, f"user_{user_id}")
+        return f"{base}.ids", f"{base}.vectors"
+
+    def _empty(self) -> _UserIndex:
+        return _UserIndex(
+            np.zeros(0, dtype=np.int64),
+            np.zeros((0, self.embedder.dimensions), dtype=np.float32),
+        )
+
+    def _load(self, user_id: int) -> _UserIndex:
+        """
+        Ouvrir l'index persisté d'un utilisateur en mmap (vide si absent ou illisible).
+
+        Une fin de fichier incomplète (arrêt pendant un ajout) est tronquée:
+        les échanges concernés seront réindexés.
+        """
+        if not self.storage_dir:
+            return self._empty()
+
+        ids_path, vectors_path = self._paths(user_id)
+        if not (os.path.exists(ids_path) and os.path.exists(vectors_path)):
+            return self._empty()
+
+        row_bytes = self.embedder.dimensions * np.dtype(np.float32).itemsize
+        id_bytes = np.dtype(np.int64).itemsize
+        try:
+            count = min(os.path.getsize(ids_path) // id_bytes, os.path.getsize(vectors_path) // row_bytes)
+            if os.path.getsize(ids_path) != count * id_bytes:
+                os.truncate(ids_path, count * id_bytes)
+            if os.path.getsize(vectors_path) != count * row_bytes:
+                os.truncate(vectors_path, count * row_bytes)
+            if not count:
+                return self._empty()
+            ids = np.memmap(ids_path, dtype=np.int64, mode="r", shape=(count,))
+            vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(count, self.embedder.dimensions))
+        except (OSError, ValueError) as e:
+            logger.warning("Index mémoire illisible pour l'utilisateur %s, reconstruction: %s", user_id, e)
+            for path in (ids_path, vectors_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return self._empty()
+
+        return _UserIndex(ids, vectors)
+
+    def _append(self, user_id: int, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """Ajouter des vecteurs en fin de fichier (les vecteurs avant les IDs)."""
+        ids_path, vectors_path = self._paths(user_id)
+        for path, array in ((vectors_path, vectors), (ids_path, ids)):
+            with open(path, "ab") as f:
+                f.write(np.ascontiguousarray(array).tobytes())
+
+    def _get(self, user_id: int) -> _UserIndex:
+        """Index ouvert d'un utilisateur (chargé si besoin), marqué comme récent."""
+        index = self._users.get(user_id)
+        if index is None:
+            index = self._load(user_id)
+            self._users[user_id] = index
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        self._users.move_to_end(user_id)
+        return index
+
+    def _sync(self, user_id: int) -> Tuple[int, _UserIndex]:
+        """Indexer les nouvelles conversations; retourne (nombre ajouté, index)."""
+        with self._lock:
+            index = self._get(user_id)
+
+            new_ids: List[int] = []
+            new_vectors: List[np.ndarray] = []
+            after_id = index.last_id
+            while True:
+                batch = self.db.get_conversations_after(user_id, after_id, limit=INDEX_BATCH_SIZE)
+                if not batch:
+                    break
+                new_ids.extend(conv["id"] for conv in batch)
+                new_vectors.append(self.embedder.embed_many(self.exchange_text(conv) for conv in batch))
+                after_id = batch[-1]["id"]
+
+            if new_ids:
+                ids = np.asarray(new_ids, dtype=np.int64)
+                vectors = np.concatenate(new_vectors)
+                if self.storage_dir:
+                    # Fichiers complétés puis rouverts en mmap: rien n'est recopié
+                    self._append(user_id, ids, vectors)
+                    index = self._users[user_id] = self._load(user_id)
+                else:
+                    index.append(ids, vectors)
+
+            return len(new_ids), index
+
+    def sync(self, user_id: int) -> int:
+        """
+        Indexer les conversations de l'utilisateur ajoutées depuis le dernier appel.
+
+        Args:
+            user_id: ID de l'utilisateur.
+
+        Returns:
+            Nombre d'échanges nouvellement indexés.
+        """
+        return self._sync(user_id)[0]
+
+    def search(
+        self,
+        user_id: int,
+        query: str,
+        k: Optional[int] = None,
+        exclude_ids: Iterable[int] = (),
+    ) -> List[Dict]:
+        """
+        Retrouver les échanges passés les plus proches d'un message.
+
+        L'index est d'abord mis à jour avec les nouvelles conversations.
+
+        Args:
+            user_id: ID de l'utilisateur.
+            query: Message actuel.
+            k: Nombre maximum d'échanges (top_k par défaut).
+            exclude_ids: IDs de conversations à ignorer (déjà dans le contexte récent).
+
+        Returns:
+            Liste de dicts contenant: id, timestamp, user_message, ai_response et
+            score (similarité cosinus). Triée du plus pertinent au moins pertinent.
+        """
+        k = k or self.top_k
+        _, index = self._sync(user_id)
+
+        query_vector = self.embedder.embed(query)
+        if not query_vector.any():
+            return []
+
+        if not index.count:
+            return []
+
+        scores = np.asarray(index.vectors @ query_vector)
+        excluded = np.asarray(list(exclude_ids), dtype=np.int64)
+        if len(excluded):
+            scores = np.where(np.isin(index.ids, excluded), -1.0, scores)
+
+        if len(scores) > k:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        candidates = candidates[scores[candidates] >= self.min_score]
+        if not len(candidates):
+            return []
+
+        score_by_id = {int(index.ids[i]): float(scores[i]) for i in candidates}
+        memories = self.db.get_conversations_by_ids(user_id, list(score_by_id))
+        for memory in memories:
+            memory["score"] = score_by_id[memory["id"]]
+        return memories
+
+    def clear(self, user_id: Optional[int] = None) -> None:
+        """
+        Oublier l'index en mémoire (et sur disque) d'un utilisateur, ou de tous.
+
+        Args:
+            user_id: ID de l'utilisateur, ou None pour tous les utilisateurs.
+        """
+        with self._lock:
+            user_ids = [user_id] if user_id is not None else list(self._users)
+            for uid in user_ids:
+                self._users.pop(uid, None)
+                if self.storage_dir:
+                    for path in self._paths(uid):
+                        if os.path.exists(path):
+                            os.remove(path)
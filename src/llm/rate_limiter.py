@@ -0,0 +1,421 @@
+"""
+Ordonnanceur des appels à l'API Claude: débit, concurrence, priorités.
+
+Chaque requête envoyée par LLMTransport demande une admission à
+``LLMScheduler.acquire``:
+- budgets par minute de requêtes (SERENE_LLM_RPM) et de tokens
+  (SERENE_LLM_TPM), gérés en seaux à jetons; les tokens réservés sont une
+  estimation, corrigée par l'usage réel à la libération;
+- nombre maximal d'appels simultanés (SERENE_LLM_MAX_CONCURRENCY);
+- classes de priorité: conversation > suggestion d'actions > extraction
+  d'actions > insights, avec vieillissement pour éviter la famine;
+- à priorité égale, l'utilisateur servi le moins récemment passe d'abord.
+
+Les seaux sont en mémoire (processus) ou, avec SERENE_LLM_RATE_DB, dans un
+fichier SQLite partagé par plusieurs processus. Sans budget configuré,
+l'admission est immédiate.
+"""
+
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("serene.llm")
+
+# Classes de priorité par composant appelant (indice plus petit = plus prioritaire)
+PRIORITY_CLASSES = ("conversation", "action_suggestion", "action_extraction", "insights")
+
+# Une attente de cette durée fait gagner une classe de priorité
+PRIORITY_AGING_SECONDS = 30.0
+
+DEFAULT_QUEUE_TIMEOUT_SECONDS = 60.0
+
+# Utilisateurs mémorisés pour l'équité (un utilisateur oublié repasse en tête, comme
+# s'il n'avait jamais été servi: c'était de toute façon le moins récemment servi)
+LAST_SERVED_MAX_USERS = 1024
+
+REQUESTS_BUCKET = "requests"
+TOKENS_BUCKET = "tokens"
+
+
+class RateLimitTimeout(Exception):
+    """Levée quand une requête n'a pas été admise dans le délai d'attente."""
+
+
+def priority_of(component: Optional[str]) -> int:
+    """Classe de priorité d'un composant (les composants inconnus passent en dernier)."""
+    try:
+        return PRIORITY_CLASSES.index(component)
+    except ValueError:
+        return len(PRIORITY_CLASSES)
+
+
+def estimate_request_tokens(kwargs: Dict[str, Any]) -> int:
+    """
+    Estimer les tokens d'une requête messages.create/stream.
+
+    Règle approximative du projet (~4 caractères = 1 token) sur le prompt
+    système et les messages, plus max_tokens pour la réponse.
+
+    Args:
+        kwargs: Paramètres de la requête.
+
+    Returns:
+        Nombre de tokens à réserver.
+    """
+    text = json.dumps([kwargs.get("system", ""), kwargs.get("messages", [])], ensure_ascii=False)
+    return len(text) // 4 + int(kwargs.get("max_tokens", 0))
+
+
+def usage_tokens(usage: Any) -> Optional[int]:
+    """Tokens d'entrée et de sortie consommés (None si l'usage est inconnu)."""
+    if usage is None:
+        return None
+    total = 0
+    for name in ("input_tokens", "output_tokens", "cache_creation_input_tokens"):
+        value = getattr(usage, name, 0)
+        total += value if isinstance(value, int) else 0
+    return total
+
+
+class MemoryBucketStore:
+    """Seaux à jetons en mémoire (un processus)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._levels: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _level(self, name: str, capacity: float, rate: float, now: float) -> float:
+        level, updated = self._levels.get(name, (capacity, now))
+        return min(capacity, level + (now - updated) * rate)
+
+    def take(self, amounts: Dict[str, Tuple[float, float]]) -> float:
+        """
+        Prélever dans plusieurs seaux, tout ou rien.
+
+        Args:
+            amounts: Par seau, (quantité, budget par minute).
+
+        Returns:
+            0 si le prélèvement est fait, sinon l'attente estimée en secondes.
+        """
+        with self._lock:
+            now = self._clock()
+            levels = {}
+            wait = 0.0
+            for name, (amount, per_minute) in amounts.items():
+                rate = per_minute / 60
+                levels[name] = self._level(name, per_minute, rate, now)
+                if levels[name] < amount:
+                    wait = max(wait, (amount - levels[name]) / rate)
+            if wait:
+                return wait
+            for name, (amount, _) in amounts.items():
+                self._levels[name] = (levels[name] - amount, now)
+            return 0.0
+
+    def adjust(self, name: str, delta: float, per_minute: float) -> None:
+        """Rendre (delta > 0) ou prélever (delta < 0) des jetons sans attendre."""
+        with self._lock:
+            now = self._clock()
+            level = self._level(name, per_minute, per_minute / 60, now)
+            self._levels[name] = (min(per_minute, level + delta), now)
+
+
+class SQLiteBucketStore:
+    """
+    Seaux à jetons dans un fichier SQLite partagé entre processus.
+
+    Chaque prélèvement est une transaction BEGIN IMMEDIATE: les processus
+    s'excluent le temps de lire et d'écrire les niveaux. L'horloge est
+    l'heure système, commune aux processus.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        """
+        Ouvrir (ou créer) le fichier des seaux.
+
+        Args:
+            path: Fichier SQLite (distinct de la base applicative de préférence).
+            clock: Horloge commune aux processus.
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        # Table propre au limiteur: le fichier peut être partagé sans migration
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_rate_buckets "
+            "(name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _levels(self, amounts: Dict[str, Tuple[float, float]], now: float) -> Dict[str, float]:
+        """Niveaux des seaux après remplissage depuis leur dernière écriture."""
+        names = list(amounts)
+        placeholders = ",".join("?" * len(names))
+        rows = dict(
+            (name, (level, updated))
+            for name, level, updated in self.conn.execute(
+                f"SELECT name, level, updated_at FROM llm_rate_buckets WHERE name IN ({placeholders})",
+                names,
+            )
+        )
+        levels = {}
+        for name in names:
+            per_minute = amounts[name][1]
+            level, updated = rows.get(name, (per_minute, now))
+            levels[name] = min(per_minute, level + max(0.0, now - updated) * per_minute / 60)
+        return levels
+
+    def _write(self, levels: Dict[str, float], now: float) -> None:
+        self.conn.executemany(
+            "INSERT INTO llm_rate_buckets (name, level, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET level = excluded.level, updated_at = excluded.updated_at",
+            [(name, level, now) for name, level in levels.items()],
+        )
+
+    def take(self, amounts: Dict[str, Tuple[float, float]]) -> float:
+        """Prélever dans plusieurs seaux, tout ou rien (voir MemoryBucketStore.take)."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                levels = self._levels(amounts, now)
+                wait = max(
+                    ((amount - levels[name]) / (per_minute / 60)
+                     for name, (amount, per_minute) in amounts.items() if levels[name] < amount),
+                    default=0.0,
+                )
+                if not wait:
+                    self._write({name: levels[name] - amounts[name][0] for name in amounts}, now)
+                self.conn.execute("COMMIT")
+                return wait
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def adjust(self, name: str, delta: float, per_minute: float) -> None:
+        """Rendre ou prélever des jetons sans attendre."""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                level = self._levels({name: (0, per_minute)}, now)[name]
+                self._write({name: min(per_minute, level + delta)}, now)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+
+class Grant:
+    """Admission accordée par LLMScheduler, à libérer après l'appel."""
+
+    def __init__(self, scheduler: "LLMScheduler", tokens: int):
+        self._scheduler = scheduler
+        self.tokens = tokens
+        self._released = False
+
+    def release(self, actual_tokens: Optional[int] = None) -> None:
+        """
+        Libérer l'emplacement de concurrence et corriger la réservation.
+
+        Args:
+            actual_tokens: Tokens réellement consommés (None: garder la réservation).
+        """
+        if self._released:
+            return
+        self._released = True
+        self._scheduler._release(self, actual_tokens)
+
+
+class _Ticket:
+    __slots__ = ("priority", "user_id", "seq", "enqueued_at")
+
+    def __init__(self, priority: int, user_id: Optional[int], seq: int, enqueued_at: float):
+        self.priority = priority
+        self.user_id = user_id
+        self.seq = seq
+        self.enqueued_at = enqueued_at
+
+
+class LLMScheduler:
+    """File d'attente des appels LLM, partagée par le processus."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 0,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT_SECONDS,
+        store: Optional[Any] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialiser l'ordonnanceur (0 = pas de limite).
+
+        Args:
+            requests_per_minute: Budget de requêtes par minute.
+            tokens_per_minute: Budget de tokens (entrée + sortie) par minute.
+            max_concurrency: Nombre maximal d'appels simultanés.
+            queue_timeout: Attente maximale d'une admission, en secondes.
+            store: Stockage des seaux (MemoryBucketStore si None).
+            clock: Horloge monotone (priorités et délais).
+
+        Raises:
+            ValueError: Si un budget est négatif.
+        """
+        if min(requests_per_minute, tokens_per_minute, max_concurrency) < 0:
+            raise ValueError("Les budgets doivent être positifs")
+
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.store = store or MemoryBucketStore()
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._waiting: List[_Ticket] = []
+        self._active = 0
+        self._seq = itertools.count(1)
+        self._grants = itertools.count(1)
+        self._taking = False
+        self._last_served: "OrderedDict[Optional[int], int]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        """Créer l'ordonnanceur à partir des variables SERENE_LLM_* (voir .env.example)."""
+        def number(name: str, default: float) -> float:
+            try:
+                return max(0.0, float(os.getenv(name, default)))
+            except ValueError:
+                return default
+
+        rate_db = os.getenv("SERENE_LLM_RATE_DB")
+        return cls(
+            requests_per_minute=number("SERENE_LLM_RPM", 0),
+            tokens_per_minute=number("SERENE_LLM_TPM", 0),
+            max_concurrency=int(number("SERENE_LLM_MAX_CONCURRENCY", 0)),
+            queue_timeout=number("SERENE_LLM_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT_SECONDS),
+            store=SQLiteBucketStore(rate_db) if rate_db else None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Indiquer si une limite est configurée."""
+        return bool(self.requests_per_minute or self.tokens_per_minute or self.max_concurrency)
+
+    def _budget(self, tokens: int) -> Dict[str, Tuple[float, float]]:
+        amounts = {}
+        if self.requests_per_minute:
+            amounts[REQUESTS_BUCKET] = (1, self.requests_per_minute)
+        if self.tokens_per_minute:
+            # Une requête plus grosse que le budget attend un seau plein
+            amounts[TOKENS_BUCKET] = (min(tokens, self.tokens_per_minute), self.tokens_per_minute)
+        return amounts
+
+    def _sort_key(self, ticket: _Ticket, now: float) -> Tuple[float, int, int]:
+        aged = ticket.priority - int((now - ticket.enqueued_at) / PRIORITY_AGING_SECONDS)
+        return (aged, self._last_served.get(ticket.user_id, 0), ticket.seq)
+
+    def acquire(self, component: Optional[str], user_id: Optional[int], tokens: int) -> Grant:
+        """
+        Attendre l'admission d'une requête.
+
+        Args:
+            component: Composant appelant (détermine la priorité).
+            user_id: Utilisateur concerné (file équitable entre utilisateurs).
+            tokens: Tokens estimés (voir estimate_request_tokens).
+
+        Returns:
+            Grant à libérer après l'appel.
+
+        Raises:
+            RateLimitTimeout: Si la requête n'est pas admise dans queue_timeout secondes.
+        """
+        if not self.enabled:
+            return Grant(self, tokens)
+
+        with self._cond:
+            now = self._clock()
+            ticket = _Ticket(priority_of(component), user_id, next(self._seq), now)
+            deadline = now + self.queue_timeout
+            self._waiting.append(ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    wait = None
+                    head = min(self._waiting, key=lambda waiting: self._sort_key(waiting, now))
+                    if (
+                        head is ticket
+                        and not self._taking
+                        and (not self.max_concurrency or self._active < self.max_concurrency)
+                    ):
+                        wait = self._take(tokens)
+                        if not wait:
+                            break
+                    if now >= deadline:
+                        raise RateLimitTimeout(f"Appel LLM ({component}) non admis après {self.queue_timeout:.0f} s")
+                    # Réévaluer au moins à chaque palier de vieillissement
+                    self._cond.wait(timeout=min(wait or PRIORITY_AGING_SECONDS, deadline - now))
+            finally:
+                self._waiting.remove(ticket)
+                # Le suivant dans la file peut être éligible
+                self._cond.notify_all()
+
+            self._last_served[user_id] = next(self._grants)
+            self._last_served.move_to_end(user_id)
+            if len(self._last_served) > LAST_SERVED_MAX_USERS:
+                self._last_served.popitem(last=False)
+            waited = self._clock() - ticket.enqueued_at
+            if waited > 1:
+                logger.info("Appel LLM %s admis après %.1f s d'attente", component, waited)
+            return Grant(self, tokens)
+
+    def _take(self, tokens: int) -> float:
+        """
+        Prélever les budgets de la requête en tête de file (appelée condition tenue).
+
+        La condition est relâchée pendant l'appel au stockage (une transaction
+        BEGIN IMMEDIATE avec SQLiteBucketStore, qui peut attendre un autre
+        processus): les libérations et l'arrivée de nouvelles requêtes ne
+        sont pas bloquées. L'emplacement de concurrence est réservé pendant
+        ce temps et un seul prélèvement a lieu à la fois.
+
+        Returns:
+            0 si la requête est admise (emplacement gardé), sinon l'attente estimée.
+        """
+        self._taking = True
+        self._active += 1
+        self._cond.release()
+        wait = None
+        try:
+            wait = self.store.take(self._budget(tokens))
+            return wait
+        finally:
+            self._cond.acquire()
+            self._taking = False
+            if wait != 0:
+                # Refus ou erreur du stockage: l'emplacement est rendu
+                self._active -= 1
+            self._cond.notify_all()
+
+    def _release(self, grant: Grant, actual_tokens: Optional[int]) -> None:
+        if not self.enabled:
+            return
+        if self.tokens_per_minute and actual_tokens is not None:
+            reserved = min(grant.tokens, self.tokens_per_minute)
+            self.store.adjust(TOKENS_BUCKET, reserved - actual_tokens, self.tokens_per_minute)
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+
+# Ordonnanceur partagé par tous les appels du processus
+scheduler = LLMScheduler.from_env()
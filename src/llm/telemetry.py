@@ -0,0 +1,261 @@
+"""
+Télémétrie des appels à l'API Claude.
+
+Chaque appel est mesuré par un ``LLMCallTracker`` (latence totale, temps
+jusqu'au premier token, tokens d'entrée/sortie/cache, nouvelles tentatives,
+coût estimé) puis enregistré dans la table llm_metrics. Aucun contenu de
+message n'est conservé. Les mesures sont exposées au format texte Prometheus
+par ``render_prometheus``.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.database.db_manager import DatabaseManager
+from src.utils.profiling import span
+from src.utils.prompts import CLAUDE_MODEL
+
+logger = logging.getLogger("serene.llm")
+
+# Tarifs en dollars par million de tokens: entrée, sortie, écriture et lecture du cache
+MODEL_PRICING = {
+    CLAUDE_MODEL: {
+        "input": 3.00,
+        "output": 15.00,
+        "cache_creation": 3.75,
+        "cache_read": 0.30,
+    },
+}
+
+# Bornes des histogrammes de durée, en secondes
+LATENCY_BUCKETS_SECONDS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+TOKEN_TYPES = ("input", "output", "cache_creation", "cache_read")
+
+
+def _token_count(value: Any) -> int:
+    """Lire un compteur de tokens (absent ou None pour les anciennes réponses)."""
+    return value if isinstance(value, int) else 0
+
+
+def estimate_cost(model: str, tokens: Dict[str, int]) -> float:
+    """
+    Estimer le coût d'un appel.
+
+    Args:
+        model: Modèle appelé.
+        tokens: Nombre de tokens par type (clés de TOKEN_TYPES).
+
+    Returns:
+        Coût en dollars (0 si le modèle n'a pas de tarif connu).
+    """
+    pricing = MODEL_PRICING.get(model)
+    if not pricing:
+        return 0.0
+    return sum(tokens.get(kind, 0) * pricing[kind] for kind in TOKEN_TYPES) / 1_000_000
+
+
+class LLMCallTracker:
+    """
+    Mesure d'un appel LLM, utilisée comme context manager.
+
+    Exemple:
+        with LLMCallTracker(db, "insights", model, user_id) as call:
+            response = client.messages.create(...)
+            call.record_usage(response.usage)
+    """
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        component: str,
+        model: str,
+        user_id: Optional[int] = None,
+    ):
+        """
+        Initialiser la mesure.
+
+        Args:
+            db: Instance de DatabaseManager où enregistrer la mesure.
+            component: Composant appelant.
+            model: Modèle appelé.
+            user_id: ID de l'utilisateur concerné (optionnel).
+        """
+        self.db = db
+        self.component = component
+        self.model = model
+        self.user_id = user_id
+        self.retries = 0
+        self.tokens = dict.fromkeys(TOKEN_TYPES, 0)
+        self.ttft_ms: Optional[float] = None
+        self.latency_ms: Optional[float] = None
+        self._start = 0.0
+        # Section du profileur de réexécution (SERENE_PROFILE=1)
+        self._span = span(f"llm.{component}")
+
+    def __enter__(self) -> "LLMCallTracker":
+        self._span.__enter__()
+        self._start = time.perf_counter()
+        return self
+
+    def first_token(self) -> None:
+        """Marquer la réception du premier token (appels en streaming)."""
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.perf_counter() - self._start) * 1000
+
+    def record_usage(self, usage: Any) -> None:
+        """
+        Relever les compteurs de tokens d'une réponse.
+
+        Args:
+            usage: Objet usage d'une réponse Anthropic.
+        """
+        self.tokens = {
+            "input": _token_count(getattr(usage, "input_tokens", 0)),
+            "output": _token_count(getattr(usage, "output_tokens", 0)),
+            "cache_creation": _token_count(getattr(usage, "cache_creation_input_tokens", 0)),
+            "cache_read": _token_count(getattr(usage, "cache_read_input_tokens", 0)),
+        }
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.latency_ms = (time.perf_counter() - self._start) * 1000
+
+        if exc_type is None:
+            status, error = "ok", None
+        elif issubclass(exc_type, GeneratorExit):
+            # Réponse en streaming abandonnée par l'appelant
+            status, error = "cancelled", None
+        else:
+            status, error = "error", exc_type.__name__
+
+        cost = estimate_cost(self.model, self.tokens)
+        logger.info(
+            "%s %s %s en %.0f ms (ttft %s ms, %d+%d tokens, %.5f $)",
+            self.component, self.model, status, self.latency_ms,
+            f"{self.ttft_ms:.0f}" if self.ttft_ms is not None else "-",
+            self.tokens["input"], self.tokens["output"], cost,
+        )
+
+        try:
+            self.db.save_llm_metric(
+                component=self.component,
+                model=self.model,
+                latency_ms=self.latency_ms,
+                user_id=self.user_id,
+                status=status,
+                ttft_ms=self.ttft_ms,
+                input_tokens=self.tokens["input"],
+                output_tokens=self.tokens["output"],
+                cache_creation_tokens=self.tokens["cache_creation"],
+                cache_read_tokens=self.tokens["cache_read"],
+                retries=self.retries,
+                cost_usd=cost,
+                error=error,
+            )
+        except Exception as e:
+            # La télémétrie ne doit jamais faire échouer l'appel
+            print(f"Erreur d'enregistrement de la télémétrie LLM: {e}")
+
+        self._span.__exit__(exc_type, exc, tb)
+        return False
+
+
+def _labels(**labels: str) -> str:
+    """Formater des labels Prometheus (valeurs échappées)."""
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _histogram_lines(name: str, rows: List[Dict[str, Any]]) -> List[str]:
+    """Formater les lignes d'un histogramme Prometheus (valeurs en secondes)."""
+    lines = []
+    for row in rows:
+        labels = {"component": row["component"], "model": row["model"]}
+        for bound, count in zip(LATENCY_BUCKETS_SECONDS, row["buckets"]):
+            lines.append(f"{name}_bucket{_labels(**labels, le=repr(bound))} {count}")
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {row['count']}")
+        lines.append(f"{name}_sum{_labels(**labels)} {(row['sum'] or 0) / 1000:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {row['count']}")
+    return lines
+
+
+def _summed_lines(name: str, totals: List[Dict[str, Any]], value, decimals: int = 0, **extra: str) -> List[str]:
+    """Additionner une valeur par (component, model), tous statuts confondus."""
+    sums: Dict[Tuple[str, str], float] = {}
+    for row in totals:
+        key = (row["component"], row["model"])
+        sums[key] = sums.get(key, 0) + (value(row) or 0)
+
+    return [
+        f"{name}{_labels(component=component, model=model, **extra)} {total:.{decimals}f}"
+        for (component, model), total in sums.items()
+    ]
+
+
+def render_prometheus(db: DatabaseManager) -> str:
+    """
+    Exposer la télémétrie LLM au format texte Prometheus.
+
+    Args:
+        db: Instance de DatabaseManager.
+
+    Returns:
+        Texte au format d'exposition Prometheus (version 0.0.4).
+    """
+    totals = db.get_llm_metric_totals()
+    bounds_ms: Tuple[float, ...] = tuple(bound * 1000 for bound in LATENCY_BUCKETS_SECONDS)
+
+    lines = [
+        "# HELP serene_llm_requests_total Appels à l'API Claude.",
+        "# TYPE serene_llm_requests_total counter",
+    ]
+    for row in totals:
+        labels = _labels(component=row["component"], model=row["model"], status=row["status"])
+        lines.append(f"serene_llm_requests_total{labels} {row['requests']}")
+
+    lines += [
+        "# HELP serene_llm_retries_total Nouvelles tentatives d'appel.",
+        "# TYPE serene_llm_retries_total counter",
+    ]
+    lines += _summed_lines("serene_llm_retries_total", totals, lambda row: row["retries"])
+
+    lines += [
+        "# HELP serene_llm_tokens_total Tokens consommés par type.",
+        "# TYPE serene_llm_tokens_total counter",
+    ]
+    for kind in TOKEN_TYPES:
+        lines += _summed_lines(
+            "serene_llm_tokens_total", totals, lambda row, kind=kind: row[f"{kind}_tokens"], type=kind
+        )
+
+    lines += [
+        "# HELP serene_llm_cost_usd_total Coût estimé en dollars.",
+        "# TYPE serene_llm_cost_usd_total counter",
+    ]
+    lines += _summed_lines("serene_llm_cost_usd_total", totals, lambda row: row["cost_usd"], decimals=6)
+
+    lines += [
+        "# HELP serene_llm_calls_skipped_total Appels évités (ex: messages filtrés avant l'extraction d'actions).",
+        "# TYPE serene_llm_calls_skipped_total counter",
+    ]
+    for row in db.get_llm_skip_totals():
+        labels = _labels(component=row["component"], reason=row["reason"])
+        lines.append(f"serene_llm_calls_skipped_total{labels} {row['skipped']}")
+
+    lines += [
+        "# HELP serene_llm_latency_seconds Durée totale des appels.",
+        "# TYPE serene_llm_latency_seconds histogram",
+    ]
+    lines += _histogram_lines("serene_llm_latency_seconds", db.get_llm_histogram("latency_ms", bounds_ms))
+
+    lines += [
+        "# HELP serene_llm_ttft_seconds Temps jusqu'au premier token (streaming).",
+        "# TYPE serene_llm_ttft_seconds histogram",
+    ]
+    lines += _histogram_lines("serene_llm_ttft_seconds", db.get_llm_histogram("ttft_ms", bounds_ms))
+
+    return "\n".join(lines) + "\n"
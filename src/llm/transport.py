@@ -0,0 +1,442 @@
+"""
+Transport commun des appels à l'API Claude.
+
+Les modules de src/llm passent par un ``LLMTransport`` qui ajoute aux appels:
+- des nouvelles tentatives avec backoff exponentiel (jitter complet), en
+  respectant les en-têtes retry-after / retry-after-ms de l'API;
+- un disjoncteur partagé par le processus: après plusieurs pannes de l'API
+  (erreurs 5xx, surcharge 529, connexion, timeout), les appels échouent
+  immédiatement pendant un délai, puis un appel d'essai est autorisé;
+- optionnellement, une requête de secours (hedging) pour les appels non
+  streamés qui dépassent un délai: la première réponse reçue est retenue;
+- l'admission de chaque tentative par l'ordonnanceur du processus
+  (débit, concurrence et priorités, voir rate_limiter.py).
+
+Les nouvelles tentatives du SDK sont désactivées (client_options) pour que
+chaque tentative soit visible du disjoncteur et comptée dans la télémétrie.
+"""
+
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from anthropic import APIConnectionError, APIStatusError
+
+from src.llm.rate_limiter import Grant, LLMScheduler, estimate_request_tokens, scheduler, usage_tokens
+
+logger = logging.getLogger("serene.llm")
+
+# Valeurs par défaut (surchargées par les variables SERENE_LLM_*, voir .env.example)
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+DEFAULT_HEDGE_AFTER_SECONDS = 0.0  # 0: pas de requête de secours
+
+# Backoff: délai de base et délai maximal entre deux tentatives
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 8.0
+
+# Au-delà, un retry-after n'est pas attendu: l'erreur est retournée tout de suite
+MAX_RETRY_AFTER_SECONDS = 20.0
+
+# Codes HTTP pour lesquels une nouvelle tentative a un sens
+RETRYABLE_STATUS = frozenset({408, 409, 429})
+
+# Requêtes de secours simultanées (tous transports confondus)
+HEDGE_MAX_WORKERS = 8
+
+
+class CircuitOpenError(Exception):
+    """Levée quand le disjoncteur est ouvert: l'appel n'est pas envoyé."""
+
+
+def _env_number(name: str, default: float, cast: Callable = float):
+    try:
+        return cast(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def client_options() -> Dict[str, Any]:
+    """
+    Options du client Anthropic utilisées avec LLMTransport.
+
+    Returns:
+        max_retries=0 (les tentatives sont gérées par le transport) et le
+        timeout par requête (SERENE_LLM_TIMEOUT, secondes).
+    """
+    return {
+        "max_retries": 0,
+        "timeout": _env_number("SERENE_LLM_TIMEOUT", DEFAULT_TIMEOUT_SECONDS),
+    }
+
+
+def is_retryable(error: Exception) -> bool:
+    """Indiquer si une nouvelle tentative peut réussir (erreur transitoire)."""
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Indiquer si l'erreur révèle une API en mauvaise santé (comptée par le disjoncteur)."""
+    if isinstance(error, APIConnectionError):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Lire le délai demandé par l'API (retry-after-ms, puis retry-after).
+
+    Args:
+        error: Erreur levée par le SDK.
+
+    Returns:
+        Délai en secondes, ou None si l'en-tête est absent ou invalide.
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            retry_at = email.utils.parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _tracked_tokens(tracker: Any) -> Optional[int]:
+    """Tokens relevés par LLMCallTracker.record_usage (None si aucun usage relevé)."""
+    tokens = getattr(tracker, "tokens", None)
+    if not tokens or not any(tokens.values()):
+        return None
+    return tokens["input"] + tokens["output"] + tokens["cache_creation"]
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur à trois états: fermé, ouvert, semi-ouvert.
+
+    Fermé: les appels passent, les pannes consécutives sont comptées.
+    Ouvert (après failure_threshold pannes): les appels échouent immédiatement
+    pendant reset_timeout secondes. Semi-ouvert ensuite: un seul appel d'essai
+    passe; son succès referme le disjoncteur, son échec le rouvre.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        reset_timeout: float = DEFAULT_BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialiser le disjoncteur.
+
+        Args:
+            failure_threshold: Pannes consécutives avant ouverture.
+            reset_timeout: Durée d'ouverture en secondes.
+            clock: Horloge monotone (injectable pour les tests).
+
+        Raises:
+            ValueError: Si failure_threshold n'est pas strictement positif.
+        """
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold doit être strictement positif")
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """Créer un disjoncteur (SERENE_LLM_BREAKER_THRESHOLD, SERENE_LLM_BREAKER_RESET)."""
+        return cls(
+            failure_threshold=max(1, _env_number("SERENE_LLM_BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD, int)),
+            reset_timeout=_env_number("SERENE_LLM_BREAKER_RESET", DEFAULT_BREAKER_RESET_SECONDS),
+        )
+
+    @property
+    def state(self) -> str:
+        """État courant (l'ouverture expirée est vue comme semi-ouverte)."""
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """
+        Autoriser un appel.
+
+        Raises:
+            CircuitOpenError: Si le disjoncteur est ouvert, ou semi-ouvert avec
+                un appel d'essai déjà en cours.
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                remaining = self.reset_timeout - (self._clock() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"API Claude indisponible, nouvel essai dans {remaining:.0f} s")
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    raise CircuitOpenError("API Claude indisponible, appel d'essai en cours")
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        """Enregistrer un appel abouti (l'API a répondu)."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Disjoncteur LLM refermé")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Libérer l'appel d'essai sans conclure (erreur locale, sans réponse de l'API)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Enregistrer une panne de l'API."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("Disjoncteur LLM ouvert après %d pannes", self._failures)
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+# Disjoncteur partagé par tous les appels du processus (une seule API en amont)
+circuit_breaker = CircuitBreaker.from_env()
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge")
+        return _hedge_executor
+
+
+class LLMTransport:
+    """
+    Appels à l'API Messages avec nouvelles tentatives, disjoncteur et hedging.
+
+    Exemple:
+        transport = LLMTransport.from_env(Anthropic(api_key=key, **client_options()))
+        with LLMCallTracker(db, "insights", model, user_id) as call:
+            response = transport.create(tracker=call, model=model, ...)
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_after: float = DEFAULT_HEDGE_AFTER_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+        llm_scheduler: Optional[LLMScheduler] = None,
+    ):
+        """
+        Initialiser le transport.
+
+        Args:
+            client: Client Anthropic (de préférence créé avec client_options()).
+            max_retries: Nouvelles tentatives après le premier essai.
+            breaker: Disjoncteur (le disjoncteur partagé du processus si None).
+            hedge_after: Délai en secondes avant une requête de secours pour
+                create() (0 pour désactiver).
+            sleep: Fonction d'attente (injectable pour les tests).
+            llm_scheduler: Ordonnanceur (celui du processus si None).
+
+        Raises:
+            ValueError: Si max_retries ou hedge_after est négatif.
+        """
+        if max_retries < 0 or hedge_after < 0:
+            raise ValueError("max_retries et hedge_after doivent être positifs")
+
+        self.client = client
+        self.max_retries = max_retries
+        self.breaker = breaker or circuit_breaker
+        self.hedge_after = hedge_after
+        self._sleep = sleep
+        self.scheduler = llm_scheduler or scheduler
+
+    @classmethod
+    def from_env(cls, client: Any) -> "LLMTransport":
+        """Créer un transport configuré par SERENE_LLM_MAX_RETRIES et SERENE_LLM_HEDGE_AFTER."""
+        return cls(
+            client,
+            max_retries=max(0, _env_number("SERENE_LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES, int)),
+            hedge_after=max(0.0, _env_number("SERENE_LLM_HEDGE_AFTER", DEFAULT_HEDGE_AFTER_SECONDS)),
+        )
+
+    def _backoff(self, attempt: int, error: Exception) -> Optional[float]:
+        """Délai avant la tentative suivante (None: ne pas réessayer)."""
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return retry_after if retry_after <= MAX_RETRY_AFTER_SECONDS else None
+        return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+
+    def _call(self, attempt_call: Callable[[], Any], tracker: Any = None) -> Any:
+        """Exécuter un appel avec disjoncteur et nouvelles tentatives."""
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = attempt_call()
+            except Exception as e:
+                if is_upstream_failure(e):
+                    self.breaker.record_failure()
+                elif isinstance(e, APIStatusError):
+                    # L'API a répondu (429, 4xx): elle est joignable
+                    self.breaker.record_success()
+                else:
+                    self.breaker.release_trial()
+
+                delay = self._backoff(attempt, e) if is_retryable(e) and attempt < self.max_retries else None
+                if delay is None:
+                    raise
+                attempt += 1
+                if tracker is not None:
+                    tracker.retries = attempt
+                logger.warning(
+                    "Appel LLM en échec (%s), tentative %d dans %.2f s", type(e).__name__, attempt + 1, delay
+                )
+                self._sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def _hedged(self, func: Callable[[], Any]) -> Any:
+        """Exécuter func, et une seconde fois en parallèle si la réponse tarde."""
+        if not self.hedge_after:
+            return func()
+
+        executor = _get_hedge_executor()
+        primary = executor.submit(func)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        logger.info("Appel LLM au-delà de %.2f s, requête de secours", self.hedge_after)
+        pending = {primary, executor.submit(func)}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future_error = future.exception()
+                if future_error is None:
+                    return future.result()
+                error = error or future_error
+        raise error
+
+    def _admit(self, tracker: Any, kwargs: Dict[str, Any]) -> Grant:
+        """Attendre l'admission d'une tentative (priorité selon le composant du tracker)."""
+        return self.scheduler.acquire(
+            getattr(tracker, "component", None),
+            getattr(tracker, "user_id", None),
+            estimate_request_tokens(kwargs),
+        )
+
+    def _create_once(self, tracker: Any, kwargs: Dict[str, Any]) -> Any:
+        grant = self._admit(tracker, kwargs)
+        response = None
+        try:
+            # Une requête de secours n'est pas admise séparément: elle reste exceptionnelle
+            response = self._hedged(lambda: self.client.messages.create(**kwargs))
+            return response
+        finally:
+            # Une requête en échec ne consomme pas de tokens
+            grant.release(usage_tokens(response.usage) if response is not None else 0)
+
+    def create(self, tracker: Any = None, **kwargs: Any) -> Any:
+        """
+        Appeler messages.create (réponse complète).
+
+        Args:
+            tracker: LLMCallTracker de l'appel (reçoit le nombre de nouvelles tentatives).
+            **kwargs: Paramètres de messages.create.
+
+        Returns:
+            Réponse du SDK.
+
+        Raises:
+            CircuitOpenError: Si le disjoncteur est ouvert.
+            RateLimitTimeout: Si l'appel n'est pas admis à temps par l'ordonnanceur.
+            anthropic.APIError: Si l'appel échoue après les nouvelles tentatives.
+        """
+        return self._call(lambda: self._create_once(tracker, kwargs), tracker)
+
+    @contextmanager
+    def stream(self, tracker: Any = None, **kwargs: Any) -> Iterator[Any]:
+        """
+        Ouvrir un messages.stream (context manager).
+
+        Les nouvelles tentatives ne portent que sur l'ouverture du flux: une
+        erreur après le premier token est retournée à l'appelant, qui a déjà
+        affiché une partie de la réponse. Pas de requête de secours en streaming.
+
+        Args:
+            tracker: LLMCallTracker de l'appel (reçoit le nombre de nouvelles tentatives).
+            **kwargs: Paramètres de messages.stream.
+
+        Yields:
+            Le MessageStream du SDK.
+
+        Raises:
+            CircuitOpenError: Si le disjoncteur est ouvert.
+            RateLimitTimeout: Si l'appel n'est pas admis à temps par l'ordonnanceur.
+            anthropic.APIError: Si l'ouverture échoue après les nouvelles tentatives.
+        """
+        def open_stream():
+            grant = self._admit(tracker, kwargs)
+            try:
+                manager = self.client.messages.stream(**kwargs)
+                return grant, manager, manager.__enter__()
+            except BaseException:
+                grant.release(0)
+                raise
+
+        grant, manager, stream = self._call(open_stream, tracker)
+        try:
+            yield stream
+        finally:
+            manager.__exit__(None, None, None)
+            grant.release(_tracked_tokens(tracker))
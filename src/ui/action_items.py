@@ -6,21 +6,19 @@ Phase 2.1 : Suivi Contextuel & Mémoire de l'IA
 import streamlit as st
 import html
 from datetime import datetime, timedelta
+from functools import lru_cache
 from src.database.db_manager import DatabaseManager
-from src.ui.auth import get_current_user_id
-from src.ui.styles.serene_styles import COLORS
+from src.ui.auth import get_current_user_id, get_database
+from src.ui.styles.serene_styles import COLORS, HTML_BUILDER_CACHE_SIZE
 from src.llm.action_suggester import ActionSuggester
+from src.utils.timing import timed
 
-
-@st.cache_resource
-def get_database():
-    """
-    Singleton DatabaseManager pour toute l'application.
-
-    Returns:
-        Instance unique de DatabaseManager.
-    """
-    return DatabaseManager("serene.db")
+# Clés de session utilisées par les callbacks des fragments
+_ACTION_OVERRIDE_KEY = "action_item_override_{}"
+_PROPOSAL_OVERRIDE_KEY = "proposal_override_{}"
+_CARD_ERROR_KEY = "action_card_error_{}"
+_STATS_STALE_KEY = "action_stats_stale"
+_FULL_RERUN_KEY = "action_items_full_rerun"
 
 
 def format_datetime(timestamp_str: str) -> str:
@@ -42,6 +40,7 @@ def format_datetime(timestamp_str: str) -> str:
         return timestamp_str
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def get_status_badge(status: str) -> str:
     """
     Retourne le badge HTML pour un statut.
@@ -64,6 +63,7 @@ def get_status_badge(status: str) -> str:
     return f'<span style="background: {config["color"]}20; color: {config["color"]}; padding: 0.25rem 0.75rem; border-radius: 12px; font-size: 0.75rem; font-weight: 500; letter-spacing: 0.02em;">{config["label"]}</span>'
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def get_source_badge(source: str) -> str:
     """
     Retourne le badge HTML pour la source.
@@ -204,6 +204,175 @@ def proposed_action_card(proposal: dict, index: int) -> str:
     )
 
 
+def render_stats(placeholder, db: DatabaseManager, user_id: int) -> None:
+    """
+    Affiche (ou rafraîchit) le bandeau de statistiques dans son emplacement.
+
+    Args:
+        placeholder: Conteneur st.empty() créé en haut de la page
+        db: Instance de DatabaseManager
+        user_id: ID de l'utilisateur courant
+    """
+    stats = db.get_action_items_stats(user_id)
+    placeholder.markdown(stats_card(stats), unsafe_allow_html=True)
+
+
+def _update_action_status(action_id: int, status: str) -> None:
+    """Callback: met à jour le statut d'une action et mémorise la nouvelle ligne."""
+    db = get_database()
+    try:
+        db.update_action_item(action_id, status=status)
+        st.session_state[_ACTION_OVERRIDE_KEY.format(action_id)] = db.get_action_item_by_id(action_id)
+        st.session_state[_STATS_STALE_KEY] = True
+    except ValueError as e:
+        st.session_state[_CARD_ERROR_KEY.format(action_id)] = f"❌ Erreur: {e}"
+
+
+def _delete_action(action_id: int) -> None:
+    """Callback: supprime une action; la carte disparaît au prochain rendu du fragment."""
+    get_database().delete_action_item(action_id)
+    st.session_state[_ACTION_OVERRIDE_KEY.format(action_id)] = None
+    st.session_state[_STATS_STALE_KEY] = True
+
+
+def _accept_proposal(proposal_id: int) -> None:
+    """Callback: accepte une proposition avec l'échéance saisie sur la carte."""
+    deadline = st.session_state.get(f"deadline_{proposal_id}")
+    try:
+        deadline_str = deadline.isoformat() if deadline else None
+        get_database().accept_proposed_action(proposal_id, deadline=deadline_str)
+        st.session_state[_PROPOSAL_OVERRIDE_KEY.format(proposal_id)] = None
+        # La nouvelle action doit apparaître dans la liste: rechargement complet
+        st.session_state[_FULL_RERUN_KEY] = True
+    except ValueError as e:
+        st.session_state[_CARD_ERROR_KEY.format(f"proposal_{proposal_id}")] = f"❌ Erreur: {e}"
+    except Exception as e:
+        st.session_state[_CARD_ERROR_KEY.format(f"proposal_{proposal_id}")] = f"❌ Erreur lors de l'acceptation: {e}"
+
+
+def _reject_proposal(proposal_id: int) -> None:
+    """Callback: rejette une proposition."""
+    try:
+        get_database().reject_proposed_action(proposal_id)
+        st.session_state[_PROPOSAL_OVERRIDE_KEY.format(proposal_id)] = None
+    except ValueError as e:
+        st.session_state[_CARD_ERROR_KEY.format(f"proposal_{proposal_id}")] = f"❌ Erreur: {e}"
+    except Exception as e:
+        st.session_state[_CARD_ERROR_KEY.format(f"proposal_{proposal_id}")] = f"❌ Erreur lors du rejet: {e}"
+
+
+def _delete_proposal(proposal_id: int) -> None:
+    """Callback: supprime une proposition."""
+    get_database().delete_proposed_action(proposal_id)
+    st.session_state[_PROPOSAL_OVERRIDE_KEY.format(proposal_id)] = None
+
+
+@st.fragment
+@timed("action_items.proposal_card")
+def _proposal_fragment(proposal: dict, index: int) -> None:
+    """
+    Carte d'une proposition et ses boutons, réexécutée indépendamment du reste de la page.
+
+    Args:
+        proposal: Proposition telle que chargée au dernier rendu complet
+        index: Position de la proposition dans la liste
+    """
+    if st.session_state.pop(_FULL_RERUN_KEY, False):
+        st.rerun()
+
+    proposal = st.session_state.pop(_PROPOSAL_OVERRIDE_KEY.format(proposal["id"]), proposal)
+    if proposal is None:
+        return
+
+    error = st.session_state.pop(_CARD_ERROR_KEY.format(f"proposal_{proposal['id']}"), None)
+    if error:
+        st.error(error)
+
+    st.markdown(proposed_action_card(proposal, index), unsafe_allow_html=True)
+
+    # Boutons d'action pour la proposition
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+
+    with col1:
+        # Option d'ajouter une deadline lors de l'acceptation
+        st.date_input(
+            "Échéance (optionnel)",
+            value=None,
+            min_value=datetime.now().date(),
+            key=f"deadline_{proposal['id']}",
+            label_visibility="collapsed"
+        )
+
+    with col2:
+        st.button("✓ Accepter", key=f"accept_{proposal['id']}", type="primary",
+                  on_click=_accept_proposal, args=(proposal["id"],))
+
+    with col3:
+        st.button("✕ Rejeter", key=f"reject_{proposal['id']}",
+                  on_click=_reject_proposal, args=(proposal["id"],))
+
+    with col4:
+        st.button("🗑", key=f"delete_proposal_{proposal['id']}", help="Supprimer",
+                  on_click=_delete_proposal, args=(proposal["id"],))
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+@st.fragment
+@timed("action_items.action_card")
+def _action_fragment(action: dict, index: int, status_filter, stats_placeholder) -> None:
+    """
+    Carte d'une action et ses boutons, réexécutée indépendamment du reste de la page.
+
+    Un clic ne rafraîchit que cette carte et le bandeau de statistiques.
+
+    Args:
+        action: Action telle que chargée au dernier rendu complet
+        index: Position de l'action dans la liste
+        status_filter: Filtre de statut actif (None pour toutes)
+        stats_placeholder: Emplacement du bandeau de statistiques
+    """
+    action = st.session_state.pop(_ACTION_OVERRIDE_KEY.format(action["id"]), action)
+
+    if st.session_state.pop(_STATS_STALE_KEY, False):
+        render_stats(stats_placeholder, get_database(), get_current_user_id())
+
+    # Action supprimée, ou qui ne correspond plus au filtre actif
+    if action is None or (status_filter and action["status"] != status_filter):
+        return
+
+    error = st.session_state.pop(_CARD_ERROR_KEY.format(action["id"]), None)
+    if error:
+        st.error(error)
+
+    st.markdown(action_card(action, index), unsafe_allow_html=True)
+
+    # Boutons d'action
+    col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+
+    with col1:
+        if action["status"] != "completed":
+            st.button("✓ Marquer comme complété", key=f"complete_{action['id']}",
+                      on_click=_update_action_status, args=(action["id"], "completed"))
+
+    with col2:
+        if action["status"] == "pending":
+            st.button("▶ Commencer", key=f"start_{action['id']}",
+                      on_click=_update_action_status, args=(action["id"], "in_progress"))
+
+    with col3:
+        if action["status"] not in ["completed", "abandoned"]:
+            st.button("✕ Abandonner", key=f"abandon_{action['id']}",
+                      on_click=_update_action_status, args=(action["id"], "abandoned"))
+
+    with col4:
+        st.button("🗑", key=f"delete_{action['id']}", help="Supprimer",
+                  on_click=_delete_action, args=(action["id"],))
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+@timed("action_items.page")
 def show_action_items():
     """Afficher la page de gestion des objectifs et actions."""
 
@@ -233,9 +402,10 @@ def show_action_items():
     db = get_database()
     user_id = get_current_user_id()
 
-    # Afficher les statistiques
-    stats = db.get_action_items_stats(user_id)
-    st.markdown(stats_card(stats), unsafe_allow_html=True)
+    # Afficher les statistiques (emplacement rafraîchi par les fragments des cartes)
+    stats_placeholder = st.empty()
+    render_stats(stats_placeholder, db, user_id)
+    st.session_state.pop(_STATS_STALE_KEY, None)
 
     # ==================== PROPOSITIONS D'ACTIONS EN ATTENTE ====================
 
@@ -273,51 +443,7 @@ def show_action_items():
 
         # Afficher chaque proposition
         for i, proposal in enumerate(pending_proposals):
-            st.markdown(proposed_action_card(proposal, i), unsafe_allow_html=True)
-
-            # Boutons d'action pour la proposition
-            col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-
-            with col1:
-                # Option d'ajouter une deadline lors de l'acceptation
-                deadline_key = f"deadline_{proposal['id']}"
-                deadline = st.date_input(
-                    "Échéance (optionnel)",
-                    value=None,
-                    min_value=datetime.now().date(),
-                    key=deadline_key,
-                    label_visibility="collapsed"
-                )
-
-            with col2:
-                if st.button("✓ Accepter", key=f"accept_{proposal['id']}", type="primary"):
-                    try:
-                        deadline_str = deadline.isoformat() if deadline else None
-                        action_id = db.accept_proposed_action(proposal["id"], deadline=deadline_str)
-                        st.success(f"✅ Action ajoutée avec succès !")
-                        st.rerun()
-                    except ValueError as e:
-                        st.error(f"❌ Erreur: {e}")
-                    except Exception as e:
-                        st.error(f"❌ Erreur lors de l'acceptation: {e}")
-
-            with col3:
-                if st.button("✕ Rejeter", key=f"reject_{proposal['id']}"):
-                    try:
-                        db.reject_proposed_action(proposal["id"])
-                        st.info("Action rejetée")
-                        st.rerun()
-                    except ValueError as e:
-                        st.error(f"❌ Erreur: {e}")
-                    except Exception as e:
-                        st.error(f"❌ Erreur lors du rejet: {e}")
-
-            with col4:
-                if st.button("🗑", key=f"delete_proposal_{proposal['id']}", help="Supprimer"):
-                    db.delete_proposed_action(proposal["id"])
-                    st.rerun()
-
-            st.markdown("<br>", unsafe_allow_html=True)
+            _proposal_fragment(proposal, i)
 
         st.divider()
 
@@ -354,7 +480,9 @@ def show_action_items():
                 suggester = ActionSuggester(db)
                 result = suggester.suggest_actions(user_id)
 
-                if result and result.get("count", 0) > 0:
+                if result and result.get("cached") and result.get("count", 0) > 0:
+                    st.info("Rien n'a changé depuis tes dernières suggestions : elles t'attendent dans les propositions.")
+                elif result and result.get("count", 0) > 0:
                     st.success(f"✅ {result['count']} action(s) suggérée(s) !")
                     if result.get("message"):
                         st.info(f"💬 {result['message']}")
@@ -423,7 +551,7 @@ def show_action_items():
                         deadline=deadline_str,
                     )
                     st.success(f"✅ Action ajoutée avec succès !")
-                    st.rerun()
+                    render_stats(stats_placeholder, db, user_id)
                 except ValueError as e:
                     st.error(f"❌ Erreur de validation: {e}")
                 except Exception as e:
@@ -472,35 +600,7 @@ def show_action_items():
 
         # Afficher les actions
         for i, action in enumerate(actions):
-            st.markdown(action_card(action, i), unsafe_allow_html=True)
-
-            # Boutons d'action
-            col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
-
-            with col1:
-                if action["status"] != "completed":
-                    if st.button("✓ Marquer comme complété", key=f"complete_{action['id']}"):
-                        db.update_action_item(action["id"], status="completed")
-                        st.rerun()
-
-            with col2:
-                if action["status"] == "pending":
-                    if st.button("▶ Commencer", key=f"start_{action['id']}"):
-                        db.update_action_item(action["id"], status="in_progress")
-                        st.rerun()
-
-            with col3:
-                if action["status"] not in ["completed", "abandoned"]:
-                    if st.button("✕ Abandonner", key=f"abandon_{action['id']}"):
-                        db.update_action_item(action["id"], status="abandoned")
-                        st.rerun()
-
-            with col4:
-                if st.button("🗑", key=f"delete_{action['id']}", help="Supprimer"):
-                    db.delete_action_item(action["id"])
-                    st.rerun()
-
-            st.markdown("<br>", unsafe_allow_html=True)
+            _action_fragment(action, i, status_filter, stats_placeholder)
 
     else:
         # État vide
@@ -3,7 +3,9 @@
 import streamlit as st
 import os
 from datetime import datetime, timedelta
-from src.database.db_manager import DatabaseManager
+from src.database.query_cache import QueryCache
+from src.database.storage import open_storage
+from src.utils.profiling import profile_methods
 from src.utils.password_validator import (
     validate_password_strength,
     get_password_requirements,
@@ -14,8 +16,19 @@ from src.utils.password_validator import (
 
 @st.cache_resource
 def get_database():
-    """Singleton DatabaseManager."""
-    return DatabaseManager("serene.db")
+    """
+    Singleton de stockage partagé par toutes les pages.
+
+    Le cache de lecture est désactivé sauf si SERENE_QUERY_CACHE_TTL est
+    défini (voir .env.example). Le stockage est choisi par
+    open_storage: PostgreSQL avec SERENE_DATABASE_URL, plusieurs fichiers
+    SQLite avec SERENE_SHARD_COUNT ou SERENE_SHARD_PER_USER, sinon serene.db.
+    Avec SERENE_PROFILE=1, chaque méthode est mesurée par le profileur
+    ('db.<méthode>').
+    """
+    query_cache = QueryCache.from_env()
+    db = open_storage(query_cache)
+    return profile_methods(db, "db")
 
 
 def show_auth():
@@ -5,27 +5,22 @@ Design cohérent, maintenable et optimisé pour la santé mentale
 
 import streamlit as st
 from datetime import datetime
-from src.database.db_manager import DatabaseManager
-from src.ui.auth import get_current_user_id
-from src.ui.styles.serene_styles import COLORS
+from functools import lru_cache
+from src.ui.auth import get_current_user_id, get_database
+from src.ui.styles.serene_styles import COLORS, HTML_BUILDER_CACHE_SIZE
+from src.utils.profiling import profiled
+from src.utils.timing import timed
 from src.ui.ui_components.mood_components import (
     mood_display_card,
     stats_banner,
     history_card,
+    history_list,
     empty_state,
     page_header
 )
 
-
-@st.cache_resource
-def get_database():
-    """
-    Singleton DatabaseManager pour toute l'application.
-    
-    Returns:
-        Instance unique de DatabaseManager.
-    """
-    return DatabaseManager("serene.db")
+# Nombre de check-ins affichés par fenêtre d'historique
+HISTORY_PAGE_SIZE = 10
 
 
 def get_mood_data(mood_score: int) -> tuple[str, str, str]:
@@ -51,6 +46,7 @@ def get_mood_data(mood_score: int) -> tuple[str, str, str]:
         return "", "Excellent", COLORS['mood_excellent']
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def format_datetime(timestamp_str: str) -> tuple[str, str]:
     """
     Formate un timestamp ISO en date et heure séparées.
@@ -68,6 +64,7 @@ def format_datetime(timestamp_str: str) -> tuple[str, str]:
         return timestamp_str, ""
 
 
+@timed("checkin.page")
 def show_checkin():
     """Afficher la page de check-in avec formulaire et historique."""
 
@@ -171,21 +168,17 @@ def show_checkin():
             unsafe_allow_html=True
         )
         
-        # Affichage des check-ins
-        for i, checkin in enumerate(history):
-            mood_emoji, mood_label, mood_color = get_mood_data(checkin["mood_score"])
-            formatted_date, formatted_time = format_datetime(checkin["timestamp"])
-            
-            st.html(
-                history_card(
-                    checkin=checkin,
-                    mood_emoji=mood_emoji,
-                    mood_label=mood_label,
-                    mood_color=mood_color,
-                    formatted_date=formatted_date,
-                    formatted_time=formatted_time,
-                    index=i
-                )
+        # Affichage des check-ins: seule la fenêtre visible est générée,
+        # en un seul bloc HTML
+        visible_count = st.session_state.get("history_visible_count", HISTORY_PAGE_SIZE)
+        st.html(render_history_window(history, visible_count))
+
+        if visible_count < len(history):
+            st.button(
+                "Afficher plus",
+                key="history_show_more",
+                on_click=_show_more_history,
+                use_container_width=True
             )
     else:
         # État vide
@@ -203,6 +196,47 @@ def show_checkin():
         )
 
 
+@profiled("checkin.render_history_window")
+def render_history_window(history: list[dict], visible_count: int) -> str:
+    """
+    Génère le HTML de la fenêtre visible de l'historique.
+
+    Seuls les `visible_count` check-ins les plus récents sont transformés en HTML :
+    le coût d'un rerun ne dépend pas de la taille de l'historique.
+
+    Args:
+        history: Check-ins triés du plus récent au plus ancien
+        visible_count: Nombre de check-ins à afficher
+
+    Returns:
+        HTML du bloc d'historique
+    """
+    cards = []
+    for i, checkin in enumerate(history[:visible_count]):
+        mood_emoji, mood_label, mood_color = get_mood_data(checkin["mood_score"])
+        formatted_date, formatted_time = format_datetime(checkin["timestamp"])
+        cards.append(
+            history_card(
+                checkin=checkin,
+                mood_emoji=mood_emoji,
+                mood_label=mood_label,
+                mood_color=mood_color,
+                formatted_date=formatted_date,
+                formatted_time=formatted_time,
+                index=i
+            )
+        )
+
+    return history_list(cards, hidden_count=max(len(history) - visible_count, 0))
+
+
+def _show_more_history():
+    """Callback: agrandir la fenêtre d'historique d'une page."""
+    st.session_state.history_visible_count = (
+        st.session_state.get("history_visible_count", HISTORY_PAGE_SIZE) + HISTORY_PAGE_SIZE
+    )
+
+
 # ==================== FONCTIONS LEGACY (pour compatibilité) ====================
 # À supprimer une fois la migration terminée
 
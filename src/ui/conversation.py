@@ -1,20 +1,19 @@
 """Interface de conversation avec l'IA - Gallery Minimalist Style"""
 
+import html
 import streamlit as st
 from dotenv import load_dotenv
-from src.database.db_manager import DatabaseManager
-from src.ui.auth import get_current_user_id
+from src.database.db_manager import SEARCH_HIGHLIGHT_END, SEARCH_HIGHLIGHT_START
+from src.ui.auth import get_current_user_id, get_database
 from src.llm.conversation_manager import ConversationManager
 from src.utils.prompts import EMERGENCY_RESOURCES
+from src.utils.timing import timed
 
 # Charger les variables d'environnement
 load_dotenv()
 
-
-@st.cache_resource
-def get_database():
-    """Singleton DatabaseManager."""
-    return DatabaseManager("serene.db")
+# Nombre de résultats de recherche par page
+SEARCH_PAGE_SIZE = 10
 
 
 @st.cache_resource
@@ -24,6 +23,91 @@ def get_conversation_manager():
     return ConversationManager(db)
 
 
+def highlight_snippet(snippet: str) -> str:
+    """
+    Échapper un extrait de recherche et surligner les termes trouvés.
+
+    Args:
+        snippet: Extrait retourné par DatabaseManager.search()
+
+    Returns:
+        HTML sûr avec les termes entourés de <mark>
+    """
+    return (
+        html.escape(snippet or "")
+        .replace(SEARCH_HIGHLIGHT_START, "<mark>")
+        .replace(SEARCH_HIGHLIGHT_END, "</mark>")
+    )
+
+
+def _reset_search_page():
+    """Callback: revenir à la première page quand la recherche change."""
+    st.session_state.search_page = 0
+
+
+def _change_search_page(delta: int):
+    """Callback: page de résultats suivante ou précédente."""
+    st.session_state.search_page = max(0, st.session_state.get("search_page", 0) + delta)
+
+
+@st.fragment
+@timed("conversation.search")
+def show_search_section():
+    """Recherche plein texte dans les conversations et notes (réexécutée seule)."""
+    with st.expander(
+        "Rechercher dans mes conversations et notes",
+        expanded=bool(st.session_state.get("search_query")),
+    ):
+        query = st.text_input(
+            "Rechercher",
+            key="search_query",
+            placeholder="Ex: sommeil, anxiété au travail...",
+            label_visibility="collapsed",
+            on_change=_reset_search_page,
+        )
+        if not query.strip():
+            return
+
+        page = st.session_state.get("search_page", 0)
+        # Une ligne de plus que la page pour savoir s'il existe une page suivante
+        results = get_database().search(
+            get_current_user_id(),
+            query,
+            limit=SEARCH_PAGE_SIZE + 1,
+            offset=page * SEARCH_PAGE_SIZE,
+        )
+        has_next = len(results) > SEARCH_PAGE_SIZE
+        results = results[:SEARCH_PAGE_SIZE]
+
+        if not results:
+            st.caption("Aucun résultat.")
+            return
+
+        items = []
+        for result in results:
+            if result["source"] == "conversation":
+                label = "Conversation"
+            else:
+                label = f"Check-in · {result['mood_score']}/10"
+            items.append(
+                f"<div style='padding: 0.75rem 0; border-bottom: 1px solid var(--line-light);'>"
+                f"<div style='font-size: 0.6875rem; color: var(--gray-medium); text-transform: uppercase; "
+                f"letter-spacing: 0.05em;'>{label} · {html.escape(str(result['timestamp'])[:16])}</div>"
+                f"<div style='font-size: 0.875rem; color: var(--charcoal); line-height: 1.7;'>"
+                f"{highlight_snippet(result['snippet'])}</div></div>"
+            )
+        st.html("".join(items))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if page > 0:
+                st.button("← Précédents", key="search_prev", on_click=_change_search_page, args=(-1,))
+        with col2:
+            if has_next:
+                st.button("Suivants →", key="search_next", on_click=_change_search_page, args=(1,))
+
+
+@timed("conversation.page")
 def show_conversation():
     """Afficher la page de conversation - Gallery minimalist style."""
 
@@ -44,6 +128,8 @@ def show_conversation():
     </div>
     """, unsafe_allow_html=True)
 
+    show_search_section()
+
     try:
         manager = get_conversation_manager()
     except ValueError as e:
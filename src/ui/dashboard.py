@@ -2,12 +2,16 @@
 
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 import re
 from datetime import datetime, timedelta
-from src.database.db_manager import DatabaseManager
-from src.ui.auth import get_current_user_id
+from src.database.db_manager import choose_mood_bucket
+from src.ui.auth import get_current_user_id, get_database
 from src.llm.insights_generator import InsightsGenerator
+from src.utils.downsampling import lttb
+from src.utils.profiling import profiled
+from src.utils.timing import timed
 from src.ui.styles.serene_styles import (
     create_page_header,
     create_section_header,
@@ -113,15 +117,133 @@ def convert_markdown_to_html(text: str) -> str:
     return text
 
 
-@st.cache_resource
-def get_database():
+# Nombre maximum de points envoyés au graphique d'humeur
+MOOD_CHART_POINT_BUDGET = 200
+
+# Libellés des granularités d'agrégation
+BUCKET_LABELS = {"hour": "par heure", "day": "par jour", "week": "par semaine"}
+
+
+def style_mood_figure(fig):
     """
-    Singleton DatabaseManager pour toute l'application.
+    Appliquer le style minimaliste monochrome au graphique d'humeur.
+
+    Args:
+        fig: Figure Plotly à styliser
 
     Returns:
-        Instance unique de DatabaseManager.
+        La figure stylisée
     """
-    return DatabaseManager("serene.db")
+    fig.update_layout(
+        hovermode='x unified',
+        xaxis_title="",
+        yaxis_title="Score",
+        yaxis=dict(
+            range=[0, 11],
+            gridcolor='#E0E0E0',
+            gridwidth=0.5,
+            tickfont=dict(family='Inter', size=10, color='#6B6B6B')
+        ),
+        xaxis=dict(
+            gridcolor='#E0E0E0',
+            gridwidth=0.5,
+            tickfont=dict(family='Inter', size=10, color='#6B6B6B')
+        ),
+        height=350,
+        plot_bgcolor='#FAF8F3',
+        paper_bgcolor='#FAF8F3',
+        font=dict(family="Inter", color='#1A1A1A', size=12),
+        margin=dict(l=40, r=20, t=20, b=40),
+        coloraxis_showscale=False,  # Masquer la barre de couleur
+        showlegend=False
+    )
+    return fig
+
+
+@profiled("dashboard.build_points_figure")
+def build_points_figure(mood_data: list, budget: int = MOOD_CHART_POINT_BUDGET):
+    """
+    Construire le nuage de points des check-ins, réduit par LTTB au-delà du budget.
+
+    Args:
+        mood_data: Check-ins (du plus récent au plus ancien)
+        budget: Nombre maximum de points affichés
+
+    Returns:
+        Figure Plotly
+    """
+    df_mood = pd.DataFrame(mood_data)
+    df_mood['timestamp'] = pd.to_datetime(df_mood['timestamp'])
+    df_mood = df_mood.sort_values('timestamp')
+
+    if len(df_mood) > budget:
+        points = list(zip(df_mood['timestamp'].astype('int64'), df_mood['mood_score']))
+        kept = lttb(points, budget)
+        df_mood = pd.DataFrame({
+            'timestamp': pd.to_datetime([x for x, _ in kept]),
+            'mood_score': [y for _, y in kept],
+        })
+
+    # Graphique avec échelle de gris
+    fig = px.scatter(
+        df_mood,
+        x='timestamp',
+        y='mood_score',
+        color='mood_score',
+        color_continuous_scale=[
+            (0.0, '#4A4A4A'),   # Gris foncé pour valeurs basses
+            (0.5, '#6B6B6B'),   # Gris moyen
+            (1.0, '#2A2A2A')    # Quasi-noir pour valeurs hautes
+        ],
+        range_color=[0, 10]
+    )
+
+    # Style minimaliste - points géométriques
+    fig.update_traces(
+        mode='markers',
+        marker=dict(size=10, line=dict(color='#FAF8F3', width=1), opacity=0.9),
+        hovertemplate='<b>%{x|%d/%m/%Y à %H:%M}</b><br>Score: %{y}/10<extra></extra>'
+    )
+    return style_mood_figure(fig)
+
+
+@profiled("dashboard.build_buckets_figure")
+def build_buckets_figure(buckets: list):
+    """
+    Construire la courbe des moyennes par intervalle avec la plage min-max.
+
+    Args:
+        buckets: Intervalles agrégés (bucket_start, mean, min, max, count)
+
+    Returns:
+        Figure Plotly
+    """
+    x = pd.to_datetime([b['bucket_start'] for b in buckets])
+
+    fig = go.Figure()
+    # Plage min-max en bande grisée
+    fig.add_trace(go.Scatter(
+        x=x, y=[b['max'] for b in buckets],
+        mode='lines', line=dict(width=0), hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=x, y=[b['min'] for b in buckets],
+        mode='lines', line=dict(width=0), fill='tonexty',
+        fillcolor='rgba(74, 74, 74, 0.12)', hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=x, y=[b['mean'] for b in buckets],
+        mode='lines+markers',
+        line=dict(color='#2A2A2A', width=1.5),
+        marker=dict(size=7, color='#4A4A4A', line=dict(color='#FAF8F3', width=1)),
+        customdata=[[b['min'], b['max'], b['count']] for b in buckets],
+        hovertemplate=(
+            '<b>%{x|%d/%m/%Y}</b><br>Moyenne: %{y:.1f}/10'
+            '<br>Min: %{customdata[0]} · Max: %{customdata[1]}'
+            '<br>%{customdata[2]} check-in(s)<extra></extra>'
+        )
+    ))
+    return style_mood_figure(fig)
 
 
 def get_insights_generator(user_id: int):
@@ -138,6 +260,7 @@ def get_insights_generator(user_id: int):
     return InsightsGenerator(db, user_id)
 
 
+@timed("dashboard.page")
 def show_dashboard():
     """Afficher le dashboard - Gallery minimalist style."""
 
@@ -178,18 +301,14 @@ def show_dashboard():
     selected_days = period_options[selected_period_label]
 
     user_id = get_current_user_id()
-    mood_data = db.get_mood_history(user_id, days=selected_days)
+    # Statistiques calculées en SQL: aucune ligne brute n'est chargée ici
+    mood_stats = db.get_mood_stats(user_id, days=selected_days)
 
-    if mood_data and len(mood_data) > 0:
-        # Convertir en DataFrame pour Plotly
-        df_mood = pd.DataFrame(mood_data)
-        df_mood['timestamp'] = pd.to_datetime(df_mood['timestamp'])
-
-        # Calculer statistiques pour grande métrique centrale
-        avg_mood = df_mood['mood_score'].mean()
-        latest_mood = df_mood.iloc[0]['mood_score']
-        min_mood = df_mood['mood_score'].min()
-        max_mood = df_mood['mood_score'].max()
+    if mood_stats["count"] > 0:
+        avg_mood = mood_stats["avg"]
+        latest_mood = mood_stats["latest"]
+        min_mood = mood_stats["min"]
+        max_mood = mood_stats["max"]
 
         # Calculer le delta (comparaison avec la moyenne)
         delta = latest_mood - avg_mood
@@ -252,49 +371,24 @@ def show_dashboard():
         </h3>
         """, unsafe_allow_html=True)
 
-        # Graphique avec échelle de gris
-        fig_mood = px.scatter(
-            df_mood,
-            x='timestamp',
-            y='mood_score',
-            color='mood_score',
-            color_continuous_scale=[
-                (0.0, '#4A4A4A'),   # Gris foncé pour valeurs basses
-                (0.5, '#6B6B6B'),   # Gris moyen
-                (1.0, '#2A2A2A')    # Quasi-noir pour valeurs hautes
-            ],
-            range_color=[0, 10]
-        )
-
-        # Style minimaliste - points géométriques
-        fig_mood.update_traces(
-            mode='markers',
-            marker=dict(size=10, line=dict(color='#FAF8F3', width=1), opacity=0.9),
-            hovertemplate='<b>%{x|%d/%m/%Y à %H:%M}</b><br>Score: %{y}/10<extra></extra>'
-        )
-
-        fig_mood.update_layout(
-            hovermode='x unified',
-            xaxis_title="",
-            yaxis_title="Score",
-            yaxis=dict(
-                range=[0, 11],
-                gridcolor='#E0E0E0',
-                gridwidth=0.5,
-                tickfont=dict(family='Inter', size=10, color='#6B6B6B')
-            ),
-            xaxis=dict(
-                gridcolor='#E0E0E0',
-                gridwidth=0.5,
-                tickfont=dict(family='Inter', size=10, color='#6B6B6B')
-            ),
-            height=350,
-            plot_bgcolor='#FAF8F3',
-            paper_bgcolor='#FAF8F3',
-            font=dict(family="Inter", color='#1A1A1A', size=12),
-            margin=dict(l=40, r=20, t=20, b=40),
-            coloraxis_showscale=False  # Masquer la barre de couleur
-        )
+        # Au-delà du budget de points: série agrégée en SQL, ou points réduits par LTTB
+        if mood_stats["count"] <= MOOD_CHART_POINT_BUDGET:
+            fig_mood = build_points_figure(db.get_mood_history(user_id, days=selected_days))
+        else:
+            bucket = choose_mood_bucket(selected_days)
+            chart_mode = st.radio(
+                "Affichage du graphique",
+                options=[f"Moyenne {BUCKET_LABELS[bucket]}", "Points (échantillonnés)"],
+                key="mood_chart_mode",
+                horizontal=True,
+                label_visibility="collapsed"
+            )
+            if chart_mode.startswith("Moyenne"):
+                fig_mood = build_buckets_figure(
+                    db.get_mood_buckets(user_id, days=selected_days, bucket=bucket)
+                )
+            else:
+                fig_mood = build_points_figure(db.get_mood_history(user_id, days=selected_days))
 
         st.plotly_chart(fig_mood, use_container_width=True)
 
@@ -380,7 +474,7 @@ def show_dashboard():
     )
 
     # Vérifier si des données existent (au moins 1 check-in ou 1 conversation)
-    checkin_count = len(mood_data) if mood_data else 0
+    checkin_count = mood_stats["count"]
     conv_count = len(conv_history) if conv_history else 0
 
     if checkin_count > 0 or conv_count > 0:
@@ -1,22 +1,25 @@
 """Interface de profil utilisateur - Gallery Minimalist Style"""
 
 import streamlit as st
-import json
+import tempfile
 from datetime import datetime
-from src.database.db_manager import DatabaseManager
+from src.database.export import write_ndjson_export, write_zip_export
+from src.ui.auth import get_database
+from src.utils.timing import timed
 from src.utils.password_validator import (
     validate_password_strength,
     get_password_requirements,
     get_password_feedback
 )
 
-
-@st.cache_resource
-def get_database():
-    """Singleton DatabaseManager."""
-    return DatabaseManager("serene.db")
+# Formats d'export proposés: libellé -> (fonction d'écriture, extension, type MIME)
+EXPORT_FORMATS = {
+    "Archive ZIP (un fichier par table)": (write_zip_export, "zip", "application/zip"),
+    "NDJSON (un enregistrement par ligne)": (write_ndjson_export, "ndjson", "application/x-ndjson"),
+}
 
 
+@timed("profile.page")
 def show_profile():
     """
     Afficher la page de profil utilisateur.
@@ -447,35 +450,54 @@ def show_data_export_section(user, db):
             • Tous vos check-ins d'humeur<br/>
             • Toutes vos conversations avec l'IA<br/>
             • Tous les insights générés pour vous<br/>
+            • Vos actions et les actions proposées par l'IA<br/>
             • Horodatage de l'export
         </p>
     </div>
     """, unsafe_allow_html=True)
 
+    export_format = st.radio(
+        "Format de l'export",
+        options=list(EXPORT_FORMATS.keys()),
+        horizontal=True,
+        key="export_format",
+    )
+
     if st.button(
-        "Télécharger mes données (JSON)",
+        "Préparer mes données",
         use_container_width=True,
         type="primary"
     ):
+        writer, extension, mime = EXPORT_FORMATS[export_format]
+        progress_bar = st.progress(0.0, text="Export en cours...")
+
+        def update_progress(done: int, total: int) -> None:
+            progress_bar.progress(done / total if total else 1.0, text=f"Export en cours... {done}/{total} éléments")
+
         try:
-            # Export user data
-            export_data = db.export_user_data(user["id"])
-
-            # Convert to JSON
-            json_data = json.dumps(export_data, indent=2, ensure_ascii=False)
-
-            # Create download button
-            st.download_button(
-                label="📥 Télécharger le fichier JSON",
-                data=json_data,
-                file_name=f"serene_export_{user['email']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json",
-                use_container_width=True
-            )
+            # Export écrit en flux dans un fichier temporaire (mémoire constante)
+            with tempfile.TemporaryFile() as export_file:
+                counts = writer(db, user["id"], export_file, progress=update_progress)
+                export_file.seek(0)
+                progress_bar.empty()
+
+                # Create download button (Streamlit conserve le fichier final en mémoire)
+                st.download_button(
+                    label=f"📥 Télécharger le fichier {extension.upper()}",
+                    data=export_file.read(),
+                    file_name=f"serene_export_{user['email']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                    mime=mime,
+                    use_container_width=True
+                )
 
-            st.success(f"✅ Export généré avec succès ! ({len(export_data['check_ins'])} check-ins, {len(export_data['conversations'])} conversations, {len(export_data['insights'])} insights)")
+            st.success(
+                f"✅ Export généré avec succès ! ({counts['check_ins']} check-ins, "
+                f"{counts['conversations']} conversations, {counts['insights']} insights, "
+                f"{counts['action_items']} actions, {counts['proposed_actions']} propositions)"
+            )
 
         except Exception as e:
+            progress_bar.empty()
             st.error(f"❌ Erreur lors de l'export: {e}")
 
     st.markdown("<div style='margin-top: 2rem;'></div>", unsafe_allow_html=True)
@@ -0,0 +1,78 @@
+"""Panneau de débogage du profilage des réexécutions (SERENE_PROFILE=1)."""
+
+import json
+
+import streamlit as st
+
+from src.utils.profiling import flatten_tree, folded_stacks, is_profiling_enabled, profiler
+
+PROFILE_VIEWS = ("Dernière exécution", "Cumul")
+
+
+def profile_rows(tree: dict, name: str) -> list[dict]:
+    """
+    Préparer les lignes du tableau de profil (sections indentées par profondeur).
+
+    Args:
+        tree: Arbre agrégé (voir Span.to_tree)
+        name: Nom de la racine
+
+    Returns:
+        Lignes avec section, total, temps propre, appels et moyenne par appel
+    """
+    return [
+        {
+            "section": "· " * row["depth"] + row["name"],
+            "total (ms)": round(row["total_ms"], 1),
+            "propre (ms)": round(row["self_ms"], 1),
+            "appels": row["calls"],
+            "moyenne (ms)": round(row["total_ms"] / row["calls"], 1) if row["calls"] else 0.0,
+        }
+        for row in flatten_tree(tree, name)
+    ]
+
+
+def show_profiling_panel(current_root: str) -> None:
+    """
+    Afficher le panneau de profilage dans la sidebar (opérateurs uniquement).
+
+    Args:
+        current_root: Nom de la racine de la réexécution en cours (sélection par défaut)
+    """
+    if not is_profiling_enabled():
+        return
+
+    snapshot = profiler.snapshot()
+    names = sorted(snapshot["aggregates"])
+
+    with st.sidebar.expander("Profilage", expanded=False):
+        if not names:
+            st.caption("Aucune réexécution mesurée.")
+            return
+
+        selected = st.selectbox(
+            "Racine",
+            names,
+            index=names.index(current_root) if current_root in names else 0,
+            key="_profiling_root",
+        )
+        view = st.radio("Vue", PROFILE_VIEWS, horizontal=True, key="_profiling_view")
+        tree = snapshot["last"][selected] if view == PROFILE_VIEWS[0] else snapshot["aggregates"][selected]
+
+        st.dataframe(profile_rows(tree, selected), hide_index=True, use_container_width=True)
+
+        st.download_button(
+            "Exporter (JSON)",
+            json.dumps(snapshot, ensure_ascii=False, indent=2).encode("utf-8"),
+            file_name="serene_profile.json",
+            mime="application/json",
+            key="_profiling_json",
+        )
+        st.download_button(
+            "Exporter (folded stacks)",
+            folded_stacks(tree, selected).encode("utf-8"),
+            file_name="serene_profile.folded",
+            mime="text/plain",
+            key="_profiling_folded",
+        )
+        st.button("Réinitialiser", on_click=profiler.reset, key="_profiling_reset")
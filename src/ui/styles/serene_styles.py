@@ -4,6 +4,11 @@ Design minimaliste inspiré des galeries d'art contemporain
 Palette: ivoire, noir, gris - Esthétique Bauhaus et calme scandinave
 """
 
+import hashlib
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
 # Palette de couleurs minimaliste - Gallery Style
 COLORS = {
     # Fond - Tons ivoire doux et chaleureux
@@ -43,8 +48,13 @@ COLORS = {
 }
 
 
+@lru_cache(maxsize=1)
 def get_main_css():
-    """Retourne le CSS principal de l'application - Gallery Minimalist Style."""
+    """
+    Retourne le CSS principal de l'application - Gallery Minimalist Style.
+
+    Le résultat ne dépend que de COLORS : il est construit une seule fois par processus.
+    """
     return f"""
     <style>
     /* ==================== GOOGLE FONTS - Elegant Sans-Serif ==================== */
@@ -974,8 +984,166 @@ def get_custom_animations_css():
     """
 
 
+# Style des boutons de navigation de la sidebar - Textes simples avec barre
+NAVIGATION_CSS = """
+<style>
+/* Navigation - Textes simples avec barre fine, pas de flèches */
+section[data-testid="stSidebar"] button[kind="secondary"] {
+    background-color: transparent !important;
+    border: none !important;
+    border-left: 1px solid transparent !important;
+    border-radius: 0 !important;
+    color: var(--gray-medium) !important;
+    font-family: 'Inter', sans-serif !important;
+    font-size: 0.875rem !important;
+    font-weight: 300 !important;
+    letter-spacing: 0.03em !important;
+    text-transform: uppercase !important;
+    padding: 0.75rem 0 0.75rem 1rem !important;
+    text-align: left !important;
+    box-shadow: none !important;
+}
+
+section[data-testid="stSidebar"] button[kind="secondary"]:hover {
+    background-color: transparent !important;
+    border-left-color: var(--gray-lighter) !important;
+    color: var(--charcoal) !important;
+}
+
+/* État sélectionné - Texte noir, pas blanc */
+section[data-testid="stSidebar"] button[kind="primary"],
+section[data-testid="stSidebar"] button[kind="primary"]:active,
+section[data-testid="stSidebar"] button[kind="primary"]:focus {
+    background-color: transparent !important;
+    border: none !important;
+    border-left: 2px solid var(--black) !important;
+    border-radius: 0 !important;
+    color: var(--black) !important;
+    font-family: 'Inter', sans-serif !important;
+    font-size: 0.875rem !important;
+    font-weight: 400 !important;
+    letter-spacing: 0.03em !important;
+    text-transform: uppercase !important;
+    padding: 0.75rem 0 0.75rem 1rem !important;
+    text-align: left !important;
+    box-shadow: none !important;
+}
+
+/* Forcer la couleur du texte intérieur à noir pour l'état sélectionné */
+section[data-testid="stSidebar"] button[kind="primary"] p,
+section[data-testid="stSidebar"] button[kind="primary"] div,
+section[data-testid="stSidebar"] button[kind="primary"] span {
+    color: var(--black) !important;
+}
+
+section[data-testid="stSidebar"] button[kind="primary"]:hover {
+    background-color: transparent !important;
+}
+
+/* Pas de flèches pour la navigation */
+section[data-testid="stSidebar"] button::after,
+section[data-testid="stSidebar"] button::before {
+    content: none !important;
+    display: none !important;
+}
+</style>
+"""
+
+
+# ==================== BUNDLE CSS COMPILÉ ====================
+
+_STYLE_BLOCK_RE = re.compile(r"<style[^>]*>(.*?)</style>", re.DOTALL | re.IGNORECASE)
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+_CSS_STRING_RE = re.compile(r"""('(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")""")
+
+
+class CssBundle(NamedTuple):
+    """Thème compilé: balise <style> minifiée et empreinte de son contenu."""
+
+    html: str
+    digest: str
+
+
+def minify_css(css: str) -> str:
+    """
+    Minifie une feuille de style (commentaires, espaces superflus).
+
+    Les chaînes entre guillemets (ex: content: '\\f058  ') sont conservées telles
+    quelles. Les espaces autour de ':' ne sont retirés qu'après le deux-points pour
+    ne pas transformer un sélecteur descendant (".a :hover") en pseudo-classe.
+
+    Args:
+        css: CSS brut
+
+    Returns:
+        CSS minifié
+    """
+    parts = _CSS_STRING_RE.split(_CSS_COMMENT_RE.sub("", css))
+    for i in range(0, len(parts), 2):
+        chunk = re.sub(r"\s+", " ", parts[i])
+        chunk = _CSS_PUNCTUATION_RE.sub(r"\1", chunk)
+        parts[i] = re.sub(r":\s+", ":", chunk)
+    return "".join(parts).replace(";}", "}").strip()
+
+
+def strip_html_whitespace(html: str) -> str:
+    """
+    Supprime l'indentation et les sauts de ligne d'un fragment HTML.
+
+    Le navigateur fusionne de toute façon les espaces consécutifs : le rendu est
+    identique mais le message envoyé à chaque rerun est plus léger.
+
+    Args:
+        html: Fragment HTML
+
+    Returns:
+        HTML compacté
+    """
+    html = re.sub(r"\s+", " ", html)
+    return re.sub(r">\s+<", "><", html).strip()
+
+
+@lru_cache(maxsize=128)
+def compact_html(html: str) -> str:
+    """
+    Version mise en cache de strip_html_whitespace() pour les fragments statiques.
+
+    Args:
+        html: Fragment HTML (littéral de la page)
+
+    Returns:
+        HTML compacté
+    """
+    return strip_html_whitespace(html)
+
+
+@lru_cache(maxsize=1)
+def get_main_css_bundle() -> CssBundle:
+    """
+    Compile le thème complet (CSS principal + navigation) une fois par processus.
+
+    Seules les balises <style> sont conservées : le <script> de get_main_css() n'est
+    jamais exécuté par Streamlit lorsqu'il est injecté via st.markdown/st.html.
+    Le bundle ne contenant que du style, st.html l'envoie dans le conteneur
+    d'événements sans occuper de place dans la page.
+
+    Returns:
+        CssBundle avec le HTML à injecter et l'empreinte (sha256 tronqué) du CSS
+    """
+    raw_css = "".join(_STYLE_BLOCK_RE.findall(get_main_css() + NAVIGATION_CSS))
+    css = minify_css(raw_css)
+    digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+    return CssBundle(html=f'<style id="serene-theme-{digest}">{css}</style>', digest=digest)
+
+
 # ==================== COMPOSANTS HTML RÉUTILISABLES ====================
 
+# Taille maximale des caches LRU des générateurs HTML (une entrée par jeu d'arguments)
+HTML_BUILDER_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def create_section_header(icon: str, title: str, subtitle: str = "") -> str:
     """
     Crée un en-tête de section avec icône et titre.
@@ -996,6 +1164,7 @@ def create_section_header(icon: str, title: str, subtitle: str = "") -> str:
     return f"<h2 style='font-family: \"Cormorant Garamond\", serif; font-size: 2rem; font-weight: 300; color: var(--black); margin-bottom: {margin_bottom}; letter-spacing: 0.02em;'><i class=\"{icon}\" style='margin-right: 0.75rem; opacity: 0.65; font-size: 1.75rem;'></i>{title}</h2>{subtitle_html}"
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def create_page_header(title: str, description: str) -> str:
     """
     Crée l'en-tête principal d'une page.
@@ -1010,6 +1179,7 @@ def create_page_header(title: str, description: str) -> str:
     return f"<div style='animation: fadeInDown 0.4s ease-out; margin-bottom: 3rem; padding-bottom: 2rem; border-bottom: 1px solid var(--line-light);'><h1 style='font-family: \"Cormorant Garamond\", serif; font-size: 3rem; color: var(--black); font-weight: 300; margin-bottom: 1rem; letter-spacing: 0.02em; line-height: 1.1;'>{title}</h1><p style='font-family: \"Inter\", sans-serif; font-size: 0.9375rem; color: var(--gray-dark); margin: 0; line-height: 1.8; font-weight: 300; max-width: 600px;'>{description}</p></div>"
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def create_metric_card_large(label: str, value: str, unit: str, delta: float = None) -> str:
     """
     Crée une grande carte métrique centrale.
@@ -1036,6 +1206,7 @@ def create_metric_card_large(label: str, value: str, unit: str, delta: float = N
     </div>"""
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def create_metric_card_small(label: str, value: str, unit: str, animation_delay: str = "0.5s") -> str:
     """
     Crée une petite carte métrique.
@@ -1052,6 +1223,7 @@ def create_metric_card_small(label: str, value: str, unit: str, animation_delay:
     return f"<div style='background-color: var(--white); padding: 1.5rem; text-align: center; border: 1px solid var(--line-light); box-shadow: var(--shadow-subtle); animation: fadeInUp {animation_delay} ease-out;'><div style='font-family: \"Inter\", sans-serif; color: var(--gray-light); font-size: 0.6875rem; text-transform: uppercase; letter-spacing: 0.1em; margin-bottom: 0.75rem; font-weight: 400;'>{label}</div><div style='font-family: \"Cormorant Garamond\", serif; color: var(--black); font-size: 2.5rem; font-weight: 300;'>{value}</div><div style='font-family: \"Inter\", sans-serif; color: var(--gray-medium); font-size: 0.75rem; font-weight: 300;'>{unit}</div></div>"
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def create_empty_state(title: str, description: str) -> str:
     """
     Crée un état vide élégant.
@@ -1096,6 +1268,7 @@ def create_insight_loading_skeleton() -> str:
     return "<div style='margin-bottom: 1rem;'><div class='skeleton' style='height: 1.5rem; width: 70%; margin-bottom: 1rem;'></div><div class='skeleton' style='height: 1rem; width: 100%; margin-bottom: 0.5rem;'></div><div class='skeleton' style='height: 1rem; width: 95%; margin-bottom: 0.5rem;'></div><div class='skeleton' style='height: 1rem; width: 85%;'></div></div><p style='color: var(--color-primary); font-size: 0.9rem; text-align: center; margin-top: 1.5rem;'>Génération de vos insights personnalisés...</p>"
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def create_insight_content(formatted_content: str) -> str:
     """
     Crée le contenu formaté d'un insight.
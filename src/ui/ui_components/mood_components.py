@@ -4,9 +4,13 @@ Design minimaliste inspiré des galeries d'art et étiquettes de musée
 Style: Bauhaus + Calme scandinave + Haute typographie
 """
 
-from src.ui.styles.serene_styles import COLORS
+from functools import lru_cache
+from typing import Iterable
 
+from src.ui.styles.serene_styles import COLORS, HTML_BUILDER_CACHE_SIZE, strip_html_whitespace
 
+
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def mood_display_card(mood_score: int, mood_emoji: str, mood_label: str, mood_color: str) -> str:
     """
     Génère le HTML pour l'affichage du mood actuel - Gallery minimal style.
@@ -60,6 +64,7 @@ def mood_display_card(mood_score: int, mood_emoji: str, mood_label: str, mood_co
     """
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def stats_banner(total_checkins: int) -> str:
     """
     Génère le HTML pour la bannière de statistiques - Museum label style.
@@ -131,10 +136,35 @@ def history_card(
     Returns:
         HTML string du composant
     """
+    return _history_card_html(
+        checkin["mood_score"],
+        checkin.get("notes") or "",
+        mood_label,
+        formatted_date,
+        formatted_time,
+        index,
+    )
+
+
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
+def _history_card_html(
+    mood_score: int,
+    notes: str,
+    mood_label: str,
+    formatted_date: str,
+    formatted_time: str,
+    index: int
+) -> str:
+    """
+    Construit (et met en cache) le HTML d'une carte d'historique.
+
+    Le dict du check-in n'étant pas hashable, history_card() en extrait les
+    seuls champs affichés pour servir de clé au cache.
+    """
     notes_html = ""
-    if checkin.get("notes"):
+    if notes:
         # Échapper les caractères HTML pour éviter les problèmes
-        safe_notes = (str(checkin['notes'])
+        safe_notes = (str(notes)
                      .replace('&', '&amp;')
                      .replace('<', '&lt;')
                      .replace('>', '&gt;')
@@ -161,9 +191,9 @@ def history_card(
     animation_delay = index * 0.05
 
     # Petit marqueur géométrique pour le score
-    marker_size = min(8 + checkin["mood_score"], 16)
+    marker_size = min(8 + mood_score, 16)
 
-    return f"""
+    return strip_html_whitespace(f"""
     <div class="history-card" style="
         background-color: {COLORS['white']};
         padding: 1.5rem 2rem;
@@ -207,7 +237,7 @@ def history_card(
                         color: {COLORS['black']};
                         line-height: 1;
                     ">
-                        {checkin["mood_score"]}
+                        {mood_score}
                     </div>
                     <div style="
                         font-family: 'Inter', sans-serif;
@@ -225,9 +255,35 @@ def history_card(
             </div>
         </div>
     </div>
+    """)
+
+
+def history_list(cards: Iterable[str], hidden_count: int = 0) -> str:
+    """
+    Assemble des cartes d'historique en un seul bloc HTML.
+
+    Un seul appel st.html pour toute la fenêtre visible au lieu d'un appel par carte.
+
+    Args:
+        cards: HTML des cartes à afficher (fenêtre visible uniquement)
+        hidden_count: Nombre de check-ins hors de la fenêtre (affiché en pied de liste)
+
+    Returns:
+        HTML string du composant
     """
+    footer_html = ""
+    if hidden_count > 0:
+        footer_html = (
+            f"<div style=\"font-family: 'Inter', sans-serif; font-size: 0.6875rem; "
+            f"color: {COLORS['gray_light']}; letter-spacing: 0.1em; text-transform: uppercase; "
+            f"text-align: center; margin-top: 0.5rem;\">"
+            f"{hidden_count} check-in(s) plus ancien(s)</div>"
+        )
+
+    return f'<div class="history-list">{"".join(cards)}{footer_html}</div>'
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def empty_state(
     icon: str = "",
     title: str = "Votre journal de bien-être vous attend",
@@ -323,6 +379,7 @@ def empty_state(
     """
 
 
+@lru_cache(maxsize=HTML_BUILDER_CACHE_SIZE)
 def page_header(title: str, emoji: str, description: str) -> str:
     """
     Génère le HTML pour l'en-tête de page - Gallery title style.
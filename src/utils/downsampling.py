@@ -0,0 +1,68 @@
+"""
+Réduction du nombre de points d'une série pour l'affichage.
+
+Implémente l'algorithme LTTB (Largest-Triangle-Three-Buckets), qui conserve
+la forme visuelle d'une série (pics et creux) avec un nombre de points borné.
+"""
+
+from typing import List, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """
+    Réduire une série à au plus `threshold` points avec LTTB.
+
+    Args:
+        points: Points (x, y) triés par x croissant.
+        threshold: Nombre maximum de points à conserver (>= 3).
+
+    Returns:
+        Liste des points conservés, incluant toujours le premier et le dernier.
+
+    Raises:
+        ValueError: Si threshold est inférieur à 3.
+    """
+    if threshold < 3:
+        raise ValueError(f"threshold doit être au moins 3, reçu: {threshold}")
+
+    n = len(points)
+    if n <= threshold:
+        return list(points)
+
+    sampled = [points[0]]
+    # Les points intermédiaires sont répartis en (threshold - 2) intervalles
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0  # Index du dernier point retenu
+
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        # Moyenne de l'intervalle suivant (ou dernier point)
+        next_start = end
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            avg_x, avg_y = points[n - 1]
+        else:
+            count = next_end - next_start
+            avg_x = sum(p[0] for p in points[next_start:next_end]) / count
+            avg_y = sum(p[1] for p in points[next_start:next_end]) / count
+
+        ax, ay = points[a]
+        best_area = -1.0
+        best_index = start
+        for j in range(start, end):
+            x, y = points[j]
+            # Double de l'aire du triangle (a, j, moyenne suivante)
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best_index = j
+
+        sampled.append(points[best_index])
+        a = best_index
+
+    sampled.append(points[n - 1])
+    return sampled
@@ -0,0 +1,296 @@
+"""
+Profilage des réexécutions Streamlit (mode opérateur, désactivé par défaut).
+
+Activé par SERENE_PROFILE=1. Chaque réexécution (ou fragment) ouvre une
+mesure racine; les sections imbriquées (pages, méthodes de DatabaseManager,
+construction des graphiques...) y ajoutent des mesures enfants, ce qui donne
+un arbre de temps par réexécution, comparable à un flame graph.
+
+Les arbres sont agrégés par nom de racine (temps total, temps propre et nombre
+d'appels par chemin), consultables dans le panneau de débogage et exportables
+en JSON (SERENE_PROFILE_DIR) ou au format "folded stacks" (flamegraph.pl,
+speedscope).
+
+Mode désactivé: ``span`` ne mesure rien et ``profile_methods`` ne modifie pas
+l'objet, le coût est celui d'une lecture de variable.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+# Nombre de profils bruts conservés (les agrégats sont conservés sans limite)
+MAX_RECENT_PROFILES = 50
+
+
+def is_profiling_enabled() -> bool:
+    """Vérifier si le profilage est activé (SERENE_PROFILE)."""
+    return os.getenv("SERENE_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class Span:
+    """Mesure d'une section et de ses sous-sections."""
+
+    __slots__ = ("name", "elapsed_ms", "children", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.elapsed_ms = 0.0
+        self.children: List["Span"] = []
+        self._start = time.perf_counter()
+
+    def stop(self) -> None:
+        self.elapsed_ms = (time.perf_counter() - self._start) * 1000
+
+    def to_tree(self) -> Dict[str, Any]:
+        """
+        Convertir la mesure en arbre agrégé (enfants de même nom fusionnés).
+
+        Returns:
+            Dict avec total_ms, self_ms, calls et children (nom -> sous-arbre).
+        """
+        tree = _empty_node()
+        tree["total_ms"] = self.elapsed_ms
+        tree["calls"] = 1
+        for child in self.children:
+            _merge(tree["children"].setdefault(child.name, _empty_node()), child.to_tree())
+        tree["self_ms"] = max(
+            0.0, self.elapsed_ms - sum(node["total_ms"] for node in tree["children"].values())
+        )
+        return tree
+
+
+def _empty_node() -> Dict[str, Any]:
+    return {"total_ms": 0.0, "self_ms": 0.0, "calls": 0, "children": {}}
+
+
+def _merge(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """Additionner l'arbre source dans l'arbre cible."""
+    target["total_ms"] += source["total_ms"]
+    target["self_ms"] += source["self_ms"]
+    target["calls"] += source["calls"]
+    for name, child in source["children"].items():
+        _merge(target["children"].setdefault(name, _empty_node()), child)
+
+
+class Profiler:
+    """Collecte des mesures: pile par thread, agrégats partagés par le processus."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._aggregates: Dict[str, Dict[str, Any]] = {}
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self._recent: deque = deque(maxlen=MAX_RECENT_PROFILES)
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Optional[Span]]:
+        """
+        Mesurer une section. Sans mesure active, la section devient une racine.
+
+        Args:
+            name: Nom de la section (ex: 'page.dashboard', 'db.get_mood_history').
+
+        Yields:
+            La mesure (son nom peut être modifié avant la fin, ex: racine renommée).
+        """
+        stack = self._stack()
+        current = Span(name)
+        if stack:
+            stack[-1].children.append(current)
+        stack.append(current)
+        try:
+            yield current
+        finally:
+            current.stop()
+            stack.pop()
+            if not stack:
+                self._record(current)
+
+    def _record(self, root: Span) -> None:
+        """Agréger une mesure racine terminée."""
+        tree = root.to_tree()
+        with self._lock:
+            _merge(self._aggregates.setdefault(root.name, _empty_node()), tree)
+            self._last[root.name] = tree
+            self._recent.append({"name": root.name, "recorded_at": time.time(), "tree": tree})
+
+        directory = os.getenv("SERENE_PROFILE_DIR")
+        if directory:
+            try:
+                self.dump_json(os.path.join(directory, "serene_profile.json"))
+            except OSError as e:
+                print(f"Erreur d'écriture du profil: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Obtenir une copie des profils collectés.
+
+        Returns:
+            Dict avec aggregates (nom de racine -> arbre cumulé), last (dernier
+            arbre par racine) et recent (derniers profils bruts).
+        """
+        with self._lock:
+            return json.loads(json.dumps({
+                "aggregates": self._aggregates,
+                "last": self._last,
+                "recent": list(self._recent),
+            }))
+
+    def dump_json(self, path: str) -> None:
+        """
+        Écrire les profils collectés en JSON (écriture atomique par renommage).
+
+        Args:
+            path: Chemin du fichier JSON.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def reset(self) -> None:
+        """Oublier tous les profils collectés."""
+        with self._lock:
+            self._aggregates.clear()
+            self._last.clear()
+            self._recent.clear()
+
+
+profiler = Profiler()
+
+
+@contextmanager
+def span(name: str) -> Iterator[Optional[Span]]:
+    """
+    Mesurer une section si le profilage est activé.
+
+    Args:
+        name: Nom de la section.
+
+    Yields:
+        La mesure, ou None si le profilage est désactivé.
+    """
+    if not is_profiling_enabled():
+        yield None
+        return
+    with profiler.span(name) as current:
+        yield current
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """
+    Décorateur mesurant chaque appel de la fonction comme une section.
+
+    Args:
+        name: Nom de la section.
+
+    Returns:
+        Décorateur préservant la signature de la fonction.
+    """
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_profiling_enabled():
+                return func(*args, **kwargs)
+            with profiler.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def profile_methods(obj: Any, prefix: str) -> Any:
+    """
+    Mesurer toutes les méthodes publiques d'un objet (ex: DatabaseManager).
+
+    Les méthodes sont remplacées sur l'instance uniquement; sans profilage
+    activé, l'objet est retourné tel quel.
+
+    Args:
+        obj: Objet à instrumenter.
+        prefix: Préfixe des noms de section (ex: 'db').
+
+    Returns:
+        L'objet, instrumenté si le profilage est activé.
+    """
+    if not is_profiling_enabled():
+        return obj
+
+    for name in dir(type(obj)):
+        if name.startswith("_"):
+            continue
+        attribute = getattr(obj, name)
+        if callable(attribute):
+            setattr(obj, name, profiled(f"{prefix}.{name}")(attribute))
+    return obj
+
+
+def flatten_tree(tree: Dict[str, Any], name: str) -> List[Dict[str, Any]]:
+    """
+    Aplatir un arbre en lignes (parcours en profondeur, enfants les plus coûteux d'abord).
+
+    Args:
+        tree: Arbre agrégé (voir Span.to_tree).
+        name: Nom de la racine.
+
+    Returns:
+        Liste de dicts contenant: depth, name, total_ms, self_ms, calls.
+    """
+    rows = []
+
+    def visit(node: Dict[str, Any], node_name: str, depth: int) -> None:
+        rows.append({
+            "depth": depth,
+            "name": node_name,
+            "total_ms": node["total_ms"],
+            "self_ms": node["self_ms"],
+            "calls": node["calls"],
+        })
+        children = sorted(node["children"].items(), key=lambda item: -item[1]["total_ms"])
+        for child_name, child in children:
+            visit(child, child_name, depth + 1)
+
+    visit(tree, name, 0)
+    return rows
+
+
+def folded_stacks(tree: Dict[str, Any], name: str) -> str:
+    """
+    Convertir un arbre au format "folded stacks" (temps propre en microsecondes).
+
+    Format lu par flamegraph.pl et speedscope: "racine;enfant;petit-enfant valeur".
+
+    Args:
+        tree: Arbre agrégé.
+        name: Nom de la racine.
+
+    Returns:
+        Une ligne par chemin.
+    """
+    lines = []
+
+    def visit(node: Dict[str, Any], path: str) -> None:
+        self_us = round(node["self_ms"] * 1000)
+        if self_us > 0:
+            lines.append(f"{path} {self_us}")
+        for child_name, child in node["children"].items():
+            visit(child, f"{path};{child_name}")
+
+    visit(tree, name)
+    return "\n".join(lines)
@@ -1,5 +1,8 @@
 """Prompts et constantes pour les conversations avec l'IA."""
 
+# Modèle Claude utilisé par tous les composants
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+
 CONVERSATION_SYSTEM_PROMPT = """
 Tu es Serene, un compagnon d'IA bienveillant spécialisé dans le soutien au bien-être mental.
 
@@ -27,6 +30,25 @@ STYLE:
 - Tutoiement
 """
 
+MEMORY_CONTEXT_PROMPT = """
+SOUVENIRS PERTINENTS (échanges plus anciens avec l'utilisateur, retrouvés pour ce message):
+{memories}
+
+Utilise ces souvenirs avec tact, seulement s'ils aident à répondre au message actuel.
+"""
+
+# Mode fusionné: la réponse se termine par les actions détectées (bloc retiré avant affichage)
+FUSED_ACTIONS_PROMPT = """
+ACTIONS DÉTECTÉES (bloc technique, jamais montré à l'utilisateur):
+Après ta réponse, ajoute sur une dernière ligne un bloc <actions>…</actions> contenant UNIQUEMENT un JSON valide:
+<actions>{"actions": [{"title": "titre court (max 100 caractères)", "description": "description optionnelle"}]}</actions>
+- N'y mets que les intentions claires et actionnables exprimées par l'utilisateur dans son dernier message
+  ("je vais", "j'ai décidé", "je dois"...): habitudes, actions relationnelles, projets concrets
+- Exclus les souhaits vagues, l'auto-critique et les réflexions passées
+- Si aucune action n'est identifiable: <actions>{"actions": []}</actions>
+- Ne mentionne jamais ce bloc dans ta réponse
+"""
+
 CRISIS_KEYWORDS = [
     "suicide", "me tuer", "en finir",
     "mourir", "disparaître", "me faire du mal",
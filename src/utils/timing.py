@@ -0,0 +1,50 @@
+"""
+Mesure du temps de rendu des sections de l'interface.
+
+Chaque exécution d'une fonction décorée par ``timed`` est journalisée sur le
+logger ``serene.timing`` (niveau INFO), ce qui permet de comparer le coût
+d'une réexécution partielle (fragment) à celui d'une page complète.
+Lorsque le profilage est activé (voir src.utils.profiling), la fonction est
+aussi mesurée comme une section de l'arbre de la réexécution.
+"""
+
+import functools
+import logging
+import time
+from typing import Callable, Dict, TypeVar
+
+from src.utils.profiling import span
+
+logger = logging.getLogger("serene.timing")
+
+F = TypeVar("F", bound=Callable)
+
+# Dernière durée mesurée (en millisecondes) par nom de section
+last_timings: Dict[str, float] = {}
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """
+    Décorateur mesurant la durée d'exécution d'une fonction de rendu.
+
+    Args:
+        name: Nom de la section, repris dans le journal
+
+    Returns:
+        Décorateur préservant la signature de la fonction
+    """
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with span(name):
+                    return func(*args, **kwargs)
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                last_timings[name] = elapsed_ms
+                logger.info("%s rendu en %.1f ms", name, elapsed_ms)
+
+        return wrapper
+
+    return decorator
@@ -4,6 +4,16 @@ import pytest
 from src.database.db_manager import DatabaseManager
 
 
+class FakeClock:
+    """Horloge monotone contrôlée par le test (avancer via now)."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
 @pytest.fixture
 def mock_db():
     """
@@ -31,3 +41,27 @@ def sample_checkins(mock_db):
     for i in range(5):
         mock_db.save_checkin(mood_score=5 + i % 6, notes=f"Test note {i}")
     return mock_db
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """
+    Fixture: DatabaseManager sur fichier, initialisé avec schema.sql.
+
+    Yields:
+        Instance de DatabaseManager utilisant le schéma complet (users, user_id...).
+    """
+    db = DatabaseManager(str(tmp_path / "serene_test.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def user_id(file_db):
+    """
+    Fixture: utilisateur de test enregistré dans file_db.
+
+    Returns:
+        ID de l'utilisateur créé.
+    """
+    return file_db.create_user("test@example.com", "Passw0rd!", "Test")
@@ -0,0 +1,103 @@
+"""Tests unitaires pour le filtre local de l'extraction d'actions."""
+
+import pytest
+
+from benchmarks.prefilter_eval import DEFAULT_SAMPLE, evaluate, load_sample
+from benchmarks.stub_server import StubLLMServer
+from src.llm.action_prefilter import (
+    DEFAULT_PREFILTER_THRESHOLD,
+    actionability_score,
+    should_extract,
+    threshold_from_env,
+)
+from src.llm.telemetry import render_prometheus
+
+
+@pytest.fixture
+def extractor(file_db, monkeypatch):
+    """Fixture: ActionExtractor branché sur le serveur LLM local."""
+    from src.llm.action_extractor import ActionExtractor
+
+    with StubLLMServer(ttft_seconds=0, token_delay_seconds=0, json_response='{"actions": []}') as stub:
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.base_url)
+        instance = ActionExtractor(file_db, prefilter_threshold=DEFAULT_PREFILTER_THRESHOLD)
+        instance.stub = stub
+        yield instance
+
+
+class TestActionabilityScore:
+    """Tests pour le score d'actionnabilité."""
+
+    @pytest.mark.parametrize("message", ["merci", "Ok !", "d'accord", "Bonjour Serene", "bonne nuit", ""])
+    def test_acknowledgments_score_zero(self, message):
+        """Tester qu'un remerciement ou une salutation n'est jamais envoyé."""
+        assert actionability_score(message) == 0.0
+
+    @pytest.mark.parametrize("message", [
+        "Je vais essayer de méditer 10 minutes par jour",
+        "J'ai décidé d'appeler ma mère chaque dimanche",
+        "Je méditerai demain matin",
+        "Il faut que je prenne rendez-vous chez le médecin",
+        "Mon objectif: marcher 30 minutes par jour",
+        "Je devrais aller marcher plus souvent",
+        "Rappelle-moi de boire de l'eau",
+        "Prendre rdv chez le dentiste",
+        "Je me suis inscrit à la salle",
+    ])
+    def test_intentions_pass(self, message):
+        """Tester que les intentions d'action dépassent le seuil par défaut."""
+        assert should_extract(message, DEFAULT_PREFILTER_THRESHOLD)
+
+    def test_venting_is_filtered(self):
+        """Tester qu'un récit sans intention est filtré."""
+        assert not should_extract("Je suis stressé par mes examens", DEFAULT_PREFILTER_THRESHOLD)
+
+    def test_accents_and_apostrophes_ignored(self):
+        """Tester l'équivalence des accents et des apostrophes typographiques."""
+        assert actionability_score("J’ai décidé de marcher") == actionability_score("j'ai decide de marcher")
+
+    def test_zero_threshold_disables(self):
+        """Tester qu'un seuil nul envoie tous les messages."""
+        assert should_extract("merci", 0)
+
+    def test_threshold_from_env(self, monkeypatch):
+        """Tester la lecture du seuil (valeur invalide: défaut)."""
+        monkeypatch.setenv("SERENE_ACTION_PREFILTER_THRESHOLD", "0.5")
+        assert threshold_from_env() == 0.5
+        monkeypatch.setenv("SERENE_ACTION_PREFILTER_THRESHOLD", "abc")
+        assert threshold_from_env() == DEFAULT_PREFILTER_THRESHOLD
+
+
+class TestEvaluation:
+    """Tests pour l'évaluation sur l'échantillon annoté."""
+
+    def test_default_threshold_keeps_recall(self):
+        """Tester qu'aucun message actionnable de l'échantillon n'est filtré au seuil par défaut."""
+        result = evaluate(load_sample(DEFAULT_SAMPLE), DEFAULT_PREFILTER_THRESHOLD)
+
+        assert result["recall"] == 1.0
+        assert result["skipped_ratio"] > 0.4
+
+
+class TestExtractorGate:
+    """Tests pour l'intégration dans ActionExtractor."""
+
+    def test_skipped_message_makes_no_call(self, extractor, file_db, user_id):
+        """Tester qu'un message filtré n'appelle pas l'API et est compté."""
+        assert extractor.extract_actions_from_message("merci !", user_id) == []
+        assert extractor.extract_actions_from_message("ok", user_id) == []
+
+        assert extractor.stub.requests == 0
+        assert file_db.get_llm_skip_totals() == [
+            {"component": "action_extraction", "reason": "prefilter", "skipped": 2}
+        ]
+        assert (
+            'serene_llm_calls_skipped_total{component="action_extraction",reason="prefilter"} 2'
+            in render_prometheus(file_db)
+        )
+
+    def test_actionable_message_is_sent(self, extractor, user_id):
+        """Tester qu'une intention d'action est envoyée au modèle."""
+        extractor.extract_actions_from_message("Je vais courir demain matin", user_id)
+        assert extractor.stub.requests == 1
@@ -0,0 +1,65 @@
+"""Tests unitaires pour les statistiques d'actions tenues par triggers."""
+
+from action_stats import check_stats
+from src.database.db_manager import DatabaseManager
+
+
+class TestActionStatsTriggers:
+    """Tests pour la mise à jour des compteurs par les triggers."""
+
+    def test_counters_follow_writes(self, file_db, user_id):
+        """Tester les compteurs après création, changement de statut et suppression."""
+        first = file_db.save_action_item(user_id, "Marcher")
+        second = file_db.save_action_item(user_id, "Lire")
+        file_db.update_action_item(first, status="completed")
+        file_db.update_action_item(second, title="Lire 10 pages")
+        file_db.delete_action_item(second)
+
+        assert file_db.get_action_items_stats(user_id) == {
+            "pending": 0, "in_progress": 0, "completed": 1, "abandoned": 0, "total": 1,
+        }
+        assert file_db.check_action_stats() == []
+
+    def test_owner_change_moves_counters(self, file_db, user_id):
+        """Tester qu'un changement de propriétaire déplace les compteurs."""
+        other_id = file_db.create_user("autre@example.com", "Passw0rd!", "Autre")
+        action_id = file_db.save_action_item(user_id, "Marcher")
+
+        file_db.conn.execute("UPDATE action_items SET user_id = ? WHERE id = ?", (other_id, action_id))
+
+        assert file_db.get_action_items_stats(user_id)["total"] == 0
+        assert file_db.get_action_items_stats(other_id)["pending"] == 1
+
+    def test_unknown_user_has_zero_stats(self, file_db):
+        """Tester les compteurs d'un utilisateur sans action."""
+        assert set(file_db.get_action_items_stats(999).values()) == {0}
+
+
+class TestConsistencyCheck:
+    """Tests pour la vérification et la réparation des compteurs."""
+
+    def test_drift_detected_and_repaired(self, file_db, user_id, capsys):
+        """Tester la détection puis la réparation d'un écart."""
+        file_db.save_action_item(user_id, "Marcher")
+        file_db.conn.execute("UPDATE action_item_stats SET pending = 5, total = 5")
+
+        [drift] = file_db.check_action_stats()
+        assert drift["stored"]["pending"] == 5
+        assert drift["actual"]["pending"] == 1
+        assert check_stats(file_db, repair=False) == 1
+
+        assert check_stats(file_db, repair=True) == 0
+        assert file_db.get_action_items_stats(user_id)["total"] == 1
+        assert file_db.check_action_stats() == []
+        assert "recalculé" in capsys.readouterr().out
+
+    def test_existing_database_backfilled(self, file_db, user_id):
+        """Tester le calcul des compteurs d'une base créée avant la table."""
+        file_db.save_action_item(user_id, "Marcher")
+        file_db.save_action_item(user_id, "Lire")
+        file_db.conn.execute("DROP TABLE action_item_stats")
+        file_db.conn.commit()
+
+        reopened = DatabaseManager(file_db.db_path)
+
+        assert reopened.get_action_items_stats(user_id)["pending"] == 2
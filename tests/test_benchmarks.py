@@ -0,0 +1,164 @@
+"""Tests unitaires pour l'outillage de benchmarks."""
+
+import os
+import shutil
+import sqlite3
+import threading
+
+import pytest
+from anthropic import Anthropic
+
+from benchmarks.harness import compare, load_results, measure, save_results
+from benchmarks.load import EXTRACTION_RESPONSE, LoadConfig, LockStats, LockTimingConnection, run_load
+from benchmarks.seed import seed_database, seed_path
+from benchmarks.stub_server import JSON_RESPONSE, STREAM_RESPONSE, StubLLMServer
+from src.database.db_manager import DatabaseManager
+
+
+class TestSeed:
+    """Tests pour la génération des bases synthétiques."""
+
+    def test_seed_counts_and_heavy_user(self, tmp_path):
+        """Tester les volumes générés et la concentration sur l'utilisateur 1."""
+        info = seed_database(seed_path(str(tmp_path), 50, 2000), rows=2000, users=50)
+
+        db = DatabaseManager(info.path)
+        try:
+            counts = {
+                table: db.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("users", "check_ins", "conversations", "action_items")
+            }
+            # L'index plein texte est reconstruit et les triggers recréés
+            assert db.search(1, "stressé", sources=("conversations",))
+        finally:
+            db.close()
+
+        assert counts == {"users": 50, "check_ins": 2000, "conversations": 2000, "action_items": 200}
+        assert info.heavy_user_rows["check_ins"] > 2000 / 50 * 3
+
+    def test_seed_is_reused(self, tmp_path):
+        """Tester qu'une base existante n'est pas régénérée."""
+        path = seed_path(str(tmp_path), 10, 100)
+        seed_database(path, rows=100, users=10)
+        mtime = os.stat(path).st_mtime_ns
+
+        seed_database(path, rows=100, users=10)
+        assert os.stat(path).st_mtime_ns == mtime
+
+    def test_seed_rejects_empty(self, tmp_path):
+        """Tester la validation des paramètres."""
+        with pytest.raises(ValueError):
+            seed_database(str(tmp_path / "empty.db"), rows=0)
+
+
+class TestHarness:
+    """Tests pour la mesure et la comparaison des résultats."""
+
+    def test_measure_statistics(self):
+        """Tester les statistiques retournées."""
+        result = measure(lambda: None, runs=5)
+        assert result["runs"] == 5
+        assert result["min_ms"] <= result["median_ms"] <= result["p95_ms"]
+
+    def test_compare_verdicts(self):
+        """Tester la détection des régressions et améliorations."""
+        baseline = {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}, "c": {"median_ms": 10.0}}
+        current = {"a": {"median_ms": 12.0}, "b": {"median_ms": 8.0}, "c": {"median_ms": 10.5}, "d": {"median_ms": 1.0}}
+
+        verdicts = {row["name"]: row["verdict"] for row in compare(current, baseline)}
+        assert verdicts == {"a": "regression", "b": "improvement", "c": "unchanged"}
+
+    def test_results_round_trip(self, tmp_path):
+        """Tester l'écriture et la relecture d'un fichier de résultats."""
+        path = str(tmp_path / "bench.json")
+        save_results(path, {"a": {"median_ms": 1.5}})
+        assert load_results(path) == {"a": {"median_ms": 1.5}}
+
+
+class TestStubServer:
+    """Tests pour le serveur LLM local."""
+
+    def test_non_streaming(self):
+        """Tester une réponse complète avec le client Anthropic."""
+        with StubLLMServer(ttft_seconds=0) as stub:
+            client = Anthropic(api_key="test", base_url=stub.base_url)
+            response = client.messages.create(
+                model="stub", max_tokens=10, messages=[{"role": "user", "content": "Bonjour"}]
+            )
+        assert response.content[0].text == JSON_RESPONSE
+        assert response.usage.input_tokens > 0
+
+    def test_streaming(self):
+        """Tester une réponse en streaming avec le client Anthropic."""
+        with StubLLMServer(ttft_seconds=0, token_delay_seconds=0) as stub:
+            client = Anthropic(api_key="test", base_url=stub.base_url)
+            with client.messages.stream(
+                model="stub", max_tokens=10, messages=[{"role": "user", "content": "Bonjour"}]
+            ) as stream:
+                text = "".join(stream.text_stream)
+                usage = stream.get_final_message().usage
+        assert text == STREAM_RESPONSE
+        assert usage.output_tokens > 0
+        assert stub.requests == 1
+
+
+class TestLoad:
+    """Tests pour le générateur de charge."""
+
+    def test_lock_wait_is_measured(self, tmp_path):
+        """Tester la mesure de l'attente quand une autre connexion tient le verrou d'écriture."""
+        path = str(tmp_path / "locks.db")
+        setup = sqlite3.connect(path)
+        setup.execute("CREATE TABLE t (x INTEGER)")
+        setup.commit()
+
+        holder = sqlite3.connect(path, check_same_thread=False)
+        holder.execute("BEGIN IMMEDIATE")
+        threading.Timer(0.1, holder.commit).start()
+
+        stats = LockStats()
+        conn = LockTimingConnection(sqlite3.connect(path), stats)
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.commit()
+
+        assert stats.waits == 1
+        assert stats.wait_seconds >= 0.05
+        assert stats.timeouts == 0
+
+    def test_lock_timeout(self, tmp_path):
+        """Tester que l'erreur est propagée au-delà du délai maximal."""
+        path = str(tmp_path / "locks.db")
+        holder = sqlite3.connect(path)
+        holder.execute("CREATE TABLE t (x INTEGER)")
+        holder.commit()
+        holder.execute("BEGIN IMMEDIATE")
+
+        stats = LockStats()
+        conn = LockTimingConnection(sqlite3.connect(path), stats, timeout=0.05)
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO t VALUES (1)")
+        assert stats.timeouts == 1
+
+    @pytest.mark.parametrize("connections,shards", [("shared", 0), ("session", 0), ("session", 2)])
+    def test_run_load_sessions(self, tmp_path, connections, shards, monkeypatch):
+        """Tester un parcours complet par utilisateur virtuel."""
+        # Filtre de l'extraction désactivé: chaque tour appelle l'extraction
+        monkeypatch.setenv("SERENE_ACTION_PREFILTER_THRESHOLD", "0")
+        info = seed_database(seed_path(str(tmp_path), 5, 200), rows=200, users=5)
+        db_path = str(tmp_path / "load.db")
+        shutil.copyfile(info.path, db_path)
+        config = LoadConfig(
+            vus=2, duration=0, iterations=1, think_time=0, turns=1, connections=connections, shards=shards
+        )
+
+        with StubLLMServer(ttft_seconds=0, token_delay_seconds=0, json_response=EXTRACTION_RESPONSE) as stub:
+            report = run_load(db_path, info.users, stub, config)
+
+        summary = report["summary"]
+        assert summary["sessions"] == 2
+        assert summary["errors"] == {}
+        assert set(report["operations"]) == {
+            "login", "checkin", "conversation.ttft", "conversation.turn", "dashboard", "actions.review",
+        }
+        # Un tour = une réponse en streaming + une extraction d'actions
+        assert summary["llm_requests"] == 4
@@ -0,0 +1,220 @@
+"""Tests unitaires pour l'import en masse."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from src.database.bulk_import import BulkImporter, detect_format
+from src.database.query_cache import QueryCache
+
+
+def _index_names(db, table):
+    """Lister les index secondaires d'une table."""
+    rows = db.conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+    return sorted(row["name"] for row in rows)
+
+
+def _trigger_names(db, table):
+    """Lister les triggers d'une table."""
+    rows = db.conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,)
+    ).fetchall()
+    return sorted(row["name"] for row in rows)
+
+
+class TestDetectFormat:
+    """Tests pour la détection du format."""
+
+    def test_known_extensions(self):
+        """Tester les extensions reconnues."""
+        assert detect_format("export.CSV") == "csv"
+        assert detect_format("export.jsonl") == "ndjson"
+        assert detect_format("export.json") == "json"
+
+    def test_unknown_extension(self):
+        """Tester le rejet d'une extension inconnue."""
+        with pytest.raises(ValueError):
+            detect_format("export.xlsx")
+
+
+class TestBulkImportCheckins:
+    """Tests pour l'import de check-ins."""
+
+    def test_import_csv(self, file_db, user_id, tmp_path):
+        """Tester l'import d'un CSV avec dates et notes."""
+        path = tmp_path / "checkins.csv"
+        path.write_text(
+            "timestamp,mood_score,notes\n"
+            "2024-01-01T08:30:00,7,Bonne journée\n"
+            "2024-01-02 21:00:00,3,\n"
+            ",5,Sans date\n",
+            encoding="utf-8",
+        )
+
+        report = BulkImporter(file_db).import_file(str(path), "check_ins", user_id)
+
+        assert report.imported == 3
+        assert report.rejected == 0
+        rows = file_db.conn.execute(
+            "SELECT timestamp, mood_score, notes FROM check_ins WHERE user_id = ? ORDER BY id",
+            (user_id,),
+        ).fetchall()
+        assert rows[0]["timestamp"] == "2024-01-01 08:30:00"
+        assert rows[1]["notes"] == ""
+        assert rows[2]["timestamp"] is not None
+
+    def test_invalid_rows_are_rejected(self, file_db, user_id, tmp_path):
+        """Tester le rejet des lignes invalides sans bloquer les autres."""
+        path = tmp_path / "checkins.ndjson"
+        lines = [
+            {"timestamp": "2024-01-01T08:00:00", "mood_score": 7},
+            {"timestamp": "2024-01-01T09:00:00", "mood_score": 11},
+            {"timestamp": "pas une date", "mood_score": 4},
+            {"timestamp": "2024-01-01T10:00:00", "mood_score": 6.5},
+            {"timestamp": "2024-01-01T11:00:00", "mood_score": "2"},
+        ]
+        path.write_text("\n".join(json.dumps(line) for line in lines), encoding="utf-8")
+
+        report = BulkImporter(file_db).import_file(str(path), "check_ins", user_id)
+
+        assert report.imported == 2
+        assert report.rejected == 3
+        assert report.errors[0] == "Ligne 2: valeur invalide"
+
+    def test_strict_mode_raises(self, file_db, user_id):
+        """Tester que le mode strict lève une erreur sur la première ligne invalide."""
+        frames = [[{"mood_score": 5}, {"mood_score": -1}]]
+
+        with pytest.raises(ValueError, match="Ligne 2"):
+            BulkImporter(file_db).import_frames(frames, "check_ins", user_id, strict=True)
+
+        assert file_db.get_mood_stats(user_id, days=1)["count"] == 0
+
+    def test_chunks_and_indexes_restored(self, file_db, user_id):
+        """Tester l'import par blocs et la restauration des index."""
+        indexes_before = _index_names(file_db, "check_ins")
+        frame = pd.DataFrame({"mood_score": [i % 11 for i in range(2500)]})
+
+        report = BulkImporter(file_db, chunk_size=1000).import_frames(
+            [frame.iloc[:1000], frame.iloc[1000:]], "check_ins", user_id, defer_indexes=True
+        )
+
+        assert report.imported == 2500
+        assert _index_names(file_db, "check_ins") == indexes_before
+
+    def test_indexes_restored_after_failure(self, file_db, user_id):
+        """Tester que les index sont recréés même si l'import échoue."""
+        indexes_before = _index_names(file_db, "check_ins")
+
+        with pytest.raises(ValueError):
+            BulkImporter(file_db).import_frames(
+                [[{"notes": "sans score"}]], "check_ins", user_id, defer_indexes=True
+            )
+
+        assert _index_names(file_db, "check_ins") == indexes_before
+
+    def test_indexes_kept_by_default(self, file_db, user_id):
+        """Tester que, par défaut, les index restent en place et seuls les triggers d'insertion sont suspendus."""
+        indexes_before = _index_names(file_db, "check_ins")
+        triggers_before = _trigger_names(file_db, "check_ins")
+        seen = []
+
+        def frames():
+            yield [{"mood_score": 5, "notes": "première"}]
+            seen.append(_index_names(file_db, "check_ins"))
+            seen.append(set(triggers_before) - set(_trigger_names(file_db, "check_ins")))
+            yield [{"mood_score": 6, "notes": "seconde"}]
+
+        BulkImporter(file_db).import_frames(frames(), "check_ins", user_id)
+
+        assert seen == [indexes_before, {"check_ins_fts_insert", "check_ins_data_version_INSERT"}]
+        assert _trigger_names(file_db, "check_ins") == triggers_before
+
+    def test_triggers_caught_up_once(self, file_db, user_id):
+        """Tester l'indexation plein texte et une seule incrémentation de version après l'import."""
+        file_db.save_checkin(user_id, 4, "avant")
+        version_before = file_db.get_data_versions(user_id)["check_ins"]
+        frames = [[{"mood_score": 5, "notes": "randonnée matinale"}], [{"mood_score": 6, "notes": "soirée calme"}]]
+
+        BulkImporter(file_db).import_frames(frames, "check_ins", user_id)
+
+        assert file_db.get_data_versions(user_id)["check_ins"] == version_before + 1
+        fts_count = file_db.conn.execute(
+            "SELECT COUNT(*) FROM check_ins_fts WHERE check_ins_fts MATCH 'randonnée OR soirée'"
+        ).fetchone()[0]
+        assert fts_count == 2
+
+    def test_triggers_restored_after_failure(self, file_db, user_id):
+        """Tester que les triggers sont rétablis et les lignes déjà importées rattrapées après un échec."""
+        triggers_before = _trigger_names(file_db, "check_ins")
+        version_before = file_db.get_data_versions(user_id)["check_ins"]
+
+        with pytest.raises(ValueError):
+            BulkImporter(file_db).import_frames(
+                [[{"mood_score": 5, "notes": "importée"}], [{"notes": "sans score"}]], "check_ins", user_id
+            )
+
+        assert _trigger_names(file_db, "check_ins") == triggers_before
+        assert file_db.get_data_versions(user_id)["check_ins"] == version_before + 1
+        assert file_db.conn.execute(
+            "SELECT COUNT(*) FROM check_ins_fts WHERE check_ins_fts MATCH 'importée'"
+        ).fetchone()[0] == 1
+
+    def test_unknown_user_or_table(self, file_db, user_id):
+        """Tester le rejet d'un utilisateur ou d'une table inconnus."""
+        with pytest.raises(ValueError):
+            BulkImporter(file_db).import_frames([], "check_ins", 999)
+        with pytest.raises(ValueError):
+            BulkImporter(file_db).import_frames([], "users", user_id)
+
+    def test_import_invalidates_query_cache(self, tmp_path):
+        """Tester que l'import invalide le cache de lecture de l'utilisateur."""
+        from src.database.db_manager import DatabaseManager
+
+        db = DatabaseManager(str(tmp_path / "cached.db"), query_cache=QueryCache())
+        uid = db.create_user("bulk@example.com", "Passw0rd!")
+        assert db.get_mood_history(uid) == []
+
+        BulkImporter(db).import_frames([[{"mood_score": 5}]], "check_ins", uid)
+
+        assert len(db.get_mood_history(uid)) == 1
+        db.close()
+
+
+class TestBulkImportConversations:
+    """Tests pour l'import de conversations."""
+
+    def test_import_json(self, file_db, user_id, tmp_path):
+        """Tester l'import d'un tableau JSON de conversations."""
+        path = tmp_path / "conversations.json"
+        path.write_text(json.dumps([
+            {"timestamp": "2024-03-01T10:00:00Z", "user_message": "Salut", "ai_response": "Bonjour", "tokens_used": 12},
+            {"user_message": "", "ai_response": "Réponse orpheline"},
+            {"user_message": "Sans tokens", "ai_response": "Ok"},
+        ]), encoding="utf-8")
+
+        report = BulkImporter(file_db).import_file(str(path), "conversations", user_id)
+
+        assert report.imported == 2
+        assert report.rejected == 1
+        row = file_db.conn.execute(
+            "SELECT timestamp, tokens_used FROM conversations WHERE user_message = 'Salut'"
+        ).fetchone()
+        assert row["timestamp"] == "2024-03-01 10:00:00"
+        assert row["tokens_used"] == 12
+
+    def test_fractional_tokens_rejected(self, file_db, user_id):
+        """Tester le rejet d'un tokens_used non entier (au lieu de le tronquer)."""
+        frames = [[
+            {"user_message": "Entier", "ai_response": "Ok", "tokens_used": "7"},
+            {"user_message": "Décimal", "ai_response": "Ok", "tokens_used": "7.5"},
+        ]]
+
+        report = BulkImporter(file_db).import_frames(frames, "conversations", user_id)
+
+        assert report.imported == 1
+        assert report.errors == ["Ligne 2: valeur invalide"]
@@ -0,0 +1,118 @@
+"""Tests unitaires pour l'export RGPD en flux."""
+
+import io
+import json
+import zipfile
+
+import pytest
+
+from src.database.export import iter_ndjson_export, write_ndjson_export, write_zip_export
+
+
+@pytest.fixture
+def populated_db(file_db, user_id):
+    """Fixture: utilisateur avec des données dans chaque table exportée."""
+    file_db.conn.executemany(
+        "INSERT INTO check_ins (user_id, mood_score, notes) VALUES (?, ?, ?)",
+        [(user_id, i % 11, f"Note {i}") for i in range(1200)],
+    )
+    file_db.conn.commit()
+    conversation_id = file_db.save_conversation(user_id, "Bonjour", "Bonjour à toi")
+    file_db.save_insight(user_id, "weekly", "Semaine calme")
+    file_db.save_action_item(user_id=user_id, title="Marcher")
+    file_db.save_proposed_action(user_id, "Méditer", conversation_id=conversation_id)
+
+    other = file_db.create_user("other@example.com", "Passw0rd!")
+    file_db.save_checkin(other, 3, "Autre utilisateur")
+    return file_db
+
+
+class TestExportRows:
+    """Tests pour la lecture par lots des sections d'export."""
+
+    def test_iter_rows_reads_in_batches(self, populated_db, user_id):
+        """Tester que les lignes sont toutes lues, lot par lot."""
+        rows = list(populated_db.iter_user_export_rows(user_id, "check_ins", batch_size=100))
+
+        assert len(rows) == 1200
+        assert "user_id" not in rows[0]
+
+    def test_iter_rows_unknown_section(self, populated_db, user_id):
+        """Tester le rejet d'une section inconnue."""
+        with pytest.raises(ValueError):
+            list(populated_db.iter_user_export_rows(user_id, "users"))
+
+    def test_export_user_data_includes_proposed_actions(self, populated_db, user_id):
+        """Tester que l'export complet contient les propositions d'actions."""
+        export = populated_db.export_user_data(user_id)
+
+        assert len(export["proposed_actions"]) == 1
+        assert "password_hash" not in export["user_profile"]
+
+
+class TestNdjsonExport:
+    """Tests pour l'export NDJSON."""
+
+    def test_ndjson_lines(self, populated_db, user_id):
+        """Tester la structure des lignes NDJSON."""
+        buffer = io.BytesIO()
+        counts = write_ndjson_export(populated_db, user_id, buffer)
+
+        records = [json.loads(line) for line in buffer.getvalue().decode("utf-8").splitlines()]
+        sections = [record["section"] for record in records]
+
+        assert sections[0] == "export_metadata"
+        assert sections[1] == "user_profile"
+        assert sections.count("check_ins") == 1200 == counts["check_ins"]
+        assert sections.count("proposed_actions") == 1
+        assert "password_hash" not in records[1]["data"]
+        assert "Autre utilisateur" not in buffer.getvalue().decode("utf-8")
+
+    def test_ndjson_counts_written_rows(self, populated_db, user_id, mocker):
+        """Tester que les comptes rendus sont ceux des lignes écrites (sans recompter)."""
+        count_rows = mocker.spy(populated_db, "count_user_export_rows")
+        buffer = io.BytesIO()
+        counts = write_ndjson_export(populated_db, user_id, buffer)
+
+        written = [json.loads(line)["section"] for line in buffer.getvalue().decode("utf-8").splitlines()]
+        assert count_rows.call_count == 1
+        assert counts == {section: written.count(section) for section in counts}
+        assert sum(counts.values()) == len(written) - 2
+
+    def test_ndjson_is_lazy(self, populated_db, user_id):
+        """Tester que l'export est produit à la demande."""
+        lines = iter_ndjson_export(populated_db, user_id)
+
+        assert json.loads(next(lines))["data"]["counts"]["check_ins"] == 1200
+
+    def test_progress_reported(self, populated_db, user_id):
+        """Tester que la progression est notifiée jusqu'au total."""
+        calls = []
+        write_ndjson_export(populated_db, user_id, io.BytesIO(), progress=lambda d, t: calls.append((d, t)))
+
+        assert len(calls) >= 2
+        assert calls[-1] == (1204, 1204)
+
+    def test_unknown_user(self, file_db):
+        """Tester l'export d'un utilisateur inexistant."""
+        with pytest.raises(ValueError):
+            write_ndjson_export(file_db, 999, io.BytesIO())
+
+
+class TestZipExport:
+    """Tests pour l'export en archive ZIP."""
+
+    def test_zip_contains_one_file_per_table(self, populated_db, user_id):
+        """Tester le contenu de l'archive."""
+        buffer = io.BytesIO()
+        write_zip_export(populated_db, user_id, buffer)
+
+        with zipfile.ZipFile(buffer) as archive:
+            names = set(archive.namelist())
+            manifest = json.loads(archive.read("manifest.json"))
+            check_ins = archive.read("check_ins.ndjson").decode("utf-8").splitlines()
+            proposals = archive.read("proposed_actions.ndjson").decode("utf-8").splitlines()
+
+        assert {"manifest.json", "user_profile.json", "insights.ndjson", "action_items.ndjson"} <= names
+        assert manifest["counts"]["check_ins"] == len(check_ins) == 1200
+        assert json.loads(proposals[0])["title"] == "Méditer"
@@ -0,0 +1,121 @@
+"""Tests unitaires pour l'extraction d'actions fusionnée avec la réponse."""
+
+import json
+
+import pytest
+
+from benchmarks.stub_server import STREAM_RESPONSE, StubLLMServer
+from src.llm.action_extractor import ActionTrailerFilter
+
+TRAILER_JSON = json.dumps(
+    {"actions": [{"title": "Courir demain matin", "description": "20 minutes"}]}, ensure_ascii=False
+)
+
+
+def filter_chunks(chunks, with_actions=False):
+    """Passer des morceaux au filtre; retourne (texte visible, bloc[, actions])."""
+    trailer_filter = ActionTrailerFilter()
+    visible = "".join(trailer_filter.feed(chunk) for chunk in chunks) + trailer_filter.finish()
+    if with_actions:
+        return visible, trailer_filter.trailer, trailer_filter.actions
+    return visible, trailer_filter.trailer
+
+
+@pytest.fixture
+def stub():
+    """Fixture: serveur LLM local renvoyant une action dans le bloc."""
+    with StubLLMServer(ttft_seconds=0, token_delay_seconds=0, json_response=TRAILER_JSON) as server:
+        yield server
+
+
+@pytest.fixture
+def manager(stub, file_db, monkeypatch):
+    """Fixture: ConversationManager en mode fusionné."""
+    from src.llm.conversation_manager import ConversationManager
+
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.base_url)
+    return ConversationManager(file_db, enable_memory=False, fused_extraction=True)
+
+
+class TestActionTrailerFilter:
+    """Tests pour le retrait du bloc d'actions."""
+
+    def test_trailer_split_character_by_character(self):
+        """Tester un délimiteur reçu caractère par caractère."""
+        text = 'Bonne idée !\n<actions>{"actions": []}</actions>'
+
+        visible, trailer = filter_chunks(list(text))
+
+        assert visible == "Bonne idée !\n"
+        assert trailer == '{"actions": []}'
+
+    def test_no_trailer_keeps_text(self):
+        """Tester qu'une réponse sans bloc est rendue entièrement."""
+        visible, trailer = filter_chunks(["Un chevron < et ", "<act", "ion tardif"])
+
+        assert visible == "Un chevron < et <action tardif"
+        assert trailer is None
+
+    def test_incomplete_marker_flushed(self):
+        """Tester qu'un début de délimiteur en fin de flux est rendu."""
+        visible, trailer = filter_chunks(["Fin <acti"])
+
+        assert visible == "Fin <acti"
+        assert trailer is None
+
+    def test_actions_read_from_trailer(self):
+        """Tester la lecture des actions du bloc, morceau par morceau."""
+        text = f"Réponse.\n<actions>{TRAILER_JSON}</actions>"
+
+        _, _, actions = filter_chunks([text[i:i + 7] for i in range(0, len(text), 7)], with_actions=True)
+
+        assert actions == [{"title": "Courir demain matin", "description": "20 minutes"}]
+
+    def test_invalid_trailer_has_no_actions(self):
+        """Tester qu'un bloc invalide ne produit aucune action."""
+        _, trailer, actions = filter_chunks(["Réponse.<actions>pas du json</actions>"], with_actions=True)
+
+        assert trailer == "pas du json"
+        assert actions == []
+
+
+class TestFusedSendMessage:
+    """Tests d'intégration avec le serveur LLM local."""
+
+    def test_single_call_saves_proposal(self, manager, stub, file_db, user_id):
+        """Tester un seul appel par tour, sans bloc affiché ni enregistré."""
+        response = "".join(manager.send_message(user_id, "Je vais courir demain matin"))
+
+        assert response.rstrip() == STREAM_RESPONSE
+        assert stub.requests == 1
+        [proposal] = file_db.get_proposed_actions(user_id)
+        assert proposal["title"] == "Courir demain matin"
+        [conversation] = file_db.get_recent_conversations(user_id, limit=1)
+        assert conversation["ai_response"] == STREAM_RESPONSE
+        assert file_db.get_llm_skip_totals() == [
+            {"component": "action_extraction", "reason": "fused", "skipped": 1}
+        ]
+
+    def test_non_actionable_message_not_asked(self, manager, stub, file_db, user_id):
+        """Tester qu'un message filtré ne demande pas de bloc d'actions."""
+        response = "".join(manager.send_message(user_id, "merci"))
+
+        assert response == STREAM_RESPONSE
+        assert stub.requests == 1
+        assert file_db.get_proposed_actions(user_id) == []
+
+    def test_separate_mode_makes_two_calls(self, stub, file_db, user_id, monkeypatch):
+        """Tester le mode par défaut: réponse puis appel d'extraction."""
+        from src.llm.conversation_manager import ConversationManager
+
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.base_url)
+        monkeypatch.delenv("SERENE_FUSED_ACTION_EXTRACTION", raising=False)
+        manager = ConversationManager(file_db, enable_memory=False)
+
+        "".join(manager.send_message(user_id, "Je vais courir demain matin"))
+
+        assert not manager.fused_extraction
+        assert stub.requests == 2
+        assert len(file_db.get_proposed_actions(user_id)) == 1
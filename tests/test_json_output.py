@@ -0,0 +1,179 @@
+"""Tests unitaires pour la lecture tolérante des réponses JSON des modèles."""
+
+import json
+import random
+
+import pytest
+
+from src.llm.action_extractor import validate_action, validate_extraction
+from src.llm.json_output import (
+    IncrementalJSONParser,
+    SchemaError,
+    compile_schema,
+    parse_object,
+    salvage_items,
+)
+
+ACTIONS = [
+    {"title": "Méditer 10 minutes", "description": "Chaque matin, avant le café"},
+    {"title": "Appeler {maman}", "description": 'Dire "merci" \\ prendre des nouvelles'},
+    {"title": "Marcher 30 min", "description": ""},
+]
+RESPONSE = json.dumps({"message": "Voici mes idées", "actions": ACTIONS}, ensure_ascii=False)
+
+
+class TestParseObject:
+    """Tests pour la recherche du premier objet valide."""
+
+    @pytest.mark.parametrize("text", [
+        RESPONSE,
+        f"```json\n{RESPONSE}\n```",
+        f"Bien sûr ! Voici le JSON demandé :\n{RESPONSE}\nN'hésite pas si besoin.",
+        f"Une accolade {{ isolée puis {RESPONSE}",
+        f"{{pas du json}} {RESPONSE}",
+    ])
+    def test_object_found_in_prose(self, text):
+        """Tester que la prose et les blocs markdown autour de l'objet sont ignorés."""
+        assert parse_object(text)["actions"] == ACTIONS
+
+    def test_braces_inside_strings(self):
+        """Tester que les accolades et guillemets échappés des chaînes sont ignorés."""
+        assert parse_object('x {"a": "} {\\"", "b": 1} y') == {"a": '} {"', "b": 1}
+
+    def test_validator_skips_invalid_objects(self):
+        """Tester qu'un objet qui ne respecte pas le schéma laisse place au suivant."""
+        text = '{"description": "sans titre"} puis {"title": "Lire"}'
+        assert parse_object(text, validate_action) == {"title": "Lire", "description": ""}
+
+    def test_no_object(self):
+        """Tester l'absence d'objet."""
+        assert parse_object("Aucune action ici.") is None
+        assert parse_object('{"actions": [') is None
+
+
+class TestCompileSchema:
+    """Tests pour les validateurs compilés."""
+
+    def test_invalid_items_dropped(self):
+        """Tester qu'une action invalide n'invalide pas les autres."""
+        result = validate_extraction({"actions": [{"title": ""}, {"title": 3}, {"title": " Lire "}, "x"]})
+        assert result == {"actions": [{"title": "Lire", "description": ""}]}
+
+    def test_defaults_and_unknown_properties(self):
+        """Tester les valeurs par défaut et l'oubli des propriétés inconnues."""
+        assert validate_action({"title": "Lire", "description": None, "priorité": 1}) == {
+            "title": "Lire", "description": "",
+        }
+
+    def test_required_and_max_length(self):
+        """Tester les propriétés requises et la troncature."""
+        with pytest.raises(SchemaError):
+            validate_action({"description": "sans titre"})
+        assert len(validate_action({"title": "x" * 500})["title"]) == 200
+
+    def test_unsupported_type(self):
+        """Tester le rejet d'un type non pris en charge."""
+        with pytest.raises(ValueError):
+            compile_schema({"type": "integer"})
+
+
+class TestIncrementalJSONParser:
+    """Tests pour la lecture au fil de l'eau."""
+
+    def test_items_emitted_as_they_complete(self):
+        """Tester que chaque action est rendue dès sa dernière accolade."""
+        parser = IncrementalJSONParser("actions", validate_action)
+        first_end = RESPONSE.index("}") + 1
+
+        assert parser.feed(RESPONSE[:first_end - 1]) == []
+        assert parser.feed(RESPONSE[first_end - 1:first_end]) == [validate_action(ACTIONS[0])]
+        parser.feed(RESPONSE[first_end:])
+        assert parser.items == ACTIONS
+
+    def test_other_arrays_ignored(self):
+        """Tester que seuls les éléments du tableau demandé sont rendus."""
+        text = '{"tags": [{"title": "non"}], "actions": [{"title": "oui", "sub": [{"a": 1}]}]}'
+        assert [item["title"] for item in salvage_items(text, "actions")] == ["oui"]
+
+    def test_truncated_response_keeps_complete_items(self):
+        """Tester la récupération des actions complètes d'une réponse tronquée."""
+        truncated = RESPONSE[: RESPONSE.index("Marcher")]
+        assert salvage_items(truncated, "actions", validate_action) == ACTIONS[:2]
+
+    def test_text_after_object_ignored(self):
+        """Tester que le texte suivant l'objet est ignoré."""
+        parser = IncrementalJSONParser("actions")
+        parser.feed('{"actions": []} puis {"actions": [{"title": "non"}]}')
+        assert parser.items == []
+
+
+class TestFuzz:
+    """Fuzzing sur des réponses malformées (graine fixe)."""
+
+    def _mutations(self, rng):
+        """Générer des réponses malformées à partir d'une réponse valide."""
+        alphabet = '{}[]":,\\ ax\n`'
+        for _ in range(300):
+            text = RESPONSE
+            kind = rng.randrange(4)
+            if kind == 0:
+                text = text[: rng.randrange(len(text))]
+            elif kind == 1:
+                position = rng.randrange(len(text))
+                text = text[:position] + rng.choice(alphabet) + text[position:]
+            elif kind == 2:
+                position = rng.randrange(len(text))
+                text = text[:position] + text[position + 1:]
+            else:
+                text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(80)))
+            yield text
+
+    def test_never_raises(self):
+        """Tester qu'aucune entrée malformée ne lève d'exception."""
+        rng = random.Random(42)
+        for text in self._mutations(rng):
+            result = parse_object(text, validate_extraction)
+            assert result is None or isinstance(result["actions"], list)
+            for item in salvage_items(text, "actions", validate_action):
+                assert item["title"]
+
+    def test_truncations_keep_a_prefix(self):
+        """Tester qu'une troncature ne rend que des actions d'origine, dans l'ordre."""
+        expected = [validate_action(action) for action in ACTIONS]
+        for end in range(len(RESPONSE) + 1):
+            items = salvage_items(RESPONSE[:end], "actions", validate_action)
+            assert items == expected[: len(items)]
+
+    def test_chunking_does_not_change_result(self):
+        """Tester que le découpage en morceaux ne change pas les éléments rendus."""
+        rng = random.Random(7)
+        for text in list(self._mutations(rng))[:100] + [RESPONSE]:
+            parser = IncrementalJSONParser("actions", validate_action)
+            position = 0
+            while position < len(text):
+                size = rng.randrange(1, 12)
+                parser.feed(text[position:position + size])
+                position += size
+            assert parser.items == salvage_items(text, "actions", validate_action)
+
+
+class TestExtractorParsing:
+    """Tests d'intégration avec ActionExtractor et le serveur LLM local."""
+
+    @pytest.mark.parametrize("response", [
+        f"Voici les actions :\n```json\n{RESPONSE}\n```",
+        RESPONSE[: RESPONSE.index("Marcher")],
+    ])
+    def test_prose_and_truncation_tolerated(self, response, file_db, user_id, monkeypatch):
+        """Tester qu'une réponse entourée de prose ou tronquée n'est pas perdue."""
+        from benchmarks.stub_server import StubLLMServer
+        from src.llm.action_extractor import ActionExtractor
+
+        with StubLLMServer(ttft_seconds=0, token_delay_seconds=0, json_response=response) as stub:
+            monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+            monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.base_url)
+            proposals = ActionExtractor(file_db, prefilter_threshold=0).extract_actions_from_message(
+                "Je vais méditer et appeler maman", user_id
+            )
+
+        assert [proposal["title"] for proposal in proposals][:2] == ["Méditer 10 minutes", "Appeler {maman}"]
@@ -0,0 +1,175 @@
+"""Tests unitaires pour la mémoire des conversations (index vectoriel)."""
+
+import numpy as np
+import pytest
+
+from src.llm.conversation_manager import ConversationManager
+from src.llm.memory_index import HashingEmbedder, MemoryIndex
+
+
+@pytest.fixture
+def manager(file_db, monkeypatch):
+    """Fixture: ConversationManager sans extraction d'actions, mémoire en RAM."""
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test-key")
+    monkeypatch.delenv("SERENE_MEMORY_DIR", raising=False)
+    monkeypatch.delenv("SERENE_MEMORY_TOP_K", raising=False)
+    return ConversationManager(file_db, enable_action_extraction=False)
+
+
+class TestHashingEmbedder:
+    """Tests pour le vectoriseur à hachage."""
+
+    def test_vectors_are_normalized(self):
+        """Tester la normalisation L2 et le type float32."""
+        vector = HashingEmbedder().embed("Je dors mal depuis une semaine")
+        assert vector.dtype == np.float32
+        assert np.linalg.norm(vector) == pytest.approx(1.0)
+
+    def test_accents_and_plurals_match(self):
+        """Tester que les accents et le pluriel simple n'empêchent pas la correspondance."""
+        embedder = HashingEmbedder()
+        similarity = embedder.embed("mes cauchemars") @ embedder.embed("Cauchemar")
+        assert similarity == pytest.approx(1.0)
+
+    def test_stop_words_only_gives_zero_vector(self):
+        """Tester qu'un texte sans mot significatif donne un vecteur nul."""
+        assert not HashingEmbedder().embed("je le la").any()
+
+
+class TestMemoryIndex:
+    """Tests pour MemoryIndex."""
+
+    def test_retrieves_relevant_exchange(self, file_db, user_id):
+        """Tester que l'échange le plus proche est retrouvé en premier."""
+        file_db.save_conversation(user_id, "Ma sœur Léa est malade", "Je suis désolée pour Léa")
+        file_db.save_conversation(user_id, "Le travail me stresse", "Parlons de ton travail")
+
+        memories = MemoryIndex(file_db).search(user_id, "des nouvelles de Léa", k=1)
+
+        assert len(memories) == 1
+        assert "Léa" in memories[0]["user_message"]
+        assert memories[0]["score"] > 0
+
+    def test_incremental_sync_and_exclusions(self, file_db, user_id):
+        """Tester l'indexation incrémentale et l'exclusion d'IDs."""
+        index = MemoryIndex(file_db)
+        first = file_db.save_conversation(user_id, "Je joue du piano", "Super")
+        assert index.sync(user_id) == 1
+
+        second = file_db.save_conversation(user_id, "Le piano me détend", "Génial")
+        assert index.sync(user_id) == 1
+        assert index.sync(user_id) == 0
+
+        memories = index.search(user_id, "piano", exclude_ids=[first])
+        assert [m["id"] for m in memories] == [second]
+
+    def test_scoped_to_user(self, file_db, user_id):
+        """Tester qu'un utilisateur ne retrouve pas les échanges d'un autre."""
+        other = file_db.create_user("other@example.com", "Passw0rd!")
+        file_db.save_conversation(other, "Mon chat Félix", "Joli nom")
+
+        assert MemoryIndex(file_db).search(user_id, "chat Félix") == []
+
+    def test_persisted_index_is_reused(self, file_db, user_id, tmp_path):
+        """Tester la persistance sur disque et le rechargement en mmap."""
+        storage = str(tmp_path / "memory")
+        file_db.save_conversation(user_id, "Randonnée en montagne", "Belle sortie")
+        assert MemoryIndex(file_db, storage_dir=storage).sync(user_id) == 1
+
+        reloaded = MemoryIndex(file_db, storage_dir=storage)
+        assert reloaded.sync(user_id) == 0
+        assert len(reloaded.search(user_id, "montagne")) == 1
+
+    def test_persisted_vectors_are_appended(self, file_db, user_id, tmp_path):
+        """Tester que les nouveaux vecteurs sont ajoutés en fin de fichier, sans réécriture."""
+        index = MemoryIndex(file_db, storage_dir=str(tmp_path / "memory"))
+        file_db.save_conversation(user_id, "Randonnée en montagne", "Belle sortie")
+        index.sync(user_id)
+        ids_path, vectors_path = index._paths(user_id)
+        with open(vectors_path, "rb") as f:
+            first_bytes = f.read()
+
+        file_db.save_conversation(user_id, "Baignade au lac", "Rafraîchissant")
+        assert index.sync(user_id) == 1
+
+        with open(vectors_path, "rb") as f:
+            content = f.read()
+        assert content.startswith(first_bytes)
+        assert len(content) == 2 * len(first_bytes)
+        assert len(index.search(user_id, "lac")) == 1
+
+    def test_torn_append_is_truncated(self, file_db, user_id, tmp_path):
+        """Tester qu'un ajout interrompu est tronqué puis réindexé."""
+        storage = str(tmp_path / "memory")
+        for text in ("Randonnée en montagne", "Baignade au lac"):
+            file_db.save_conversation(user_id, text, "Super")
+        index = MemoryIndex(file_db, storage_dir=storage)
+        index.sync(user_id)
+        ids_path, _ = index._paths(user_id)
+        with open(ids_path, "r+b") as f:
+            f.truncate(12)  # un ID et demi
+
+        reloaded = MemoryIndex(file_db, storage_dir=storage)
+        assert reloaded.sync(user_id) == 1
+        assert len(reloaded.search(user_id, "lac")) == 1
+
+    def test_in_memory_index_grows(self, file_db, user_id):
+        """Tester l'ajout au-delà de la capacité initiale."""
+        index = MemoryIndex(file_db)
+        for i in range(100):
+            file_db.save_conversation(user_id, f"Souvenir numéro {i}", "Noté")
+            index.sync(user_id)
+
+        assert index._users[user_id].count == 100
+        assert index._users[user_id].last_id == file_db.get_recent_conversations(user_id, limit=1)[0]["id"]
+
+    def test_open_indexes_bounded(self, file_db, user_id):
+        """Tester que seuls les max_users index les plus récents restent ouverts."""
+        index = MemoryIndex(file_db, max_users=2)
+        others = [file_db.create_user(f"lru{i}@example.com", "Passw0rd!") for i in range(2)]
+        for uid in (user_id, *others):
+            index.sync(uid)
+
+        assert list(index._users) == others
+        with pytest.raises(ValueError):
+            MemoryIndex(file_db, max_users=0)
+
+    def test_from_env_can_disable(self, file_db, monkeypatch):
+        """Tester la désactivation par SERENE_MEMORY_TOP_K=0."""
+        monkeypatch.setenv("SERENE_MEMORY_TOP_K", "0")
+        assert MemoryIndex.from_env(file_db) is None
+
+
+class TestConversationContext:
+    """Tests pour la construction du contexte (fenêtre récente + souvenirs)."""
+
+    def test_recent_window_keeps_latest_exchanges(self, manager, file_db, user_id):
+        """Tester que la fenêtre récente contient les derniers échanges, dans l'ordre."""
+        manager.MAX_HISTORY_MESSAGES = 2
+        for i in range(4):
+            file_db.save_conversation(user_id, f"message {i}", f"réponse {i}")
+
+        _, messages = manager._build_conversation_context(user_id, "message 4")
+
+        assert [m["content"] for m in messages] == [
+            "message 2", "réponse 2", "message 3", "réponse 3", "message 4",
+        ]
+
+    def test_older_relevant_exchange_recalled_in_system_prompt(self, manager, file_db, user_id):
+        """Tester qu'un échange sorti de la fenêtre est rappelé dans le system prompt."""
+        manager.MAX_HISTORY_MESSAGES = 2
+        file_db.save_conversation(user_id, "Mon père est hospitalisé", "Je suis là pour toi")
+        for i in range(3):
+            file_db.save_conversation(user_id, f"message {i}", f"réponse {i}")
+
+        system_prompt, _ = manager._build_conversation_context(user_id, "Des nouvelles de mon père")
+
+        assert system_prompt.startswith(manager.system_prompt)
+        assert "Mon père est hospitalisé" in system_prompt
+
+    def test_no_memory_keeps_base_prompt(self, manager, user_id):
+        """Tester que le system prompt est inchangé sans souvenir pertinent."""
+        system_prompt, messages = manager._build_conversation_context(user_id, "Bonjour")
+
+        assert system_prompt == manager.system_prompt
+        assert messages == [{"role": "user", "content": "Bonjour"}]
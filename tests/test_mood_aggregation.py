@@ -0,0 +1,130 @@
+"""Tests unitaires pour l'agrégation et l'échantillonnage de l'historique d'humeur."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database.db_manager import choose_mood_bucket
+from src.utils.downsampling import lttb
+
+
+def _insert_checkin(db, user_id, mood_score, timestamp):
+    """Insérer un check-in à une date donnée."""
+    db.conn.execute(
+        "INSERT INTO check_ins (user_id, mood_score, timestamp) VALUES (?, ?, ?)",
+        (user_id, mood_score, timestamp.strftime("%Y-%m-%d %H:%M:%S")),
+    )
+    db.conn.commit()
+
+
+class TestMoodStats:
+    """Tests pour get_mood_stats."""
+
+    def test_stats_computed_in_sql(self, file_db, user_id):
+        """Tester les statistiques sur la fenêtre demandée."""
+        now = datetime.now()
+        _insert_checkin(file_db, user_id, 4, now - timedelta(days=2))
+        _insert_checkin(file_db, user_id, 8, now - timedelta(hours=1))
+        _insert_checkin(file_db, user_id, 1, now - timedelta(days=40))
+
+        stats = file_db.get_mood_stats(user_id, days=30)
+
+        assert stats["count"] == 2
+        assert stats["avg"] == 6
+        assert stats["min"] == 4
+        assert stats["max"] == 8
+        assert stats["latest"] == 8
+
+    def test_stats_empty(self, file_db, user_id):
+        """Tester les statistiques sans check-in."""
+        stats = file_db.get_mood_stats(user_id, days=7)
+
+        assert stats["count"] == 0
+        assert stats["latest"] is None
+
+
+class TestMoodBuckets:
+    """Tests pour get_mood_buckets."""
+
+    def test_daily_buckets(self, file_db, user_id):
+        """Tester l'agrégation par jour (moyenne, min, max, nombre)."""
+        day = (datetime.now() - timedelta(days=3)).replace(hour=9, minute=0, second=0)
+        _insert_checkin(file_db, user_id, 2, day)
+        _insert_checkin(file_db, user_id, 6, day + timedelta(hours=5))
+        _insert_checkin(file_db, user_id, 9, day + timedelta(days=1))
+
+        buckets = file_db.get_mood_buckets(user_id, days=30, bucket="day")
+
+        assert len(buckets) == 2
+        first = buckets[0]
+        assert first["bucket_start"] == day.strftime("%Y-%m-%d")
+        assert (first["mean"], first["min"], first["max"], first["count"]) == (4, 2, 6, 2)
+        assert buckets[1]["count"] == 1
+
+    def test_weekly_buckets_start_on_monday(self, file_db, user_id):
+        """Tester que les semaines commencent le lundi."""
+        monday = datetime.now() - timedelta(days=14)
+        monday = (monday - timedelta(days=monday.weekday())).replace(hour=12)
+        _insert_checkin(file_db, user_id, 5, monday)
+        _insert_checkin(file_db, user_id, 7, monday + timedelta(days=6))
+
+        buckets = file_db.get_mood_buckets(user_id, days=90, bucket="week")
+
+        assert len(buckets) == 1
+        assert buckets[0]["bucket_start"] == monday.strftime("%Y-%m-%d")
+        assert buckets[0]["count"] == 2
+
+    def test_hourly_buckets(self, file_db, user_id):
+        """Tester l'agrégation par heure."""
+        hour = (datetime.now() - timedelta(hours=5)).replace(minute=5, second=0)
+        _insert_checkin(file_db, user_id, 3, hour)
+        _insert_checkin(file_db, user_id, 5, hour + timedelta(minutes=30))
+
+        buckets = file_db.get_mood_buckets(user_id, days=1)
+
+        assert len(buckets) == 1
+        assert buckets[0]["bucket_start"] == hour.strftime("%Y-%m-%d %H:00:00")
+
+    def test_invalid_bucket(self, file_db, user_id):
+        """Tester le rejet d'une granularité inconnue."""
+        with pytest.raises(ValueError):
+            file_db.get_mood_buckets(user_id, bucket="month")
+
+    def test_choose_bucket_by_window(self):
+        """Tester le choix de granularité selon la fenêtre."""
+        assert choose_mood_bucket(1) == "hour"
+        assert choose_mood_bucket(30) == "day"
+        assert choose_mood_bucket(90) == "week"
+
+
+class TestLttb:
+    """Tests pour l'algorithme LTTB."""
+
+    def test_short_series_unchanged(self):
+        """Tester qu'une série sous le budget est conservée."""
+        points = [(0, 1), (1, 2), (2, 3)]
+
+        assert lttb(points, 10) == points
+
+    def test_respects_budget_and_keeps_endpoints(self):
+        """Tester le budget de points et la conservation des extrémités."""
+        points = [(i, (i * 7) % 11) for i in range(1000)]
+
+        sampled = lttb(points, 50)
+
+        assert len(sampled) == 50
+        assert sampled[0] == points[0]
+        assert sampled[-1] == points[-1]
+        assert [x for x, _ in sampled] == sorted(x for x, _ in sampled)
+
+    def test_keeps_spike(self):
+        """Tester qu'un pic isolé est conservé."""
+        points = [(i, 5) for i in range(500)]
+        points[250] = (250, 10)
+
+        assert (250, 10) in lttb(points, 20)
+
+    def test_invalid_threshold(self):
+        """Tester le rejet d'un budget trop petit."""
+        with pytest.raises(ValueError):
+            lttb([(0, 0)], 2)
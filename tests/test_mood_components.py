@@ -0,0 +1,73 @@
+"""Tests unitaires pour les générateurs HTML mémoïsés de l'historique."""
+
+from src.ui.checkin import HISTORY_PAGE_SIZE, render_history_window
+from src.ui.ui_components.mood_components import (
+    history_card,
+    history_list,
+    mood_display_card,
+    stats_banner,
+)
+
+
+def _make_history(count):
+    """Construire un historique factice trié du plus récent au plus ancien."""
+    return [
+        {
+            "id": count - i,
+            "timestamp": f"2025-01-{(count - i) % 28 + 1:02d} 10:00:00",
+            "mood_score": i % 11,
+            "notes": f"Note {i}",
+        }
+        for i in range(count)
+    ]
+
+
+class TestMemoizedBuilders:
+    """Tests pour la mise en cache des composants HTML."""
+
+    def test_builders_return_cached_html(self):
+        """Tester que des arguments identiques renvoient le même objet HTML."""
+        assert stats_banner(12) is stats_banner(12)
+        assert mood_display_card(7, "", "Bien", "#000") is mood_display_card(7, "", "Bien", "#000")
+
+    def test_history_card_accepts_unhashable_dict(self):
+        """Tester que history_card met en cache à partir d'un dict de check-in."""
+        checkin = {"id": 1, "mood_score": 6, "notes": "Promenade <3"}
+
+        first = history_card(checkin, "", "Neutre", "#000", "01/01/2025", "10:00", 0)
+        second = history_card(dict(checkin), "", "Neutre", "#000", "01/01/2025", "10:00", 0)
+
+        assert first is second
+        assert "Promenade &lt;3" in first
+
+    def test_history_card_without_notes(self):
+        """Tester la carte sans notes (None ou vide)."""
+        html = history_card({"mood_score": 4, "notes": None}, "", "Difficile", "#000", "01/01/2025", "10:00")
+
+        assert "font-style: italic" not in html
+
+
+class TestHistoryWindow:
+    """Tests pour le rendu groupé et fenêtré de l'historique."""
+
+    def test_history_list_is_single_block(self):
+        """Tester que les cartes sont assemblées en un seul bloc."""
+        html = history_list(["<div>a</div>", "<div>b</div>"])
+
+        assert html == '<div class="history-list"><div>a</div><div>b</div></div>'
+
+    def test_window_only_renders_visible_cards(self):
+        """Tester que seules les cartes visibles sont générées."""
+        history = _make_history(30)
+
+        html = render_history_window(history, HISTORY_PAGE_SIZE)
+
+        assert html.count('class="history-card"') == HISTORY_PAGE_SIZE
+        assert "20 check-in(s) plus ancien(s)" in html
+
+    def test_window_larger_than_history(self):
+        """Tester une fenêtre plus grande que l'historique."""
+        html = render_history_window(_make_history(3), HISTORY_PAGE_SIZE)
+
+        assert html.count('class="history-card"') == 3
+        assert "plus ancien" not in html
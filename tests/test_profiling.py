@@ -0,0 +1,157 @@
+"""Tests unitaires pour le profilage des réexécutions."""
+
+import json
+
+import pytest
+
+from src.utils.profiling import (
+    Profiler,
+    flatten_tree,
+    folded_stacks,
+    profile_methods,
+    profiled,
+    profiler,
+    span,
+)
+from src.utils.timing import timed
+
+
+@pytest.fixture
+def profiling(monkeypatch):
+    """Fixture: profilage activé, profils vidés avant et après le test."""
+    monkeypatch.setenv("SERENE_PROFILE", "1")
+    monkeypatch.delenv("SERENE_PROFILE_DIR", raising=False)
+    profiler.reset()
+    yield profiler
+    profiler.reset()
+
+
+class TestSpan:
+    """Tests pour la collecte des mesures."""
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Tester qu'aucune mesure n'est collectée sans SERENE_PROFILE."""
+        monkeypatch.delenv("SERENE_PROFILE", raising=False)
+        profiler.reset()
+
+        with span("rerun") as current:
+            assert current is None
+
+        assert profiler.snapshot()["aggregates"] == {}
+
+    def test_nested_spans_build_tree(self, profiling):
+        """Tester l'arbre des sections et la fusion des appels de même nom."""
+        with span("rerun") as root:
+            for _ in range(3):
+                with span("db.get_mood_history"):
+                    pass
+            with span("page.dashboard"):
+                with span("dashboard.build_points_figure"):
+                    pass
+            root.name = "rerun.Dashboard"
+
+        tree = profiling.snapshot()["last"]["rerun.Dashboard"]
+        assert tree["calls"] == 1
+        assert tree["children"]["db.get_mood_history"]["calls"] == 3
+        assert "dashboard.build_points_figure" in tree["children"]["page.dashboard"]["children"]
+        children_total = sum(child["total_ms"] for child in tree["children"].values())
+        assert tree["self_ms"] == pytest.approx(tree["total_ms"] - children_total)
+
+    def test_aggregates_accumulate_runs(self, profiling):
+        """Tester le cumul des réexécutions par racine."""
+        for _ in range(2):
+            with span("rerun.Home"):
+                with span("app.styles"):
+                    pass
+
+        aggregate = profiling.snapshot()["aggregates"]["rerun.Home"]
+        assert aggregate["calls"] == 2
+        assert aggregate["children"]["app.styles"]["calls"] == 2
+
+    def test_timed_sections_are_profiled(self, profiling):
+        """Tester que les sections mesurées par timed apparaissent dans l'arbre."""
+        @timed("checkin.page")
+        def render():
+            return "ok"
+
+        with span("rerun"):
+            assert render() == "ok"
+
+        assert "checkin.page" in profiling.snapshot()["last"]["rerun"]["children"]
+
+    def test_dump_json(self, profiling, tmp_path):
+        """Tester l'export JSON des profils."""
+        with span("rerun"):
+            pass
+
+        path = tmp_path / "profiles" / "serene_profile.json"
+        profiling.dump_json(str(path))
+
+        data = json.loads(path.read_text(encoding="utf-8"))
+        assert data["aggregates"]["rerun"]["calls"] == 1
+        assert data["recent"][0]["name"] == "rerun"
+
+
+class TestInstrumentation:
+    """Tests pour l'instrumentation des méthodes."""
+
+    def test_profile_methods_wraps_database(self, profiling, file_db, user_id):
+        """Tester que chaque méthode publique de DatabaseManager est mesurée."""
+        db = profile_methods(file_db, "db")
+        with span("rerun"):
+            db.save_checkin(user_id, 7, "Bien")
+            assert len(db.get_mood_history(user_id)) == 1
+
+        children = profiling.snapshot()["last"]["rerun"]["children"]
+        assert set(children) == {"db.save_checkin", "db.get_mood_history"}
+
+    def test_profile_methods_noop_when_disabled(self, monkeypatch, file_db):
+        """Tester que l'objet n'est pas modifié sans profilage."""
+        monkeypatch.delenv("SERENE_PROFILE", raising=False)
+        profile_methods(file_db, "db")
+        assert "get_mood_history" not in vars(file_db)
+
+    def test_profiled_preserves_result(self, profiling):
+        """Tester que le décorateur profiled retourne le résultat de la fonction."""
+        @profiled("build")
+        def build(value):
+            return value * 2
+
+        assert build(21) == 42
+        assert profiling.snapshot()["aggregates"]["build"]["calls"] == 1
+
+
+class TestTreeFormats:
+    """Tests pour l'aplatissement et le format folded stacks."""
+
+    @pytest.fixture
+    def tree(self):
+        return {
+            "total_ms": 10.0, "self_ms": 2.0, "calls": 1,
+            "children": {
+                "a": {"total_ms": 3.0, "self_ms": 3.0, "calls": 1, "children": {}},
+                "b": {"total_ms": 5.0, "self_ms": 1.0, "calls": 2, "children": {
+                    "c": {"total_ms": 4.0, "self_ms": 4.0, "calls": 2, "children": {}},
+                }},
+            },
+        }
+
+    def test_flatten_orders_by_cost(self, tree):
+        """Tester le parcours en profondeur, enfants les plus coûteux d'abord."""
+        rows = flatten_tree(tree, "rerun")
+        assert [(row["depth"], row["name"]) for row in rows] == [
+            (0, "rerun"), (1, "b"), (2, "c"), (1, "a"),
+        ]
+
+    def test_folded_stacks(self, tree):
+        """Tester le format lu par flamegraph.pl (temps propre en µs)."""
+        assert folded_stacks(tree, "rerun").splitlines() == [
+            "rerun 2000", "rerun;a 3000", "rerun;b 1000", "rerun;b;c 4000",
+        ]
+
+    def test_independent_profilers(self):
+        """Tester que deux profileurs ne partagent pas leurs mesures."""
+        first, second = Profiler(), Profiler()
+        with first.span("rerun"):
+            pass
+        assert second.snapshot()["aggregates"] == {}
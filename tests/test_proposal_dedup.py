@@ -0,0 +1,134 @@
+"""Tests unitaires pour la déduplication des propositions d'actions."""
+
+import sqlite3
+
+import pytest
+
+from src.database.db_manager import DatabaseManager, normalize_title, titles_similar
+
+
+class TestNormalizeTitle:
+    """Tests pour la clé de déduplication des titres."""
+
+    def test_case_accents_and_punctuation(self):
+        """Tester que la casse, les accents et la ponctuation sont ignorés."""
+        assert normalize_title("Aller courir") == normalize_title("aller  Courir !")
+        assert normalize_title("Méditer le matin") == normalize_title("mediter le matin")
+
+    def test_stop_words_and_inflections(self):
+        """Tester l'oubli des mots vides et des terminaisons simples."""
+        assert normalize_title("Faire une promenade") == normalize_title("faire des promenades")
+
+    def test_similarity(self):
+        """Tester la comparaison des clés."""
+        walk = normalize_title("Faire une promenade")
+        assert titles_similar(walk, normalize_title("Faire une promenade après le dîner"))
+        assert not titles_similar(walk, normalize_title("Appeler un ami"))
+        assert not titles_similar(normalize_title("Lire"), normalize_title("Lire un roman policier"))
+
+
+class TestSaveProposedAction:
+    """Tests pour l'enregistrement sans doublons."""
+
+    def test_duplicate_pending_is_ignored(self, file_db, user_id):
+        """Tester qu'une proposition en attente similaire n'est pas dupliquée."""
+        first = file_db.save_proposed_action(user_id, "Aller courir 20 minutes")
+
+        assert first is not None
+        assert file_db.save_proposed_action(user_id, "aller courir 20 minutes !") is None
+        assert file_db.get_proposed_actions_count(user_id) == 1
+
+    def test_other_user_not_affected(self, file_db, user_id):
+        """Tester que la déduplication est propre à chaque utilisateur."""
+        other_id = file_db.create_user("autre@example.com", "Passw0rd!", "Autre")
+        file_db.save_proposed_action(user_id, "Aller courir")
+
+        assert file_db.save_proposed_action(other_id, "Aller courir") is not None
+
+    def test_active_action_item_blocks_proposal(self, file_db, user_id):
+        """Tester qu'une action en cours empêche une proposition similaire."""
+        action_id = file_db.save_action_item(user_id, "Méditer 10 minutes le matin")
+        file_db.update_action_item(action_id, status="in_progress")
+
+        assert file_db.save_proposed_action(user_id, "Méditer 10 minutes") is None
+
+        file_db.update_action_item(action_id, status="completed")
+        assert file_db.save_proposed_action(user_id, "Méditer 10 minutes") is not None
+
+    def test_rejected_frees_title(self, file_db, user_id):
+        """Tester qu'une proposition rejetée peut être proposée à nouveau."""
+        proposal_id = file_db.save_proposed_action(user_id, "Appeler un ami")
+        file_db.reject_proposed_action(proposal_id)
+
+        assert file_db.save_proposed_action(user_id, "Appeler un ami") is not None
+
+    def test_unique_index_on_pending(self, file_db, user_id):
+        """Tester que l'index refuse deux clés identiques en attente (écritures concurrentes)."""
+        file_db.save_proposed_action(user_id, "Boire de l'eau")
+
+        with pytest.raises(sqlite3.IntegrityError):
+            file_db.conn.execute(
+                "INSERT INTO proposed_actions (user_id, title, title_key) VALUES (?, ?, ?)",
+                (user_id, "Boire de l'eau", normalize_title("Boire de l'eau")),
+            )
+        file_db.conn.rollback()
+
+
+class TestActiveTitleKeys:
+    """Tests pour les clés de titres gardées en mémoire par utilisateur."""
+
+    def test_batch_reads_keys_once(self, file_db, user_id, mocker):
+        """Tester qu'une série de propositions ne relit les clés qu'une fois, sans cache de requêtes."""
+        assert file_db.query_cache is None
+        load = mocker.spy(file_db, "_load_active_title_keys")
+
+        for title in ("Aller courir", "Boire de l'eau", "Appeler un ami", "aller courir !"):
+            file_db.save_proposed_action(user_id, title)
+
+        assert load.call_count == 1
+        assert file_db.get_active_title_keys(user_id) == sorted(
+            normalize_title(title) for title in ("Aller courir", "Boire de l'eau", "Appeler un ami")
+        )
+        assert load.call_count == 1
+
+    def test_write_from_other_connection_is_seen(self, file_db, user_id):
+        """Tester qu'une écriture d'un autre processus (autre connexion) invalide les clés."""
+        file_db.save_proposed_action(user_id, "Aller courir")
+        other = DatabaseManager(file_db.db_path)
+        other.save_action_item(user_id, "Méditer 10 minutes le matin")
+        other.close()
+
+        assert file_db.save_proposed_action(user_id, "Méditer 10 minutes") is None
+
+
+class TestMigration:
+    """Tests pour l'ajout de title_key à une base existante."""
+
+    def test_existing_pending_rows_get_keys(self, tmp_path):
+        """Tester le remplissage des clés, seule la plus ancienne d'un doublon en recevant une."""
+        path = str(tmp_path / "old.db")
+        conn = sqlite3.connect(path)
+        conn.executescript(
+            """
+            CREATE TABLE proposed_actions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT,
+                status TEXT DEFAULT 'pending',
+                conversation_id INTEGER,
+                proposed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                reviewed_at DATETIME
+            );
+            INSERT INTO proposed_actions (user_id, title) VALUES (1, 'Aller courir'), (1, 'aller courir'),
+                (1, 'Lire');
+            INSERT INTO proposed_actions (user_id, title, status) VALUES (1, 'Lire', 'rejected');
+            """
+        )
+        conn.close()
+
+        db = DatabaseManager(path)
+        keys = [row[0] for row in db.conn.execute("SELECT title_key FROM proposed_actions ORDER BY id")]
+        db.close()
+
+        assert keys == [normalize_title("Aller courir"), None, normalize_title("Lire"), None]
@@ -0,0 +1,188 @@
+"""Tests unitaires pour le cache de lecture des requêtes."""
+
+import pytest
+
+from src.database.db_manager import DatabaseManager
+from src.database.query_cache import QueryCache
+from tests.conftest import FakeClock
+
+
+@pytest.fixture
+def cached_db(tmp_path):
+    """Fixture: DatabaseManager sur fichier avec cache de lecture."""
+    db = DatabaseManager(str(tmp_path / "cached.db"), query_cache=QueryCache())
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def two_users(cached_db):
+    """Fixture: deux utilisateurs dans cached_db."""
+    return (
+        cached_db.create_user("alice@example.com", "Passw0rd!"),
+        cached_db.create_user("bob@example.com", "Passw0rd!"),
+    )
+
+
+class TestQueryCache:
+    """Tests pour la classe QueryCache."""
+
+    def test_hit_after_miss(self):
+        """Tester qu'un second accès est servi par le cache."""
+        cache = QueryCache()
+        calls = []
+
+        for _ in range(2):
+            cache.get_or_load((1, "q", ()), ["t"], lambda: calls.append(1) or "v")
+
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_ttl_expiration(self):
+        """Tester qu'une entrée expirée est rechargée."""
+        clock = FakeClock()
+        cache = QueryCache(ttl_seconds=10, clock=clock)
+        cache.get_or_load((1, "q", ()), ["t"], lambda: "old")
+
+        clock.now = 11
+        assert cache.get_or_load((1, "q", ()), ["t"], lambda: "new") == "new"
+
+    def test_lru_eviction(self):
+        """Tester l'éviction de l'entrée la moins récemment utilisée."""
+        cache = QueryCache(max_entries=2)
+        cache.get_or_load((1, "a", ()), ["t"], lambda: "a")
+        cache.get_or_load((1, "b", ()), ["t"], lambda: "b")
+        cache.get_or_load((1, "a", ()), ["t"], lambda: "a")  # a devient récent
+        cache.get_or_load((1, "c", ()), ["t"], lambda: "c")
+
+        assert cache.get_or_load((1, "a", ()), ["t"], lambda: "reloaded") == "a"
+        assert cache.get_or_load((1, "b", ()), ["t"], lambda: "reloaded") == "reloaded"
+        assert cache.stats()["evictions"] >= 1
+
+    def test_invalidate_is_scoped_to_user_and_table(self):
+        """Tester que l'invalidation ne touche que l'utilisateur et la table visés."""
+        cache = QueryCache()
+        cache.get_or_load((1, "a", ()), ["check_ins"], lambda: "a")
+        cache.get_or_load((1, "b", ()), ["action_items"], lambda: "b")
+        cache.get_or_load((2, "a", ()), ["check_ins"], lambda: "a")
+
+        assert cache.invalidate(1, ["check_ins"]) == 1
+        assert cache.stats()["size"] == 2
+
+    def test_write_during_load_is_not_cached(self):
+        """Tester qu'un résultat lu pendant une écriture n'est pas mémorisé."""
+        cache = QueryCache()
+
+        def loader():
+            cache.invalidate(1, ["t"])
+            return "stale"
+
+        cache.get_or_load((1, "q", ()), ["t"], loader)
+
+        assert cache.stats()["size"] == 0
+
+    def test_invalid_parameters(self):
+        """Tester le rejet des paramètres invalides."""
+        with pytest.raises(ValueError):
+            QueryCache(max_entries=0)
+        with pytest.raises(ValueError):
+            QueryCache(ttl_seconds=0)
+
+    def test_from_env_disabled_by_default(self, monkeypatch):
+        """Tester que le cache est désactivé sans SERENE_QUERY_CACHE_TTL."""
+        monkeypatch.delenv("SERENE_QUERY_CACHE_TTL", raising=False)
+        assert QueryCache.from_env() is None
+
+    def test_from_env_can_disable(self, monkeypatch):
+        """Tester la désactivation via SERENE_QUERY_CACHE_TTL=0."""
+        monkeypatch.setenv("SERENE_QUERY_CACHE_TTL", "0")
+        assert QueryCache.from_env() is None
+
+        monkeypatch.setenv("SERENE_QUERY_CACHE_TTL", "5")
+        assert QueryCache.from_env().ttl_seconds == 5
+
+
+class TestDatabaseManagerCaching:
+    """Tests pour l'intégration du cache dans DatabaseManager."""
+
+    def test_repeated_reads_hit_cache(self, cached_db, two_users):
+        """Tester que des lectures répétées sont servies par le cache."""
+        alice, _ = two_users
+        cached_db.get_mood_history(alice, days=30)
+        cached_db.get_mood_history(alice, 30)
+        cached_db.get_mood_history(user_id=alice)
+
+        stats = cached_db.query_cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
+
+    def test_save_checkin_invalidates_history(self, cached_db, two_users):
+        """Tester qu'un check-in rend l'historique à jour."""
+        alice, _ = two_users
+        assert cached_db.get_mood_history(alice) == []
+
+        cached_db.save_checkin(alice, 7, "Bien")
+
+        assert len(cached_db.get_mood_history(alice)) == 1
+
+    def test_writes_do_not_invalidate_other_users(self, cached_db, two_users):
+        """Tester que l'écriture d'un utilisateur conserve le cache des autres."""
+        alice, bob = two_users
+        cached_db.get_action_items_stats(bob)
+
+        cached_db.save_action_item(user_id=alice, title="Marcher")
+        cached_db.get_action_items_stats(bob)
+
+        assert cached_db.query_cache.stats()["hits"] == 1
+
+    def test_writes_do_not_invalidate_other_tables(self, cached_db, two_users):
+        """Tester qu'une écriture ne purge que les tables concernées."""
+        alice, _ = two_users
+        cached_db.get_mood_history(alice)
+
+        cached_db.save_action_item(user_id=alice, title="Marcher")
+        cached_db.get_mood_history(alice)
+
+        assert cached_db.query_cache.stats()["hits"] == 1
+
+    def test_update_by_id_invalidates_owner(self, cached_db, two_users):
+        """Tester qu'une mise à jour par ID invalide le cache du propriétaire."""
+        alice, _ = two_users
+        action_id = cached_db.save_action_item(user_id=alice, title="Lire")
+        assert cached_db.get_action_items_stats(alice)["pending"] == 1
+
+        cached_db.update_action_item(action_id, status="completed")
+        stats = cached_db.get_action_items_stats(alice)
+        assert stats["pending"] == 0
+        assert stats["completed"] == 1
+
+        cached_db.delete_action_item(action_id)
+        assert cached_db.get_action_items_stats(alice)["total"] == 0
+
+    def test_accept_proposal_invalidates_both_tables(self, cached_db, two_users):
+        """Tester que l'acceptation rafraîchit propositions et actions."""
+        alice, _ = two_users
+        proposal_id = cached_db.save_proposed_action(alice, "Respirer")
+        assert len(cached_db.get_proposed_actions(alice, status="pending")) == 1
+        assert cached_db.get_action_items(alice) == []
+
+        cached_db.accept_proposed_action(proposal_id)
+
+        assert cached_db.get_proposed_actions(alice, status="pending") == []
+        assert len(cached_db.get_action_items(alice)) == 1
+
+    def test_cached_results_are_copies(self, cached_db, two_users):
+        """Tester que modifier un résultat ne corrompt pas le cache."""
+        alice, _ = two_users
+        cached_db.save_action_item(user_id=alice, title="Lire")
+
+        cached_db.get_action_items(alice)[0]["title"] = "Modifié"
+
+        assert cached_db.get_action_items(alice)[0]["title"] == "Lire"
+
+    def test_without_cache_reads_hit_database(self, file_db, user_id):
+        """Tester que le comportement par défaut reste sans cache."""
+        assert file_db.query_cache is None
+        file_db.save_checkin(user_id, 5)
+        assert len(file_db.get_mood_history(user_id)) == 1
@@ -0,0 +1,217 @@
+"""Tests unitaires pour l'ordonnanceur des appels LLM."""
+
+import threading
+import time
+
+import pytest
+
+from src.llm.rate_limiter import (
+    LLMScheduler,
+    MemoryBucketStore,
+    RateLimitTimeout,
+    SQLiteBucketStore,
+    estimate_request_tokens,
+    priority_of,
+)
+
+
+def wait_for_queue(scheduler, size, timeout=2.0):
+    """Attendre que size requêtes soient en file."""
+    deadline = time.monotonic() + timeout
+    while len(scheduler._waiting) < size:
+        assert time.monotonic() < deadline, "file d'attente non atteinte"
+        time.sleep(0.005)
+
+
+def queue_and_release(scheduler, holder, requests):
+    """
+    Mettre des requêtes en file derrière holder, puis les servir une à une.
+
+    Returns:
+        Ordre d'admission (étiquettes des requêtes).
+    """
+    order = []
+    lock = threading.Lock()
+
+    def worker(label, component, user_id):
+        grant = scheduler.acquire(component, user_id, 10)
+        with lock:
+            order.append(label)
+        grant.release()
+
+    threads = []
+    for i, (label, component, user_id) in enumerate(requests):
+        thread = threading.Thread(target=worker, args=(label, component, user_id))
+        thread.start()
+        threads.append(thread)
+        wait_for_queue(scheduler, i + 1)
+
+    holder.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    return order
+
+
+class TestBudgets:
+    """Tests pour les budgets de requêtes et de tokens."""
+
+    def test_disabled_by_default(self):
+        """Tester l'admission immédiate sans budget."""
+        scheduler = LLMScheduler()
+        assert not scheduler.enabled
+        grants = [scheduler.acquire("conversation", 1, 10_000) for _ in range(100)]
+        for grant in grants:
+            grant.release()
+
+    def test_tokens_per_minute_blocks(self):
+        """Tester l'attente quand le budget de tokens est épuisé."""
+        scheduler = LLMScheduler(tokens_per_minute=600)  # 10 tokens/s
+        scheduler.acquire("conversation", 1, 600).release()
+
+        start = time.monotonic()
+        scheduler.acquire("conversation", 1, 5).release()
+        assert time.monotonic() - start >= 0.3
+
+    def test_release_refunds_unused_tokens(self):
+        """Tester la correction de la réservation par l'usage réel."""
+        scheduler = LLMScheduler(tokens_per_minute=600, queue_timeout=0.2)
+        scheduler.acquire("conversation", 1, 600).release(actual_tokens=100)
+
+        start = time.monotonic()
+        scheduler.acquire("conversation", 1, 400).release()
+        assert time.monotonic() - start < 0.1
+
+    def test_requests_per_minute(self):
+        """Tester le budget de requêtes."""
+        store = MemoryBucketStore()
+        assert store.take({"requests": (1, 2)}) == 0
+        assert store.take({"requests": (1, 2)}) == 0
+        assert store.take({"requests": (1, 2)}) > 0
+
+    def test_queue_timeout(self):
+        """Tester l'erreur quand l'admission tarde trop."""
+        scheduler = LLMScheduler(max_concurrency=1, queue_timeout=0.1)
+        holder = scheduler.acquire("conversation", 1, 10)
+
+        with pytest.raises(RateLimitTimeout):
+            scheduler.acquire("insights", 2, 10)
+        holder.release()
+        assert scheduler._waiting == []
+
+    def test_sqlite_store_is_shared(self, tmp_path):
+        """Tester que deux processus (deux connexions) partagent les seaux."""
+        path = str(tmp_path / "rate.db")
+        first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+
+        assert first.take({"tokens": (100, 100)}) == 0
+        assert second.take({"tokens": (50, 100)}) > 0
+
+        first.adjust("tokens", 60, 100)
+        assert second.take({"tokens": (50, 100)}) == 0
+
+
+class BlockingStore(MemoryBucketStore):
+    """Stockage dont le prélèvement reste bloqué une fois armé (processus concurrent)."""
+
+    def __init__(self):
+        super().__init__()
+        self.armed = False
+        self.entered = threading.Event()
+        self.unblock = threading.Event()
+
+    def take(self, amounts):
+        if self.armed:
+            self.entered.set()
+            self.unblock.wait(timeout=5)
+        return super().take(amounts)
+
+
+class TestStoreOutsideLock:
+    """Tests pour l'appel au stockage hors de la condition de l'ordonnanceur."""
+
+    def test_release_not_blocked_by_store(self):
+        """Tester qu'un prélèvement bloqué n'empêche ni les libérations ni les arrivées."""
+        store = BlockingStore()
+        scheduler = LLMScheduler(requests_per_minute=100, max_concurrency=2, store=store)
+        first = scheduler.acquire("conversation", 1, 10)
+        store.armed = True
+
+        thread = threading.Thread(target=lambda: scheduler.acquire("conversation", 2, 10).release())
+        thread.start()
+        assert store.entered.wait(timeout=2)
+
+        released = threading.Thread(target=first.release)
+        released.start()
+        released.join(timeout=1)
+        assert not released.is_alive()
+        assert scheduler._active == 1
+
+        store.unblock.set()
+        thread.join(timeout=5)
+        assert scheduler._active == 0
+
+    def test_slot_returned_when_store_fails(self):
+        """Tester que l'emplacement réservé est rendu si le stockage échoue."""
+
+        class FailingStore(MemoryBucketStore):
+            def take(self, amounts):
+                raise OSError("disque indisponible")
+
+        scheduler = LLMScheduler(requests_per_minute=100, max_concurrency=1, store=FailingStore())
+        with pytest.raises(OSError):
+            scheduler.acquire("conversation", 1, 10)
+
+        assert scheduler._active == 0
+        assert scheduler._waiting == []
+
+    def test_last_served_is_bounded(self, monkeypatch):
+        """Tester que la mémoire d'équité garde les utilisateurs servis le plus récemment."""
+        monkeypatch.setattr("src.llm.rate_limiter.LAST_SERVED_MAX_USERS", 3)
+        scheduler = LLMScheduler(max_concurrency=1)
+        for user_id in range(5):
+            scheduler.acquire("conversation", user_id, 10).release()
+
+        assert list(scheduler._last_served) == [2, 3, 4]
+
+
+class TestScheduling:
+    """Tests pour les priorités et l'équité entre utilisateurs."""
+
+    def test_priority_classes(self):
+        """Tester l'ordre des composants."""
+        assert priority_of("conversation") < priority_of("action_suggestion")
+        assert priority_of("action_suggestion") < priority_of("action_extraction")
+        assert priority_of("action_extraction") < priority_of("insights")
+        assert priority_of("inconnu") > priority_of("insights")
+
+    def test_conversation_before_background(self):
+        """Tester qu'une conversation passe avant l'extraction et les insights en attente."""
+        scheduler = LLMScheduler(max_concurrency=1)
+        holder = scheduler.acquire("conversation", 1, 10)
+
+        order = queue_and_release(scheduler, holder, [
+            ("insights", "insights", 2),
+            ("extraction", "action_extraction", 3),
+            ("conversation", "conversation", 4),
+        ])
+        assert order == ["conversation", "extraction", "insights"]
+
+    def test_fair_queuing_per_user(self):
+        """Tester l'alternance entre utilisateurs de même priorité."""
+        scheduler = LLMScheduler(max_concurrency=1)
+        holder = scheduler.acquire("conversation", 9, 10)
+
+        order = queue_and_release(scheduler, holder, [
+            ("a1", "action_extraction", 1),
+            ("a2", "action_extraction", 1),
+            ("a3", "action_extraction", 1),
+            ("b1", "action_extraction", 2),
+        ])
+        assert order == ["a1", "b1", "a2", "a3"]
+
+    def test_estimate_request_tokens(self):
+        """Tester l'estimation (prompt / 4 + max_tokens)."""
+        tokens = estimate_request_tokens({
+            "system": "x" * 400, "messages": [{"role": "user", "content": "y" * 400}], "max_tokens": 100,
+        })
+        assert 300 <= tokens <= 330
@@ -0,0 +1,186 @@
+"""Tests unitaires pour les connexions de lecture séparées de DatabaseManager."""
+
+import os
+import time
+
+import pytest
+
+from src.database.db_manager import DatabaseManager
+from src.database.export import write_ndjson_export
+from src.database.query_cache import QueryCache
+from src.database.read_replicas import ReadReplicas
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Fixture: DatabaseManager fichier avec 2 connexions de lecture (WAL)."""
+    manager = DatabaseManager(str(tmp_path / "serene.db"), read_connections=2)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def snapshot_db(tmp_path):
+    """Fixture: DatabaseManager dont les lectures passent par une copie (refaite à la main)."""
+    path = str(tmp_path / "serene.db")
+    manager = DatabaseManager(path, read_connections=2)
+    manager.replicas = ReadReplicas(path, 2, snapshot_seconds=60, background=False)
+    manager.replicas.refresh()
+    yield manager
+    manager.close()
+
+
+class TestWalReaders:
+    """Tests pour les connexions de lecture sur la base en mode WAL."""
+
+    def test_wal_enabled(self, db):
+        """Tester que la base passe en mode WAL."""
+        assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_reads_use_pool_and_see_writes(self, db):
+        """Tester que les lectures passent par le pool et voient les écritures validées."""
+        db.save_checkin(1, 7, "Bonne journée")
+        db.save_conversation(1, "Bonjour", "Bonjour !")
+
+        assert [c["notes"] for c in db.get_mood_history(1)] == ["Bonne journée"]
+        assert db.get_conversation_count(1) == 1
+        assert db.replicas.reads == 2
+        assert db.replicas.writer_reads == 0
+
+    def test_read_connections_are_read_only(self, db):
+        """Tester qu'une connexion de lecture refuse les écritures."""
+        with db.replicas.connection() as conn:
+            with pytest.raises(Exception, match="readonly"):
+                conn.execute("DELETE FROM check_ins")
+
+    def test_memory_database_has_no_readers(self):
+        """Tester qu'une base en mémoire garde sa connexion unique."""
+        memory_db = DatabaseManager(":memory:", read_connections=2)
+        assert memory_db.replicas is None
+        memory_db.close()
+
+    def test_export_streams_through_pool(self, db, tmp_path):
+        """Tester l'export en flux via une connexion de lecture."""
+        user_id = db.create_user("export@example.com", "Passw0rd!")
+        for i in range(5):
+            db.save_checkin(user_id, i)
+
+        with open(tmp_path / "export.ndjson", "wb") as f:
+            counts = write_ndjson_export(db, user_id, f)
+
+        assert counts["check_ins"] == 5
+        assert db.replicas.reads > 0
+        assert db.replicas.writer_reads == 0
+
+    def test_cache_and_readers_together(self, tmp_path):
+        """Tester que le cache est toujours invalidé avec des connexions de lecture."""
+        manager = DatabaseManager(str(tmp_path / "cached.db"), query_cache=QueryCache(), read_connections=1)
+        manager.save_checkin(1, 4)
+        assert manager.get_mood_stats(1)["count"] == 1
+        manager.save_checkin(1, 6)
+        assert manager.get_mood_stats(1)["count"] == 2
+        manager.close()
+
+
+class TestSnapshotReaders:
+    """Tests pour les lectures sur une copie rafraîchie périodiquement."""
+
+    def test_writer_serves_until_first_snapshot(self, tmp_path):
+        """Tester que les lectures passent par l'écrivain tant qu'aucune copie n'existe."""
+        path = str(tmp_path / "serene.db")
+        manager = DatabaseManager(path, read_connections=1)
+        manager.replicas = ReadReplicas(path, 1, snapshot_seconds=60, background=False)
+
+        assert manager.get_mood_history(1) == []
+        assert manager.replicas.writer_reads == 1
+        assert manager.replicas.refreshes == 0
+        manager.close()
+
+    def test_background_refresh(self, tmp_path):
+        """Tester que la copie est refaite par le thread d'arrière-plan."""
+        path = str(tmp_path / "serene.db")
+        DatabaseManager(path).close()
+        replicas = ReadReplicas(path, 1, snapshot_seconds=0.01)
+
+        deadline = time.monotonic() + 5
+        while replicas.refreshes < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert replicas.refreshes >= 2
+        assert os.path.exists(replicas.snapshot_path)
+        replicas.close()
+        assert not replicas._refresher.is_alive()
+
+    def test_writer_reads_own_writes_until_refresh(self, snapshot_db):
+        """Tester qu'un utilisateur relit ses écritures avant la copie suivante."""
+        snapshot_db.save_checkin(1, 8, "Après la copie")
+
+        assert [c["notes"] for c in snapshot_db.get_mood_history(1)] == ["Après la copie"]
+        assert snapshot_db.replicas.writer_reads == 1
+
+        snapshot_db.replicas.refresh()
+        assert [c["notes"] for c in snapshot_db.get_mood_history(1)] == ["Après la copie"]
+        assert snapshot_db.replicas.writer_reads == 1
+
+    def test_markers_pruned_after_refresh(self, snapshot_db):
+        """Tester que les marqueurs couverts par la copie sont oubliés."""
+        snapshot_db.save_checkin(1, 8)
+        snapshot_db.save_checkin(2, 6)
+        assert len(snapshot_db.replicas._last_write) == 2
+
+        snapshot_db.replicas.refresh()
+
+        assert snapshot_db.replicas._last_write == {}
+        assert snapshot_db.replicas.can_serve(1) and snapshot_db.replicas.can_serve(2)
+
+    def test_other_users_read_snapshot(self, snapshot_db):
+        """Tester que les autres utilisateurs lisent la copie (sans l'écriture récente)."""
+        snapshot_db.save_checkin(1, 8)
+
+        assert snapshot_db.get_mood_history(2) == []
+        with snapshot_db.replicas.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM check_ins").fetchone()[0] == 0
+        assert snapshot_db.replicas.writer_reads == 0
+
+    def test_row_id_writes_mark_owner(self, snapshot_db):
+        """Tester le marqueur des écritures par ID de ligne (owner_table)."""
+        action_id = snapshot_db.save_action_item(1, "Marcher")
+        snapshot_db.replicas.refresh()
+        assert snapshot_db.replicas.can_serve(1)
+
+        snapshot_db.update_action_item(action_id, status="completed")
+        assert not snapshot_db.replicas.can_serve(1)
+        assert snapshot_db.get_action_items_stats(1)["completed"] == 1
+
+    def test_close_removes_snapshot(self, snapshot_db):
+        """Tester que close supprime la copie."""
+        snapshot_path = snapshot_db.replicas.snapshot_path
+        assert os.path.exists(snapshot_path)
+        snapshot_db.close()
+        assert not os.path.exists(snapshot_path)
+
+
+class TestReadReplicasConfig:
+    """Tests pour la configuration des connexions de lecture."""
+
+    def test_invalid_size(self, tmp_path):
+        """Tester qu'un pool vide est refusé."""
+        with pytest.raises(ValueError):
+            ReadReplicas(str(tmp_path / "serene.db"), 0)
+
+    def test_from_env(self, tmp_path, monkeypatch):
+        """Tester la lecture des variables d'environnement."""
+        monkeypatch.setenv("SERENE_DB_READ_CONNECTIONS", "3")
+        monkeypatch.setenv("SERENE_DB_SNAPSHOT_SECONDS", "30")
+        manager = DatabaseManager.from_env(str(tmp_path / "serene.db"))
+        assert manager.replicas.size == 3
+        assert manager.replicas.snapshot_seconds == 30
+        manager.close()
+
+    def test_from_env_defaults(self, tmp_path, monkeypatch):
+        """Tester qu'aucune connexion de lecture n'est ouverte par défaut."""
+        monkeypatch.delenv("SERENE_DB_READ_CONNECTIONS", raising=False)
+        monkeypatch.setenv("SERENE_DB_SNAPSHOT_SECONDS", "invalide")
+        manager = DatabaseManager.from_env(str(tmp_path / "serene.db"))
+        assert manager.replicas is None
+        manager.close()
@@ -0,0 +1,133 @@
+"""Tests unitaires pour la recherche plein texte (FTS5)."""
+
+import pandas as pd
+import pytest
+
+from src.database.bulk_import import BulkImporter
+from src.database.db_manager import (
+    SEARCH_HIGHLIGHT_END,
+    SEARCH_HIGHLIGHT_START,
+    DatabaseManager,
+    build_search_query,
+)
+from src.ui.conversation import highlight_snippet
+
+
+class TestBuildSearchQuery:
+    """Tests pour la construction de la requête MATCH."""
+
+    def test_words_become_quoted_prefixes(self):
+        """Tester la conversion en préfixes entre guillemets."""
+        assert build_search_query("Fatigue travail") == '"fatigue"* "travail"*'
+
+    def test_stop_words_and_elisions_removed(self):
+        """Tester la suppression des mots vides et des élisions."""
+        assert build_search_query("l'anxiété de la semaine") == '"anxiété"* "semaine"*'
+
+    def test_fts_syntax_is_neutralized(self):
+        """Tester que la syntaxe FTS5 saisie par l'utilisateur est ignorée."""
+        assert build_search_query('sommeil" OR NEAR(') == '"sommeil"* "or"* "near"*'
+
+    def test_empty_query(self):
+        """Tester une saisie sans mot exploitable."""
+        assert build_search_query("  le, la !") is None
+
+
+class TestSearch:
+    """Tests pour DatabaseManager.search."""
+
+    def test_accent_insensitive_and_prefix(self, file_db, user_id):
+        """Tester la recherche sans accents et par préfixe."""
+        file_db.save_conversation(user_id, "Je suis très fatigué ce soir", "Prends soin de toi")
+        file_db.save_checkin(user_id, 4, "Anxiété au travail")
+
+        assert [r["source"] for r in file_db.search(user_id, "fatigue")] == ["conversation"]
+        results = file_db.search(user_id, "anxiete")
+        assert results[0]["source"] == "check_in"
+        assert results[0]["mood_score"] == 4
+        assert SEARCH_HIGHLIGHT_START + "Anxiété" + SEARCH_HIGHLIGHT_END in results[0]["snippet"]
+
+    def test_results_scoped_to_user(self, file_db, user_id):
+        """Tester que la recherche ne retourne que les données de l'utilisateur."""
+        other = file_db.create_user("other@example.com", "Passw0rd!")
+        file_db.save_checkin(other, 5, "Sommeil agité")
+
+        assert file_db.search(user_id, "sommeil") == []
+        assert len(file_db.search(other, "sommeil")) == 1
+
+    def test_ranking_and_pagination(self, file_db, user_id):
+        """Tester le classement par pertinence et la pagination."""
+        for i in range(12):
+            file_db.save_checkin(user_id, 5, f"Journée {i} avec un peu de stress")
+        best = file_db.save_checkin(user_id, 2, "Stress stress stress")
+
+        first_page = file_db.search(user_id, "stress", limit=5)
+        second_page = file_db.search(user_id, "stress", limit=5, offset=5)
+
+        assert first_page[0]["id"] == best
+        assert len(first_page) == len(second_page) == 5
+        assert not {r["id"] for r in first_page} & {r["id"] for r in second_page}
+
+    def test_sources_filter(self, file_db, user_id):
+        """Tester la restriction à une seule source."""
+        file_db.save_conversation(user_id, "Parlons du sommeil", "Bien sûr")
+        file_db.save_checkin(user_id, 6, "Bon sommeil")
+
+        results = file_db.search(user_id, "sommeil", sources=("check_ins",))
+
+        assert [r["source"] for r in results] == ["check_in"]
+        with pytest.raises(ValueError):
+            file_db.search(user_id, "sommeil", sources=("users",))
+
+    def test_triggers_follow_updates_and_deletes(self, file_db, user_id):
+        """Tester la synchronisation de l'index après modification et suppression."""
+        checkin_id = file_db.save_checkin(user_id, 5, "Promenade en forêt")
+
+        file_db.conn.execute("UPDATE check_ins SET notes = 'Lecture au calme' WHERE id = ?", (checkin_id,))
+        assert file_db.search(user_id, "promenade") == []
+        assert len(file_db.search(user_id, "lecture")) == 1
+
+        file_db.conn.execute("DELETE FROM check_ins WHERE id = ?", (checkin_id,))
+        assert file_db.search(user_id, "lecture") == []
+
+    def test_existing_database_is_indexed(self, tmp_path):
+        """Tester l'indexation des lignes d'une base créée avant FTS5."""
+        path = str(tmp_path / "legacy.db")
+        db = DatabaseManager(path)
+        uid = db.create_user("legacy@example.com", "Passw0rd!")
+        db.conn.executescript(
+            """
+            DROP TRIGGER check_ins_fts_insert;
+            DROP TRIGGER check_ins_fts_delete;
+            DROP TRIGGER check_ins_fts_update;
+            DROP TABLE check_ins_fts;
+            """
+        )
+        db.conn.execute("INSERT INTO check_ins (user_id, mood_score, notes) VALUES (?, 6, 'Méditation')", (uid,))
+        db.conn.commit()
+        db.close()
+
+        db = DatabaseManager(path)
+        assert len(db.search(uid, "meditation")) == 1
+        db.close()
+
+    def test_bulk_import_backfills_index(self, file_db, user_id):
+        """Tester que les lignes importées en masse sont indexées."""
+        file_db.save_checkin(user_id, 5, "Avant import")
+        frame = pd.DataFrame({"mood_score": [5, 6], "notes": ["Yoga matinal", "Yoga du soir"]})
+
+        BulkImporter(file_db).import_frames([frame], "check_ins", user_id)
+        file_db.save_checkin(user_id, 7, "Yoga après import")
+
+        assert len(file_db.search(user_id, "yoga")) == 3
+        assert len(file_db.search(user_id, "avant")) == 1
+
+
+class TestHighlightSnippet:
+    """Tests pour l'affichage des extraits."""
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        """Tester l'échappement HTML et le surlignage."""
+        snippet = f"<b>{SEARCH_HIGHLIGHT_START}stress{SEARCH_HIGHLIGHT_END}</b>"
+
+        assert highlight_snippet(snippet) == "&lt;b&gt;<mark>stress</mark>&lt;/b&gt;"
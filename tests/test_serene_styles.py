@@ -0,0 +1,80 @@
+"""Tests unitaires pour la compilation du thème CSS."""
+
+from src.ui.styles.serene_styles import (
+    NAVIGATION_CSS,
+    compact_html,
+    get_main_css,
+    get_main_css_bundle,
+    minify_css,
+)
+
+
+class TestMinifyCss:
+    """Tests pour la fonction minify_css."""
+
+    def test_minify_removes_comments_and_whitespace(self):
+        """Tester la suppression des commentaires et espaces superflus."""
+        css = "/* titre */\n.a  >  .b {\n    color : red ;\n    margin: 0;\n}\n"
+
+        assert minify_css(css) == ".a>.b{color :red;margin:0}"
+
+    def test_minify_preserves_quoted_strings(self):
+        """Tester que le contenu des chaînes n'est pas modifié."""
+        css = ".icon::before { content: '\\f058  ' !important; }"
+
+        assert "'\\f058  '" in minify_css(css)
+
+    def test_minify_keeps_descendant_pseudo_selector(self):
+        """Tester qu'un sélecteur descendant n'est pas fusionné en pseudo-classe."""
+        assert minify_css(".a :hover { color: red; }") == ".a :hover{color:red}"
+
+
+class TestMainCssBundle:
+    """Tests pour le bundle CSS compilé."""
+
+    def test_bundle_is_compiled_once(self):
+        """Tester que le bundle est mis en cache pour le processus."""
+        assert get_main_css_bundle() is get_main_css_bundle()
+        assert get_main_css() is get_main_css()
+
+    def test_bundle_contains_only_style(self):
+        """Tester que le bundle ne contient qu'une balise <style>."""
+        html = get_main_css_bundle().html
+
+        assert html.startswith("<style")
+        assert html.endswith("</style>")
+        assert "<script" not in html
+        assert html.count("<style") == 1
+
+    def test_bundle_includes_navigation_css(self):
+        """Tester que le style de navigation est inclus dans le bundle."""
+        html = get_main_css_bundle().html
+
+        assert minify_css("section[data-testid=\"stSidebar\"] button::after") in html
+        assert "<style>" in NAVIGATION_CSS
+
+    def test_bundle_is_smaller_than_source(self):
+        """Tester que le bundle est plus léger que le CSS source."""
+        assert len(get_main_css_bundle().html) < len(get_main_css()) * 0.8
+
+    def test_bundle_digest_matches_content(self):
+        """Tester que l'empreinte est reprise dans l'identifiant de la balise."""
+        bundle = get_main_css_bundle()
+
+        assert len(bundle.digest) == 12
+        assert f'id="serene-theme-{bundle.digest}"' in bundle.html
+
+
+class TestCompactHtml:
+    """Tests pour la fonction compact_html."""
+
+    def test_compact_html_removes_indentation(self):
+        """Tester la suppression de l'indentation entre balises."""
+        html = """
+        <div style='padding: 1rem;'>
+            <p>Bonjour
+               le monde</p>
+        </div>
+        """
+
+        assert compact_html(html) == "<div style='padding: 1rem;'><p>Bonjour le monde</p></div>"
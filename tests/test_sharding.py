@@ -0,0 +1,185 @@
+"""Tests unitaires pour la répartition des utilisateurs sur plusieurs fichiers SQLite."""
+
+import sqlite3
+
+import pytest
+
+from src.database.db_manager import DatabaseManager
+from src.database.sharding import SHARD_ID_SPAN, ShardedDatabaseManager
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    """Fixture: ShardedDatabaseManager à 2 shards."""
+    db = ShardedDatabaseManager(str(tmp_path / "shards"), shard_count=2)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def users(sharded):
+    """Fixture: quatre utilisateurs avec un check-in et une action chacun."""
+    user_ids = []
+    for i in range(4):
+        user_id = sharded.create_user(f"user{i}@example.com", "Passw0rd!", f"User {i}")
+        sharded.save_checkin(user_id, 5 + i, f"Note {i}")
+        sharded.save_action_item(user_id, f"Action {i}")
+        user_ids.append(user_id)
+    return user_ids
+
+
+def count_rows(path, table):
+    """Compter les lignes d'une table directement dans un fichier."""
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class TestRouting:
+    """Tests pour l'aiguillage des méthodes."""
+
+    def test_every_public_method_routed(self):
+        """Tester que toute méthode publique de DatabaseManager est servie."""
+        public = {name for name in dir(DatabaseManager) if not name.startswith("_")}
+        assert public <= set(dir(ShardedDatabaseManager))
+
+    def test_users_spread_over_shard_files(self, sharded, users):
+        """Tester que les données sont écrites dans le fichier du shard de l'utilisateur."""
+        assert count_rows(sharded.shard_path(1), "check_ins") == 2
+        assert count_rows(sharded.shard_path(2), "check_ins") == 2
+        assert count_rows(sharded.shard_path(1), "users") == 0
+        assert sharded.authenticate_user("user3@example.com", "Passw0rd!")["id"] == users[3]
+        assert [c["notes"] for c in sharded.get_mood_history(users[3])] == ["Note 3"]
+
+    def test_row_ids_unique_across_shards(self, sharded, users):
+        """Tester que chaque shard alloue ses IDs dans sa propre plage."""
+        ids = [sharded.get_action_items(user_id)[0]["id"] for user_id in users]
+        assert len(set(ids)) == 4
+        assert {action_id // SHARD_ID_SPAN for action_id in ids} == {1, 2}
+
+    def test_row_methods_find_shard(self, sharded, users):
+        """Tester les méthodes par ID de ligne (actions et propositions)."""
+        proposal_id = sharded.save_proposed_action(users[1], "Respirer")
+        action_id = sharded.accept_proposed_action(proposal_id)
+
+        sharded.update_action_item(action_id, status="completed")
+
+        assert sharded.get_action_item_by_id(action_id)["status"] == "completed"
+        assert sharded.get_action_items_stats(users[1])["completed"] == 1
+
+    def test_unknown_user_rejected(self, sharded):
+        """Tester qu'un utilisateur absent de l'annuaire est refusé."""
+        with pytest.raises(ValueError):
+            sharded.get_mood_history(999)
+
+    def test_per_user_files(self, tmp_path):
+        """Tester le mode un fichier par utilisateur."""
+        db = ShardedDatabaseManager(str(tmp_path / "per_user"), per_user=True)
+        first = db.create_user("a@example.com", "Passw0rd!")
+        second = db.create_user("b@example.com", "Passw0rd!")
+
+        assert db.shard_number_for(first) != db.shard_number_for(second)
+        db.close()
+
+    def test_open_shards_bounded(self, tmp_path):
+        """Tester que seuls max_open_shards shards restent ouverts en mode per_user."""
+        db = ShardedDatabaseManager(str(tmp_path / "per_user"), per_user=True, max_open_shards=2)
+        user_ids = [db.create_user(f"u{i}@example.com", "Passw0rd!") for i in range(4)]
+        for user_id in user_ids:
+            db.save_checkin(user_id, 5)
+
+        assert len(db._shards) == 2
+        assert all(len(db.get_mood_history(user_id)) == 1 for user_id in user_ids)
+        db.close()
+
+    def test_evicted_shard_closed_after_use(self, tmp_path):
+        """Tester qu'un shard évincé pendant un parcours n'est fermé qu'à la fin."""
+        db = ShardedDatabaseManager(str(tmp_path / "per_user"), per_user=True, max_open_shards=1)
+        first = db.create_user("a@example.com", "Passw0rd!")
+        for i in range(3):
+            db.save_checkin(first, i)
+
+        rows = db.iter_user_export_rows(first, "check_ins", batch_size=1)
+        assert next(rows)["mood_score"] == 2
+        db.create_user("b@example.com", "Passw0rd!")  # évince le shard de first
+        assert [row["mood_score"] for row in rows] == [1, 0]
+        assert not db._retired and not db._in_use
+        db.close()
+
+    def test_from_env(self, tmp_path, monkeypatch):
+        """Tester la configuration par l'environnement."""
+        monkeypatch.delenv("SERENE_SHARD_PER_USER", raising=False)
+        monkeypatch.setenv("SERENE_SHARD_COUNT", "0")
+        assert ShardedDatabaseManager.from_env() is None
+
+        monkeypatch.setenv("SERENE_SHARD_COUNT", "3")
+        monkeypatch.setenv("SERENE_SHARD_DIR", str(tmp_path / "env"))
+        db = ShardedDatabaseManager.from_env()
+        assert db.shard_numbers() == [1, 2, 3]
+        db.close()
+
+
+class TestRebalancing:
+    """Tests pour le découpage des shards et la migration."""
+
+    def test_split_moves_users(self, sharded, users):
+        """Tester le découpage d'un shard et la continuité des données déplacées."""
+        number = sharded.shard_number_for(users[1])
+        moved_user = next(u for u in users if u != users[1] and sharded.shard_number_for(u) == number)
+        for _ in range(5):
+            sharded.save_conversation(users[1], "Bonjour", "Salut")
+        sharded.save_conversation(moved_user, "Je vais marcher", "Bonne idée")
+        versions = sharded.get_data_versions(moved_user)
+        [action] = sharded.get_action_items(moved_user)
+
+        result = sharded.split_shard(number)
+
+        # Le plus gros utilisateur reste, le suivant part vers le nouveau shard
+        assert result == {"shard": 3, "moved_users": 1, "moved_rows": 3}
+        assert sharded.shard_number_for(moved_user) == 3
+        assert sharded.shard_number_for(users[1]) == number
+        assert len(sharded.get_conversation_history(moved_user)) == 1
+        assert sharded.search(moved_user, "marcher")
+        assert all(new >= old for new, old in zip(sharded.get_data_versions(moved_user).values(), versions.values()))
+
+        sharded.update_action_item(action["id"], status="completed")
+        assert sharded.get_action_items_stats(moved_user)["completed"] == 1
+        assert sharded._shard_number_for_row("action_items", action["id"]) == 3
+        assert sharded.save_action_item(moved_user, "Nouvelle") // SHARD_ID_SPAN == 3
+        assert sharded.check_action_stats() == []
+
+    def test_move_to_older_shard_refused(self, sharded, users):
+        """Tester le refus d'un déplacement vers une plage d'IDs inférieure."""
+        user_id = next(u for u in users if sharded.shard_number_for(u) == 2)
+        with pytest.raises(ValueError):
+            sharded.move_user(user_id, 1)
+        assert sharded.get_action_items(user_id)
+
+    def test_import_single_database(self, file_db, user_id, tmp_path):
+        """Tester la migration d'une base unique."""
+        file_db.save_checkin(user_id, 7, "Bien")
+        action_id = file_db.save_action_item(user_id, "Lire")
+
+        db = ShardedDatabaseManager(str(tmp_path / "imported"), shard_count=2)
+        assert db.import_database(file_db.db_path) == 1
+
+        assert db.authenticate_user("test@example.com", "Passw0rd!")["id"] == user_id
+        assert db.get_mood_history(user_id)[0]["notes"] == "Bien"
+        assert db.get_action_item_by_id(action_id)["title"] == "Lire"
+        assert db.get_action_items_stats(user_id)["pending"] == 1
+        with pytest.raises(ValueError):
+            db.import_database(file_db.db_path)
+        db.close()
+
+    def test_moved_rows_backfilled(self, sharded, users, tmp_path):
+        """Tester l'enregistrement des lignes déplacées d'un annuaire antérieur à moved_rows."""
+        number = sharded.shard_number_for(users[1])
+        moved_user = next(u for u in users if u != users[1] and sharded.shard_number_for(u) == number)
+        [action] = sharded.get_action_items(moved_user)
+        sharded.split_shard(number)
+        sharded.directory.conn.execute("DROP TABLE moved_rows")
+        sharded.directory.conn.commit()
+
+        reopened = ShardedDatabaseManager(sharded.shard_dir, shard_count=2)
+        assert reopened._shard_number_for_row("action_items", action["id"]) == 3
+        assert reopened.get_action_item_by_id(action["id"])["title"] == action["title"]
+        reopened.close()
@@ -0,0 +1,313 @@
+"""
+Tests unitaires pour l'interface de stockage et l'implémentation PostgreSQL.
+
+Les tests PostgreSQL utilisent le serveur de SERENE_TEST_POSTGRES_URL (ex: un
+conteneur postgres:16) ou, sans cette variable, un serveur jetable démarré
+pour la session avec pgserver (pip install -r requirements-postgres-test.txt);
+ils ne sont ignorés que si aucun des deux n'est disponible. Chaque test
+travaille dans un schéma temporaire, supprimé à la fin.
+"""
+
+import inspect
+import os
+import uuid
+
+import pytest
+
+from src.database.db_manager import SEARCH_HIGHLIGHT_START, DatabaseManager
+from src.database.postgres import PostgresDatabaseManager, build_tsquery
+from src.database.sharding import ShardedDatabaseManager
+from src.database.storage import StorageBackend, open_storage
+
+POSTGRES_URL = os.getenv("SERENE_TEST_POSTGRES_URL")
+
+
+def protocol_methods():
+    """Noms des méthodes de StorageBackend."""
+    return sorted(
+        name for name, member in vars(StorageBackend).items()
+        if not name.startswith("_") and callable(member)
+    )
+
+
+@pytest.fixture(scope="session")
+def postgres_url(tmp_path_factory):
+    """Fixture: URL du serveur de test (SERENE_TEST_POSTGRES_URL, sinon serveur pgserver jetable)."""
+    pytest.importorskip("psycopg")
+    pytest.importorskip("psycopg_pool")
+    if POSTGRES_URL:
+        yield POSTGRES_URL
+        return
+
+    pgserver = pytest.importorskip(
+        "pgserver", reason="SERENE_TEST_POSTGRES_URL non défini et pgserver absent (requirements-postgres-test.txt)"
+    )
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"), cleanup_mode="delete")
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture
+def postgres_schema(postgres_url):
+    """Fixture: conninfo d'un schéma PostgreSQL temporaire."""
+    import psycopg
+
+    schema = f"serene_test_{uuid.uuid4().hex[:12]}"
+    with psycopg.connect(postgres_url, autocommit=True) as conn:
+        conn.execute(f"CREATE SCHEMA {schema}")
+    yield psycopg.conninfo.make_conninfo(postgres_url, options=f"-c search_path={schema}")
+    with psycopg.connect(postgres_url, autocommit=True) as conn:
+        conn.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+@pytest.fixture
+def postgres_db(postgres_schema):
+    """Fixture: PostgresDatabaseManager sur un schéma temporaire."""
+    db = PostgresDatabaseManager(postgres_schema, pool_size=4)
+    yield db
+    db.close()
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def storage(request, tmp_path):
+    """Fixture: chaque implémentation de StorageBackend."""
+    if request.param == "postgres":
+        yield request.getfixturevalue("postgres_db")
+        return
+    db = DatabaseManager(str(tmp_path / "serene.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def owner(storage):
+    """Fixture: utilisateur de test."""
+    return storage.create_user("test@example.com", "Passw0rd!", "Test")
+
+
+class TestStorageInterface:
+    """Tests pour l'interface commune."""
+
+    def test_interface_covers_database_manager(self):
+        """Tester que l'interface reprend toutes les méthodes publiques de DatabaseManager."""
+        public = {
+            name for name in dir(DatabaseManager)
+            if not name.startswith("_") and callable(getattr(DatabaseManager, name))
+        }
+        public.discard("from_env")  # constructeur, propre à chaque implémentation
+        assert public == set(protocol_methods())
+
+    @pytest.mark.parametrize("implementation", [DatabaseManager, PostgresDatabaseManager])
+    def test_signatures_match(self, implementation):
+        """Tester que les paramètres de chaque méthode sont ceux de l'interface."""
+        for name in protocol_methods():
+            expected = list(inspect.signature(getattr(StorageBackend, name)).parameters)
+            assert list(inspect.signature(getattr(implementation, name)).parameters) == expected, name
+
+    def test_sharded_manager_implements_interface(self):
+        """Tester que ShardedDatabaseManager sert toutes les méthodes de l'interface."""
+        assert set(protocol_methods()) <= set(dir(ShardedDatabaseManager))
+
+    def test_open_storage(self, tmp_path, monkeypatch):
+        """Tester le choix de l'implémentation par l'environnement."""
+        monkeypatch.delenv("SERENE_DATABASE_URL", raising=False)
+        monkeypatch.delenv("SERENE_SHARD_PER_USER", raising=False)
+        monkeypatch.setenv("SERENE_SHARD_COUNT", "0")
+        db = open_storage(db_path=str(tmp_path / "serene.db"))
+        assert type(db) is DatabaseManager
+        assert isinstance(db, StorageBackend)
+        db.close()
+
+        monkeypatch.setenv("SERENE_SHARD_COUNT", "2")
+        monkeypatch.setenv("SERENE_SHARD_DIR", str(tmp_path / "shards"))
+        db = open_storage()
+        assert type(db) is ShardedDatabaseManager
+        db.close()
+
+    def test_build_tsquery(self):
+        """Tester la conversion d'une saisie en requête tsquery."""
+        assert build_tsquery("L'anxiété et la fatigue") == "'anxiete':* & 'fatigue':*"
+        assert build_tsquery("anxiété", keep_accents=True) == "('anxiete':* | 'anxiété':*)"
+        assert build_tsquery("le la 'de' & | !") is None
+
+
+class TestStorageContract:
+    """Mêmes comportements pour chaque implémentation (SQLite et PostgreSQL)."""
+
+    def test_checkins_and_mood_aggregates(self, storage, owner):
+        """Tester les check-ins, les statistiques et l'agrégation par jour."""
+        for score, notes in ((4, "Fatigué"), (6, ""), (8, "Bonne journée")):
+            storage.save_checkin(owner, score, notes)
+
+        history = storage.get_mood_history(owner)
+        stats = storage.get_mood_stats(owner)
+        [bucket] = storage.get_mood_buckets(owner, days=7)
+
+        assert sorted(c["mood_score"] for c in history) == [4, 6, 8]
+        assert isinstance(history[0]["timestamp"], str)
+        assert (stats["count"], stats["min"], stats["max"]) == (3, 4, 8)
+        assert stats["avg"] == pytest.approx(6.0) and isinstance(stats["avg"], float)
+        assert bucket["count"] == 3 and len(bucket["bucket_start"]) == 10
+        with pytest.raises(ValueError):
+            storage.save_checkin(owner, 11)
+
+    def test_conversations(self, storage, owner):
+        """Tester l'enregistrement et la lecture des conversations."""
+        ids = [storage.save_conversation(owner, f"Message {i}", f"Réponse {i}", 10) for i in range(3)]
+
+        assert [c["id"] for c in storage.get_conversation_history(owner)] == ids
+        assert [c["id"] for c in storage.get_recent_conversations(owner, limit=2)] == ids[1:]
+        assert storage.get_conversation_count(owner) == 3
+        assert [c["id"] for c in storage.get_conversations_after(owner, ids[0])] == ids[1:]
+        assert [c["id"] for c in storage.get_conversations_by_ids(owner, [ids[2], 0, ids[0]])] == [ids[2], ids[0]]
+
+    def test_search(self, storage, owner):
+        """Tester la recherche sans accents, avec surlignage et filtrage par source."""
+        conversation_id = storage.save_conversation(owner, "Je me sens anxieuse", "L'anxiété est fréquente")
+        checkin_id = storage.save_checkin(owner, 3, "Très fatigué ce soir")
+        other = storage.create_user("other@example.com", "Passw0rd!")
+        storage.save_conversation(other, "Moi aussi anxieuse", "D'accord")
+
+        [result] = storage.search(owner, "anxiete")
+        assert (result["source"], result["id"]) == ("conversation", conversation_id)
+        assert SEARCH_HIGHLIGHT_START in storage.search(owner, "anxieuse")[0]["snippet"]
+
+        [result] = storage.search(owner, "fatigue", sources=("check_ins",))
+        assert (result["source"], result["id"], result["mood_score"]) == ("check_in", checkin_id, 3)
+        assert storage.search(owner, "le la") == []
+        with pytest.raises(ValueError):
+            storage.search(owner, "anxiete", sources=("users",))
+
+    def test_users(self, storage, owner):
+        """Tester les comptes, préférences et profils."""
+        with pytest.raises(ValueError):
+            storage.create_user("test@example.com", "Autre!")
+
+        assert storage.authenticate_user("test@example.com", "mauvais") is None
+        user = storage.authenticate_user("test@example.com", "Passw0rd!")
+        assert user["id"] == owner and "password_hash" not in user
+
+        storage.update_user_preferences(owner, {"theme": "sombre"})
+        storage.update_user_profile(owner, full_name="Test User", birth_year=1990)
+        storage.change_password(owner, "Nouveau1!")
+
+        assert storage.get_user_preferences(owner) == {"theme": "sombre"}
+        assert storage.get_user_export_profile(owner)["display_name"] == "Test"
+        assert storage.get_user_by_id(owner)["last_login"] is not None
+        assert storage.authenticate_user("test@example.com", "Nouveau1!")["id"] == owner
+
+    def test_actions_stats_and_versions(self, storage, owner):
+        """Tester les actions, leurs compteurs et les versions de données."""
+        before = storage.get_data_versions(owner)
+        first = storage.save_action_item(owner, "Marcher", deadline="2030-01-01")
+        second = storage.save_action_item(owner, "Lire")
+
+        storage.update_action_item(first, status="completed")
+        storage.delete_action_item(second)
+
+        action = storage.get_action_item_by_id(first)
+        assert action["status"] == "completed" and action["completed_at"] is not None
+        assert action["deadline"].startswith("2030-01-01")
+        assert [a["id"] for a in storage.get_action_items(owner, status="completed")] == [first]
+        assert storage.get_action_items_stats(owner) == {
+            "pending": 0, "in_progress": 0, "completed": 1, "abandoned": 0, "total": 1,
+        }
+        assert storage.check_action_stats() == []
+        assert storage.get_data_versions(owner)["action_items"] == before["action_items"] + 4
+
+    def test_proposals(self, storage, owner):
+        """Tester la déduplication, l'acceptation et le rejet des propositions."""
+        proposal_id = storage.save_proposed_action(owner, "Aller courir 2 fois")
+        assert storage.save_proposed_action(owner, "aller  Courir, 2 fois !") is None
+        rejected_id = storage.save_proposed_action(owner, "Appeler maman")
+
+        action_id = storage.accept_proposed_action(proposal_id)
+        storage.reject_proposed_action(rejected_id)
+
+        assert storage.get_action_item_by_id(action_id)["source"] == "ai_extracted"
+        assert storage.get_proposed_actions_count(owner) == 0
+        assert {p["status"] for p in storage.get_proposed_actions(owner)} == {"accepted", "rejected"}
+        assert storage.find_similar_active_title(owner, "Aller courir deux fois par semaine") is None
+        with pytest.raises(ValueError):
+            storage.accept_proposed_action(proposal_id)
+        with pytest.raises(ValueError):
+            storage.reject_proposed_action(0)
+
+    def test_insights(self, storage, owner):
+        """Tester les insights."""
+        insight_id = storage.save_insight(owner, "weekly", "Semaine calme", tokens_used=120)
+
+        assert storage.get_latest_insight(owner, "weekly")["id"] == insight_id
+        assert storage.get_latest_insight(owner, "monthly") is None
+
+    def test_llm_telemetry(self, storage):
+        """Tester le résumé, les percentiles, l'histogramme et les appels évités."""
+        for latency in (100.0, 200.0, 300.0):
+            storage.save_llm_metric("conversation", "claude", latency, ttft_ms=latency / 2, cost_usd=0.01)
+        storage.save_llm_metric("conversation", "claude", 50.0, status="error", retries=2)
+        storage.record_llm_skip("action_extraction", "prefilter")
+        storage.record_llm_skip("action_extraction", "prefilter")
+
+        [summary] = storage.get_llm_metrics_summary()
+        assert (summary["requests"], summary["errors"], summary["retries"]) == (4, 1, 2)
+        assert (summary["p50_latency_ms"], summary["p95_latency_ms"]) == (100.0, 300.0)
+        assert summary["cost_usd"] == pytest.approx(0.03)
+        [histogram] = storage.get_llm_histogram("latency_ms", (100.0, 250.0))
+        assert (histogram["count"], histogram["sum"], histogram["buckets"]) == (4, 650.0, [2, 3])
+        assert storage.get_llm_metric_totals()[0]["status"] == "error"
+        assert storage.get_llm_skip_totals(days=1) == [
+            {"component": "action_extraction", "reason": "prefilter", "skipped": 2}
+        ]
+
+    def test_export(self, storage, owner):
+        """Tester l'export par lots."""
+        for score in range(5):
+            storage.save_checkin(owner, score)
+
+        rows = list(storage.iter_user_export_rows(owner, "check_ins", batch_size=2))
+        export = storage.export_user_data(owner)
+
+        assert len(rows) == 5
+        assert storage.count_user_export_rows(owner)["check_ins"] == 5
+        assert len(export["check_ins"]) == 5 and export["user_profile"]["id"] == owner
+        with pytest.raises(ValueError):
+            list(storage.iter_user_export_rows(owner, "users"))
+
+
+class TestPostgresReplicas:
+    """Tests propres à PostgreSQL: plusieurs réplicas et curseurs côté serveur."""
+
+    def test_replicas_share_state(self, postgres_schema):
+        """Tester que deux gestionnaires sur la même base voient les mêmes données."""
+        first = PostgresDatabaseManager(postgres_schema, pool_size=2)
+        second = PostgresDatabaseManager(postgres_schema, pool_size=2)
+        try:
+            user_id = first.create_user("a@example.com", "Passw0rd!")
+            proposal_id = first.save_proposed_action(user_id, "Méditer")
+
+            assert second.authenticate_user("a@example.com", "Passw0rd!")["id"] == user_id
+            second.accept_proposed_action(proposal_id)
+            with pytest.raises(ValueError):
+                first.accept_proposed_action(proposal_id)
+            assert first.get_action_items_stats(user_id)["pending"] == 1
+            assert first.get_data_versions(user_id) == second.get_data_versions(user_id)
+        finally:
+            first.close()
+            second.close()
+
+    def test_export_uses_server_side_cursor(self, postgres_db, postgres_url):
+        """Tester que l'export lit les lignes par lots avec FETCH."""
+        import psycopg
+
+        user_id = postgres_db.create_user("a@example.com", "Passw0rd!")
+        for score in range(5):
+            postgres_db.save_checkin(user_id, score)
+
+        rows = postgres_db.iter_user_export_rows(user_id, "check_ins", batch_size=2)
+        next(rows)
+        with psycopg.connect(postgres_url) as conn:
+            queries = [row[0] for row in conn.execute("SELECT query FROM pg_stat_activity")]
+        rest = list(rows)
+
+        assert any(query.startswith('FETCH FORWARD 2 FROM "serene_export_check_ins"') for query in queries)
+        assert len(rest) == 4
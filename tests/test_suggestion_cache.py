@@ -0,0 +1,139 @@
+"""Tests unitaires pour le cache versionné des suggestions d'actions."""
+
+import json
+
+import pytest
+
+from benchmarks.stub_server import StubLLMServer
+from src.database.query_cache import VersionedCache
+
+SUGGESTIONS = json.dumps({
+    "message": "Quelques pistes :",
+    "actions": [{"title": "Marcher 20 minutes", "description": "Après le déjeuner"}],
+}, ensure_ascii=False)
+
+
+@pytest.fixture
+def suggester(file_db, monkeypatch):
+    """Fixture: ActionSuggester branché sur le serveur LLM local."""
+    from src.llm.action_suggester import ActionSuggester
+
+    with StubLLMServer(ttft_seconds=0, token_delay_seconds=0, json_response=SUGGESTIONS) as stub:
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.base_url)
+        instance = ActionSuggester(file_db)
+        instance.stub = stub
+        yield instance
+
+
+class TestVersionedCache:
+    """Tests pour VersionedCache."""
+
+    def test_version_mismatch_is_a_miss(self):
+        """Tester qu'une entrée d'une autre version n'est pas rendue."""
+        cache = VersionedCache(max_entries=4)
+        cache.put("k", (1,), "v")
+
+        assert cache.get("k", (1,)) == "v"
+        assert cache.get("k", (2,)) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_least_recently_used_evicted(self):
+        """Tester l'éviction de l'entrée la moins récemment lue."""
+        cache = VersionedCache(max_entries=2)
+        cache.put("a", 0, 1)
+        cache.put("b", 0, 2)
+        cache.get("a", 0)
+        cache.put("c", 0, 3)
+
+        assert cache.get("b", 0) is None
+        assert cache.get("a", 0) == 1
+
+
+class TestDataVersions:
+    """Tests pour les versions de données par utilisateur."""
+
+    def test_write_bumps_only_its_table(self, file_db, user_id):
+        """Tester qu'une écriture n'incrémente que la version de sa table."""
+        before = file_db.get_data_versions(user_id)
+        file_db.save_checkin(user_id, 6, "Journée calme")
+        after = file_db.get_data_versions(user_id)
+
+        assert after["check_ins"] == before["check_ins"] + 1
+        assert {t: v for t, v in after.items() if t != "check_ins"} == {
+            t: v for t, v in before.items() if t != "check_ins"
+        }
+
+    def test_direct_sql_writes_counted(self, file_db, user_id):
+        """Tester que les triggers comptent aussi les écritures hors de DatabaseManager."""
+        action_id = file_db.save_action_item(user_id, "Lire 10 pages")
+        version = file_db.get_data_versions(user_id)["action_items"]
+
+        file_db.conn.execute("UPDATE action_items SET title = 'Lire 20 pages' WHERE id = ?", (action_id,))
+        file_db.conn.execute("DELETE FROM action_items WHERE id = ?", (action_id,))
+
+        assert file_db.get_data_versions(user_id)["action_items"] == version + 2
+
+    def test_versions_per_user_and_persistent(self, file_db, user_id):
+        """Tester l'isolation par utilisateur et la persistance des versions."""
+        from src.database.db_manager import DatabaseManager
+
+        other_id = file_db.create_user("autre@example.com", "Passw0rd!", "Autre")
+        file_db.save_conversation(user_id, "Bonjour", "Salut !")
+        versions = file_db.get_data_versions(user_id)
+
+        assert set(file_db.get_data_versions(other_id).values()) == {0}
+        assert DatabaseManager(file_db.db_path).get_data_versions(user_id) == versions
+
+
+class TestSuggestionCache:
+    """Tests d'intégration avec le serveur LLM local."""
+
+    def test_unchanged_data_makes_no_call(self, suggester, file_db, user_id):
+        """Tester qu'une seconde demande sans nouvelle donnée n'appelle pas l'API."""
+        from src.llm.action_suggester import ActionSuggester
+
+        first = suggester.suggest_actions(user_id)
+        # L'interface crée un suggesteur par clic: le cache est partagé par base
+        second = ActionSuggester(file_db).suggest_actions(user_id)
+
+        assert suggester.stub.requests == 1
+        assert not first["cached"]
+        assert second["cached"]
+        assert second["proposals"] == first["proposals"]
+
+    def test_new_checkin_regenerates(self, suggester, file_db, user_id):
+        """Tester qu'un nouveau check-in relance la génération."""
+        suggester.suggest_actions(user_id)
+        file_db.save_checkin(user_id, 3, "Mauvaise nuit")
+        result = suggester.suggest_actions(user_id)
+
+        assert suggester.stub.requests == 2
+        assert not result["cached"]
+
+    def test_next_day_regenerates(self, suggester, user_id, monkeypatch):
+        """Tester qu'un changement de jour relance la génération (fenêtre de 7 jours glissante)."""
+        from datetime import date, timedelta
+
+        import src.llm.action_suggester as action_suggester
+
+        suggester.suggest_actions(user_id)
+
+        class Tomorrow(date):
+            @classmethod
+            def today(cls):
+                return date.today() + timedelta(days=1)
+
+        monkeypatch.setattr(action_suggester, "date", Tomorrow)
+        result = suggester.suggest_actions(user_id)
+
+        assert suggester.stub.requests == 2
+        assert not result["cached"]
+
+    def test_rejected_proposal_regenerates(self, suggester, file_db, user_id):
+        """Tester que le rejet d'une suggestion invalide le cache."""
+        [proposal] = suggester.suggest_actions(user_id)["proposals"]
+        file_db.reject_proposed_action(proposal["id"])
+        suggester.suggest_actions(user_id)
+
+        assert suggester.stub.requests == 2
@@ -0,0 +1,135 @@
+"""Tests unitaires pour la télémétrie des appels LLM."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.llm.conversation_manager import ConversationManager
+from src.llm.telemetry import LLMCallTracker, estimate_cost, render_prometheus
+from src.utils.prompts import CLAUDE_MODEL
+
+
+def _usage(input_tokens=100, output_tokens=50, cache_creation=0, cache_read=0):
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_creation_input_tokens=cache_creation,
+        cache_read_input_tokens=cache_read,
+    )
+
+
+def _metrics(db):
+    return [dict(row) for row in db.conn.execute("SELECT * FROM llm_metrics ORDER BY id")]
+
+
+class TestEstimateCost:
+    """Tests pour l'estimation du coût."""
+
+    def test_all_token_types_priced(self):
+        """Tester le coût par type de token (tarifs par million)."""
+        tokens = {"input": 1_000_000, "output": 1_000_000, "cache_creation": 0, "cache_read": 1_000_000}
+        assert estimate_cost(CLAUDE_MODEL, tokens) == pytest.approx(3.0 + 15.0 + 0.30)
+
+    def test_unknown_model_is_free(self):
+        """Tester qu'un modèle sans tarif a un coût nul."""
+        assert estimate_cost("inconnu", {"input": 1000}) == 0.0
+
+
+class TestLLMCallTracker:
+    """Tests pour LLMCallTracker."""
+
+    def test_records_successful_call(self, file_db, user_id):
+        """Tester l'enregistrement d'un appel réussi avec tokens et TTFT."""
+        with LLMCallTracker(file_db, "insights", CLAUDE_MODEL, user_id) as call:
+            call.first_token()
+            call.record_usage(_usage(cache_read=200))
+
+        [metric] = _metrics(file_db)
+        assert metric["component"] == "insights"
+        assert metric["status"] == "ok"
+        assert metric["user_id"] == user_id
+        assert metric["input_tokens"] == 100
+        assert metric["cache_read_tokens"] == 200
+        assert metric["ttft_ms"] is not None
+        assert metric["latency_ms"] >= metric["ttft_ms"]
+        assert metric["cost_usd"] > 0
+
+    def test_records_error_and_reraises(self, file_db):
+        """Tester qu'une erreur est enregistrée sans être masquée."""
+        with pytest.raises(RuntimeError):
+            with LLMCallTracker(file_db, "action_extraction", CLAUDE_MODEL):
+                raise RuntimeError("API down")
+
+        [metric] = _metrics(file_db)
+        assert metric["status"] == "error"
+        assert metric["error"] == "RuntimeError"
+
+    def test_mock_usage_counts_as_zero(self, file_db):
+        """Tester qu'un usage sans compteurs entiers n'échoue pas."""
+        with LLMCallTracker(file_db, "insights", CLAUDE_MODEL) as call:
+            call.record_usage(MagicMock())
+
+        assert _metrics(file_db)[0]["input_tokens"] == 0
+
+
+class TestMetricsAggregation:
+    """Tests pour le résumé et l'exposition Prometheus."""
+
+    @pytest.fixture
+    def recorded(self, file_db):
+        for latency in range(1, 21):
+            file_db.save_llm_metric("conversation", CLAUDE_MODEL, latency * 100.0, ttft_ms=50.0,
+                                    input_tokens=10, output_tokens=5, cost_usd=0.01)
+        file_db.save_llm_metric("insights", CLAUDE_MODEL, 3000.0, status="error", error="APIError")
+        return file_db
+
+    def test_summary_percentiles(self, recorded):
+        """Tester les percentiles par composant (rang le plus proche)."""
+        summary = {row["component"]: row for row in recorded.get_llm_metrics_summary(days=1)}
+
+        conversation = summary["conversation"]
+        assert conversation["requests"] == 20
+        assert conversation["p50_latency_ms"] == 1000.0
+        assert conversation["p95_latency_ms"] == 1900.0
+        assert conversation["p95_ttft_ms"] == 50.0
+        assert summary["insights"]["errors"] == 1
+        assert summary["insights"]["p95_ttft_ms"] is None
+
+    def test_prometheus_exposition(self, recorded):
+        """Tester les compteurs et histogrammes exposés."""
+        text = render_prometheus(recorded)
+        labels = f'component="conversation",model="{CLAUDE_MODEL}"'
+
+        assert f'serene_llm_requests_total{{{labels},status="ok"}} 20' in text
+        assert f'serene_llm_tokens_total{{{labels},type="input"}} 200' in text
+        assert f'serene_llm_latency_seconds_bucket{{{labels},le="1.0"}} 10' in text
+        assert f'serene_llm_latency_seconds_bucket{{{labels},le="+Inf"}} 20' in text
+        assert f'serene_llm_ttft_seconds_count{{{labels}}} 20' in text
+        assert "# TYPE serene_llm_latency_seconds histogram" in text
+
+    def test_invalid_status_rejected(self, file_db):
+        """Tester la validation du statut."""
+        with pytest.raises(ValueError):
+            file_db.save_llm_metric("conversation", CLAUDE_MODEL, 10.0, status="timeout")
+
+
+class TestConversationTelemetry:
+    """Tests pour l'instrumentation de ConversationManager."""
+
+    def test_streamed_call_recorded(self, file_db, user_id, monkeypatch, mocker):
+        """Tester qu'un message en streaming enregistre TTFT et tokens."""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-test-key")
+        stream = MagicMock()
+        stream.text_stream = iter(["Bonjour", " !"])
+        stream.get_final_message.return_value.usage = _usage(input_tokens=12, output_tokens=3)
+        client = mocker.patch("src.llm.conversation_manager.Anthropic")
+        client.return_value.messages.stream.return_value.__enter__.return_value = stream
+
+        manager = ConversationManager(file_db, enable_action_extraction=False, enable_memory=False)
+        assert "".join(manager.send_message(user_id, "Salut")) == "Bonjour !"
+
+        [metric] = _metrics(file_db)
+        assert metric["component"] == "conversation"
+        assert metric["input_tokens"] == 12
+        assert metric["ttft_ms"] is not None
@@ -0,0 +1,44 @@
+"""Tests unitaires pour la mesure du temps de rendu."""
+
+import logging
+
+import pytest
+
+from src.utils.timing import last_timings, timed
+
+
+class TestTimed:
+    """Tests pour le décorateur timed."""
+
+    def test_timed_logs_duration(self, caplog):
+        """Tester que la durée est journalisée et mémorisée."""
+        @timed("test.section")
+        def render():
+            return 42
+
+        with caplog.at_level(logging.INFO, logger="serene.timing"):
+            assert render() == 42
+
+        assert "test.section rendu en" in caplog.text
+        assert last_timings["test.section"] >= 0
+
+    def test_timed_logs_on_exception(self, caplog):
+        """Tester que la durée est journalisée même si le rendu échoue."""
+        @timed("test.failure")
+        def render():
+            raise RuntimeError("boom")
+
+        with caplog.at_level(logging.INFO, logger="serene.timing"):
+            with pytest.raises(RuntimeError):
+                render()
+
+        assert "test.failure rendu en" in caplog.text
+
+    def test_timed_preserves_metadata(self):
+        """Tester que le nom et la docstring sont conservés."""
+        @timed("test.meta")
+        def render():
+            """Docstring."""
+
+        assert render.__name__ == "render"
+        assert render.__doc__ == "Docstring."
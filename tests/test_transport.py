@@ -0,0 +1,233 @@
+"""Tests unitaires pour le transport LLM (nouvelles tentatives, disjoncteur, hedging)."""
+
+import time
+
+import pytest
+from anthropic import Anthropic, BadRequestError, InternalServerError
+
+from benchmarks.stub_server import JSON_RESPONSE, STREAM_RESPONSE, StubLLMServer
+from src.llm.rate_limiter import LLMScheduler, RateLimitTimeout
+from src.llm.transport import CircuitBreaker, CircuitOpenError, LLMTransport
+from tests.conftest import FakeClock
+
+MESSAGES = [{"role": "user", "content": "Bonjour"}]
+
+
+class Tracker:
+    """Remplace LLMCallTracker: seul le compteur de tentatives est lu."""
+
+    retries = 0
+
+
+@pytest.fixture
+def stub():
+    """Fixture: serveur LLM local sans latence."""
+    with StubLLMServer(ttft_seconds=0, token_delay_seconds=0) as server:
+        yield server
+
+
+@pytest.fixture
+def sleeps():
+    """Fixture: attentes demandées par le transport (sans attendre)."""
+    return []
+
+
+def make_transport(stub, sleeps, **kwargs):
+    client = Anthropic(api_key="test", base_url=stub.base_url, max_retries=0)
+    kwargs.setdefault("breaker", CircuitBreaker())
+    return LLMTransport(client, sleep=sleeps.append, **kwargs)
+
+
+class TestRetries:
+    """Tests pour les nouvelles tentatives."""
+
+    def test_overloaded_then_success(self, stub, sleeps):
+        """Tester qu'une surcharge (529) transitoire ne fait pas perdre l'appel."""
+        stub.fail_next(529, count=2)
+        tracker = Tracker()
+
+        response = make_transport(stub, sleeps).create(
+            tracker=tracker, model="stub", max_tokens=10, messages=MESSAGES
+        )
+
+        assert response.content[0].text == JSON_RESPONSE
+        assert stub.requests == 3
+        assert tracker.retries == 2
+        assert len(sleeps) == 2
+
+    def test_retry_after_is_honored(self, stub, sleeps):
+        """Tester que le délai demandé par l'API est respecté."""
+        stub.fail_next(429, retry_after=1.5)
+
+        make_transport(stub, sleeps).create(model="stub", max_tokens=10, messages=MESSAGES)
+
+        assert sleeps == [1.5]
+
+    def test_long_retry_after_fails_fast(self, stub, sleeps):
+        """Tester qu'un retry-after trop long n'est pas attendu."""
+        stub.fail_next(429, retry_after=600)
+
+        with pytest.raises(Exception):
+            make_transport(stub, sleeps).create(model="stub", max_tokens=10, messages=MESSAGES)
+        assert sleeps == []
+
+    def test_client_error_not_retried(self, stub, sleeps):
+        """Tester qu'une erreur 400 est retournée sans nouvelle tentative."""
+        stub.fail_next(400)
+
+        with pytest.raises(BadRequestError):
+            make_transport(stub, sleeps).create(model="stub", max_tokens=10, messages=MESSAGES)
+        assert stub.requests == 1
+
+    def test_retries_exhausted(self, stub, sleeps):
+        """Tester l'erreur finale après max_retries nouvelles tentatives."""
+        stub.fail_next(500, count=5)
+
+        with pytest.raises(InternalServerError):
+            make_transport(stub, sleeps, max_retries=3).create(model="stub", max_tokens=10, messages=MESSAGES)
+        assert stub.requests == 4
+        # Backoff exponentiel borné (jitter complet)
+        assert all(0 <= delay <= 0.5 * 2 ** i for i, delay in enumerate(sleeps))
+
+    def test_stream_open_is_retried(self, stub, sleeps):
+        """Tester la nouvelle tentative à l'ouverture d'un flux."""
+        stub.fail_next(529)
+        tracker = Tracker()
+
+        with make_transport(stub, sleeps).stream(
+            tracker=tracker, model="stub", max_tokens=10, messages=MESSAGES
+        ) as stream:
+            text = "".join(stream.text_stream)
+
+        assert text == STREAM_RESPONSE
+        assert tracker.retries == 1
+
+
+class TestCircuitBreaker:
+    """Tests pour le disjoncteur."""
+
+    def test_opens_and_fails_fast(self, stub, sleeps):
+        """Tester que les appels échouent sans requête une fois le disjoncteur ouvert."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        transport = make_transport(stub, sleeps, max_retries=0, breaker=breaker)
+        stub.fail_next(503, count=2)
+
+        for _ in range(2):
+            with pytest.raises(InternalServerError):
+                transport.create(model="stub", max_tokens=10, messages=MESSAGES)
+
+        with pytest.raises(CircuitOpenError):
+            transport.create(model="stub", max_tokens=10, messages=MESSAGES)
+        assert stub.requests == 2
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_half_open_trial(self):
+        """Tester l'appel d'essai après le délai d'ouverture."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.before_call()
+        breaker.record_failure()
+
+        clock.now = 11
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+        # Un seul appel d'essai à la fois
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        """Tester qu'un appel d'essai en échec rouvre le disjoncteur."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 10
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_rate_limit_does_not_trip(self, stub, sleeps):
+        """Tester qu'un 429 (API joignable) n'ouvre pas le disjoncteur."""
+        breaker = CircuitBreaker(failure_threshold=1)
+        stub.fail_next(429)
+
+        with pytest.raises(Exception):
+            make_transport(stub, sleeps, max_retries=0, breaker=breaker).create(
+                model="stub", max_tokens=10, messages=MESSAGES
+            )
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestHedging:
+    """Tests pour les requêtes de secours."""
+
+    def test_hedged_request_wins(self, stub, sleeps):
+        """Tester que la requête de secours répond avant une requête lente."""
+        stub.slow_next(2.0)
+        transport = make_transport(stub, sleeps, hedge_after=0.1)
+
+        start = time.perf_counter()
+        response = transport.create(model="stub", max_tokens=10, messages=MESSAGES)
+
+        assert time.perf_counter() - start < 1.5
+        assert response.content[0].text == JSON_RESPONSE
+        assert stub.requests == 2
+
+    def test_no_hedge_when_fast(self, stub, sleeps):
+        """Tester qu'aucune requête de secours n'est envoyée sous le délai."""
+        make_transport(stub, sleeps, hedge_after=1.0).create(model="stub", max_tokens=10, messages=MESSAGES)
+        assert stub.requests == 1
+
+
+class TestScheduling:
+    """Tests pour l'admission des appels par l'ordonnanceur."""
+
+    def test_not_admitted_is_not_sent(self, stub, sleeps):
+        """Tester qu'une requête non admise n'atteint pas l'API et ne touche pas au disjoncteur."""
+        llm_scheduler = LLMScheduler(max_concurrency=1, queue_timeout=0.05)
+        breaker = CircuitBreaker(failure_threshold=1)
+        transport = make_transport(stub, sleeps, breaker=breaker, llm_scheduler=llm_scheduler)
+        holder = llm_scheduler.acquire("conversation", 1, 10)
+
+        with pytest.raises(RateLimitTimeout):
+            transport.create(model="stub", max_tokens=10, messages=MESSAGES)
+        holder.release()
+
+        assert stub.requests == 0
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_usage_settles_reservation(self, stub, sleeps):
+        """Tester que l'usage réel remplace la réservation (max_tokens)."""
+        llm_scheduler = LLMScheduler(tokens_per_minute=10_000, queue_timeout=0.05)
+        transport = make_transport(stub, sleeps, llm_scheduler=llm_scheduler)
+
+        # Deux réservations de 6000 tokens ne tiennent dans le budget que si la première est corrigée
+        for _ in range(2):
+            transport.create(model="stub", max_tokens=6000, messages=MESSAGES)
+        assert stub.requests == 2
+
+
+class TestConversationRetries:
+    """Tests d'intégration avec ConversationManager."""
+
+    def test_send_message_survives_overload(self, stub, file_db, user_id, monkeypatch):
+        """Tester qu'une surcharge transitoire ne fait pas perdre le tour de conversation."""
+        from src.llm.conversation_manager import ConversationManager
+
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.base_url)
+        manager = ConversationManager(file_db, enable_action_extraction=False, enable_memory=False)
+        manager.transport.breaker = CircuitBreaker()
+        manager.transport._sleep = lambda delay: None
+        stub.fail_next(529)
+
+        response = "".join(manager.send_message(user_id, "Bonjour"))
+
+        assert response == STREAM_RESPONSE
+        metrics = file_db.conn.execute("SELECT status, retries FROM llm_metrics").fetchall()
+        assert [tuple(row) for row in metrics] == [("ok", 1)]